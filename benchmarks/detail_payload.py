@@ -0,0 +1,120 @@
+"""
+KPI detail view payload.
+
+Builds the charts a KPI detail view sends (trend with confidence band and
+forecast, volume comparison, process steps) for every KPI of the dataset at
+its latest quarter, serializes them the way ``st.plotly_chart`` does, and
+reports the bytes per view before and after ``kpi_core.figures.compact_figure``.
+Charts carry Streamlit's Plotly template, as they do in the dashboard. Fails
+if compaction saves less than the required share of the bytes.
+
+Usage:
+    python benchmarks/detail_payload.py
+    python benchmarks/detail_payload.py --data data/kpiData.json --min-reduction 0.4 --json
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import plotly.io as pio  # noqa: E402
+
+from kpi_core import list_quarters, load_data, prepare_category_first_df, process_step_rows  # noqa: E402
+from kpi_core.figures import comparison_figure, compact_figure, steps_figure, trend_figure  # noqa: E402
+from kpi_core.forecast import forecast_band, kpi_forecasts  # noqa: E402
+from kpi_core.intervals import kpi_band, kpi_intervals  # noqa: E402
+
+DEFAULT_MIN_REDUCTION = 0.35
+FORECAST_HORIZON = 2  # the trend chart's default "quarters ahead"
+
+
+def use_streamlit_template() -> bool:
+    """Make Streamlit's Plotly template the default, as importing ``st.plotly_chart`` does."""
+    try:
+        from streamlit.elements.lib.streamlit_plotly_theme import configure_streamlit_plotly_theme
+    except ImportError:
+        return False
+    configure_streamlit_plotly_theme()
+    return True
+
+
+def detail_figures(data: Dict[str, Any], process: str, kpi_id: str, quarter: str, intervals, forecasts) -> List[Any]:
+    """Charts of one KPI detail view (None for charts the KPI does not have)."""
+    band = kpi_band(intervals, process, kpi_id)
+    ahead = forecast_band(forecasts, process, kpi_id, FORECAST_HORIZON)
+    trend = trend_figure(
+        process,
+        kpi_id,
+        data["quarterlyData"][process],
+        quarter,
+        "All",
+        band=band if not band.empty else None,
+        forecast=ahead if not ahead.empty else None,
+    )
+    comparison = comparison_figure(process, *prepare_category_first_df(process, kpi_id, quarter, data))
+    steps_rows, _ = process_step_rows(process, quarter, data["processStepData"], "All")
+    steps = steps_figure(steps_rows) if not steps_rows.empty else None
+    return [trend, comparison, steps]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--data", default=str(ROOT / "data" / "kpiData.json"), help="Path to the KPI JSON file.")
+    parser.add_argument("--min-reduction", type=float, default=DEFAULT_MIN_REDUCTION)
+    parser.add_argument("--json", action="store_true", help="Emit a JSON report instead of a table.")
+    args = parser.parse_args()
+
+    themed = use_streamlit_template()
+    data = load_data(args.data)
+    quarter = list_quarters(data)[-1]
+    intervals, forecasts = kpi_intervals(data), kpi_forecasts(data)
+    rows = []
+    for process, block in data["quarterlyData"].items():
+        views = raw = compact = 0
+        compact_s = 0.0
+        for kpi_id in block:
+            views += 1
+            for fig in detail_figures(data, process, kpi_id, quarter, intervals, forecasts):
+                if fig is None:
+                    continue
+                raw += len(pio.to_json(fig, validate=False))
+                t0 = time.perf_counter()
+                compact_figure(fig)
+                compact_s += time.perf_counter() - t0
+                compact += len(pio.to_json(fig, validate=False))
+        rows.append(
+            {
+                "process": process,
+                "views": views,
+                "raw_kb_per_view": round(raw / views / 1024, 2),
+                "compact_kb_per_view": round(compact / views / 1024, 2),
+                "reduction": round(1 - compact / raw, 3),
+                "compact_ms_per_view": round(compact_s * 1000 / views, 2),
+                "raw_bytes": raw,
+                "compact_bytes": compact,
+            }
+        )
+    reduction = 1 - sum(r["compact_bytes"] for r in rows) / sum(r["raw_bytes"] for r in rows)
+    if args.json:
+        report = {"quarter": quarter, "streamlit_template": themed, "reduction": round(reduction, 3), "rows": rows}
+        print(json.dumps({"min_reduction": args.min_reduction, **report}, indent=2))
+    else:
+        print(f"KPI detail view payload ({quarter}, min reduction {args.min_reduction:.0%})")
+        for r in rows:
+            print(
+                f"  {r['process']:<6}{r['views']:>4} views  raw {r['raw_kb_per_view']:>6.1f} KB  "
+                f"compact {r['compact_kb_per_view']:>6.1f} KB  -{r['reduction']:.0%}  "
+                f"{r['compact_ms_per_view']:>6.1f} ms"
+            )
+        print(f"  total  -{reduction:.0%}")
+    return 0 if reduction >= args.min_reduction else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
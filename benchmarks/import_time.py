@@ -0,0 +1,122 @@
+"""
+Import-time budget for the KPI dashboard.
+
+Runs ``python -X importtime`` in a fresh interpreter for the modules the
+dashboard imports at startup, prints a per-package breakdown of cumulative
+import time, and compares the total against a startup budget. The modules that
+are deferred with ``kpi_core.lazy_import`` are measured separately so the
+saving is visible in the report.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 1200 --json
+"""
+
+import argparse
+import json
+import pathlib
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# Imports executed when `streamlit run stream_kpi_dash_g2.py` starts a session
+STARTUP_IMPORTS: List[str] = [
+    "streamlit",
+    "kpi_core",
+    "kpi_core.constants",
+    "kpi_core.periods",
+    "kpi_core.data",
+    "kpi_core.status",
+    "kpi_core.steps",
+    "kpi_core.comparison",
+    "kpi_core.analytics",
+    "kpi_core.bottlenecks",
+]
+
+# Heavy modules deferred until a chart or analysis actually needs them
+DEFERRED_IMPORTS: List[str] = [
+    "pandas",
+    "numpy",
+    "plotly.graph_objects",
+    "plotly.express",
+    "scipy.stats",
+]
+
+DEFAULT_BUDGET_MS = 1500.0
+
+
+def _importtime(stmt: str) -> Dict[str, float]:
+    """Run ``stmt`` under ``-X importtime`` and sum cumulative ms per top-level import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    per_pkg: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth != 0:
+            continue
+        top = name.strip().split(".")[0]
+        per_pkg[top] = per_pkg.get(top, 0.0) + int(cumulative) / 1000.0
+    return per_pkg
+
+
+def measure(modules: List[str]) -> Tuple[float, Dict[str, float]]:
+    """
+    Measure cold import time for a group of modules in a fresh interpreter.
+
+    Interpreter bootstrap imports (``site``, ``encodings``...) are excluded so
+    only the cost attributable to ``modules`` is reported.
+
+    Args:
+        modules (List[str]): Modules to import, in order.
+
+    Returns:
+        Tuple[float, Dict[str, float]]: Total milliseconds and per top-level
+        import cumulative milliseconds.
+    """
+    bootstrap = set(_importtime("pass"))
+    per_pkg = {
+        k: v
+        for k, v in _importtime("; ".join(f"import {m}" for m in modules)).items()
+        if k not in bootstrap
+    }
+    return sum(per_pkg.values()), per_pkg
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--json", action="store_true", help="Emit a JSON report instead of a table.")
+    args = parser.parse_args()
+
+    startup_total, startup = measure(STARTUP_IMPORTS)
+    deferred = {m: measure([m])[0] for m in DEFERRED_IMPORTS}
+    report = {
+        "startup_ms": round(startup_total, 1),
+        "budget_ms": args.budget_ms,
+        "startup_breakdown_ms": {k: round(v, 1) for k, v in sorted(startup.items(), key=lambda kv: -kv[1])},
+        "deferred_ms": {k: round(v, 1) for k, v in deferred.items()},
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Startup imports: {report['startup_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        for pkg, ms in report["startup_breakdown_ms"].items():
+            print(f"  {pkg:<28}{ms:>10.1f} ms")
+        print("Deferred until first use:")
+        for mod, ms in report["deferred_ms"].items():
+            print(f"  {mod:<28}{ms:>10.1f} ms")
+    return 0 if startup_total <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Trend chart payload budget.
+
+Builds ``kpi_core.figures.trend_figure`` for synthetic KPI histories at
+quarterly, monthly, weekly and daily granularity over 15 years, with the five
+GMP disaggregations overlaid, and reports the serialized figure size with and
+without server-side downsampling. Fails if any downsampled figure exceeds the
+payload budget.
+
+Usage:
+    python benchmarks/trend_payload.py
+    python benchmarks/trend_payload.py --budget-kb 256 --json
+"""
+
+import argparse
+import json
+import pathlib
+import sys
+import time
+from typing import Any, Dict
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np  # noqa: E402
+
+from kpi_core.constants import DISAG_KPI_LINKS  # noqa: E402
+from kpi_core.figures import trend_figure  # noqa: E402
+
+BASE_KPI = "pct_facilities_inspected_on_time"
+YEARS = 15
+GRANULARITIES = {"quarter": 4, "month": 12, "week": 52, "day": 365}
+DEFAULT_BUDGET_KB = 256.0
+
+
+def synthetic_block(points: int, seed: int = 7) -> Dict[str, Any]:
+    """KPI block with an overall series and every GMP disaggregation for ``points`` periods."""
+    rng = np.random.default_rng(seed)
+    labels = [f"P{i:05d}" for i in range(points)]
+
+    def series() -> Dict[str, Any]:
+        values = np.clip(70 + np.cumsum(rng.normal(0, 0.5, points)), 0, 100)
+        return {"target": 90, "baseline": 65, "data": [{"quarter": q, "value": float(v)} for q, v in zip(labels, values)]}
+
+    block = {BASE_KPI: series()}
+    for kid in DISAG_KPI_LINKS[BASE_KPI].values():
+        block[kid] = series()
+    return block
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-kb", type=float, default=DEFAULT_BUDGET_KB)
+    parser.add_argument("--json", action="store_true", help="Emit a JSON report instead of a table.")
+    args = parser.parse_args()
+
+    trend_figure("GMP", BASE_KPI, synthetic_block(8), "", "All")  # exclude Plotly import from timings
+    rows = []
+    for name, per_year in GRANULARITIES.items():
+        points = YEARS * per_year
+        block = synthetic_block(points)
+        t0 = time.perf_counter()
+        fig = trend_figure("GMP", BASE_KPI, block, "", "All")
+        build_ms = (time.perf_counter() - t0) * 1000.0
+        full = trend_figure("GMP", BASE_KPI, block, "", "All", point_budget=10**9)
+        rows.append(
+            {
+                "granularity": name,
+                "points_per_series": points,
+                "full_kb": round(len(full.to_json()) / 1024, 1),
+                "downsampled_kb": round(len(fig.to_json()) / 1024, 1),
+                "trace_types": sorted({t.type for t in fig.data}),
+                "build_ms": round(build_ms, 1),
+            }
+        )
+    worst = max(r["downsampled_kb"] for r in rows)
+    if args.json:
+        print(json.dumps({"budget_kb": args.budget_kb, "rows": rows}, indent=2))
+    else:
+        print(f"Trend payload (budget {args.budget_kb:.0f} KB)")
+        for r in rows:
+            print(
+                f"  {r['granularity']:<8}{r['points_per_series']:>7} pts  "
+                f"full {r['full_kb']:>9.1f} KB  downsampled {r['downsampled_kb']:>7.1f} KB  "
+                f"{'/'.join(r['trace_types']):<18}{r['build_ms']:>7.1f} ms"
+            )
+    return 0 if worst <= args.budget_kb else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
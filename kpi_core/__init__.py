@@ -0,0 +1,108 @@
+"""
+Core building blocks for the NDA Regulatory KPI Dashboard.
+
+This package holds the pieces of the dashboard that do not need Streamlit:
+static configuration, theming, import helpers and the headless KPI data layer
+(loading, status rules, comparison frames, analytics and bottleneck prep), so
+notebooks, batch jobs and services can reuse exactly what the dashboard
+computes. Importing it is cheap; heavy libraries are only loaded by the
+modules that actually use them.
+"""
+
+from .analytics import (
+    category_display_name,
+    flatten_steps_for_analytics,
+    flatten_volumes,
+    metric_display_name,
+    prep_analysis,
+)
+from .bottlenecks import (
+    aging_matrix,
+    bottleneck_analytics,
+    fine_bottleneck_df,
+    flatten_bottleneck_analytics,
+    prepare_bottleneck_df,
+)
+from .comparison import build_kpi_comparison_df, pair_spec_for_kpi, prepare_category_first_df
+from .data import (
+    DataError,
+    file_version,
+    filter_period,
+    list_quarters,
+    load_data,
+    normalize_periods,
+    quarter_order_key,
+)
+from .lazy import LazyModule, lazy_import
+from .periods import parse_period, period_label, period_year, sort_periods
+from .status import (
+    base_kpi_ids,
+    has_disag_for_kpi,
+    resolve_effective_kpi_id,
+    status_counts,
+    status_for,
+    status_matrix,
+)
+from .steps import (
+    StepCatalog,
+    StepKey,
+    friendly_step_label,
+    get_step_status,
+    parse_step_key,
+    process_step_rows,
+    process_step_status_counts,
+    process_step_statuses,
+    select_steps,
+    step_catalog,
+    strip_disag_suffix,
+    wrap_label,
+)
+from .theme import global_css
+
+__all__ = [
+    "DataError",
+    "LazyModule",
+    "StepCatalog",
+    "StepKey",
+    "aging_matrix",
+    "base_kpi_ids",
+    "bottleneck_analytics",
+    "build_kpi_comparison_df",
+    "category_display_name",
+    "file_version",
+    "filter_period",
+    "fine_bottleneck_df",
+    "flatten_bottleneck_analytics",
+    "flatten_steps_for_analytics",
+    "flatten_volumes",
+    "friendly_step_label",
+    "get_step_status",
+    "global_css",
+    "has_disag_for_kpi",
+    "lazy_import",
+    "list_quarters",
+    "load_data",
+    "metric_display_name",
+    "normalize_periods",
+    "pair_spec_for_kpi",
+    "parse_period",
+    "parse_step_key",
+    "period_label",
+    "period_year",
+    "prep_analysis",
+    "prepare_bottleneck_df",
+    "prepare_category_first_df",
+    "process_step_rows",
+    "process_step_status_counts",
+    "process_step_statuses",
+    "quarter_order_key",
+    "resolve_effective_kpi_id",
+    "select_steps",
+    "sort_periods",
+    "status_counts",
+    "status_for",
+    "status_matrix",
+    "step_catalog",
+    "strip_disag_suffix",
+    "wrap_label",
+]
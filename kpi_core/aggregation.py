@@ -0,0 +1,202 @@
+"""
+Component-aware aggregation for self-service analytics.
+
+Percentages cannot be averaged across quarters: a yearly mean of quarterly
+rates weights a 5-case quarter like a 500-case one. Every rate metric is
+therefore stored with its additive components (numerator, denominator) and
+rolled up as a ratio of sums:
+
+- percentage KPIs take their components from ``kpiCounts``;
+- volume pairs (e.g. approvals granted / applications completed) become rate
+  metrics built from the volume tables.
+
+``ratio_components`` produces the quarterly component rows (they join the
+analytics pool), ``yearly_components`` materializes them per
+(process, metric, category, year) once per dataset version, and
+``ratio_pivot`` aggregates a pool with the right rule per metric: ratio of
+sums for rates, sum for volumes, mean for everything else.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .intervals import kpi_counts_frame
+from .lazy import lazy_import
+from .periods import parse_period, period_year
+
+pd = lazy_import("pandas")
+
+# Aggregation name for component-aware rollups (alongside sum/mean/median)
+RATIO_AGG = "ratio"
+# Rates are shown in percent
+RATE_SCALE = 100.0
+# Sources whose values are additive counts
+ADDITIVE_SOURCES = {"volumes"}
+
+COMPONENT_COLUMNS = [
+    "source",
+    "process",
+    "quarter",
+    "period_id",
+    "year",
+    "metric_name",
+    "category",
+    "value",
+    "numerator",
+    "denominator",
+]
+
+
+@dataclass(frozen=True)
+class VolumeRatio:
+    """A rate metric defined by two volume fields of one process."""
+
+    metric: str
+    process: str
+    numerator: str
+    denominator: str
+    category: Optional[str] = None
+
+
+VOLUME_RATIOS: List[VolumeRatio] = [
+    VolumeRatio("completion_rate", "MA", "applications_completed", "applications_received"),
+    VolumeRatio("approval_rate", "MA", "approvals_granted", "applications_completed"),
+    VolumeRatio("fir_response_rate", "MA", "fir_responses_received", "fir_sent"),
+    VolumeRatio("completion_rate", "CT", "applications_completed", "applications_received"),
+    VolumeRatio("query_response_rate", "CT", "queries_responses_received", "queries_sent"),
+    VolumeRatio("gcp_inspection_rate", "CT", "gcp_inspections_conducted", "gcp_inspections_requested"),
+] + [
+    VolumeRatio(metric, "GMP", f"{num}_{cat}", f"{den}_{cat}", cat)
+    for cat in ("domestic", "foreign", "reliance", "desk")
+    for metric, num, den in (
+        ("inspection_rate", "conducted", "requested"),
+        ("compliance_rate", "compliant", "conducted"),
+    )
+]
+
+_VOLUME_SECTIONS = {"MA": "quarterlyVolumes", "CT": "quarterlyVolumes", "GMP": "inspectionVolumes"}
+
+
+def ratio_components(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Quarterly rate metrics with their numerator and denominator.
+
+    Percentage KPIs pool the ``kpiCounts`` numerator and denominator as
+    reported; the reported value × denominator stands in only where a
+    quarter has no numerator. Quarters with a non-positive denominator have
+    no defined rate and are left out, so they cannot bias the sums.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        pd.DataFrame: ``COMPONENT_COLUMNS`` rows; source "kpis" for
+        ``kpiCounts`` KPIs and "ratios" for volume pairs.
+    """
+    counts = kpi_counts_frame(data)
+    kpis = pd.DataFrame(
+        {
+            "source": "kpis",
+            "process": counts["process"],
+            "quarter": counts["quarter"],
+            "period_id": counts["period_id"],
+            "year": counts["period_id"] // 4,
+            "metric_name": counts["kpi_id"],
+            "category": None,
+            "numerator": counts["numerator"].fillna(counts["value"] / RATE_SCALE * counts["denominator"]),
+            "denominator": counts["denominator"],
+        }
+    )
+    rows = []
+    for spec in VOLUME_RATIOS:
+        for rec in data.get(_VOLUME_SECTIONS[spec.process], {}).get(spec.process, []):
+            num, den = rec.get(spec.numerator), rec.get(spec.denominator)
+            if isinstance(num, (int, float)) and isinstance(den, (int, float)):
+                q, pid = rec["quarter"], parse_period(rec["quarter"])[1]
+                rows.append(("ratios", spec.process, q, pid, period_year(q), spec.metric, spec.category, num, den))
+    volumes = pd.DataFrame(rows, columns=[c for c in COMPONENT_COLUMNS if c != "value"])
+    out = pd.concat([kpis, volumes], ignore_index=True)
+    out = out[out["denominator"] > 0]
+    out = out.astype({"numerator": float, "denominator": float, "period_id": int, "year": int})
+    out["value"] = out["numerator"] / out["denominator"] * RATE_SCALE
+    return out[COMPONENT_COLUMNS].reset_index(drop=True)
+
+
+def yearly_components(components: pd.DataFrame) -> pd.DataFrame:
+    """
+    Materialized per-(process, metric, category, year) component sums.
+
+    Args:
+        components (pd.DataFrame): Output of ``ratio_components``.
+
+    Returns:
+        pd.DataFrame: Columns source, process, metric_name, category, year,
+        numerator, denominator, quarters (count pooled) and value.
+    """
+    keys = ["source", "process", "metric_name", "category", "year"]
+    out = (
+        components.assign(category=components["category"].fillna(""))
+        .groupby(keys, sort=True, as_index=False)
+        .agg(numerator=("numerator", "sum"), denominator=("denominator", "sum"), quarters=("quarter", "size"))
+    )
+    out["category"] = out["category"].replace("", None)
+    out["value"] = out["numerator"] / out["denominator"] * RATE_SCALE
+    return out
+
+
+def is_ratio_metric(df: pd.DataFrame) -> pd.Series:
+    """Rows that carry rate components."""
+    if "denominator" not in df.columns:
+        return pd.Series(False, index=df.index)
+    return df["denominator"].notna()
+
+
+def ratio_pivot(
+    df: pd.DataFrame,
+    index: str,
+    columns: str,
+    yearly: Optional[pd.DataFrame] = None,
+    fill: Optional[float] = 0,
+) -> pd.DataFrame:
+    """
+    Pivot with a component-aware aggregation per metric.
+
+    Rates are pooled as sum(numerator) / sum(denominator); volumes are
+    summed; other metrics (days, ratios without components) are averaged.
+
+    Args:
+        df (pd.DataFrame): Pool rows (already filtered).
+        index (str): Row grouping ("quarter", "year", ...).
+        columns (str): Column grouping ("metric_name" or "category").
+        yearly (Optional[pd.DataFrame]): Materialized ``yearly_components``
+            already restricted to the pool's scope; used for rate rows when
+            ``index`` is "year" instead of re-aggregating quarters.
+        fill (Optional[float]): Value for empty cells; None keeps NaN.
+
+    Returns:
+        pd.DataFrame: Pivot of ``index`` × ``columns``.
+    """
+    ratio_mask = is_ratio_metric(df)
+    parts = []
+    rates = df[ratio_mask]
+    if index == "year" and yearly is not None and not rates.empty:
+        scope = rates[["process", "metric_name", "year"]].drop_duplicates()
+        rates = yearly.merge(scope, on=["process", "metric_name", "year"])
+    if not rates.empty:
+        sums = rates.groupby([index, columns])[["numerator", "denominator"]].sum()
+        parts.append(sums["numerator"] / sums["denominator"] * RATE_SCALE)
+    rest = df[~ratio_mask]
+    additive = rest["source"].isin(ADDITIVE_SOURCES)
+    if additive.any():
+        parts.append(rest[additive].groupby([index, columns])["value"].sum())
+    if (~additive).any():
+        parts.append(rest[~additive].groupby([index, columns])["value"].mean())
+    if not parts:
+        return pd.DataFrame()
+    combined = pd.concat(parts)
+    combined = combined[~combined.index.duplicated(keep="first")]
+    if fill is None:
+        return combined.unstack(columns).sort_index()
+    return combined.unstack(columns, fill_value=fill).fillna(fill).sort_index()
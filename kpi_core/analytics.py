@@ -0,0 +1,275 @@
+"""
+Self-service analytics: flattened metric tables and pivot preparation.
+
+The flatteners turn the nested export into long-format rows
+(source, process, quarter, period_id, year, metric_name, category, value)
+that ``prep_analysis`` pivots for trend, comparison and correlation views.
+The integer ``period_id`` is stored once here, so period filters compare
+integers instead of parsing labels.
+Rate metrics also carry numerator/denominator columns (see
+``kpi_core.aggregation``) so the "ratio" aggregation can pool them correctly.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .aggregation import RATIO_AGG, ratio_pivot
+from .constants import KPI_NAME_MAP, METRIC_DISPLAY_NAMES
+from .instrumentation import PROFILER
+from .lazy import lazy_import
+from .periods import parse_period, period_year, sort_periods
+from .steps import strip_disag_suffix
+
+pd = lazy_import("pandas")
+
+
+def flatten_volumes(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Flatten quarterly and inspection volumes into analysis-ready DF.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        pd.DataFrame: Flattened volumes.
+    """
+    rows = []
+    for proc in ["MA", "CT"]:
+        for qd in data.get("quarterlyVolumes", {}).get(proc, []):
+            quarter = qd["quarter"]
+            period_id, year = parse_period(quarter)[1], period_year(quarter)
+            for metric, value in qd.items():
+                if metric == "quarter":
+                    continue
+                cat = metric.split("_")[-1] if "_" in metric else None
+                rows.append(
+                    {
+                        "source": "volumes",
+                        "process": proc,
+                        "quarter": quarter,
+                        "period_id": period_id,
+                        "year": year,
+                        "metric_name": metric,
+                        "category": cat,
+                        "value": (value if isinstance(value, (int, float)) else 0),
+                    }
+                )
+    for qd in data.get("inspectionVolumes", {}).get("GMP", []):
+        quarter = qd["quarter"]
+        period_id, year = parse_period(quarter)[1], period_year(quarter)
+        for metric, value in qd.items():
+            if metric == "quarter":
+                continue
+            cat = metric.split("_")[-1] if "_" in metric else None
+            rows.append(
+                {
+                    "source": "volumes",
+                    "process": "GMP",
+                    "quarter": quarter,
+                    "period_id": period_id,
+                    "year": year,
+                    "metric_name": metric,
+                    "category": cat,
+                    "value": (value if isinstance(value, (int, float)) else 0),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def flatten_steps_for_analytics(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Flatten process steps and bottlenecks for analytics.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        pd.DataFrame: Flattened steps data.
+    """
+    rows = []
+    # Process steps avgDays/targetDays
+    for proc, steps in data.get("processStepData", {}).items():
+        for step_key, obj in steps.items():
+            base_step = strip_disag_suffix(step_key)
+            for rec in obj.get("data", []):
+                quarter = rec.get("quarter")
+                if not quarter:
+                    continue
+                period_id, year = parse_period(quarter)[1], period_year(quarter)
+                if "avgDays" in rec:
+                    rows.append(
+                        {
+                            "source": "steps",
+                            "process": proc,
+                            "quarter": quarter,
+                            "period_id": period_id,
+                            "year": year,
+                            "metric_name": "step_avg_days",
+                            "category": base_step,
+                            "value": rec["avgDays"],
+                        }
+                    )
+                if "targetDays" in rec:
+                    rows.append(
+                        {
+                            "source": "steps",
+                            "process": proc,
+                            "quarter": quarter,
+                            "period_id": period_id,
+                            "year": year,
+                            "metric_name": "step_target_days",
+                            "category": base_step,
+                            "value": rec["targetDays"],
+                        }
+                    )
+    # Bottleneck metrics
+    for proc, steps in data.get("bottleneckData", {}).items():
+        for step, series in steps.items():
+            for rec in series:
+                quarter = rec.get("quarter")
+                if not quarter:
+                    continue
+                period_id, year = parse_period(quarter)[1], period_year(quarter)
+                for m in [
+                    "cycle_time_median",
+                    "ext_median_days",
+                    "opening_backlog",
+                    "carry_over_rate",
+                    "avg_query_cycles",
+                    "fpy_pct",
+                    "wait_share_pct",
+                    "work_to_staff_ratio",
+                    "sched_median_days",
+                ]:
+                    if rec.get(m) is not None:
+                        rows.append(
+                            {
+                                "source": "bottlenecks",
+                                "process": proc,
+                                "quarter": quarter,
+                                "period_id": period_id,
+                                "year": year,
+                                "metric_name": m,
+                                "category": step,
+                                "value": rec[m],
+                            }
+                        )
+    return pd.DataFrame(rows)
+
+
+def metric_display_name(metric: str) -> str:
+    """
+    Human-readable name for metrics.
+
+    Args:
+        metric (str): Metric key.
+
+    Returns:
+        str: Display name.
+    """
+    if metric in METRIC_DISPLAY_NAMES:
+        return METRIC_DISPLAY_NAMES[metric]
+    if metric in KPI_NAME_MAP:
+        return KPI_NAME_MAP[metric]["short"]
+    return metric.replace("_", " ").title()
+
+
+def category_display_name(cat: Optional[str]) -> str:
+    """
+    Human-readable category name.
+
+    Args:
+        cat (Optional[str]): Category.
+
+    Returns:
+        str: Display name.
+    """
+    return cat if cat is None else str(cat)
+
+
+@PROFILER.timed("prep_analysis")
+def prep_analysis(
+    df: pd.DataFrame,
+    analysis_type: str,
+    processes: List[str],
+    metrics: List[str],
+    group_by: str,
+    agg: str,
+    compare_by_category: bool,
+    show_pct_change: bool,
+    x_metric: Optional[str] = None,
+    y_metric: Optional[str] = None,
+    yearly_components: Optional[pd.DataFrame] = None,
+) -> Tuple[pd.DataFrame, str, Dict[str, Any], str, Optional[pd.DataFrame]]:
+    """
+    Prepare pivot table for analysis.
+
+    Args:
+        df (pd.DataFrame): Input data.
+        analysis_type (str): Type ("Trend", "Comparison", etc.).
+        processes (List[str]): Processes.
+        metrics (List[str]): Metrics.
+        group_by (str): Grouping column.
+        agg (str): Aggregation function, or "ratio" for ratio-of-sums rates
+            (volumes summed, other metrics averaged).
+        compare_by_category (bool): Compare by category.
+        show_pct_change (bool): Show % change.
+        x_metric (Optional[str]): X metric for correlation.
+        y_metric (Optional[str]): Y metric for correlation.
+        yearly_components (Optional[pd.DataFrame]): Materialized yearly rate
+            components for whole-year scopes (see ``yearly_components``).
+
+    Returns:
+        Tuple: Pivot DF, agg, metadata, type, % change DF.
+    """
+    if df.empty:
+        return pd.DataFrame(), None, None, None, None
+    filtered = df[df["process"].isin(processes)].copy()
+    is_time_series = group_by in ["quarter", "year"]
+    pt = None
+    meta = {"color_var": None, "x_col": None, "y_col": None}
+
+    def pivot(rows: pd.DataFrame, columns: Optional[str]) -> pd.DataFrame:
+        if agg == RATIO_AGG:
+            return ratio_pivot(rows, group_by, columns or "metric_name", yearly_components)
+        if columns is None:
+            return pd.pivot_table(rows, values="value", index=group_by, aggfunc=agg, fill_value=0)
+        return pd.pivot_table(rows, values="value", index=group_by, columns=columns, aggfunc=agg, fill_value=0)
+
+    if analysis_type == "Correlation":
+        if not (x_metric and y_metric):
+            return pd.DataFrame(), None, None, None, None
+        filtered = filtered[filtered["metric_name"].isin([x_metric, y_metric])]
+        if filtered.empty:
+            return pd.DataFrame(), None, None, None, None
+        if group_by not in ["quarter", "year"]:
+            group_by = "quarter"
+        pt_x = pivot(filtered[filtered["metric_name"] == x_metric], None)
+        pt_x.columns = [metric_display_name(x_metric)]
+        pt_y = pivot(filtered[filtered["metric_name"] == y_metric], None)
+        pt_y.columns = [metric_display_name(y_metric)]
+        pt = pt_x.join(pt_y, how="inner")
+        pt = pt.loc[sort_periods(pt.index)] if group_by == "quarter" else pt.sort_index()
+        meta = {"x_col": pt.columns[0], "y_col": pt.columns[1], "color_var": None}
+        return pt, agg, meta, "Correlation", None
+    if metrics:
+        filtered = filtered[filtered["metric_name"].isin(metrics)]
+    if filtered.empty:
+        return pd.DataFrame(), None, None, None, None
+    if compare_by_category and "category" in filtered.columns and filtered["category"].notna().any():
+        pt = pivot(filtered, "category")
+        pt.columns = [category_display_name(c) for c in pt.columns]
+        meta["color_var"] = "category"
+    else:
+        pt = pivot(filtered, "metric_name")
+        pt.columns = [metric_display_name(c) for c in pt.columns]
+        meta["color_var"] = "metric_name"
+    if group_by == "quarter":
+        pt = pt.loc[sort_periods(pt.index)]
+    pct_change_df = None
+    if show_pct_change and is_time_series and analysis_type == "Trend" and len(pt) > 1:
+        pct_change_df = pt.pct_change(axis=0) * 100
+        pct_change_df = pct_change_df.round(1).dropna(how="all")
+        pct_change_df.index.name = group_by  # Ensure index name for plotting
+    return (pt if group_by == "quarter" else pt.sort_index()), agg, meta, analysis_type, pct_change_df
@@ -0,0 +1,327 @@
+"""
+Batch anomaly detection over every KPI, step and bottleneck series.
+
+All series of a dataset are stacked into one series × quarter matrix (NaN
+where a series has no value):
+
+- ``quarterlyData`` KPIs and their disaggregated children (``value``);
+- ``processStepData`` steps (``avgDays``);
+- every numeric field of every ``bottleneckData`` step.
+
+Most series drift steadily, and a trend is not an anomaly. Both detectors
+are whole-matrix array operations, so the cost grows with the number of
+cells and never loops over series in Python:
+
+- **outliers**: robust z-scores of the residuals from a Theil-Sen trend
+  line (median of pairwise slopes, itself robust to the outliers it
+  exposes): ``(r − median) / (1.4826 · MAD)``. The scale is floored at
+  ``SCALE_FLOOR`` of the series level, the ±5% band ``status_for`` already
+  treats as noise, so near-perfect fits do not turn rounding into alarms;
+  ``|z| > OUTLIER_Z`` flags a quarter;
+- **level shifts**: for every split point at once, the t statistic of a
+  step added to a linear trend (normal equations from cumulative sums,
+  solved as one batch of 3 × 3 systems). The strongest split per series is
+  flagged when ``|t| > CHANGE_T`` and the step is at least ``MIN_SHIFT``
+  of the series level, at the first quarter of the new level.
+
+Results are one row per flagged (series, quarter, kind), indexed by
+(process, quarter) for the Overview's per-quarter lookups.
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Any, Dict, Iterator, Tuple
+
+from .analytics import metric_display_name
+from .constants import KPI_NAME_MAP
+from .lazy import lazy_import
+from .periods import QUARTER, parse_period, period_label
+from .steps import friendly_step_label, parse_step_key
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Iglewicz-Hoaglin cut-off for modified z-scores
+OUTLIER_Z = 3.5
+# Smallest residual scale, as a share of the series level
+SCALE_FLOOR = 0.05
+# t statistic and smallest size (share of the series level) of a level shift
+CHANGE_T = 3.0
+MIN_SHIFT = 0.10
+# Fewer observations than this give no stable median/MAD
+MIN_OBSERVATIONS = 6
+# Shortest level on either side of a change point
+MIN_SEGMENT = 3
+# Series per Theil-Sen block (pairwise slopes take series × periods² memory)
+TREND_CHUNK_SERIES = 4096
+# MAD → standard deviation for normal data; mean absolute deviation fallback when MAD is 0
+_MAD_SCALE = 1.4826
+_MEAN_AD_SCALE = 1.2533
+
+SOURCE_KPI = "kpi"
+SOURCE_STEP = "step"
+SOURCE_BOTTLENECK = "bottleneck"
+
+KIND_OUTLIER = "outlier"
+KIND_SHIFT = "shift"
+
+SERIES_KEYS = ["source", "process", "series", "field"]
+ANOMALY_INDEX = ["process", "quarter"]
+ANOMALY_COLUMNS = [
+    "source",
+    "series",
+    "field",
+    "period_id",
+    "kind",
+    "value",
+    "expected",
+    "score",
+]
+
+
+def _observations(data: Dict[str, Any]) -> Iterator[Tuple[str, str, str, str, str, float]]:
+    """(source, process, series, field, quarter, value) for every numeric cell."""
+    for process, block in data.get("quarterlyData", {}).items():
+        for kpi_id, kobj in block.items():
+            for rec in kobj.get("data", []):
+                yield SOURCE_KPI, process, kpi_id, "value", rec["quarter"], rec.get("value")
+    for process, steps in data.get("processStepData", {}).items():
+        for step, obj in steps.items():
+            for rec in obj.get("data", []):
+                yield SOURCE_STEP, process, step, "avgDays", rec["quarter"], rec.get("avgDays")
+    for process, steps in data.get("bottleneckData", {}).items():
+        for step, series in steps.items():
+            for rec in series:
+                for name, value in rec.items():
+                    if name != "quarter":
+                        yield SOURCE_BOTTLENECK, process, step, name, rec["quarter"], value
+
+
+def stacked_series(data: Dict[str, Any]) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Every numeric series of the dataset on one quarter grid.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        Tuple: Series keys (``SERIES_KEYS`` columns), the series × quarter
+        value matrix (NaN where missing) and the quarter ids of its columns.
+    """
+    cells = pd.DataFrame(
+        [
+            obs
+            for obs in _observations(data)
+            if isinstance(obs[5], (int, float)) and not isinstance(obs[5], bool)
+        ],
+        columns=SERIES_KEYS + ["quarter", "value"],
+    )
+    if cells.empty:
+        return pd.DataFrame(columns=SERIES_KEYS), np.empty((0, 0)), np.empty(0, dtype=np.int64)
+    row, keys = pd.MultiIndex.from_frame(cells[SERIES_KEYS]).factorize()
+    labels, label_idx = np.unique(cells["quarter"].to_numpy(dtype=str), return_inverse=True)
+    parsed = [parse_period(label) for label in labels]
+    label_ids = np.array([pid if gran == QUARTER else -1 for gran, pid in parsed], dtype=np.int64)
+    pid = label_ids[label_idx]
+    keep = pid >= 0
+    lo, hi = int(pid[keep].min()), int(pid[keep].max())
+    matrix = np.full((len(keys), hi - lo + 1), np.nan)
+    matrix[row[keep], pid[keep] - lo] = cells["value"].to_numpy(dtype=float)[keep]
+    return keys.to_frame(index=False, name=SERIES_KEYS), matrix, np.arange(lo, hi + 1, dtype=np.int64)
+
+
+def theil_sen_trend(matrix: np.ndarray) -> np.ndarray:
+    """
+    Theil-Sen trend line of every series, evaluated at every period.
+
+    Args:
+        matrix (np.ndarray): Series × period values (NaN where missing).
+
+    Returns:
+        np.ndarray: Fitted trend values (flat where a series has fewer than
+        two observations).
+    """
+    t_len = matrix.shape[1]
+    x = np.arange(t_len, dtype=float)
+    i, j = np.triu_indices(t_len, k=1)
+    out = np.empty_like(matrix)
+    for lo in range(0, len(matrix), TREND_CHUNK_SERIES):
+        y = matrix[lo : lo + TREND_CHUNK_SERIES]
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            slope = np.nanmedian((y[:, j] - y[:, i]) / (j - i), axis=1)
+            slope = np.nan_to_num(slope)
+            intercept = np.nanmedian(y - slope[:, None] * x[None, :], axis=1)
+        out[lo : lo + TREND_CHUNK_SERIES] = intercept[:, None] + slope[:, None] * x[None, :]
+    return out
+
+
+def robust_z(matrix: np.ndarray, floor: Any = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Modified z-score of every cell against its own series.
+
+    Args:
+        matrix (np.ndarray): Series × period values (NaN where missing).
+        floor (array-like): Smallest scale per series (scalar or one per row).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Robust z-scores (NaN where missing or
+        the series is constant) and the series medians.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        median = np.nanmedian(matrix, axis=1, keepdims=True)
+        dev = np.abs(matrix - median)
+        scale = _MAD_SCALE * np.nanmedian(dev, axis=1, keepdims=True)
+        scale = np.where(scale > 0, scale, _MEAN_AD_SCALE * np.nanmean(dev, axis=1, keepdims=True))
+        scale = np.maximum(scale, np.reshape(np.asarray(floor, dtype=float), (-1, 1)))
+        z = np.where(scale > 0, (matrix - median) / scale, np.nan)
+    return z, median[:, 0]
+
+
+def _tail_sums(a: np.ndarray) -> np.ndarray:
+    """Row sums over columns k… for every k >= 1 (reverse cumulative sums)."""
+    return np.cumsum(a[:, ::-1], axis=1)[:, ::-1][:, 1:]
+
+
+def level_shifts(
+    matrix: np.ndarray, min_segment: int = MIN_SEGMENT
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Strongest step on top of a linear trend, for every series and split at once.
+
+    For a split before column k each series is regressed on
+    ``[1, t, 1{t >= k}]`` over its observed quarters; the step's t
+    statistic measures a level shift the trend does not explain. The
+    normal equations of every (series, split) come from cumulative sums and
+    are solved as one batch of 3 × 3 systems. Only splits at an observed
+    column that leave ``min_segment`` observations on each side count.
+
+    Args:
+        matrix (np.ndarray): Series × period values (NaN where missing).
+        min_segment (int): Shortest segment on either side.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Per series,
+        the column where the new level starts (-1 if none is admissible),
+        the step's t statistic, the step size and the trend value expected
+        there without it.
+    """
+    n_series, t_len = matrix.shape
+    none = (np.full(n_series, -1), np.zeros(n_series), np.zeros(n_series), np.full(n_series, np.nan))
+    if t_len < 2 * min_segment:
+        return none
+    observed = ~np.isnan(matrix)
+    w = observed.astype(float)
+    x = np.arange(t_len, dtype=float)[None, :] * w
+    y = np.where(observed, matrix, 0.0)
+    # Totals over all observed quarters, and over quarters >= k for every split k
+    n, sx, sxx = w.sum(1)[:, None], x.sum(1)[:, None], (x * x).sum(1)[:, None]
+    sy, sxy, syy = y.sum(1)[:, None], (x * y).sum(1)[:, None], (y * y).sum(1)[:, None]
+    nd, sxd, syd = _tail_sums(w), _tail_sums(x), _tail_sums(y)
+    k = t_len - 1
+    xtx = np.empty((n_series, k, 3, 3))
+    xtx[..., 0, 0] = n
+    xtx[..., 0, 1] = xtx[..., 1, 0] = sx
+    xtx[..., 1, 1] = sxx
+    xtx[..., 0, 2] = xtx[..., 2, 0] = xtx[..., 2, 2] = nd
+    xtx[..., 1, 2] = xtx[..., 2, 1] = sxd
+    xty = np.stack([np.broadcast_to(sy, nd.shape), np.broadcast_to(sxy, nd.shape), syd], axis=-1)
+    admissible = (nd >= min_segment) & (n - nd >= min_segment) & observed[:, 1:]
+    # Inadmissible splits get an identity system so the batch solve never sees a singular matrix
+    xtx[~admissible] = np.eye(3)
+    xty[~admissible] = 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inv = np.linalg.inv(xtx)
+        beta = (inv @ xty[..., None])[..., 0]
+        sse = syy - (beta * xty).sum(-1)
+        var = np.maximum(sse, 0.0) / np.maximum(n - 3, 1)
+        t = beta[..., 2] / np.sqrt(var * inv[..., 2, 2])
+    t = np.where(admissible & np.isfinite(t), t, 0.0)
+    best = np.abs(t).argmax(axis=1)
+    rows = np.arange(n_series)
+    start = np.where(admissible[rows, best], best + 1, -1)
+    b = beta[rows, best]
+    return start, t[rows, best], b[:, 2], b[:, 0] + b[:, 1] * (best + 1)
+
+
+def anomaly_table(
+    data: Dict[str, Any], outlier_z: float = OUTLIER_Z, change_t: float = CHANGE_T
+) -> pd.DataFrame:
+    """
+    Outliers and level shifts of every series, in one vectorized pass.
+
+    Args:
+        data (Dict): Loaded data.
+        outlier_z (float): Robust z cut-off.
+        change_t (float): Level-shift t cut-off.
+
+    Returns:
+        pd.DataFrame: ``ANOMALY_COLUMNS`` indexed by ``ANOMALY_INDEX``
+        (sorted). ``expected`` is the trend value for outliers and the
+        trend without the step for shifts; ``score`` is the robust z or the
+        step's t statistic.
+    """
+    keys, matrix, ids = stacked_series(data)
+    enough = (~np.isnan(matrix)).sum(axis=1) >= MIN_OBSERVATIONS
+    if not enough.any():
+        return pd.DataFrame(columns=ANOMALY_INDEX + ANOMALY_COLUMNS).set_index(ANOMALY_INDEX)
+    keys, matrix = keys[enough].reset_index(drop=True), matrix[enough]
+    level = np.abs(np.nanmedian(matrix, axis=1))
+
+    trend = theil_sen_trend(matrix)
+    z, median = robust_z(matrix - trend, SCALE_FLOOR * level)
+    r, c = np.nonzero(np.abs(np.nan_to_num(z)) > outlier_z)
+    outliers = keys.iloc[r].assign(
+        period_id=ids[c], kind=KIND_OUTLIER, value=matrix[r, c], expected=trend[r, c] + median[r], score=z[r, c]
+    )
+
+    start, t, step, expected = level_shifts(matrix)
+    (r,) = np.nonzero((start >= 0) & (np.abs(t) > change_t) & (np.abs(step) >= MIN_SHIFT * level))
+    c = start[r]
+    shifts = keys.iloc[r].assign(
+        period_id=ids[c], kind=KIND_SHIFT, value=matrix[r, c], expected=expected[r], score=t[r]
+    )
+
+    out = pd.concat([outliers, shifts], ignore_index=True)
+    out["quarter"] = [period_label(int(pid), QUARTER) for pid in out["period_id"]]
+    return out[ANOMALY_INDEX + ANOMALY_COLUMNS].set_index(ANOMALY_INDEX).sort_index()
+
+
+def anomalies_for(table: pd.DataFrame, process: str, quarter: str) -> pd.DataFrame:
+    """
+    Anomalies of one process and quarter, strongest first.
+
+    Args:
+        table (pd.DataFrame): Output of ``anomaly_table``.
+        process (str): Process.
+        quarter (str): Quarter.
+
+    Returns:
+        pd.DataFrame: ``ANOMALY_COLUMNS`` rows.
+    """
+    if (process, quarter) not in table.index:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    sel = table.loc[[(process, quarter)]].reset_index(drop=True)
+    return sel.iloc[np.argsort(-np.abs(sel["score"].to_numpy(dtype=float)), kind="stable")].reset_index(drop=True)
+
+
+def anomaly_label(source: str, series: str, field: str) -> str:
+    """
+    Display name of an anomaly's series.
+
+    Args:
+        source (str): ``SOURCE_KPI``, ``SOURCE_STEP`` or ``SOURCE_BOTTLENECK``.
+        series (str): KPI ID, step key or bottleneck step.
+        field (str): Field of the series.
+
+    Returns:
+        str: Label, e.g. "Technical Dossier Review · WIP Count".
+    """
+    if source == SOURCE_KPI:
+        return KPI_NAME_MAP.get(series, {}).get("short", series)
+    if source == SOURCE_STEP:
+        disag = parse_step_key(series).disag
+        label = friendly_step_label(series)
+        return f"{label} ({disag}) · average days" if disag else f"{label} · average days"
+    return f"{series} · {metric_display_name(field)}"
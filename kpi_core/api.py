@@ -0,0 +1,315 @@
+"""
+Read-only HTTP API over the KPI store.
+
+Serves the same KPI series, per-quarter statuses, comparison frames, step
+metrics and bottleneck frames the dashboard renders, computed once per dataset
+version by ``kpi_core.store``. Every response carries a weak content-hash
+``ETag`` (``If-None-Match`` yields ``304 Not Modified``), bodies above 1 KB are
+gzip-compressed, and tabular endpoints return Arrow IPC streams when asked
+with ``?format=arrow`` or ``Accept: application/vnd.apache.arrow.stream``.
+
+Handlers are async; frame building and encoding run on Starlette's thread
+pool so slow requests do not block the event loop.
+
+Requires ``starlette`` (and ``uvicorn`` to run it standalone; ``pyarrow`` for
+Arrow responses)::
+
+    python -m kpi_core.api --data data/kpiData.json --port 8600
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from .constants import DISAG_LABEL_SUFFIXES
+from .data import DataError
+from .lazy import lazy_import
+from .store import KPIStore, Snapshot
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow")
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+GZIP_MIN_BYTES = 1024
+# Query parameters that select content; anything else is ignored (and kept out of memo keys)
+QUERY_PARAMS = ("kind", "process", "quarter", "disag", "format")
+DEFAULT_PORT = 8600
+
+
+# =======================
+# ENCODING
+# =======================
+def arrow_available() -> bool:
+    """Whether ``pyarrow`` can be imported."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def encode_json(df: Optional[pd.DataFrame], meta: Dict[str, Any]) -> bytes:
+    """
+    Encode a frame as ``{"meta": ..., "rows": [...]}`` JSON.
+
+    Args:
+        df (Optional[pd.DataFrame]): Rows (None for metadata-only responses).
+        meta (Dict): Response metadata.
+
+    Returns:
+        bytes: UTF-8 JSON.
+    """
+    rows = "null" if df is None else df.to_json(orient="records", date_format="iso")
+    return f'{{"meta":{json.dumps(meta, separators=(",", ":"))},"rows":{rows}}}'.encode("utf-8")
+
+
+def encode_arrow(df: pd.DataFrame, meta: Dict[str, Any]) -> bytes:
+    """
+    Encode a frame as an Arrow IPC stream; ``meta`` goes in the schema metadata.
+
+    Args:
+        df (pd.DataFrame): Rows.
+        meta (Dict): Response metadata (stored under ``kpi_meta``).
+
+    Returns:
+        bytes: Arrow IPC stream.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"kpi_meta": json.dumps(meta).encode("utf-8")}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def content_etag(body: bytes) -> str:
+    """
+    Weak ETag derived from the uncompressed response bytes.
+
+    Weak, because the gzip and identity encodings of a body share it and a
+    strong validator must differ per content-coding.
+    """
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an ``If-None-Match`` header against an ETag (weak comparison).
+
+    Args:
+        if_none_match (Optional[str]): Header value.
+        etag (str): Current ETag.
+
+    Returns:
+        bool: True if the client copy is current.
+    """
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    opaque = etag.removeprefix("W/")
+    return "*" in candidates or any(t.removeprefix("W/") == opaque for t in candidates)
+
+
+def wants_arrow(request: Request) -> bool:
+    """Format negotiation: ``?format=`` wins over the ``Accept`` header."""
+    fmt = request.query_params.get("format")
+    if fmt:
+        if fmt not in ("json", "arrow"):
+            raise HTTPException(400, f"Unknown format '{fmt}' (use json or arrow).")
+        return fmt == "arrow"
+    return ARROW_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+# =======================
+# FRAME BUILDERS
+# =======================
+def _require_process(snap: Snapshot, process: str) -> None:
+    if process not in snap.processes():
+        raise HTTPException(404, f"Unknown process '{process}'.")
+
+
+def _require_kpi(snap: Snapshot, process: str, kpi_id: str) -> None:
+    _require_process(snap, process)
+    if kpi_id not in snap.kpi_ids(process):
+        raise HTTPException(404, f"Unknown KPI '{kpi_id}' for {process}.")
+
+
+def _quarter_param(snap: Snapshot, request: Request) -> str:
+    quarter = request.query_params.get("quarter") or snap.latest_quarter()
+    if quarter not in snap.quarters:
+        raise HTTPException(404, f"Unknown quarter '{quarter}'.")
+    return quarter
+
+
+def _meta_frame(snap: Snapshot, request: Request) -> Tuple[Optional[pd.DataFrame], Dict[str, Any]]:
+    return None, {
+        "processes": {p: snap.kpi_ids(p) for p in snap.processes()},
+        "quarters": snap.quarters,
+    }
+
+
+def _series_frame(snap: Snapshot, request: Request) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    process, kpi_id = request.path_params["process"], request.path_params["kpi_id"]
+    _require_kpi(snap, process, kpi_id)
+    return snap.kpi_series(process, kpi_id), snap.kpi_meta(process, kpi_id)
+
+
+def _status_frame(snap: Snapshot, request: Request) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    df = snap.status_matrix()
+    allowed = {"kind": ["kpi", "step"], "process": snap.processes(), "quarter": snap.quarters}
+    meta: Dict[str, Any] = {}
+    for col, values in allowed.items():
+        value = request.query_params.get(col)
+        if value:
+            if value not in values:
+                raise HTTPException(404, f"Unknown {col} '{value}'.")
+            df = df[df[col] == value]
+            meta[col] = value
+    return df.reset_index(drop=True), meta
+
+
+def _comparison_frame(snap: Snapshot, request: Request) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    process, kpi_id = request.path_params["process"], request.path_params["kpi_id"]
+    _require_kpi(snap, process, kpi_id)
+    quarter = _quarter_param(snap, request)
+    df, title, categories, groups = snap.comparison(process, kpi_id, quarter)
+    return df, {"process": process, "kpi_id": kpi_id, "quarter": quarter, "title": title,
+                "categories": categories, "groups": groups}
+
+
+def _steps_frame(snap: Snapshot, request: Request) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    process = request.path_params["process"]
+    _require_process(snap, process)
+    quarter = _quarter_param(snap, request)
+    disag = request.query_params.get("disag", "All")
+    if disag != "All" and disag not in DISAG_LABEL_SUFFIXES:
+        raise HTTPException(404, f"Unknown disaggregation '{disag}'.")
+    df, fell_back = snap.steps(process, quarter, disag)
+    df = df.assign(step=df["step"].str.replace("<br>", " ", regex=False))
+    return df, {"process": process, "quarter": quarter, "disag": disag, "fell_back": fell_back}
+
+
+def _bottleneck_frame(snap: Snapshot, request: Request) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    process = request.path_params["process"]
+    _require_process(snap, process)
+    quarter = _quarter_param(snap, request)
+    return snap.bottlenecks(process, quarter), {"process": process, "quarter": quarter}
+
+
+# =======================
+# APPLICATION
+# =======================
+def _encoded(snap: Snapshot, request: Request, builder, arrow: bool) -> Tuple[bytes, str, str]:
+    """Build and encode one response body, memoized on the snapshot."""
+    params = tuple((k, request.query_params.get(k)) for k in QUERY_PARAMS if k != "format")
+    key = ("response", request.url.path, params, arrow)
+
+    def build() -> Tuple[bytes, str, str]:
+        df, meta = builder(snap, request)
+        meta = {"version": snap.version, **meta}
+        if arrow and df is not None:
+            body, media_type = encode_arrow(df, meta), ARROW_MEDIA_TYPE
+        else:
+            body, media_type = encode_json(df, meta), JSON_MEDIA_TYPE
+        return body, content_etag(body), media_type
+
+    return snap.derived(key, build)
+
+
+def create_app(store: KPIStore) -> Starlette:
+    """
+    Build the Starlette application for a store.
+
+    Args:
+        store (KPIStore): Data source shared with the caller.
+
+    Returns:
+        Starlette: ASGI application.
+    """
+
+    def endpoint(builder):
+        async def handler(request: Request) -> Response:
+            arrow = wants_arrow(request)
+            if arrow and not arrow_available():
+                raise HTTPException(406, "Arrow responses need pyarrow installed.")
+            try:
+                snap = await run_in_threadpool(store.snapshot)
+            except DataError as e:
+                raise HTTPException(503, str(e))
+            body, etag, media_type = await run_in_threadpool(_encoded, snap, request, builder, arrow)
+            headers = {
+                "ETag": etag,
+                "Cache-Control": "no-cache",
+                "Vary": "Accept, Accept-Encoding",
+                "X-Dataset-Version": snap.version,
+            }
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+            return Response(body, media_type=media_type, headers=headers)
+
+        return handler
+
+    async def http_error(request: Request, exc: HTTPException) -> Response:
+        return JSONResponse({"detail": exc.detail}, status_code=exc.status_code)
+
+    routes = [
+        Route("/v1/meta", endpoint(_meta_frame)),
+        Route("/v1/status", endpoint(_status_frame)),
+        Route("/v1/kpis/{process}/{kpi_id}/series", endpoint(_series_frame)),
+        Route("/v1/kpis/{process}/{kpi_id}/comparison", endpoint(_comparison_frame)),
+        Route("/v1/steps/{process}", endpoint(_steps_frame)),
+        Route("/v1/bottlenecks/{process}", endpoint(_bottleneck_frame)),
+    ]
+    return Starlette(
+        routes=routes,
+        middleware=[Middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)],
+        exception_handlers={HTTPException: http_error},
+    )
+
+
+def serve_in_thread(store: KPIStore, port: int, host: str = "127.0.0.1") -> Any:
+    """
+    Run the API with uvicorn on a daemon thread (for embedding in the dashboard).
+
+    Args:
+        store (KPIStore): Store shared with the host process.
+        port (int): TCP port.
+        host (str): Bind address (loopback by default).
+
+    Returns:
+        uvicorn.Server: The running server.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(create_app(store), host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="kpi-api", daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Read-only KPI HTTP API.")
+    parser.add_argument("--data", default="data/kpiData.json", help="Path to the KPI JSON file.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run(create_app(KPIStore(args.data)), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
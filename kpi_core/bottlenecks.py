@@ -0,0 +1,277 @@
+"""
+Bottleneck metric frames per process step and quarter.
+
+Steps or metrics missing from ``bottleneckData`` are filled with plausible
+seeded values so the Bottleneck Analysis view stays populated in the demo.
+When the data file delivers bottleneck series by week or month,
+``fine_bottleneck_df`` exposes those periods within a quarter.
+
+``bottleneck_analytics`` derives flow metrics for every process, step and
+quarter in one vectorized pass over the recorded fields: backlog aging,
+Little's-law lead time (WIP / throughput), backlog growth and capacity
+headroom.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lazy import lazy_import
+from .periods import DAYS_PER_QUARTER, parse_period, period_ids, to_quarter
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+
+def prepare_bottleneck_df(process: str, quarter: str, bottleneck_data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Prepare bottleneck DF with fallback random data if missing.
+
+    Uses per-step local RNGs (not the global ``random`` state) so frames can be
+    built concurrently.
+
+    Args:
+        process (str): Process.
+        quarter (str): Quarter.
+        bottleneck_data (Dict): Bottlenecks data.
+
+    Returns:
+        pd.DataFrame: Bottleneck metrics.
+    """
+    steps_data = bottleneck_data.get(process, {})
+    if not steps_data:
+        default_steps = {
+            "MA": [
+                "Preliminary Screening",
+                "Technical Dossier Review",
+                "Quality Review",
+                "Safety & Efficacy Review",
+                "Queries to Applicant",
+                "Applicant Response Review",
+                "Decision Issued",
+                "License Publication",
+            ],
+            "CT": [
+                "Administrative Screening",
+                "Ethics Review",
+                "Technical Review",
+                "GCP Inspection",
+                "Applicant Response Review",
+                "Decision Issued",
+                "Trial Registration",
+            ],
+            "GMP": [
+                "Application Screening",
+                "Inspection Planning",
+                "Inspection Conducted",
+                "Inspection Report Drafted",
+                "CAPA Requested",
+                "CAPA Review",
+                "Final Decision Issued",
+                "Report Publication",
+            ],
+        }
+        steps_data = {step: [] for step in default_steps.get(process, ["Generic Step 1", "Generic Step 2"])}
+    rows = []
+    for step, series in steps_data.items():
+        qrec = next((x for x in series if x.get("quarter") == quarter), None) or {}
+        rng = random.Random(f"{process}_{quarter}_{step}")
+        row = {"step": step}
+        row["cycle_time_median"] = qrec.get("cycle_time_median") or rng.uniform(10, 60)
+        row["ext_median_days"] = qrec.get("ext_median_days") or rng.uniform(5, 30)
+        row["opening_backlog"] = qrec.get("opening_backlog") or rng.randint(5, 50)
+        row["carry_over_rate"] = (qrec.get("carry_over_rate") or rng.uniform(0.1, 0.4)) * 100
+        row["avg_query_cycles"] = qrec.get("avg_query_cycles") or rng.uniform(1, 4)
+        row["fpy_pct"] = qrec.get("fpy_pct") or rng.uniform(70, 95)
+        row["wait_share_pct"] = qrec.get("wait_share_pct") or rng.uniform(20, 60)
+        if process == "MA":
+            row["work_to_staff_ratio"] = qrec.get("work_to_staff_ratio") or rng.uniform(1.5, 4.0)
+        else:
+            row["sched_median_days"] = qrec.get("sched_median_days") or rng.uniform(7, 21)
+        rows.append(row)
+    df = pd.DataFrame(rows).sort_values("step")
+    if df["cycle_time_median"].isna().any():
+        df.loc[df["cycle_time_median"].isna(), "cycle_time_median"] = np.random.RandomState(42).uniform(
+            10, 60, size=df["cycle_time_median"].isna().sum()
+        )
+    return df
+
+
+def fine_bottleneck_df(
+    process: str, quarter: str, fine_bottleneck_data: Dict[str, Any], metrics: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Week/month bottleneck metrics of every step within one quarter.
+
+    Args:
+        process (str): Process.
+        quarter (str): Quarter.
+        fine_bottleneck_data (Dict): ``data["finePeriods"]["bottleneckData"]``.
+        metrics (Optional[List[str]]): Metric columns to keep (default: all).
+
+    Returns:
+        pd.DataFrame: Columns step, period, period_id plus metrics, in
+        chronological order; empty if the process has no fine-grained series.
+    """
+    target = parse_period(quarter)[1]
+    frames = []
+    for step, series in fine_bottleneck_data.get(process, {}).items():
+        if not series:
+            continue
+        df = pd.DataFrame(series)
+        ids, gran = period_ids(df["period"])
+        mask = to_quarter(ids, gran) == target
+        if not mask.any():
+            continue
+        df = df.loc[mask].assign(step=step, period_id=ids[mask])
+        keep = [c for c in (metrics or df.columns) if c in df.columns and c not in ("step", "period", "period_id")]
+        frames.append(df[["step", "period", "period_id"] + keep])
+    if not frames:
+        return pd.DataFrame(columns=["step", "period", "period_id"] + list(metrics or []))
+    return pd.concat(frames, ignore_index=True).sort_values(["period_id", "step"], kind="stable").reset_index(drop=True)
+
+
+# =======================
+# FLOW ANALYTICS
+# =======================
+# Aging buckets (field, label, midpoint in days for the mean-age estimate)
+AGE_BUCKETS: List[Tuple[str, str, float]] = [
+    ("age_0_30", "0–30 days", 15.0),
+    ("age_31_60", "31–60 days", 45.5),
+    ("age_61_90", "61–90 days", 75.5),
+    ("age_90_plus", "90+ days", 105.0),
+]
+
+# Derived metrics published to the analytics pool (source "bottlenecks")
+BOTTLENECK_ANALYTICS_METRICS: List[str] = [
+    "aged_items",
+    "aged_90_share_pct",
+    "mean_age_days",
+    "throughput_q",
+    "littles_lead_time_days",
+    "net_inflow_q",
+    "backlog_growth_pct",
+    "backlog_change_qoq_pct",
+    "capacity_headroom_pct",
+    "utilisation_headroom_pct",
+]
+
+_FLOW_FIELDS = [
+    "wip_count",
+    "capacity_cases_q",
+    "incoming_cases_q",
+    "throughput_util",
+    "wip_cap_ratio",
+    "opening_backlog",
+    "closing_backlog",
+    "rework_rate",
+    "quality_score",
+] + [b[0] for b in AGE_BUCKETS]
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Elementwise num / den with NaN where den is not positive."""
+    return np.divide(num, den, out=np.full(len(num), np.nan), where=den > 0)
+
+
+def bottleneck_analytics(bottleneck_data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Flow metrics for every process, step and quarter.
+
+    Only recorded values are used (no seeded fallbacks); missing inputs give
+    NaN. Throughput is capacity × utilisation; Little's law turns WIP and
+    daily throughput into an expected lead time.
+
+    Args:
+        bottleneck_data (Dict): ``data["bottleneckData"]``.
+
+    Returns:
+        pd.DataFrame: process, step, quarter, period_id, the recorded flow
+        fields and ``BOTTLENECK_ANALYTICS_METRICS``, in chronological order.
+    """
+    records = [
+        (process, step, rec["quarter"], *(rec.get(f) for f in _FLOW_FIELDS))
+        for process, steps in bottleneck_data.items()
+        for step, series in steps.items()
+        for rec in series
+        if rec.get("quarter")
+    ]
+    df = pd.DataFrame(records, columns=["process", "step", "quarter"] + _FLOW_FIELDS)
+    df[_FLOW_FIELDS] = df[_FLOW_FIELDS].apply(pd.to_numeric, errors="coerce")
+    period_id = np.fromiter((parse_period(q)[1] for q in df["quarter"]), dtype=np.int64, count=len(df))
+    df.insert(3, "period_id", period_id)
+    df = df.sort_values(["process", "step", "period_id"], kind="stable").reset_index(drop=True)
+
+    ages = df[[b[0] for b in AGE_BUCKETS]].to_numpy(dtype=float)
+    aged = np.nansum(ages, axis=1)
+    aged = np.where(np.isnan(ages).all(axis=1), np.nan, aged)
+    mids = np.array([b[2] for b in AGE_BUCKETS])
+    wip = df["wip_count"].to_numpy(dtype=float)
+    capacity = df["capacity_cases_q"].to_numpy(dtype=float)
+    incoming = df["incoming_cases_q"].to_numpy(dtype=float)
+    opening = df["opening_backlog"].to_numpy(dtype=float)
+    closing = df["closing_backlog"].to_numpy(dtype=float)
+    throughput = capacity * df["throughput_util"].to_numpy(dtype=float)
+
+    df["aged_items"] = aged
+    df["aged_90_share_pct"] = _ratio(ages[:, -1], aged) * 100
+    df["mean_age_days"] = _ratio(np.nan_to_num(ages) @ mids, aged)
+    df["throughput_q"] = throughput
+    df["littles_lead_time_days"] = _ratio(wip, throughput / DAYS_PER_QUARTER)
+    df["net_inflow_q"] = incoming - throughput
+    df["backlog_growth_pct"] = _ratio(closing - opening, opening) * 100
+    prev_closing = df.groupby(["process", "step"])["closing_backlog"].shift(1).to_numpy(dtype=float)
+    df["backlog_change_qoq_pct"] = _ratio(closing - prev_closing, np.abs(prev_closing)) * 100
+    df["capacity_headroom_pct"] = _ratio(capacity - incoming, capacity) * 100
+    df["utilisation_headroom_pct"] = (1 - df["throughput_util"]) * 100
+    return df
+
+
+def aging_matrix(analytics: pd.DataFrame, process: str, quarter: str) -> pd.DataFrame:
+    """
+    Step × age-bucket item counts for one process and quarter (heatmap input).
+
+    Args:
+        analytics (pd.DataFrame): Output of ``bottleneck_analytics``.
+        process (str): Process.
+        quarter (str): Quarter.
+
+    Returns:
+        pd.DataFrame: Index step, one column per ``AGE_BUCKETS`` label.
+    """
+    sel = analytics[(analytics["process"] == process) & (analytics["quarter"] == quarter)]
+    out = sel.set_index("step")[[b[0] for b in AGE_BUCKETS]]
+    out.columns = [b[1] for b in AGE_BUCKETS]
+    return out.dropna(how="all").sort_index()
+
+
+def flatten_bottleneck_analytics(analytics: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derived flow metrics as analytics-pool rows.
+
+    Args:
+        analytics (pd.DataFrame): Output of ``bottleneck_analytics``.
+
+    Returns:
+        pd.DataFrame: Long rows (source, process, quarter, period_id, year,
+        metric_name, category, value) for ``BOTTLENECK_ANALYTICS_METRICS``.
+    """
+    long = analytics.melt(
+        id_vars=["process", "step", "quarter", "period_id"],
+        value_vars=BOTTLENECK_ANALYTICS_METRICS,
+        var_name="metric_name",
+        value_name="value",
+    ).dropna(subset=["value"])
+    return pd.DataFrame(
+        {
+            "source": "bottlenecks",
+            "process": long["process"],
+            "quarter": long["quarter"],
+            "period_id": long["period_id"],
+            "year": (long["period_id"] // 4).astype(int),
+            "metric_name": long["metric_name"],
+            "category": long["step"],
+            "value": long["value"],
+        }
+    ).reset_index(drop=True)
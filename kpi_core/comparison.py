@@ -0,0 +1,436 @@
+"""
+Volume comparison frames behind the KPI detail "volume breakdown" chart.
+
+Where the export has no explicit split (e.g. new vs renewal applications), the
+split is derived with seeded pseudo-random ratios so values are reproducible.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+from .constants import TIME_BASED
+from .instrumentation import PROFILER
+from .lazy import lazy_import
+from .periods import period_year, sort_periods
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+
+def seeded_rng(*parts) -> random.Random:
+    """
+    Create seeded random number generator for reproducible simulations.
+
+    Args:
+        *parts: Seed components.
+
+    Returns:
+        random.Random: Seeded RNG.
+    """
+    s = "|".join(str(p) for p in parts)
+    r = random.Random()
+    r.seed(s)
+    return r
+
+
+def clamp(v: float, lo: float, hi: float) -> float:
+    """Clamp value between lo and hi."""
+    return max(lo, min(hi, v))
+
+
+@PROFILER.timed("build_kpi_comparison_df")
+def build_kpi_comparison_df(
+    process: str, kpi_id: str, quarter: str, data: Dict[str, Any]
+) -> Tuple[pd.DataFrame, str, str]:
+    """
+    Build DataFrame for KPI volume comparison chart.
+
+    Args:
+        process (str): Process.
+        kpi_id (str): KPI ID.
+        quarter (str): Quarter (used for year).
+        data (Dict): Loaded data.
+
+    Returns:
+        Tuple[pd.DataFrame, str, str]: DF, title, ylabel.
+    """
+    if kpi_id in TIME_BASED:
+        return pd.DataFrame(columns=["quarter", "series", "value"]), "", ""
+
+    year = period_year(quarter)
+
+    def labels_from(block_list: List[Dict]) -> List[str]:
+        return [d["quarter"] for d in block_list]
+
+    if process in ["MA", "CT"]:
+        qlist = data["quarterlyVolumes"][process]
+        year_quarters = sort_periods(q for q in labels_from(qlist) if period_year(q) == year)
+        rec_map = {d["quarter"]: d for d in qlist if d["quarter"] in year_quarters}
+    else:
+        qlist = data["inspectionVolumes"]["GMP"]
+        year_quarters = sort_periods(q for q in labels_from(qlist) if period_year(q) == year)
+        rec_map = {d["quarter"]: d for d in qlist if d["quarter"] in year_quarters}
+
+    if not year_quarters:
+        return (
+            pd.DataFrame(columns=["quarter", "series", "value"]),
+            f"No volume data for {year}",
+            "",
+        )
+
+    rows = []
+    title = ""
+    ylabel = "count"
+
+    if process == "MA":
+        title_map = {
+            "pct_new_apps_evaluated_on_time": "New Applications: Submitted vs Evaluated",
+            "pct_renewal_apps_evaluated_on_time": "Renewal Applications: Submitted vs Evaluated",
+            "pct_variation_apps_evaluated_on_time": "Variation Applications: Submitted vs Evaluated",
+            "pct_fir_responses_on_time": "FIR: Queries vs Responses",
+            "pct_query_responses_evaluated_on_time": "Queries: Raised vs Responses",
+            "pct_granted_within_90_days": "MA Applications: Submitted vs Granted",
+        }
+        title = f"{title_map.get(kpi_id, 'MA comparison')} — {year}"
+        for q in year_quarters:
+            rec = rec_map.get(q, {})
+            recvd = int(rec.get("applications_received", 0) or 0)
+            compl = int(rec.get("applications_completed", 0) or 0)
+            appr = int(rec.get("approvals_granted", 0) or 0)
+            rng = seeded_rng("MA", kpi_id, q)
+            new_ratio = 0.50 + rng.uniform(-0.05, 0.05)
+            ren_ratio = 0.30 + rng.uniform(-0.05, 0.05)
+            var_subm = clamp(recvd - int(round(recvd * new_ratio)) - int(round(recvd * ren_ratio)), 0, recvd)
+            if kpi_id == "pct_new_apps_evaluated_on_time":
+                new_sub = int(round(recvd * new_ratio))
+                new_eval = int(round(compl * new_ratio))
+                rows += [
+                    {"quarter": q, "series": "Submitted", "value": new_sub},
+                    {"quarter": q, "series": "Evaluated", "value": new_eval},
+                ]
+            elif kpi_id == "pct_renewal_apps_evaluated_on_time":
+                ren_sub = int(round(recvd * ren_ratio))
+                ren_eval = int(round(compl * ren_ratio))
+                rows += [
+                    {"quarter": q, "series": "Submitted", "value": ren_sub},
+                    {"quarter": q, "series": "Evaluated", "value": ren_eval},
+                ]
+            elif kpi_id == "pct_variation_apps_evaluated_on_time":
+                var_sub = var_subm
+                var_eval = clamp(compl - int(round(compl * new_ratio)) - int(round(compl * ren_ratio)), 0, compl)
+                rows += [
+                    {"quarter": q, "series": "Submitted", "value": var_sub},
+                    {"quarter": q, "series": "Evaluated", "value": var_eval},
+                ]
+            elif kpi_id == "pct_fir_responses_on_time":
+                fir_q = int(round(compl * clamp(0.35 + rng.uniform(-0.08, 0.08), 0.15, 0.6)))
+                fir_r = int(round(fir_q * clamp(0.88 + rng.uniform(-0.05, 0.05), 0.6, 1.0)))
+                rows += [
+                    {"quarter": q, "series": "FIR queries", "value": fir_q},
+                    {"quarter": q, "series": "FIR responses", "value": fir_r},
+                ]
+            elif kpi_id == "pct_query_responses_evaluated_on_time":
+                queries = int(round(compl * clamp(0.55 + rng.uniform(-0.1, 0.1), 0.3, 0.8)))
+                q_resps = int(round(queries * clamp(0.82 + rng.uniform(-0.08, 0.08), 0.5, 0.98)))
+                rows += [
+                    {"quarter": q, "series": "Queries", "value": queries},
+                    {"quarter": q, "series": "Query responses", "value": q_resps},
+                ]
+            elif kpi_id == "pct_granted_within_90_days":
+                rows += [
+                    {"quarter": q, "series": "Submitted", "value": recvd},
+                    {"quarter": q, "series": "Granted", "value": appr},
+                ]
+
+    elif process == "CT":
+        title_map = {
+            "pct_new_apps_evaluated_on_time_ct": "CT New Applications: Submitted vs Evaluated",
+            "pct_amendment_apps_evaluated_on_time": "CT Amendments: Submitted vs Evaluated",
+            "pct_gcp_inspections_on_time": "GCP Inspections: Planned vs Conducted",
+            "pct_safety_reports_assessed_on_time": "Safety Reports: Submitted vs Assessed",
+            "pct_gcp_compliant": "GCP Sites: Assessed vs Compliant",
+            "pct_registry_submissions_on_time": "Registry: Total reports vs Published",
+            "pct_capa_evaluated_on_time": "CAPA: Raised vs Evaluated",
+        }
+        title = f"{title_map.get(kpi_id, 'CT comparison')} — {year}"
+        for q in year_quarters:
+            rec = rec_map.get(q, {})
+            recvd = int(rec.get("applications_received", 0) or 0)
+            compl = int(rec.get("applications_completed", 0) or 0)
+            req_insp = int(rec.get("gcp_inspections_requested", 0) or 0)
+            cond_insp = int(rec.get("gcp_inspections_conducted", 0) or 0)
+            rng = seeded_rng("CT", kpi_id, q)
+            new_ratio = 0.65 + rng.uniform(-0.07, 0.07)
+            new_subm = int(round(recvd * new_ratio))
+            amd_subm = max(recvd - new_subm, 0)
+            new_eval = int(
+                round(compl * max(min(new_ratio + rng.uniform(-0.03, 0.03), 0.85), 0.4))
+            )
+            amd_eval = max(compl - new_eval, 0)
+            safety_reports = int(
+                round(compl * max(min(0.60 + rng.uniform(-0.1, 0.1), 0.9), 0.3))
+            )
+            safety_assessed = int(
+                round(safety_reports * max(min(0.9 + rng.uniform(-0.08, 0.05), 1.0), 0.5))
+            )
+            sites_assessed = int(
+                round(cond_insp * max(min(1.2 + rng.uniform(-0.2, 0.2), 2.0), 0.5))
+            )
+            sites_compliant = int(
+                round(sites_assessed * max(min(0.9 + rng.uniform(-0.05, 0.05), 1.0), 0.6))
+            )
+            registry_sub = int(
+                round(recvd * max(min(0.5 + rng.uniform(-0.1, 0.1), 0.9), 0.3))
+            )
+            registry_proc = int(
+                round(registry_sub * max(min(0.9 + rng.uniform(-0.05, 0.05), 1.0), 0.6))
+            )
+            capa_raised = int(
+                round(compl * max(min(0.25 + rng.uniform(-0.08, 0.08), 0.6), 0.1))
+            )
+            capa_eval = int(
+                round(capa_raised * max(min(0.9 + rng.uniform(-0.08, 0.05), 1.0), 0.5))
+            )
+            if kpi_id == "pct_new_apps_evaluated_on_time_ct":
+                rows += [
+                    {"quarter": q, "series": "Submitted", "value": new_subm},
+                    {"quarter": q, "series": "Evaluated", "value": new_eval},
+                ]
+            elif kpi_id == "pct_amendment_apps_evaluated_on_time":
+                rows += [
+                    {"quarter": q, "series": "Submitted", "value": amd_subm},
+                    {"quarter": q, "series": "Evaluated", "value": amd_eval},
+                ]
+            elif kpi_id == "pct_gcp_inspections_on_time":
+                rows += [
+                    {"quarter": q, "series": "Planned", "value": req_insp},
+                    {"quarter": q, "series": "Conducted", "value": cond_insp},
+                ]
+            elif kpi_id == "pct_safety_reports_assessed_on_time":
+                rows += [
+                    {"quarter": q, "series": "Safety reports", "value": safety_reports},
+                    {"quarter": q, "series": "Assessed", "value": safety_assessed},
+                ]
+            elif kpi_id == "pct_gcp_compliant":
+                rows += [
+                    {"quarter": q, "series": "Sites assessed", "value": sites_assessed},
+                    {"quarter": q, "series": "Compliant", "value": sites_compliant},
+                ]
+            elif kpi_id == "pct_registry_submissions_on_time":
+                rows += [
+                    {"quarter": q, "series": "Total reports", "value": registry_sub},
+                    {"quarter": q, "series": "Published", "value": registry_proc},
+                ]
+            elif kpi_id == "pct_capa_evaluated_on_time":
+                rows += [
+                    {"quarter": q, "series": "CAPA raised", "value": capa_raised},
+                    {"quarter": q, "series": "Evaluated", "value": capa_eval},
+                ]
+
+    elif process == "GMP":
+        title_map = {
+            "pct_facilities_inspected_on_time": "GMP: Submitted vs Inspected by Inspection Type",
+            "pct_inspections_waived_on_time": "GMP: Total Inspections vs Waived (Desk/Remote)",
+            "pct_facilities_compliant": "GMP: Conducted vs Compliant by Inspection Type",
+            "pct_capa_decisions_on_time": "GMP: CAPA Decisions by Inspection Source",
+            "pct_applications_completed_on_time": "GMP: Applications by Source",
+            "pct_reports_published_on_time": "GMP: Reports Published by Inspection Type",
+        }
+        title = f"{title_map.get(kpi_id, 'GMP comparison')} — {year}"
+        for q in year_quarters:
+            rec = rec_map.get(q, {})
+            rng = seeded_rng("GMP", kpi_id, q)
+            req = {
+                "Domestic": int(rec.get("requested_domestic", 0) or 0),
+                "Foreign": int(rec.get("requested_foreign", 0) or 0),
+                "Reliance": int(rec.get("requested_reliance", 0) or 0),
+                "Desk": int(rec.get("requested_desk", 0) or 0),
+            }
+            cond = {
+                "Domestic": int(rec.get("conducted_domestic", 0) or 0),
+                "Foreign": int(rec.get("conducted_foreign", 0) or 0),
+                "Reliance": int(rec.get("conducted_reliance", 0) or 0),
+                "Desk": int(rec.get("conducted_desk", 0) or 0),
+            }
+            types = ["Domestic", "Foreign", "Reliance", "Desk"]
+            waived = {
+                t: int(round(req[t] * clamp(0.12 + rng.uniform(-0.05, 0.05), 0, 0.3)))
+                for t in types
+            }
+            compliant = {
+                t: int(round(cond[t] * clamp(0.88 + rng.uniform(-0.06, 0.05), 0.5, 1.0)))
+                for t in types
+            }
+            capa = {
+                t: int(round(cond[t] * clamp(0.30 + rng.uniform(-0.1, 0.1), 0.05, 0.7)))
+                for t in types
+            }
+            apps_by_src = {
+                t: int(round(req[t] * clamp(1.10 + rng.uniform(-0.2, 0.2), 0.4, 2.0)))
+                for t in types
+            }
+            reports = {
+                t: int(round(cond[t] * clamp(0.95 + rng.uniform(-0.05, 0.05), 0.5, 1.2)))
+                for t in types
+            }
+            if kpi_id == "pct_facilities_inspected_on_time":
+                for t in types:
+                    rows += [
+                        {"quarter": q, "series": f"{t} — Submitted", "value": req[t]},
+                        {"quarter": q, "series": f"{t} — Inspected", "value": cond[t]},
+                    ]
+            elif kpi_id == "pct_inspections_waived_on_time":
+                total_inspections = sum(req.values())
+                total_waived = waived["Desk"]
+                rows += [
+                    {"quarter": q, "series": "Total Inspections", "value": total_inspections},
+                    {"quarter": q, "series": "Waived (Desk/Remote)", "value": total_waived},
+                ]
+            elif kpi_id == "pct_facilities_compliant":
+                for t in types:
+                    rows += [
+                        {"quarter": q, "series": f"{t} — Conducted", "value": cond[t]},
+                        {"quarter": q, "series": f"{t} — Compliant", "value": compliant[t]},
+                    ]
+            elif kpi_id == "pct_capa_decisions_on_time":
+                for t in ["Domestic", "Foreign", "Reliance"]:
+                    rows += [
+                        {"quarter": q, "series": f"{t} — CAPA decisions", "value": capa[t]},
+                    ]
+            elif kpi_id == "pct_applications_completed_on_time":
+                for t in ["Domestic", "Foreign", "Reliance"]:
+                    rows += [
+                        {"quarter": q, "series": f"{t} — Applications", "value": apps_by_src[t]},
+                    ]
+            elif kpi_id == "pct_reports_published_on_time":
+                for t in types:
+                    rows += [
+                        {"quarter": q, "series": f"{t} — Reports published", "value": reports[t]},
+                    ]
+
+    df = pd.DataFrame(rows)
+    return df, title, ylabel
+
+
+def pair_spec_for_kpi(process: str, kpi_id: str) -> Optional[Tuple[Optional[str], str, List[str]]]:
+    """
+    Get pair specification for volume comparison.
+
+    Args:
+        process (str): Process.
+        kpi_id (str): KPI ID.
+
+    Returns:
+        Optional[Tuple]: Base label, compare label, group levels.
+    """
+    if process == "MA":
+        pairs = {
+            "pct_new_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
+            "pct_renewal_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
+            "pct_variation_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
+            "pct_fir_responses_on_time": ("FIR queries", "FIR responses", ["All"]),
+            "pct_query_responses_evaluated_on_time": ("Queries", "Query responses", ["All"]),
+            "pct_granted_within_90_days": ("Submitted", "Granted", ["All"]),
+        }
+        return pairs.get(kpi_id)
+    if process == "CT":
+        pairs = {
+            "pct_new_apps_evaluated_on_time_ct": ("Submitted", "Evaluated", ["All"]),
+            "pct_amendment_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
+            "pct_gcp_inspections_on_time": ("Planned", "Conducted", ["All"]),
+            "pct_safety_reports_assessed_on_time": ("Safety reports", "Assessed", ["All"]),
+            "pct_gcp_compliant": ("Sites assessed", "Compliant", ["All"]),
+            "pct_registry_submissions_on_time": ("Total reports", "Published", ["All"]),
+            "pct_capa_evaluated_on_time": ("CAPA raised", "Evaluated", ["All"]),
+        }
+        return pairs.get(kpi_id)
+    if process == "GMP":
+        pairs = {
+            "pct_facilities_inspected_on_time": (
+                "Submitted",
+                "Inspected",
+                ["Domestic", "Foreign", "Reliance", "Desk"],
+            ),
+            "pct_facilities_compliant": (
+                "Conducted",
+                "Compliant",
+                ["Domestic", "Foreign", "Reliance", "Desk"],
+            ),
+            "pct_inspections_waived_on_time": ("Total Inspections", "Waived (Desk/Remote)", ["All"]),
+            "pct_capa_decisions_on_time": (None, "CAPA decisions", ["Domestic", "Foreign", "Reliance"]),
+            "pct_applications_completed_on_time": (None, "Applications", ["Domestic", "Foreign", "Reliance"]),
+            "pct_reports_published_on_time": (
+                "Conducted",
+                "Reports published",
+                ["Domestic", "Foreign", "Reliance", "Desk"],
+            ),
+        }
+        return pairs.get(kpi_id)
+    return None
+
+
+def prepare_category_first_df(
+    process: str, kpi_id: str, quarter: str, data: Dict[str, Any]
+) -> Tuple[pd.DataFrame, str, List[str], List[str]]:
+    """
+    Prepare DataFrame for category-first volume analysis.
+
+    Args:
+        process (str): Process.
+        kpi_id (str): KPI ID.
+        quarter (str): Quarter.
+        data (Dict): Data.
+
+    Returns:
+        Tuple: DF, title, categories, group levels.
+    """
+    spec = pair_spec_for_kpi(process, kpi_id)
+    if not spec:
+        return pd.DataFrame(), "", [], []
+    base_label, compare_label, group_levels = spec
+    df_raw, title, _ = build_kpi_comparison_df(process, kpi_id, quarter, data)
+    if df_raw.empty:
+        return pd.DataFrame(), title, [], []
+
+    rows = []
+    for _, r in df_raw.iterrows():
+        series = str(r["series"])
+        if "—" in series:
+            group, category = [s.strip() for s in series.split("—", 1)]
+        else:
+            group, category = "All", series
+        rows.append(
+            {
+                "quarter": r["quarter"],
+                "group": group,
+                "category": category,
+                "value": int(r["value"] or 0),
+            }
+        )
+    d = pd.DataFrame(rows)
+    categories = [c for c in [base_label, compare_label] if c is not None] if base_label else [compare_label]
+    d = d[d["category"].isin(categories)].copy()
+    if base_label is not None and len(group_levels) == 1:
+        pair_tot = d.groupby("quarter")["value"].sum().rename("pair_total")
+        d = d.merge(pair_tot.reset_index(), on="quarter", how="left")
+        d["pct"] = (d["value"] / d["pair_total"]) * 100.0
+        if kpi_id == "pct_inspections_waived_on_time":
+            total_vals = d[d["category"] == "Total Inspections"].set_index("quarter")["value"]
+            waived_rows = d["category"] == "Waived (Desk/Remote)"
+            d.loc[waived_rows, "pct"] = (
+                d.loc[waived_rows, "value"] / total_vals[d.loc[waived_rows, "quarter"]].values
+            ) * 100
+            d.loc[d["category"] == "Total Inspections", "pct"] = 100.0
+    else:
+        cat_tot = (
+            d.groupby(["quarter", "category"], as_index=False)["value"].sum().rename(columns={"value": "cat_total"})
+        )
+        d = d.merge(cat_tot, on=["quarter", "category"], how="left")
+        d["pct"] = np.where(d["cat_total"] > 0, (d["value"] / d["cat_total"]) * 100.0, np.nan)
+    if process == "GMP":
+        d["group"] = pd.Categorical(d["group"], categories=group_levels, ordered=True)
+    else:
+        d["group"] = pd.Categorical(d["group"], categories=["All"], ordered=True)
+    return d, title, categories, group_levels
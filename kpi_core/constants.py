@@ -0,0 +1,300 @@
+"""
+Static configuration for the KPI dashboard.
+
+Theme tokens, KPI catalogues, disaggregation links and step aliases live here
+so they are compiled once into bytecode and shared by the Streamlit app and
+any headless consumers, instead of being rebuilt on every script rerun.
+"""
+
+from typing import Dict, List, Set
+
+# =======================
+# THEME TOKENS
+# =======================
+# Color palette inspired by NDA branding
+NDA_GREEN = "#006341"
+NDA_LIGHT_GREEN = "#e0f0e5"
+NDA_DARK_GREEN = "#004c30"
+NDA_ACCENT = "#8dc63f"
+TEXT_DARK = "#0f172a"
+TEXT_LIGHT = "#64748b"
+BG_COLOR = "#f8fafc"
+CARD_BG = "#ffffff"
+BORDER_COLOR = "#e2e8f0"
+
+PALETTE = {
+    "primary": NDA_GREEN,
+    "accent": NDA_ACCENT,
+    "ok": NDA_GREEN,
+    "warn": "#F59E0B",
+    "bad": "#C62828",
+    "info": "#1976D2",
+    "violet": "#7a4cff",
+    "grey": "#6b7280",
+}
+
+# GMP-specific disaggregation colors
+GMP_GROUP_COLORS = {
+    "Domestic": "#3b82f6",
+    "Foreign": "#7c3aed",
+    "Reliance": "#f59e0b",
+    "Desk": "#10b981",
+}
+
+
+# =======================
+# KPI MAPPING AND UTILITIES
+# =======================
+KPI_NAME_MAP: Dict[str, Dict[str, str]] = {
+    # Marketing Authorization (MA) KPIs
+    "pct_new_apps_evaluated_on_time": {"short": "New Apps on Time", "long": "Percentage of New Applications Evaluated On Time"},
+    "pct_renewal_apps_evaluated_on_time": {"short": "Renewals on Time", "long": "Percentage of Renewal Applications Evaluated On Time"},
+    "pct_variation_apps_evaluated_on_time": {"short": "Variations on Time", "long": "Percentage of Variation Applications Evaluated On Time"},
+    "pct_fir_responses_on_time": {"short": "F.I.R Responses on Time", "long": "Percentage of Further Information Responses On Time"},
+    "pct_query_responses_evaluated_on_time": {"short": "Query Responses on Time", "long": "Percentage of Query Responses Evaluated On Time"},
+    "pct_granted_within_90_days": {"short": "Granted ≤ 90 Days", "long": "Percentage of Applications Granted Within 90 Days"},
+    "median_duration_continental": {"short": "Median Duration", "long": "Median Duration to Grant (Days, Continental)"},
+    # Clinical Trials (CT) KPIs
+    "pct_new_apps_evaluated_on_time_ct": {"short": "CT New Apps on Time", "long": "Clinical Trials: % of New Applications Evaluated On Time"},
+    "pct_amendment_apps_evaluated_on_time": {"short": "Amendments on Time", "long": "Clinical Trials: % of Amendment Applications Evaluated On Time"},
+    "pct_gcp_inspections_on_time": {"short": "GCP Inspections on Time", "long": "Clinical Trials: % of GCP Inspections Completed On Time"},
+    "pct_safety_reports_assessed_on_time": {"short": "Safety Reports on Time", "long": "Clinical Trials: % of Safety Reports Assessed On Time"},
+    "pct_gcp_compliant": {"short": "GCP Compliant", "long": "Clinical Trials: % of Sites Compliant with GCP"},
+    "pct_registry_submissions_on_time": {"short": "Registry on Time", "long": "Clinical Trials: % of Registry Submissions On Time"},
+    "pct_capa_evaluated_on_time": {"short": "CAPA on Time", "long": "Clinical Trials: % of CAPA Evaluations Completed On Time"},
+    "avg_turnaround_time": {"short": "Avg TAT (Days)", "long": "Clinical Trials: Average Turnaround Time (Days)"},
+    # GMP KPIs
+    "pct_facilities_inspected_on_time": {"short": "Facilities Inspected On Time", "long": "GMP: % of Facilities Inspected On Time"},
+    "pct_inspections_waived_on_time": {"short": "Waivers on Time", "long": "GMP: % of Inspections Waived On Time"},
+    "pct_facilities_compliant": {"short": "Facilities Compliant", "long": "GMP: % of Facilities Compliant"},
+    "pct_capa_decisions_on_time": {"short": "CAPA Decisions on Time", "long": "GMP: % of CAPA Decisions On Time"},
+    "pct_applications_completed_on_time": {"short": "Apps Completed on Time", "long": "GMP: % of Applications Completed On Time"},
+    "avg_turnaround_time_gmp": {"short": "Avg TAT (GMP)", "long": "GMP: Average Turnaround Time (Days)"},
+    "median_turnaround_time": {"short": "Median TAT", "long": "GMP: Median Turnaround Time (Days)"},
+    "pct_reports_published_on_time": {"short": "Reports on Time", "long": "GMP: % of Reports Published On Time"},
+    # GMP Disaggregated KPIs (child metrics)
+    "pct_facilities_inspected_on_time_on_site_domestic": {"short": "On-time (On-site Domestic)", "long": "GMP: % On Time (On-site Domestic)"},
+    "pct_facilities_inspected_on_time_on_site_foreign": {"short": "On-time (On-site Foreign)", "long": "GMP: % On Time (On-site Foreign)"},
+    "pct_facilities_inspected_on_time_reliance_joint_on_site_foreign": {"short": "On-time (Reliance/Joint On-site Foreign)", "long": "GMP: % On Time (Reliance/Joint On-site Foreign)"},
+    "pct_facilities_compliant_on_site_domestic": {"short": "Compliant (On-site Domestic)", "long": "GMP: % Compliant (On-site Domestic)"},
+    "pct_facilities_compliant_on_site_foreign": {"short": "Compliant (On-site Foreign)", "long": "GMP: % Compliant (On-site Foreign)"},
+    "pct_facilities_compliant_reliance_joint_on_site_foreign": {"short": "Compliant (Reliance/Joint On-site Foreign)", "long": "GMP: % Compliant (Reliance/Joint On-site Foreign)"},
+    "pct_facilities_compliant_reliance_joint_desk_based_foreign": {"short": "Compliant (Reliance/Joint Desk-based Foreign)", "long": "GMP: % Compliant (Reliance/Joint Desk-based Foreign)"},
+    "pct_capa_decisions_on_time_direct_foreign_domestic_done_by_nra": {"short": "CAPA on Time (Direct NRA)", "long": "GMP: % CAPA On Time (Direct NRA)"},
+    "pct_capa_decisions_on_time_reliance_rec_joint_inspections": {"short": "CAPA on Time (Reliance Joint)", "long": "GMP: % CAPA On Time (Reliance Joint)"},
+    "pct_applications_completed_on_time_domestic_applicant": {"short": "Apps On-time (Domestic Applicant)", "long": "GMP: % Apps On Time (Domestic Applicant)"},
+    "pct_applications_completed_on_time_foreign_applicant_direct": {"short": "Apps On-time (Foreign Direct)", "long": "GMP: % Apps On Time (Foreign Direct)"},
+    "pct_applications_completed_on_time_foreign_applicant_reliance": {"short": "Apps On-time (Foreign Reliance)", "long": "GMP: % Apps On Time (Foreign Reliance)"},
+    "avg_turnaround_time_gmp_on_site_domestic": {"short": "Avg TAT (On-site Domestic)", "long": "GMP: Avg TAT (On-site Domestic)"},
+    "avg_turnaround_time_gmp_on_site_foreign": {"short": "Avg TAT (On-site Foreign)", "long": "GMP: Avg TAT (On-site Foreign)"},
+    "avg_turnaround_time_gmp_reliance_joint_on_site_foreign": {"short": "Avg TAT (Reliance/Joint On-site Foreign)", "long": "GMP: Avg TAT (Reliance/Joint On-site Foreign)"},
+    "median_turnaround_time_on_site_domestic": {"short": "Median TAT (On-site Domestic)", "long": "GMP: Median TAT (On-site Domestic)"},
+    "median_turnaround_time_on_site_foreign": {"short": "Median TAT (On-site Foreign)", "long": "GMP: Median TAT (On-site Foreign)"},
+    "pct_reports_published_on_time_on_site_domestic": {"short": "Reports on Time (On-site Domestic)", "long": "GMP: % Reports On Time (On-site Domestic)"},
+    "pct_reports_published_on_time_on_site_foreign": {"short": "Reports on Time (On-site Foreign)", "long": "GMP: % Reports On Time (On-site Foreign)"},
+    "pct_reports_published_on_time_reliance_joint_on_site_foreign": {"short": "Reports on Time (Reliance/Joint On-site Foreign)", "long": "GMP: % Reports On Time (Reliance/Joint On-site Foreign)"},
+}
+
+# Time-based KPIs (lower values are better)
+TIME_BASED: Set[str] = {
+    "median_duration_continental",
+    "avg_turnaround_time",
+    "avg_turnaround_time_gmp",
+    "median_turnaround_time",
+}
+
+
+# =======================
+# KPI TO PROCESS MAPPING
+# =======================
+KPI_PROCESS_MAP: Dict[str, str] = {
+    # CT KPIs
+    "pct_new_apps_evaluated_on_time_ct": "CT",
+    "pct_amendment_apps_evaluated_on_time": "CT",
+    "pct_gcp_inspections_on_time": "CT",
+    "pct_safety_reports_assessed_on_time": "CT",
+    "pct_gcp_compliant": "CT",
+    "pct_registry_submissions_on_time": "CT",
+    "pct_capa_evaluated_on_time": "CT",
+    "avg_turnaround_time": "CT",
+    # GMP KPIs
+    "pct_facilities_inspected_on_time": "GMP",
+    "pct_inspections_waived_on_time": "GMP",
+    "pct_facilities_compliant": "GMP",
+    "pct_capa_decisions_on_time": "GMP",
+    "pct_applications_completed_on_time": "GMP",
+    "avg_turnaround_time_gmp": "GMP",
+    "median_turnaround_time": "GMP",
+    "pct_reports_published_on_time": "GMP",
+    # MA KPIs
+    "pct_new_apps_evaluated_on_time": "MA",
+    "pct_renewal_apps_evaluated_on_time": "MA",
+    "pct_variation_apps_evaluated_on_time": "MA",
+    "pct_fir_responses_on_time": "MA",
+    "pct_query_responses_evaluated_on_time": "MA",
+    "pct_granted_within_90_days": "MA",
+    "median_duration_continental": "MA",
+}
+
+
+
+# =======================
+# DISAGGREGATION FILTERS AND LINKS
+# =======================
+DISAG_UI_OPTIONS: Dict[str, List[str]] = {
+    "MA": ["All"],
+    "CT": ["All"],
+    "GMP": [
+        "All",
+        "On-site Domestic",
+        "On-site Foreign",
+        "Reliance/Joint On-site Foreign",
+        "Reliance/Joint Desk-based Foreign",
+        "Direct NRA",
+        "Reliance Joint",
+        "Domestic Applicant",
+        "Foreign Direct",
+        "Foreign Reliance",
+    ],
+}
+
+DISAG_KPI_LINKS: Dict[str, Dict[str, str]] = {
+    "pct_facilities_inspected_on_time": {
+        "On-site Domestic": "pct_facilities_inspected_on_time_on_site_domestic",
+        "On-site Foreign": "pct_facilities_inspected_on_time_on_site_foreign",
+        "Reliance/Joint On-site Foreign": "pct_facilities_inspected_on_time_reliance_joint_on_site_foreign",
+    },
+    "pct_facilities_compliant": {
+        "On-site Domestic": "pct_facilities_compliant_on_site_domestic",
+        "On-site Foreign": "pct_facilities_compliant_on_site_foreign",
+        "Reliance/Joint On-site Foreign": "pct_facilities_compliant_reliance_joint_on_site_foreign",
+        "Reliance/Joint Desk-based Foreign": "pct_facilities_compliant_reliance_joint_desk_based_foreign",
+    },
+    "pct_capa_decisions_on_time": {
+        "Direct NRA": "pct_capa_decisions_on_time_direct_foreign_domestic_done_by_nra",
+        "Reliance Joint": "pct_capa_decisions_on_time_reliance_rec_joint_inspections",
+    },
+    "pct_applications_completed_on_time": {
+        "Domestic Applicant": "pct_applications_completed_on_time_domestic_applicant",
+        "Foreign Direct": "pct_applications_completed_on_time_foreign_applicant_direct",
+        "Foreign Reliance": "pct_applications_completed_on_time_foreign_applicant_reliance",
+    },
+    "avg_turnaround_time_gmp": {
+        "On-site Domestic": "avg_turnaround_time_gmp_on_site_domestic",
+        "On-site Foreign": "avg_turnaround_time_gmp_on_site_foreign",
+        "Reliance/Joint On-site Foreign": "avg_turnaround_time_gmp_reliance_joint_on_site_foreign",
+    },
+    "median_turnaround_time": {
+        "On-site Domestic": "median_turnaround_time_on_site_domestic",
+        "On-site Foreign": "median_turnaround_time_on_site_foreign",
+    },
+    "pct_reports_published_on_time": {
+        "On-site Domestic": "pct_reports_published_on_time_on_site_domestic",
+        "On-site Foreign": "pct_reports_published_on_time_on_site_foreign",
+        "Reliance/Joint On-site Foreign": "pct_reports_published_on_time_reliance_joint_on_site_foreign",
+    },
+}
+
+# Lower values are better for time-based KPIs and their disaggregated children
+LOWER_IS_BETTER: Set[str] = set(TIME_BASED) | {
+    child for base, mapping in DISAG_KPI_LINKS.items() if base in TIME_BASED for child in mapping.values()
+}
+
+
+# =======================
+# PROCESS STEPS AND BOTTLENECKS
+# =======================
+STEP_ALIASES: Dict[str, str] = {
+    "application_submission_review": "Submission review",
+    "technical_screening": "Tech screening",
+    "committee_assignment": "Committee assign.",
+    "committee_review": "Committee review",
+    "inspection_scheduling": "Schedule insp.",
+    "inspection_execution": "Conduct insp.",
+    "report_drafting": "Draft report",
+    "report_publication": "Publish report",
+    "capa_request": "CAPA request",
+    "capa_evaluation": "CAPA evaluation",
+}
+
+DISAG_SUFFIXES: List[str] = [
+    "_domestic",
+    "_foreign",
+    "_reliance_joint_on_site_foreign",
+    "_reliance_joint_desk_based_foreign",
+    "_direct_foreign_domestic_done_by_nra",
+    "_reliance_rec_joint_inspections",
+    "_domestic_applicant",
+    "_foreign_applicant_direct",
+    "_foreign_applicant_reliance",
+]
+
+# Map disaggregation UI labels to step-key suffixes for filtering
+DISAG_LABEL_SUFFIXES: Dict[str, str] = {
+    "On-site Domestic": "_domestic",
+    "On-site Foreign": "_foreign",
+    "Reliance/Joint On-site Foreign": "_reliance_joint_on_site_foreign",
+    "Reliance/Joint Desk-based Foreign": "_reliance_joint_desk_based_foreign",
+    "Direct NRA": "_direct_foreign_domestic_done_by_nra",
+    "Reliance Joint": "_reliance_rec_joint_inspections",
+    "Domestic Applicant": "_domestic_applicant",
+    "Foreign Direct": "_foreign_applicant_direct",
+    "Foreign Reliance": "_foreign_applicant_reliance",
+}
+
+
+# =======================
+# ANALYTICS METRIC LABELS
+# =======================
+# Human-readable names for volume, step and bottleneck metrics
+METRIC_DISPLAY_NAMES: Dict[str, str] = {
+    # Volumes
+    "applications_received": "Applications Received",
+    "applications_completed": "Applications Completed",
+    "approvals_granted": "Approvals Granted",
+    "gcp_inspections_requested": "GCP Inspections Requested",
+    "gcp_inspections_conducted": "GCP Inspections Conducted",
+    "requested_domestic": "Requested - Domestic",
+    "requested_foreign": "Requested - Foreign",
+    "requested_reliance": "Requested - Reliance",
+    "requested_desk": "Requested - Desk/Remote",
+    "conducted_domestic": "Conducted - Domestic",
+    "conducted_foreign": "Conducted - Foreign",
+    "conducted_reliance": "Conducted - Reliance",
+    "conducted_desk": "Conducted - Desk/Remote",
+    "compliant_domestic": "Compliant - Domestic",
+    "compliant_foreign": "Compliant - Foreign",
+    "compliant_reliance": "Compliant - Reliance",
+    "compliant_desk": "Compliant - Desk/Remote",
+    "reports_published": "Reports Published",
+    "fir_queries": "FIR Queries",
+    "fir_responses": "FIR Responses",
+    "queries": "Queries",
+    "query_responses": "Query Responses",
+    "amendments_received": "Amendments Received",
+    "sites_assessed": "Sites Assessed",
+    "registry_submissions": "Registry Submissions",
+    # Steps/Bottlenecks
+    "step_avg_days": "Step Actual Days",
+    "step_target_days": "Step Target Days",
+    "opening_backlog": "Opening Backlog",
+    "cycle_time_median": "Median Cycle Time (Days)",
+    "ext_median_days": "Median External Response (Days)",
+    "carry_over_rate": "Carry-Over Rate (%)",
+    "avg_query_cycles": "Average Query Cycles",
+    "fpy_pct": "First Pass Yield (%)",
+    "wait_share_pct": "Wait Time Share (%)",
+    "work_to_staff_ratio": "Work-to-Staff Ratio",
+    "sched_median_days": "Median Scheduling (Days)",
+    # Bottleneck flow analytics
+    "aged_items": "Aged Items (All Buckets)",
+    "aged_90_share_pct": "Items Aged 90+ Days (%)",
+    "mean_age_days": "Mean Item Age (Days)",
+    "throughput_q": "Throughput (Cases/Quarter)",
+    "littles_lead_time_days": "Lead Time, Little's Law (Days)",
+    "net_inflow_q": "Net Inflow (Cases/Quarter)",
+    "backlog_growth_pct": "Backlog Growth in Quarter (%)",
+    "backlog_change_qoq_pct": "Closing Backlog Change QoQ (%)",
+    "capacity_headroom_pct": "Capacity Headroom (%)",
+    "utilisation_headroom_pct": "Utilisation Headroom (%)",
+}
@@ -0,0 +1,270 @@
+"""
+Correlation engine for self-service analytics.
+
+The analytics pool of a scope is pivoted once into a period × series matrix
+(a series is one process, metric and category; missing cells stay NaN), and
+every pair is scored in one vectorized pass:
+
+- Pearson correlations over the periods both series have (pairwise
+  complete), from masked matrix products: with ``W`` the observed mask and
+  ``X`` the zero-filled values, ``Wᵀ W`` counts the shared periods and
+  ``Xᵀ X``, ``Xᵀ W``, ``(X²)ᵀ W`` give the sums of every pair at once;
+- Spearman correlations as Pearson on per-series ranks (ranked within each
+  lag window; exact whenever both series cover the window);
+- two-sided p-values from the t distribution, and Benjamini-Hochberg
+  q-values across all pairs tested, since thousands of pairs are scanned;
+- lagged cross-correlations (series x leading series y by 1…``max_lag``
+  periods), from the same products on shifted matrices.
+
+``ranked_pairs`` returns the strongest relationships first, so "what moves
+with cycle time" is one lookup instead of trying pairs one by one. Strength
+is the weaker of |Pearson| and |Spearman| (0 when their signs differ): with
+ten quarters a single extreme value can make Pearson look perfect, and
+requiring the rank correlation to agree keeps such pairs off the top.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .aggregation import RATIO_AGG, ratio_pivot
+from .analytics import metric_display_name
+from .lazy import lazy_import
+from .periods import sort_periods
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+
+# Shared periods a pair needs before it is scored
+MIN_PERIODS = 6
+MAX_LAG = 2
+METHODS = ("pearson", "spearman")
+
+PAIR_COLUMNS = [
+    "x",
+    "y",
+    "x_label",
+    "y_label",
+    "lag",
+    "n",
+    "pearson",
+    "pearson_p",
+    "spearman",
+    "spearman_p",
+    "q_value",
+    "strength",
+]
+
+_SEP = "|"
+
+
+def series_label(key: str) -> str:
+    """Display label of a ``process|metric|category`` series key."""
+    process, metric, category = key.split(_SEP)
+    label = f"{process} · {metric_display_name(metric)}"
+    return f"{label} · {category}" if category and not metric.endswith(category) else label
+
+
+def metric_matrix(pool: pd.DataFrame, agg: str = RATIO_AGG) -> pd.DataFrame:
+    """
+    Quarter × series matrix of an analytics pool.
+
+    Args:
+        pool (pd.DataFrame): Analytics rows (already scoped and filtered).
+        agg (str): Aggregation of duplicate rows per cell ("ratio" pools rate
+            components; otherwise a pandas aggregation name).
+
+    Returns:
+        pd.DataFrame: Quarters (chronological) × ``process|metric|category``
+        columns; NaN where a series has no value.
+    """
+    if pool.empty:
+        return pd.DataFrame()
+    rows = pool.assign(
+        series=pool["process"] + _SEP + pool["metric_name"] + _SEP + pool["category"].fillna("").astype(str)
+    )
+    if agg == RATIO_AGG:
+        matrix = ratio_pivot(rows, "quarter", "series", fill=None)
+    else:
+        matrix = pd.pivot_table(rows, values="value", index="quarter", columns="series", aggfunc=agg)
+    matrix = matrix.loc[sort_periods(matrix.index)]
+    # Constant series have no defined correlation
+    return matrix.loc[:, matrix.nunique() > 1]
+
+
+def _ranks(x: np.ndarray) -> np.ndarray:
+    """Average ranks down each column, NaN kept."""
+    return pd.DataFrame(x).rank(axis=0, method="average").to_numpy()
+
+
+def _pairwise(a: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise-complete Pearson r of every column of ``a`` with every column of ``b``.
+
+    Args:
+        a (np.ndarray): Periods × m values (NaN where missing).
+        b (np.ndarray): Periods × k values, aligned with ``a``.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: m × k correlations and shared-period counts.
+    """
+    wa, wb = ~np.isnan(a), ~np.isnan(b)
+    xa, xb = np.where(wa, a, 0.0), np.where(wb, b, 0.0)
+    fa, fb = wa.astype(float), wb.astype(float)
+    n = fa.T @ fb
+    sa, sb = xa.T @ fb, fa.T @ xb
+    saa, sbb = (xa * xa).T @ fb, fa.T @ (xb * xb)
+    sab = xa.T @ xb
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sab - sa * sb
+        r = cov / np.sqrt((n * saa - sa * sa) * (n * sbb - sb * sb))
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _p_values(r: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Two-sided p-values of correlations (t test with n − 2 degrees of freedom)."""
+    dof = np.maximum(n - 2, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = r * np.sqrt(dof / np.maximum(1.0 - r * r, 1e-12))
+    return 2.0 * stats.t.sf(np.abs(t), dof)
+
+
+def _bh_q_values(p: np.ndarray) -> np.ndarray:
+    """Benjamini-Hochberg adjusted p-values."""
+    if len(p) == 0:
+        return p
+    order = np.argsort(p)
+    ranked = p[order] * len(p) / np.arange(1, len(p) + 1)
+    q = np.minimum.accumulate(ranked[::-1])[::-1]
+    out = np.empty_like(q)
+    out[order] = np.minimum(q, 1.0)
+    return out
+
+
+def correlation_matrix(matrix: pd.DataFrame, method: str = "pearson") -> pd.DataFrame:
+    """
+    Full correlation matrix (pairwise complete), matching ``DataFrame.corr``.
+
+    Pearson, and Spearman on gap-free series, come from one vectorized pass.
+    With gaps a Spearman pair must be ranked within the periods both series
+    have, so that case is left to ``DataFrame.corr``.
+
+    Args:
+        matrix (pd.DataFrame): Periods × series.
+        method (str): "pearson" or "spearman".
+
+    Returns:
+        pd.DataFrame: Series × series correlations.
+
+    Raises:
+        ValueError: For an unknown method.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method: {method!r} (expected one of {METHODS})")
+    x = matrix.to_numpy(dtype=float)
+    if method == "spearman":
+        if np.isnan(x).any():
+            return matrix.astype(float).corr(method="spearman")
+        x = _ranks(x)
+    r, _ = _pairwise(x, x)
+    return pd.DataFrame(r, index=matrix.columns, columns=matrix.columns)
+
+
+def ranked_pairs(
+    matrix: pd.DataFrame, max_lag: int = MAX_LAG, min_periods: int = MIN_PERIODS
+) -> pd.DataFrame:
+    """
+    Every series pair (and lag) scored and ranked by strength.
+
+    Lag 0 scores each unordered pair once; lag L pairs ``x`` at period t
+    with ``y`` at period t + L for every ordered pair of distinct series.
+
+    Args:
+        matrix (pd.DataFrame): Periods × series (see ``metric_matrix``).
+        max_lag (int): Longest lead of ``x`` over ``y``, in periods.
+        min_periods (int): Shared periods a pair needs.
+
+    Returns:
+        pd.DataFrame: ``PAIR_COLUMNS``, strongest first; the q-value
+        controls the false discovery rate over all rows.
+    """
+    cols = np.asarray(matrix.columns)
+    x = matrix.to_numpy(dtype=float)
+    parts = []
+    for lag in range(0, max_lag + 1):
+        if lag >= len(x):
+            break
+        lead, follow = (x, x) if lag == 0 else (x[:-lag], x[lag:])
+        r, n = _pairwise(lead, follow)
+        rho, _ = _pairwise(_ranks(lead), _ranks(follow))
+        keep = (n >= min_periods) & np.isfinite(r)
+        keep &= np.triu(np.ones_like(keep), k=1).astype(bool) if lag == 0 else ~np.eye(len(cols), dtype=bool)
+        i, j = np.nonzero(keep)
+        parts.append(
+            pd.DataFrame(
+                {"x": cols[i], "y": cols[j], "lag": lag, "n": n[i, j], "pearson": r[i, j], "spearman": rho[i, j]}
+            )
+        )
+    out = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["x", "y", "lag", "n"])
+    if out.empty:
+        return pd.DataFrame(columns=PAIR_COLUMNS)
+    n = out["n"].to_numpy(dtype=float)
+    out["pearson_p"] = _p_values(out["pearson"].to_numpy(), n)
+    out["spearman_p"] = _p_values(out["spearman"].to_numpy(), n)
+    out["q_value"] = _bh_q_values(out["pearson_p"].to_numpy())
+    labels = {c: series_label(c) for c in cols}
+    out["x_label"] = out["x"].map(labels)
+    out["y_label"] = out["y"].map(labels)
+    out["n"] = out["n"].astype(int)
+    r, rho = out["pearson"].to_numpy(), np.nan_to_num(out["spearman"].to_numpy())
+    out["strength"] = np.where(np.sign(r) == np.sign(rho), np.minimum(np.abs(r), np.abs(rho)), 0.0)
+    order = np.argsort(-out["strength"].to_numpy(), kind="stable")
+    return out.iloc[order][PAIR_COLUMNS].reset_index(drop=True)
+
+
+def _matches(keys: pd.Series, wanted: set) -> pd.Series:
+    """Series keys that are in ``wanted`` or whose metric part is."""
+    return keys.isin(wanted) | keys.str.split(_SEP).str[1].isin(wanted)
+
+
+def pairs_involving(
+    pairs: pd.DataFrame, metrics: Optional[List[str]] = None, top: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Ranked pairs where either side is one of ``metrics`` (all pairs when None).
+
+    Args:
+        pairs (pd.DataFrame): Output of ``ranked_pairs``.
+        metrics (Optional[List[str]]): Metric keys (any process or category)
+            or full series keys.
+        top (Optional[int]): Keep only the first ``top`` rows.
+
+    Returns:
+        pd.DataFrame: Matching rows, order kept.
+    """
+    sel = pairs
+    if metrics:
+        wanted = set(metrics)
+        sel = pairs[_matches(pairs["x"], wanted) | _matches(pairs["y"], wanted)]
+    return sel.head(top) if top else sel
+
+
+def correlation_scan(
+    pool: pd.DataFrame, agg: str = RATIO_AGG, max_lag: int = MAX_LAG, min_periods: int = MIN_PERIODS
+) -> Dict[str, Any]:
+    """
+    Matrix and ranked pairs of one analytics scope.
+
+    Args:
+        pool (pd.DataFrame): Analytics rows of the scope.
+        agg (str): Cell aggregation (see ``metric_matrix``).
+        max_lag (int): Longest lead, in quarters.
+        min_periods (int): Shared quarters a pair needs.
+
+    Returns:
+        Dict[str, Any]: ``matrix`` (quarters × series) and ``pairs``
+        (``ranked_pairs``).
+    """
+    matrix = metric_matrix(pool, agg)
+    return {"matrix": matrix, "pairs": ranked_pairs(matrix, max_lag, min_periods)}
@@ -0,0 +1,263 @@
+"""
+Dataset loading and period helpers.
+
+Reads the dashboard's JSON export without any UI dependency: callers (the
+Streamlit app, batch jobs, services) decide how to surface ``DataError``.
+
+Series may be delivered at month or ISO-week granularity (records keyed by
+``"period"``, e.g. ``"2025-03"`` / ``"2025-W07"``, instead of ``"quarter"``).
+They are rolled up to quarters at load so every quarterly view works
+unchanged; the original fine-grained sections are kept under
+``data["finePeriods"]`` for weekly/monthly views.
+
+The quarterly sections are then checked (``kpi_core.validation``): values
+known to be wrong are quarantined and the data-quality report is kept under
+``data["dataQuality"]``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lazy import lazy_import
+from .periods import parse_period, rollup, sort_periods
+from .validation import check_and_quarantine
+
+pd = lazy_import("pandas")
+
+REQUIRED_KEYS: List[str] = [
+    "quarterlyData",
+    "processStepData",
+    "kpiCounts",
+    "quarterlyVolumes",
+    "inspectionVolumes",
+    "bottleneckData",
+]
+
+
+# Aggregation of fine-grained fields when rolling up to quarters; anything
+# not listed is averaged (rates, medians, durations)
+ROLLUP_SUM = {"numerator", "denominator", "started_q", "completed_q", "incoming_cases_q", "capacity_cases_q"}
+ROLLUP_FIRST = {"opening_backlog"}
+ROLLUP_LAST = {"targetDays", "target", "open_end_q", "closing_backlog", "wip_count", "ext_sla_days"}
+# Sections made of additive volume counts: every numeric field is summed
+VOLUME_SECTIONS = {"quarterlyVolumes", "inspectionVolumes"}
+
+
+class DataError(ValueError):
+    """Raised when the data file is missing or does not have the expected structure."""
+
+
+def file_version(data_path: str) -> str:
+    """
+    Content fingerprint of a data file.
+
+    Args:
+        data_path (str): Path to JSON data file.
+
+    Returns:
+        str: Short SHA-256 hex digest of the file contents.
+    """
+    return hashlib.sha256(pathlib.Path(data_path).read_bytes()).hexdigest()[:16]
+
+
+def write_atomic(path: pathlib.Path, payload: bytes) -> None:
+    """
+    Write ``payload`` to ``path`` through a temporary file, so readers never see a partial file.
+
+    Args:
+        path (pathlib.Path): Destination; its folder must exist.
+        payload (bytes): File contents.
+
+    Raises:
+        OSError: If the folder is not writable.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def load_data(data_path: str, validate: bool = True) -> Dict[str, Any]:
+    """
+    Load and validate JSON data from file path.
+
+    Args:
+        data_path (str): Path to JSON data file.
+        validate (bool): Run the data-quality checks and quarantine errors.
+
+    Returns:
+        Dict[str, Any]: Loaded and validated data.
+
+    Raises:
+        DataError: If file not found or missing required keys.
+    """
+    p = pathlib.Path(data_path)
+    if not p.exists():
+        raise DataError(f"Data file not found: {p}")
+    with p.open("r", encoding="utf-8") as f:
+        raw = json.load(f)
+    for k in REQUIRED_KEYS:
+        if k not in raw:
+            raise DataError(f"Missing '{k}' in data file.")
+    return prepare_data(raw, validate)
+
+
+def prepare_data(raw: Dict[str, Any], validate: bool = True) -> Dict[str, Any]:
+    """
+    Turn a parsed export into loaded data: quarterly sections, checked.
+
+    Args:
+        raw (Dict): Parsed export (modified in place).
+        validate (bool): Run the data-quality checks and quarantine errors.
+
+    Returns:
+        Dict[str, Any]: Loaded data.
+
+    Raises:
+        DataError: If a period label cannot be parsed.
+    """
+    try:
+        data = normalize_periods(raw)
+    except ValueError as e:
+        raise DataError(str(e)) from e
+    return check_and_quarantine(data) if validate else data
+
+
+def _rollup_how(field: str, section: str) -> str:
+    if section in VOLUME_SECTIONS or field in ROLLUP_SUM:
+        return "sum"
+    if field in ROLLUP_FIRST:
+        return "first"
+    if field in ROLLUP_LAST or field.startswith("age_"):
+        return "last"
+    return "mean"
+
+
+def _rollup_records(records: List[Dict[str, Any]], section: str) -> List[Dict[str, Any]]:
+    """Quarterly records from month/week records of one series."""
+    df = pd.DataFrame(records)
+    numeric = [c for c in df.columns if c != "period" and pd.api.types.is_numeric_dtype(df[c])]
+    out = rollup(df, [], {c: _rollup_how(c, section) for c in numeric})
+    return out.drop(columns=["period_id"]).to_dict("records")
+
+
+def _is_fine_series(node: Any) -> bool:
+    return (
+        isinstance(node, list)
+        and bool(node)
+        and isinstance(node[0], dict)
+        and "period" in node[0]
+        and "quarter" not in node[0]
+    )
+
+
+def _rollup_tree(node: Any, section: str) -> Tuple[Any, bool]:
+    """Copy of ``node`` with every fine-grained series rolled up (shared if unchanged)."""
+    if _is_fine_series(node):
+        return _rollup_records(node, section), True
+    if isinstance(node, dict):
+        out, changed = {}, False
+        for k, v in node.items():
+            out[k], c = _rollup_tree(v, section)
+            changed = changed or c
+        return (out if changed else node), changed
+    return node, False
+
+
+def normalize_periods(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Roll month/week series up to quarters, keeping the originals.
+
+    Args:
+        raw (Dict): Parsed data file.
+
+    Returns:
+        Dict[str, Any]: Data whose sections are quarterly; fine-grained
+        sections, if any, are under ``"finePeriods"``.
+    """
+    fine: Dict[str, Any] = {}
+    for section in list(raw):
+        if section == "finePeriods":
+            continue
+        rolled, changed = _rollup_tree(raw[section], section)
+        if changed:
+            fine[section] = raw[section]
+            raw[section] = rolled
+    if fine:
+        raw["finePeriods"] = fine
+    return raw
+
+
+def list_quarters(data: Dict[str, Any]) -> List[str]:
+    """
+    All quarters present in the KPI series, in chronological order.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        List[str]: Sorted quarter labels.
+    """
+    return sort_periods(
+        {
+            q
+            for proc in data["quarterlyData"].values()
+            for k in proc.values()
+            for q in [d["quarter"] for d in k["data"]]
+        }
+    )
+
+
+def quarter_order_key(q: str) -> Tuple[int, int]:
+    """Sorting key for quarters (Qx YYYY)."""
+    _, pid = parse_period(q)
+    return (pid // 4, pid % 4 + 1)
+
+
+def filter_period(
+    df: pd.DataFrame,
+    mode: str,
+    q_all: List[str],
+    q_single: Optional[str],
+    q_from: Optional[str],
+    q_to: Optional[str],
+    y_from: Optional[int],
+    y_to: Optional[int],
+) -> pd.DataFrame:
+    """
+    Filter DF by period mode.
+
+    Args:
+        df (pd.DataFrame): Analytics-pool rows (with quarter, period_id and year).
+        mode (str): Mode ("Single Quarter", etc.).
+        q_all (List[str]): All quarters.
+        q_single (Optional[str]): Single quarter.
+        q_from (Optional[str]): From quarter.
+        q_to (Optional[str]): To quarter.
+        y_from (Optional[int]): From year.
+        y_to (Optional[int]): To year.
+
+    Returns:
+        pd.DataFrame: Filtered DF.
+    """
+    if df.empty:
+        return df
+    if mode == "Single Quarter" and q_single:
+        return df[df["quarter"] == q_single]
+    if mode == "Quarter Range" and q_from and q_to:
+        lo, hi = sorted((parse_period(q_from)[1], parse_period(q_to)[1]))
+        return df[(df["period_id"] >= lo) & (df["period_id"] <= hi)]
+    if mode == "Year Range" and y_from and y_to:
+        return df[(df["year"] >= y_from) & (df["year"] <= y_to)]
+    return df
@@ -0,0 +1,79 @@
+"""
+Server-side downsampling for long time series.
+
+``lttb_indices`` implements Largest-Triangle-Three-Buckets: it keeps the first
+and last points and, per bucket, the point forming the largest triangle with
+the previously kept point and the next bucket's mean. Peaks and troughs
+survive, so a few hundred points draw the same shape as tens of thousands.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def lttb_indices(y: Sequence[float], n_out: int, x: Optional[Sequence[float]] = None) -> np.ndarray:
+    """
+    Indices of the points LTTB keeps.
+
+    Args:
+        y (Sequence[float]): Values (NaNs are treated as gaps and never picked
+            over a real value in the same bucket).
+        n_out (int): Target number of points (>= 3).
+        x (Optional[Sequence[float]]): Positions; defaults to 0..n-1 (evenly
+            spaced periods).
+
+    Returns:
+        np.ndarray: Sorted integer indices into ``y``.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    y_filled = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+
+    # Interior points split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    # Mean of every bucket, used as the third triangle vertex for the bucket before it
+    sums_x = np.add.reduceat(x[1 : n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y_filled[1 : n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    mean_x = np.append(sums_x / counts, x[-1])
+    mean_y = np.append(sums_y / counts, y_filled[-1])
+
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        bx, by = x[lo:hi], y_filled[lo:hi]
+        ax, ay = x[a], y_filled[a]
+        area = np.abs((ax - mean_x[i + 1]) * (by - ay) - (ax - bx) * (mean_y[i + 1] - ay))
+        area = np.where(np.isnan(y[lo:hi]), -1.0, area)
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def window_bounds(labels: Sequence[str], x_range: Optional[Tuple[str, str]]) -> Tuple[int, int]:
+    """
+    Positional slice of ``labels`` covered by a (start, end) label range.
+
+    Args:
+        labels (Sequence[str]): Period labels in order.
+        x_range (Optional[Tuple[str, str]]): Inclusive label range; None for all.
+
+    Returns:
+        Tuple[int, int]: ``start``/``stop`` for slicing.
+    """
+    if not x_range:
+        return 0, len(labels)
+    pos = {label: i for i, label in enumerate(labels)}
+    start = pos.get(x_range[0], 0)
+    stop = pos.get(x_range[1], len(labels) - 1) + 1
+    return (start, stop) if start < stop else (0, len(labels))
@@ -0,0 +1,290 @@
+"""
+Headless quarterly report export.
+
+Builds the same figures as the dashboard's KPI detail view (trend, volume
+comparison, process steps) and Bottleneck Analysis for every process, then
+writes a static HTML bundle and, optionally, PNG/PDF images via kaleido.
+
+Image rendering is spread over a process pool. Each figure's spec is hashed and
+recorded in ``manifest.json``; on re-runs, figures whose hash and output files
+are unchanged are skipped, so refreshing a pack after a small data change only
+re-renders what moved.
+
+Usage::
+
+    python -m kpi_core.export --quarter "Q2 2025" --out reports/Q2_2025 --formats html,png,pdf
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import pathlib
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from .bottlenecks import prepare_bottleneck_df
+from .comparison import prepare_category_first_df
+from .constants import KPI_NAME_MAP
+from .data import list_quarters, load_data
+from .figures import backlog_figure, comparison_figure, cycle_time_figure, steps_figure, trend_figure
+from .lazy import lazy_import
+from .status import base_kpi_ids
+from .steps import process_step_rows
+
+pio = lazy_import("plotly.io")
+
+IMAGE_FORMATS = ("png", "pdf")
+MANIFEST = "manifest.json"
+PLOTLY_JS = "plotly.min.js"
+
+
+class ExportError(RuntimeError):
+    """Raised when a requested output format cannot be produced."""
+
+
+@dataclass
+class FigureJob:
+    """One figure of the report, serialized so it can cross process boundaries."""
+
+    key: str
+    section: str
+    heading: str
+    spec: str
+
+    @property
+    def digest(self) -> str:
+        """Content hash of the figure spec."""
+        return hashlib.sha256(self.spec.encode("utf-8")).hexdigest()[:20]
+
+    @property
+    def slug(self) -> str:
+        """File-system safe name derived from the key."""
+        return re.sub(r"[^A-Za-z0-9_.-]+", "_", self.key)
+
+
+# =======================
+# FIGURE COLLECTION
+# =======================
+def collect_figures(data: Dict[str, Any], quarter: str, disag_choice: str = "All") -> List[FigureJob]:
+    """
+    Build every figure of the quarterly pack.
+
+    Args:
+        data (Dict): Loaded data.
+        quarter (str): Report quarter.
+        disag_choice (str): Disaggregation applied to trends and steps.
+
+    Returns:
+        List[FigureJob]: Figures in report order.
+    """
+    jobs: List[FigureJob] = []
+
+    def add(key: str, section: str, heading: str, fig) -> None:
+        if fig is not None:
+            jobs.append(FigureJob(key, section, heading, fig.to_json()))
+
+    for process, kpis_block in data["quarterlyData"].items():
+        for kpi_id in base_kpi_ids(kpis_block):
+            name = KPI_NAME_MAP.get(kpi_id, {}).get("long", kpi_id)
+            add(
+                f"{process}/{kpi_id}/trend",
+                process,
+                f"{name} — trend vs target",
+                trend_figure(process, kpi_id, kpis_block, quarter, disag_choice),
+            )
+            d, title, categories, group_levels = prepare_category_first_df(process, kpi_id, quarter, data)
+            add(
+                f"{process}/{kpi_id}/comparison",
+                process,
+                f"{name} — volume breakdown",
+                comparison_figure(process, d, title, categories, group_levels),
+            )
+        df_steps, _ = process_step_rows(process, quarter, data["processStepData"], disag_choice)
+        if not df_steps.empty:
+            add(f"{process}/steps", process, "Process steps — actual vs target days", steps_figure(df_steps))
+        df_b = prepare_bottleneck_df(process, quarter, data.get("bottleneckData", {}))
+        add(f"{process}/bottlenecks/backlog", process, "Backlog carried forward", backlog_figure(df_b, process, quarter))
+        add(f"{process}/bottlenecks/cycle_time", process, "Median step cycle time", cycle_time_figure(df_b, process, quarter))
+    return jobs
+
+
+# =======================
+# RENDERING
+# =======================
+def kaleido_available() -> bool:
+    """Whether static image export (kaleido) is installed."""
+    return importlib.util.find_spec("kaleido") is not None
+
+
+def _render_image(spec: str, path: str, fmt: str, width: int, height: int) -> str:
+    """Process-pool worker: write one figure as an image."""
+    fig = pio.from_json(spec)
+    tmp = f"{path}.tmp"
+    pio.write_image(fig, tmp, format=fmt, width=width, height=height)
+    os.replace(tmp, path)
+    return path
+
+
+def _write_if_changed(path: pathlib.Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def render_html(jobs: Sequence[FigureJob], quarter: str, images: Dict[str, List[str]]) -> str:
+    """
+    Static HTML bundle: one section per process, interactive figures, image links.
+
+    Args:
+        jobs (Sequence[FigureJob]): Figures in report order.
+        quarter (str): Report quarter.
+        images (Dict): Figure key to relative image paths.
+
+    Returns:
+        str: HTML document (loads ``plotly.min.js`` from the same folder).
+    """
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>KPI report {html.escape(quarter)}</title>",
+        f"<script src='{PLOTLY_JS}'></script>",
+        "<style>body{font-family:Inter,Arial,sans-serif;margin:2rem;color:#1f2937}"
+        "h2{border-bottom:2px solid #1A5632;padding-bottom:.3rem}.fig{margin:1rem 0 2rem}</style>",
+        f"</head><body><h1>Regulatory KPI report — {html.escape(quarter)}</h1>",
+    ]
+    section = None
+    for job in jobs:
+        if job.section != section:
+            section = job.section
+            parts.append(f"<h2 id='{html.escape(section)}'>{html.escape(section)}</h2>")
+        fig = pio.from_json(job.spec)
+        links = " · ".join(
+            f"<a href='{html.escape(p)}'>{html.escape(p.rsplit('.', 1)[-1].upper())}</a>" for p in images.get(job.key, [])
+        )
+        parts.append(
+            f"<div class='fig'><h3>{html.escape(job.heading)}</h3>"
+            + fig.to_html(full_html=False, include_plotlyjs=False, div_id=job.slug)
+            + (f"<p>{links}</p>" if links else "")
+            + "</div>"
+        )
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def export_report(
+    data: Dict[str, Any],
+    quarter: str,
+    out_dir: str,
+    formats: Sequence[str] = ("html",),
+    workers: Optional[int] = None,
+    width: int = 1200,
+    height: int = 600,
+) -> Dict[str, Any]:
+    """
+    Export the quarterly pack to ``out_dir``.
+
+    Args:
+        data (Dict): Loaded data.
+        quarter (str): Report quarter.
+        out_dir (str): Output folder (created if needed).
+        formats (Sequence[str]): Any of "html", "png", "pdf".
+        workers (Optional[int]): Process pool size for image rendering.
+        width (int): Image width in px.
+        height (int): Image height in px.
+
+    Returns:
+        Dict[str, Any]: Figures, images rendered/skipped and elapsed seconds.
+
+    Raises:
+        ExportError: If images are requested without kaleido installed.
+    """
+    t0 = time.perf_counter()
+    image_formats = [f for f in formats if f in IMAGE_FORMATS]
+    if image_formats and not kaleido_available():
+        raise ExportError("PNG/PDF export needs kaleido (pip install kaleido; kaleido>=1 also needs Chrome).")
+    out = pathlib.Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    manifest_path = out / MANIFEST
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+
+    jobs = collect_figures(data, quarter)
+    images: Dict[str, List[str]] = {}
+    pending = []
+    for job in jobs:
+        for fmt in image_formats:
+            rel = f"img/{job.slug}.{fmt}"
+            images.setdefault(job.key, []).append(rel)
+            entry = f"{job.digest}:{width}x{height}"
+            if manifest.get(rel) == entry and (out / rel).exists():
+                continue
+            pending.append((job, rel, entry, fmt))
+
+    rendered, failed = 0, []
+    if pending:
+        (out / "img").mkdir(exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_render_image, job.spec, str(out / rel), fmt, width, height): (rel, entry)
+                for job, rel, entry, fmt in pending
+            }
+            for fut in as_completed(futures):
+                rel, entry = futures[fut]
+                try:
+                    fut.result()
+                except Exception as e:  # keep going; report the failures
+                    failed.append(f"{rel}: {e}")
+                    manifest.pop(rel, None)
+                    continue
+                manifest[rel] = entry
+                rendered += 1
+
+    html_written = False
+    if "html" in formats:
+        js = out / PLOTLY_JS
+        if not js.exists():
+            from plotly.offline import get_plotlyjs
+
+            js.write_text(get_plotlyjs(), encoding="utf-8")
+        html_written = _write_if_changed(out / "index.html", render_html(jobs, quarter, images))
+
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    return {
+        "figures": len(jobs),
+        "images_rendered": rendered,
+        "images_skipped": sum(len(v) for v in images.values()) - len(pending),
+        "failed": failed,
+        "html_written": html_written,
+        "seconds": round(time.perf_counter() - t0, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the quarterly KPI report pack.")
+    parser.add_argument("--data", default="data/kpiData.json", help="Path to the KPI JSON file.")
+    parser.add_argument("--quarter", help="Report quarter, e.g. 'Q2 2025' (default: latest).")
+    parser.add_argument("--out", default="reports", help="Output folder.")
+    parser.add_argument("--formats", default="html", help="Comma-separated: html,png,pdf.")
+    parser.add_argument("--workers", type=int, default=None, help="Image rendering processes.")
+    args = parser.parse_args(argv)
+
+    data = load_data(args.data)
+    quarter = args.quarter or list_quarters(data)[-1]
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    try:
+        report = export_report(data, quarter, args.out, formats, workers=args.workers)
+    except ExportError as e:
+        parser.error(str(e))
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,818 @@
+"""
+Plotly figure builders for the KPI detail and bottleneck views.
+
+These return figures instead of rendering them, so the dashboard
+(``st.plotly_chart``) and the batch exporter (HTML/PNG/PDF) draw exactly the
+same charts from the same frames.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .constants import (
+    BORDER_COLOR,
+    CARD_BG,
+    DISAG_KPI_LINKS,
+    GMP_GROUP_COLORS,
+    NDA_ACCENT,
+    NDA_GREEN,
+    PALETTE,
+    TEXT_DARK,
+)
+from .data import quarter_order_key
+from .downsample import lttb_indices, window_bounds
+from .lazy import lazy_import
+from .periods import parse_period
+from .status import resolve_effective_kpi_id
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+
+# GMP KPIs whose "All" trend overlays every disaggregated child series
+GMP_ALL_DISAG_TRENDS: List[str] = [
+    "pct_facilities_inspected_on_time",
+    "pct_facilities_compliant",
+    "pct_capa_decisions_on_time",
+    "pct_applications_completed_on_time",
+    "pct_reports_published_on_time",
+]
+
+# Per-trace point count above which trend lines are drawn with WebGL (Scattergl)
+TREND_WEBGL_THRESHOLD = 500
+# Max data points per trend figure, shared by its series (keeps payloads bounded)
+TREND_POINT_BUDGET = 2000
+
+
+# =======================
+# KPI TREND
+# =======================
+def _windowed(k: Dict[str, Any], x_range: Optional[Tuple[str, str]]) -> pd.DataFrame:
+    """KPI series as a frame, restricted to the zoom window (quarantined values read as NaN)."""
+    series = pd.DataFrame(k["data"]).reindex(columns=["quarter", "value"])
+    if x_range:
+        start, stop = window_bounds(series["quarter"].tolist(), x_range)
+        series = series.iloc[start:stop]
+    return series
+
+
+def _series_trace(series: pd.DataFrame, budget: int, **kwargs) -> go.Scatter:
+    """Line trace for one series: LTTB-downsampled to ``budget`` points, WebGL when still long."""
+    if len(series) > budget:
+        series = series.iloc[lttb_indices(series["value"].to_numpy(dtype=float), budget)]
+    cls = go.Scattergl if len(series) > TREND_WEBGL_THRESHOLD else go.Scatter
+    return cls(x=series["quarter"], y=series["value"], **kwargs)
+
+
+def _reference_trace(x: List[str], value: float, compact: bool, **kwargs) -> go.Scatter:
+    """Constant target/baseline line; long views only send its two end points."""
+    if compact and len(x) > 2:
+        x = [list(x)[0], list(x)[-1]]
+    return go.Scatter(x=x, y=[value] * len(x), mode="lines", **kwargs)
+
+
+def _band_traces(band: pd.DataFrame, quarters: List[str]) -> List[go.Scatter]:
+    """Shaded confidence band (lower edge, then upper edge filled to it) over ``quarters``."""
+    band = band[band["quarter"].isin(set(quarters))].dropna(subset=["ci_low", "ci_high"])
+    if band.empty:
+        return []
+    x = band["quarter"].tolist()
+    return [
+        go.Scatter(
+            x=x, y=band["ci_low"], mode="lines", line=dict(width=0), hoverinfo="skip", showlegend=False
+        ),
+        go.Scatter(
+            x=x,
+            y=band["ci_high"],
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor="rgba(26,86,50,0.15)",
+            name="95% interval",
+            customdata=band["ci_low"],
+            hovertemplate="%{customdata:.1f}% – %{y:.1f}%<extra>95% interval</extra>",
+        ),
+    ]
+
+
+def _forecast_continuation(forecast: Optional[pd.DataFrame], series: pd.DataFrame) -> pd.DataFrame:
+    """Forecast rows when they continue the drawn series (the window reaches the latest quarter)."""
+    if forecast is None or forecast.empty or series.empty:
+        return pd.DataFrame(columns=["quarter"])
+    if parse_period(series["quarter"].iloc[-1])[1] + 1 != forecast["period_id"].iloc[0]:
+        return pd.DataFrame(columns=["quarter"])
+    return forecast
+
+
+def _forecast_traces(forecast: pd.DataFrame, series: pd.DataFrame) -> List[go.Scatter]:
+    """Dashed forecast line from the last observed point, with its prediction interval shaded."""
+    if forecast.empty:
+        return []
+    last = series.iloc[-1]
+    x = [last["quarter"]] + forecast["quarter"].tolist()
+    return [
+        go.Scatter(
+            x=x,
+            y=[last["value"]] + forecast["pi_low"].tolist(),
+            mode="lines",
+            line=dict(width=0),
+            hoverinfo="skip",
+            showlegend=False,
+        ),
+        go.Scatter(
+            x=x,
+            y=[last["value"]] + forecast["pi_high"].tolist(),
+            mode="lines",
+            line=dict(width=0),
+            fill="tonexty",
+            fillcolor="rgba(100,116,139,0.15)",
+            name="95% prediction interval",
+            hoverinfo="skip",
+        ),
+        go.Scatter(
+            x=x,
+            y=[last["value"]] + forecast["forecast"].tolist(),
+            mode="lines+markers",
+            line=dict(width=2, dash="dash", color="#64748b"),
+            name="Forecast",
+            customdata=[None] + (forecast["p_hit"] * 100).tolist(),
+            hovertemplate="%{x}: %{y:.1f}<br>P(meet target) %{customdata:.0f}%<extra>Forecast</extra>",
+        ),
+    ]
+
+
+def trend_periods(process: str, base_kpi_id: str, kpis_block: Dict[str, Any], disag_choice: str) -> List[str]:
+    """
+    Period labels of the series a trend chart draws (for zoom controls).
+
+    Args:
+        process (str): Process.
+        base_kpi_id (str): Base KPI ID.
+        kpis_block (Dict): KPIs data.
+        disag_choice (str): Disaggregation.
+
+    Returns:
+        List[str]: Period labels of the overall/effective series.
+    """
+    effective_kpi_id, _ = resolve_effective_kpi_id(base_kpi_id, process, disag_choice)
+    k = kpis_block.get(effective_kpi_id) or kpis_block.get(base_kpi_id)
+    return [x["quarter"] for x in k["data"]] if k else []
+
+
+def trend_figure(
+    process: str,
+    base_kpi_id: str,
+    kpis_block: Dict[str, Any],
+    quarter: str,
+    disag_choice: str,
+    x_range: Optional[Tuple[str, str]] = None,
+    point_budget: int = TREND_POINT_BUDGET,
+    band: Optional[pd.DataFrame] = None,
+    forecast: Optional[pd.DataFrame] = None,
+) -> Optional[go.Figure]:
+    """
+    Trend line chart for a KPI, respecting disaggregation.
+
+    Series longer than their share of ``point_budget`` are LTTB-downsampled and
+    drawn with WebGL above ``TREND_WEBGL_THRESHOLD`` points, so the payload stays
+    bounded however long the history is. Passing ``x_range`` re-queries a zoom
+    window at full budget. ``band`` (``kpi_core.intervals.kpi_band``) shades the
+    confidence interval around the overall series; ``forecast``
+    (``kpi_core.forecast.forecast_band``) extends it with a dashed forecast
+    and its prediction interval when the window reaches the latest quarter.
+
+    Args:
+        process (str): Process.
+        base_kpi_id (str): Base KPI ID.
+        kpis_block (Dict): KPIs data.
+        quarter (str): Selected quarter.
+        disag_choice (str): Disaggregation.
+        x_range (Optional[Tuple[str, str]]): Inclusive (start, end) period window.
+        point_budget (int): Max data points across all series of the figure.
+        band (Optional[pd.DataFrame]): Rows with quarter, ci_low, ci_high.
+        forecast (Optional[pd.DataFrame]): Rows with quarter, forecast,
+            pi_low, pi_high, p_hit.
+
+    Returns:
+        Optional[go.Figure]: Figure, or None if the KPI has no series.
+    """
+    # Special handling for GMP all-disag view
+    if process == "GMP" and base_kpi_id in GMP_ALL_DISAG_TRENDS and disag_choice == "All":
+        fig = go.Figure()
+        child_map = DISAG_KPI_LINKS.get(base_kpi_id, {})
+        children = [(label, kpis_block[kid]) for label, kid in child_map.items() if kpis_block.get(kid)]
+        k_base = kpis_block.get(base_kpi_id)
+        budget = max(point_budget // (len(children) + (1 if k_base else 0) or 1), 3)
+        ref_quarters = None
+        compact = False
+        for label, k in children:
+            series = _windowed(k, x_range)
+            if ref_quarters is None:
+                ref_quarters = series["quarter"].tolist()
+            compact = compact or len(series) > TREND_WEBGL_THRESHOLD
+            fig.add_trace(_series_trace(series, budget, name=label, mode="lines+markers"))
+        if k_base:
+            series_base = _windowed(k_base, x_range)
+            if ref_quarters is None:
+                ref_quarters = series_base["quarter"].tolist()
+            compact = compact or len(series_base) > TREND_WEBGL_THRESHOLD
+            if band is not None:
+                fig.add_traces(_band_traces(band, series_base["quarter"].tolist()))
+            fig.add_trace(
+                _series_trace(
+                    series_base,
+                    budget,
+                    name="Overall",
+                    mode="lines+markers",
+                    line=dict(width=4, color=NDA_GREEN),
+                )
+            )
+            ahead = _forecast_continuation(forecast, series_base)
+            fig.add_traces(_forecast_traces(ahead, series_base))
+            ref_quarters = ref_quarters + ahead["quarter"].tolist()
+            target = k_base.get("target")
+            baseline = k_base.get("baseline")
+            if target is not None:
+                fig.add_trace(
+                    _reference_trace(
+                        ref_quarters, target, compact, name="Target", line=dict(dash="dash", color=NDA_ACCENT)
+                    )
+                )
+            if baseline is not None:
+                fig.add_trace(
+                    _reference_trace(
+                        ref_quarters, baseline, compact, name="Baseline", line=dict(dash="dot", color="#94a3b8")
+                    )
+                )
+        y_max = 100 if base_kpi_id.startswith("pct_") else None
+        fig.update_layout(
+            title="Trend vs Target — All disaggregations",
+            height=500,
+            margin=dict(l=10, r=10, t=40, b=0),
+            yaxis_range=[0, y_max] if y_max else None,
+            plot_bgcolor=CARD_BG,
+            paper_bgcolor=CARD_BG,
+            font=dict(color=TEXT_DARK),
+            legend=dict(orientation="h", y=-0.2),
+        )
+        return fig
+
+    # Standard trend for effective KPI
+    effective_kpi_id, applied = resolve_effective_kpi_id(base_kpi_id, process, disag_choice)
+    k = kpis_block.get(effective_kpi_id) or kpis_block.get(base_kpi_id)
+    if not k:
+        return None
+    series = _windowed(k, x_range)
+    target = k.get("target")
+    baseline = k.get("baseline")
+    y_max = 100 if effective_kpi_id.startswith("pct_") else None
+    compact = len(series) > TREND_WEBGL_THRESHOLD
+    fig = go.Figure()
+    if band is not None:
+        fig.add_traces(_band_traces(band, series["quarter"].tolist()))
+    fig.add_trace(
+        _series_trace(
+            series,
+            max(point_budget, 3),
+            name="Performance",
+            mode="lines+markers",
+            line=dict(width=3, color=NDA_GREEN),
+        )
+    )
+    ahead = _forecast_continuation(forecast, series)
+    fig.add_traces(_forecast_traces(ahead, series))
+    ref_quarters = series["quarter"].tolist() + ahead["quarter"].tolist()
+    if target is not None:
+        fig.add_trace(
+            _reference_trace(
+                ref_quarters, target, compact, name="Target", line=dict(dash="dash", color=NDA_ACCENT)
+            )
+        )
+    if baseline is not None:
+        fig.add_trace(
+            _reference_trace(
+                ref_quarters, baseline, compact, name="Baseline", line=dict(dash="dot", color="#94a3b8")
+            )
+        )
+    title_suffix = f" — {applied}" if applied else ""
+    fig.update_layout(
+        title=f"Trend vs Target{title_suffix}",
+        height=500,
+        margin=dict(l=10, r=10, t=40, b=0),
+        yaxis_range=[0, y_max] if y_max else None,
+        plot_bgcolor=CARD_BG,
+        paper_bgcolor=CARD_BG,
+        font=dict(color=TEXT_DARK),
+        legend=dict(orientation="h", y=-0.2),
+    )
+    return fig
+
+
+# =======================
+# VOLUME COMPARISON
+# =======================
+def comparison_figure(
+    process: str, d: pd.DataFrame, title: str, categories: List[str], group_levels: List[str]
+) -> Optional[go.Figure]:
+    """
+    Volume comparison bars from a category-first frame.
+
+    Args:
+        process (str): Process.
+        d (pd.DataFrame): Output of ``prepare_category_first_df``.
+        title (str): Chart title.
+        categories (List[str]): Categories compared.
+        group_levels (List[str]): Group order (GMP disaggregations).
+
+    Returns:
+        Optional[go.Figure]: Figure, or None if there is nothing to compare.
+    """
+    if d.empty or not title:
+        return None
+
+    fig = go.Figure()
+    if process in ("MA", "CT"):
+        qorder = sorted(d["quarter"].unique(), key=quarter_order_key)
+        for i, cat in enumerate(categories):
+            dd = d[d["category"] == cat].groupby("quarter", as_index=False).agg(
+                {"value": "sum", "pct": "mean"}
+            )
+            dd["quarter"] = pd.Categorical(dd["quarter"], categories=qorder, ordered=True)
+            color = NDA_GREEN if i == 0 else NDA_ACCENT
+            fig.add_bar(
+                x=dd["quarter"],
+                y=dd["value"],
+                name=cat,
+                marker=dict(color=color),
+                text=[
+                    f"{int(v):,} ({p:.0f}%)" if not np.isnan(p) else f"{int(v):,} (—)"
+                    for v, p in zip(dd["value"], dd["pct"])
+                ],
+                textposition="outside",
+            )
+        fig.update_layout(
+            title=title,
+            barmode="group",
+            bargap=0.25,
+            bargroupgap=0.15,
+            margin=dict(l=10, r=10, t=50, b=10),
+            plot_bgcolor=CARD_BG,
+            paper_bgcolor=CARD_BG,
+            font=dict(color=TEXT_DARK),
+            legend=dict(orientation="h", y=-0.2),
+            xaxis=dict(title=""),
+            yaxis=dict(title="count", rangemode="tozero"),
+        )
+        return fig
+
+    qorder = sorted(d["quarter"].unique(), key=quarter_order_key)
+    x_axis = []
+    for q in qorder:
+        for cat in categories:
+            x_axis.append((q, cat))
+    look = {}
+    for _, r in d.iterrows():
+        look[(str(r["group"]), r["quarter"], r["category"])] = (
+            int(r["value"]),
+            float(r["pct"]) if not pd.isna(r["pct"]) else np.nan,
+        )
+    for g in group_levels:
+        xs, ys, texts = [], [], []
+        for (q, cat) in x_axis:
+            v, p = look.get((g, q, cat), (0, np.nan))
+            xs.append((q, cat))
+            ys.append(v)
+            texts.append(
+                f"{int(v):,} ({p:.0f}%)" if not np.isnan(p) else f"{int(v):,} (—)"
+            )
+        fig.add_bar(
+            x=xs,
+            y=ys,
+            name=g,
+            marker=dict(color=GMP_GROUP_COLORS.get(g, NDA_GREEN)),
+            text=texts,
+            textposition="outside",
+        )
+    fig.update_layout(
+        title=title,
+        barmode="group",
+        bargap=0.25,
+        bargroupgap=0.15,
+        margin=dict(l=10, r=10, t=50, b=10),
+        plot_bgcolor=CARD_BG,
+        paper_bgcolor=CARD_BG,
+        font=dict(color=TEXT_DARK),
+        legend=dict(orientation="h", y=-0.2),
+        xaxis=dict(title="", type="category"),
+        yaxis=dict(title="count", rangemode="tozero"),
+    )
+    return fig
+
+
+# =======================
+# PROCESS STEPS
+# =======================
+def steps_figure(df_bar: pd.DataFrame) -> go.Figure:
+    """
+    Actual vs target days per step, actual bars colored by status.
+
+    Args:
+        df_bar (pd.DataFrame): Output of ``process_step_rows``.
+
+    Returns:
+        go.Figure: Grouped bar chart.
+    """
+    fig = go.Figure()
+    status_colors = {"success": NDA_GREEN, "warning": PALETTE["warn"], "error": PALETTE["bad"]}
+    actual_colors = [status_colors[row["status"]] for _, row in df_bar.iterrows()]
+    fig.add_trace(
+        go.Bar(
+            x=df_bar["step"],
+            y=df_bar["Actual"],
+            name="Actual",
+            marker_color=actual_colors,
+            text=[f"{v:.0f}d" for v in df_bar["Actual"]],
+            textposition="outside",
+            textfont=dict(size=12, color=TEXT_DARK),
+            legendgroup="Actual",
+            hovertemplate="<b>%{x}</b><br>Actual: %{y:.0f} days<extra></extra>",
+        )
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_bar["step"],
+            y=df_bar["Target"],
+            name="Target",
+            marker_color=PALETTE["grey"],
+            marker_opacity=0.7,
+            text=[f"{v:.0f}d" for v in df_bar["Target"]],
+            textposition="outside",
+            textfont=dict(size=12, color=TEXT_DARK),
+            legendgroup="Target",
+            hovertemplate="<b>%{x}</b><br>Target: %{y:.0f} days<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        barmode="group",
+        height=400,
+        margin=dict(l=10, r=10, t=10, b=100),
+        xaxis_tickangle=-45,
+        plot_bgcolor=CARD_BG,
+        paper_bgcolor=CARD_BG,
+        font=dict(color=TEXT_DARK, size=12),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=-0.3,
+            xanchor="center",
+            x=0.5,
+            bgcolor="rgba(255,255,255,0.8)",
+            bordercolor=BORDER_COLOR,
+            borderwidth=1,
+        ),
+        hoverlabel=dict(bgcolor="white", font_size=12, font_family="Inter"),
+    )
+    return fig
+
+
+# =======================
+# BOTTLENECKS
+# =======================
+def backlog_figure(df_b: pd.DataFrame, process: str, quarter: str) -> Optional[go.Figure]:
+    """
+    Horizontal bars of the backlog carried into each step.
+
+    Args:
+        df_b (pd.DataFrame): Output of ``prepare_bottleneck_df``.
+        process (str): Process.
+        quarter (str): Quarter.
+
+    Returns:
+        Optional[go.Figure]: Figure, or None without backlog data.
+    """
+    if df_b.empty or "opening_backlog" not in df_b.columns:
+        return None
+    backlog_df = df_b[["step", "opening_backlog"]].dropna()
+    fig = px.bar(
+        backlog_df,
+        y="step",
+        x="opening_backlog",
+        orientation="h",
+        title=f"Backlog Carried Forward in Process Step ({quarter}, {process})",
+        labels={"opening_backlog": "Backlog Items", "step": "Process Steps"},
+        color_discrete_sequence=[NDA_GREEN],
+    )
+    fig.update_layout(height=400, plot_bgcolor=CARD_BG, paper_bgcolor=CARD_BG, font=dict(color=TEXT_DARK))
+    return fig
+
+
+def cycle_time_figure(df_b: pd.DataFrame, process: str, quarter: str) -> Optional[go.Figure]:
+    """
+    Bars of the median days each step takes to complete.
+
+    Args:
+        df_b (pd.DataFrame): Output of ``prepare_bottleneck_df``.
+        process (str): Process.
+        quarter (str): Quarter.
+
+    Returns:
+        Optional[go.Figure]: Figure, or None without cycle-time data.
+    """
+    if df_b.empty or "cycle_time_median" not in df_b.columns:
+        return None
+    cycle_df = df_b[["step", "cycle_time_median"]].dropna()
+    fig = px.bar(
+        cycle_df,
+        x="step",
+        y="cycle_time_median",
+        title=f"Median Time to Complete This Step (Days, {quarter}, {process})",
+        labels={"cycle_time_median": "Median Days", "step": "Process Steps"},
+        color_discrete_sequence=[NDA_ACCENT],
+    )
+    fig.update_layout(
+        height=400,
+        xaxis_tickangle=45,
+        plot_bgcolor=CARD_BG,
+        paper_bgcolor=CARD_BG,
+        font=dict(color=TEXT_DARK),
+    )
+    return fig
+
+
+def fine_bottleneck_figure(df_fine: pd.DataFrame, metric: str, label: str, quarter: str) -> Optional[go.Figure]:
+    """
+    Lines of one bottleneck metric per step across the weeks/months of a quarter.
+
+    Args:
+        df_fine (pd.DataFrame): Output of ``fine_bottleneck_df``.
+        metric (str): Metric column.
+        label (str): Axis label of the metric.
+        quarter (str): Quarter.
+
+    Returns:
+        Optional[go.Figure]: Figure, or None without data for the metric.
+    """
+    if df_fine.empty or metric not in df_fine.columns:
+        return None
+    plot_df = df_fine[["step", "period", metric]].dropna()
+    if plot_df.empty:
+        return None
+    fig = px.line(
+        plot_df,
+        x="period",
+        y=metric,
+        color="step",
+        markers=True,
+        title=f"{label} Within {quarter}",
+        labels={metric: label, "period": "Period", "step": "Process Step"},
+    )
+    fig.update_layout(height=400, plot_bgcolor=CARD_BG, paper_bgcolor=CARD_BG, font=dict(color=TEXT_DARK))
+    fig.update_xaxes(type="category")
+    return fig
+
+
+def aging_heatmap_figure(matrix: pd.DataFrame, process: str, quarter: str) -> Optional[go.Figure]:
+    """
+    Heatmap of open items per step and age bucket.
+
+    Args:
+        matrix (pd.DataFrame): Output of ``aging_matrix``.
+        process (str): Process.
+        quarter (str): Quarter.
+
+    Returns:
+        Optional[go.Figure]: Figure, or None without aging data.
+    """
+    if matrix.empty:
+        return None
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.to_numpy(),
+            x=list(matrix.columns),
+            y=list(matrix.index),
+            colorscale=[[0, CARD_BG], [0.5, NDA_ACCENT], [1, "#ef4444"]],
+            text=matrix.to_numpy(),
+            texttemplate="%{text:.0f}",
+            hovertemplate="%{y}<br>%{x}: %{z:.0f} items<extra></extra>",
+            colorbar=dict(title="Items"),
+        )
+    )
+    fig.update_layout(
+        title=f"Backlog Aging by Step ({quarter}, {process})",
+        height=400,
+        plot_bgcolor=CARD_BG,
+        paper_bgcolor=CARD_BG,
+        font=dict(color=TEXT_DARK),
+        xaxis_title="Age of Open Items",
+        yaxis_title="Process Steps",
+    )
+    return fig
+
+
+# =======================
+# STEP FLOW
+# =======================
+def cumulative_flow_figure(cfd: pd.DataFrame, process: str) -> Optional[go.Figure]:
+    """
+    Cumulative-flow diagram: cumulative arrivals per step, completions as "Done".
+
+    Args:
+        cfd (pd.DataFrame): Output of ``cumulative_flow``.
+        process (str): Process.
+
+    Returns:
+        Optional[go.Figure]: Figure, or None without flow data.
+    """
+    if cfd.empty:
+        return None
+    stages = list(dict.fromkeys(cfd["stage"]))
+    shades = [0.25 + 0.7 * i / max(len(stages) - 1, 1) for i in range(len(stages))]
+    colors = px.colors.sample_colorscale("Greens", shades)
+    fig = go.Figure()
+    # Draw from "Done" upwards so each band fills down to the stage after it
+    for i, stage in enumerate(reversed(stages)):
+        part = cfd[cfd["stage"] == stage]
+        fig.add_trace(
+            go.Scatter(
+                x=part["quarter"],
+                y=part["cumulative"],
+                name=stage,
+                mode="lines",
+                line=dict(width=1, color=colors[len(stages) - 1 - i]),
+                fill="tozeroy" if i == 0 else "tonexty",
+            )
+        )
+    fig.update_layout(
+        title=f"Cumulative Flow by Step ({process})",
+        height=450,
+        plot_bgcolor=CARD_BG,
+        paper_bgcolor=CARD_BG,
+        font=dict(color=TEXT_DARK),
+        yaxis_title="Cumulative Items",
+        xaxis_title="Quarter",
+        legend=dict(traceorder="reversed"),
+    )
+    return fig
+
+
+def flow_ranking_figure(summary: pd.DataFrame, process: str, quarter: str) -> Optional[go.Figure]:
+    """
+    Horizontal bars of backlog days per step, biggest bottleneck on top.
+
+    Args:
+        summary (pd.DataFrame): Output of ``flow_summary``.
+        process (str): Process.
+        quarter (str): Quarter (or window label) of the summary.
+
+    Returns:
+        Optional[go.Figure]: Figure, or None without ranked steps.
+    """
+    ranked = summary.dropna(subset=["backlog_days"])
+    if ranked.empty:
+        return None
+    ranked = ranked.sort_values("backlog_days")
+    fig = go.Figure(
+        go.Bar(
+            x=ranked["backlog_days"],
+            y=ranked["step"],
+            orientation="h",
+            marker_color=[("#ef4444" if r == 1 else NDA_GREEN) for r in ranked["rank"]],
+            customdata=ranked[["open_end", "throughput_per_day"]].to_numpy(),
+            hovertemplate="%{y}<br>%{x:.1f} days of open work"
+            "<br>%{customdata[0]:.0f} open · %{customdata[1]:.1f}/day<extra></extra>",
+        )
+    )
+    fig.update_layout(
+        title=f"Days of Open Work per Step ({quarter}, {process})",
+        height=400,
+        plot_bgcolor=CARD_BG,
+        paper_bgcolor=CARD_BG,
+        font=dict(color=TEXT_DARK),
+        xaxis_title="Open items ÷ daily throughput (days)",
+        yaxis_title="Process Steps",
+    )
+    return fig
+
+
+# =======================
+# PAYLOAD COMPACTION
+# =======================
+# Decimal places kept in figure data: the finest format any chart displays (.2f)
+DISPLAY_DECIMALS = 2
+# Data arrays rounded and re-encoded by ``compact_figure`` (z may be 2-D)
+NUMERIC_ARRAYS = ("x", "y", "z", "base", "width", "customdata", "marker.size")
+# Integer dtypes Plotly.js reads from base64 typed arrays, narrowest first
+TYPED_INTS = ("int8", "uint8", "int16", "uint16", "int32", "uint32")
+
+
+def _precision(values: np.ndarray, decimals: int) -> int:
+    """Decimals to keep: ``decimals``, more for small values so four significant digits survive."""
+    finite = np.abs(values[np.isfinite(values)])
+    peak = finite.max() if finite.size else 0.0
+    return max(decimals, 3 - int(np.floor(np.log10(peak)))) if peak > 0 else decimals
+
+
+def _compact_array(values: Any, decimals: int, key: str) -> Any:
+    """
+    Smallest encoding of one numeric data array, or None to leave it as is.
+
+    Integral arrays become the narrowest integer typed array (sent as base64,
+    1-4 bytes per value); other floats are rounded and sent as a JSON list,
+    which beats 8-byte float64 typed arrays once values are short.
+    """
+    if values is None or isinstance(values, (str, dict)):
+        return None
+    arr = np.asarray(values)
+    if arr.dtype.kind not in "iuf" or arr.size == 0 or arr.ndim > (2 if key in ("z", "customdata") else 1):
+        return None
+    if arr.dtype.kind == "f":
+        arr = np.round(arr, _precision(arr, decimals))
+    finite = np.isfinite(arr)
+    if not finite.all():
+        return np.where(finite, arr, None).tolist()
+    if np.array_equal(arr, np.round(arr)) and (arr.ndim == 1 or key == "z"):
+        lo, hi = arr.min(), arr.max()
+        for dtype in TYPED_INTS:
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return arr.astype(dtype)
+    return arr.tolist()
+
+
+def _collapse_reference_lines(fig: go.Figure) -> None:
+    """
+    Send constant category lines (targets, baselines) as their two end points.
+
+    Such a line repeats the quarter labels of the series drawn before it; a
+    straight line between its first and last category draws the same. Only
+    lines whose labels all appear in earlier traces are collapsed, so the
+    category axis keeps its order, and never the edge a later trace fills to.
+    """
+    seen: Set[str] = set()
+    traces = list(fig.data)
+    for i, trace in enumerate(traces):
+        x = trace["x"] if "x" in trace else None
+        labels = list(x) if x is not None and not isinstance(x, str) else []
+        filled_to = i + 1 < len(traces) and getattr(traces[i + 1], "fill", None) in ("tonexty", "tonextx")
+        if (
+            trace.type in ("scatter", "scattergl")
+            and trace.mode == "lines"
+            and len(labels) > 2
+            and all(isinstance(q, str) for q in labels)
+            and set(labels) <= seen
+            and not filled_to
+            and trace.fill in (None, "none")
+            and trace.customdata is None
+            and trace.text is None
+            and trace.hovertemplate is None
+        ):
+            y = np.asarray(trace.y, dtype=float) if trace.y is not None else np.array([])
+            if y.size == len(labels) and np.all(y == y[0]):
+                trace.update(x=[labels[0], labels[-1]], y=[y[0], y[0]])
+                if trace.hoverinfo is None:
+                    trace.hoverinfo = "name+y"
+        seen.update(q for q in labels if isinstance(q, str))
+
+
+def _prune_template(fig: go.Figure) -> None:
+    """Keep only the template's per-trace defaults for trace types the figure draws."""
+    template = fig.layout.template
+    data = template.data.to_plotly_json() if template.data is not None else {}
+    if not data:
+        return
+    used = {trace.type for trace in fig.data}
+    if not set(data) <= used:
+        template.data = {kind: traces for kind, traces in data.items() if kind in used}
+
+
+def compact_figure(fig: go.Figure, decimals: int = DISPLAY_DECIMALS) -> go.Figure:
+    """
+    Shrink a figure's serialized payload without changing what is drawn.
+
+    Numeric data arrays are rounded to display precision and integral ones
+    sent as narrow base64 typed arrays; constant reference lines that repeat
+    the quarter labels of other traces are sent as end points; and the
+    template keeps defaults only for the trace types in use (the theme's
+    defaults for every other chart type otherwise ship with each figure).
+    Idempotent; the figure is modified in place.
+
+    Args:
+        fig (go.Figure): Figure to compact.
+        decimals (int): Decimal places kept (more for values below 1).
+
+    Returns:
+        go.Figure: The same figure.
+    """
+    _collapse_reference_lines(fig)
+    for trace in fig.data:
+        for key in NUMERIC_ARRAYS:
+            if key not in trace:
+                continue
+            compacted = _compact_array(trace[key], decimals, key.split(".")[-1])
+            if compacted is not None:
+                trace[key] = None  # plotly skips assignments equal to the current value, whatever the dtype
+                trace[key] = compacted
+    _prune_template(fig)
+    return fig
@@ -0,0 +1,202 @@
+"""
+Step flow analysis from ``processStepCounts``.
+
+Each process gets a step × quarter flow matrix of items started, completed
+and still open at quarter end. All derived measures are array operations
+over the whole matrix (every step and quarter at once):
+
+- throughput (completed per quarter) and inflow/outflow imbalance;
+- open-item accumulation against the previous quarter end, plus the
+  conservation residual ``open_prev + started - completed - open_end``;
+- hand-off gaps, i.e. items completed by one step that the next step has
+  not started;
+- backlog days (open items ÷ daily throughput), which ranks where work
+  actually piles up.
+
+``cumulative_flow`` gives the data for a cumulative-flow diagram: the
+cumulative arrivals of every step plus the departures of the last one.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .lazy import lazy_import
+from .periods import DAYS_PER_QUARTER, sort_periods
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+FLOW_FIELDS = ("started_q", "completed_q", "open_end_q")
+
+
+@dataclass(frozen=True)
+class FlowMatrix:
+    """Step × quarter counts of one process (steps in pipeline order)."""
+
+    process: str
+    steps: List[str]
+    quarters: List[str]
+    started: np.ndarray
+    completed: np.ndarray
+    open_end: np.ndarray
+
+    @property
+    def open_start(self) -> np.ndarray:
+        """Open items at the start of each quarter (previous quarter end; NaN first)."""
+        out = np.full_like(self.open_end, np.nan)
+        out[:, 1:] = self.open_end[:, :-1]
+        return out
+
+    @property
+    def imbalance(self) -> np.ndarray:
+        """Net inflow per quarter (started − completed)."""
+        return self.started - self.completed
+
+    @property
+    def accumulation(self) -> np.ndarray:
+        """Change in open items over each quarter."""
+        return self.open_end - self.open_start
+
+    @property
+    def residual(self) -> np.ndarray:
+        """Items unaccounted for by the flow balance (0 when counts are consistent)."""
+        return self.open_start + self.started - self.completed - self.open_end
+
+    @property
+    def handoff_gap(self) -> np.ndarray:
+        """Items completed by each step but not started by the next (last step: NaN)."""
+        out = np.full_like(self.completed, np.nan)
+        out[:-1] = self.completed[:-1] - self.started[1:]
+        return out
+
+    def window(self, quarters: Optional[List[str]]) -> "FlowMatrix":
+        """The matrix restricted to ``quarters`` (kept in chronological order)."""
+        if quarters is None:
+            return self
+        wanted = set(quarters)
+        idx = [i for i, q in enumerate(self.quarters) if q in wanted]
+        return FlowMatrix(
+            self.process,
+            self.steps,
+            [self.quarters[i] for i in idx],
+            self.started[:, idx],
+            self.completed[:, idx],
+            self.open_end[:, idx],
+        )
+
+
+def flow_matrix(process_step_counts: Dict[str, Any], process: str) -> Optional[FlowMatrix]:
+    """
+    Flow matrix of one process.
+
+    Args:
+        process_step_counts (Dict): ``data["processStepCounts"]``.
+        process (str): Process.
+
+    Returns:
+        Optional[FlowMatrix]: Matrix (missing cells are NaN), or None if the
+        process has no step counts.
+    """
+    steps_data = process_step_counts.get(process) or {}
+    steps = [s for s, series in steps_data.items() if series]
+    if not steps:
+        return None
+    quarters = sort_periods({rec["quarter"] for s in steps for rec in steps_data[s] if rec.get("quarter")})
+    col = {q: j for j, q in enumerate(quarters)}
+    cube = np.full((len(FLOW_FIELDS), len(steps), len(quarters)), np.nan)
+    for i, step in enumerate(steps):
+        for rec in steps_data[step]:
+            j = col.get(rec.get("quarter"))
+            if j is None:
+                continue
+            for f, field in enumerate(FLOW_FIELDS):
+                value = rec.get(field)
+                if isinstance(value, (int, float)):
+                    cube[f, i, j] = value
+    return FlowMatrix(process, steps, quarters, cube[0], cube[1], cube[2])
+
+
+def flow_matrices(process_step_counts: Dict[str, Any]) -> Dict[str, FlowMatrix]:
+    """Flow matrices of every process with step counts."""
+    out = {}
+    for process in process_step_counts:
+        fm = flow_matrix(process_step_counts, process)
+        if fm is not None:
+            out[process] = fm
+    return out
+
+
+def flow_summary(fm: FlowMatrix, quarters: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Per-step flow measures over a quarter window, ranked by backlog days.
+
+    Args:
+        fm (FlowMatrix): Flow matrix.
+        quarters (Optional[List[str]]): Window (default: all quarters).
+
+    Returns:
+        pd.DataFrame: One row per step with started, completed, imbalance,
+        open_end (last quarter), accumulation, handoff_gap, residual,
+        completion_ratio (completed ÷ available), throughput_per_day,
+        backlog_days and rank (1 = biggest bottleneck).
+    """
+    w = fm.window(quarters)
+    # Accumulation/residual need the quarter before the window when it exists
+    full_acc, full_res = fm.accumulation, fm.residual
+    idx = [fm.quarters.index(q) for q in w.quarters]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        started = np.nansum(w.started, axis=1)
+        completed = np.nansum(w.completed, axis=1)
+        available = np.nansum(fm.open_start[:, idx[:1]], axis=1) + started if idx else started
+        open_last = w.open_end[:, -1] if w.quarters else np.full(len(fm.steps), np.nan)
+        per_day = completed / (max(len(w.quarters), 1) * DAYS_PER_QUARTER)
+        out = pd.DataFrame(
+            {
+                "step": fm.steps,
+                "started": started,
+                "completed": completed,
+                "imbalance": started - completed,
+                "open_end": open_last,
+                "accumulation": np.nansum(full_acc[:, idx], axis=1),
+                "handoff_gap": np.nansum(w.handoff_gap, axis=1),
+                "residual": np.nansum(full_res[:, idx], axis=1),
+                "completion_ratio": np.where(available > 0, completed / available, np.nan),
+                "throughput_per_day": per_day,
+                "backlog_days": np.where(per_day > 0, open_last / per_day, np.nan),
+            }
+        )
+    out.loc[len(fm.steps) - 1, "handoff_gap"] = np.nan
+    out["rank"] = out["backlog_days"].rank(ascending=False, method="min", na_option="bottom").astype(int)
+    return out.sort_values(["rank", "step"]).reset_index(drop=True)
+
+
+def cumulative_flow(fm: FlowMatrix, quarters: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Cumulative-flow diagram data.
+
+    Each step's line is its cumulative arrivals; "Done" is the cumulative
+    completions of the last step. The vertical gap between two adjacent
+    lines is the work in progress between them.
+
+    Args:
+        fm (FlowMatrix): Flow matrix.
+        quarters (Optional[List[str]]): Window (default: all quarters).
+
+    Returns:
+        pd.DataFrame: Columns quarter, stage, cumulative (stages in pipeline
+        order, "Done" last).
+    """
+    w = fm.window(quarters)
+    arrivals = np.nancumsum(w.started, axis=1)
+    done = np.nancumsum(w.completed[-1:], axis=1)
+    stages = w.steps + ["Done"]
+    values = np.vstack([arrivals, done])
+    return pd.DataFrame(
+        {
+            "quarter": np.tile(w.quarters, len(stages)),
+            "stage": np.repeat(stages, len(w.quarters)),
+            "cumulative": values.ravel(),
+        }
+    )
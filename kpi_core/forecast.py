@@ -0,0 +1,315 @@
+"""
+Damped-trend forecasts for every KPI series.
+
+Every KPI and disaggregated child in ``quarterlyData`` is fitted with
+additive damped-trend exponential smoothing (ETS(A,Ad,N), error-correction
+form)::
+
+    forecast  ŷ = l + φ·b
+    level     l ← ŷ + α·e
+    trend     b ← φ·b + β·e
+
+All series are stacked into one series × quarter matrix (NaN where a series
+has no value) and fitted in a single pass: the recursion runs over quarters
+for every series and every grid point of (α, β, φ) at once, and each series
+keeps the grid point with the smallest one-step-ahead squared error. φ is
+capped at 0.98 as in standard ETS, since undamped trends on ten quarters
+extrapolate too far.
+
+h-step forecasts are ``l + (φ + … + φʰ)·b`` with the analytic ETS variance
+``σ²·(1 + Σ_{j<h} (α + β·(φ + … + φʲ))²)``; prediction intervals and the
+probability of meeting target come from that normal predictive distribution
+(lower is better for time-based KPIs). Large batches are split into chunks
+of series and fitted on a process pool.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from .constants import LOWER_IS_BETTER
+from .intervals import CI_Z
+from .lazy import lazy_import
+from .periods import QUARTER, parse_period, period_label
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+
+MAX_HORIZON = 4
+# Fewer observations than this leave too few errors to choose (α, β, φ)
+MIN_OBSERVATIONS = 5
+# Series per chunk; chunks are the unit of parallel work
+CHUNK_SERIES = 512
+# Below this many series the pool start-up costs more than it saves
+PARALLEL_MIN_SERIES = 4096
+
+ALPHA_GRID = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+# β as a fraction of α (keeps β ≤ α, the usual admissible region)
+BETA_FRACTIONS = (0.0, 0.05, 0.1, 0.2, 0.35, 0.5)
+PHI_GRID = (0.8, 0.85, 0.9, 0.95, 0.98)
+
+MODEL_COLUMNS = [
+    "process",
+    "kpi_id",
+    "last_quarter",
+    "last_period_id",
+    "n_obs",
+    "alpha",
+    "beta",
+    "phi",
+    "sigma",
+    "level",
+    "trend",
+    "target",
+]
+
+FORECAST_COLUMNS = [
+    "process",
+    "kpi_id",
+    "horizon",
+    "quarter",
+    "period_id",
+    "forecast",
+    "pi_low",
+    "pi_high",
+    "target",
+    "p_hit",
+]
+
+
+def _parameter_grid() -> np.ndarray:
+    """(α, β, φ) grid as a G × 3 array."""
+    return np.array(
+        [(a, a * f, phi) for a, f, phi in itertools.product(ALPHA_GRID, BETA_FRACTIONS, PHI_GRID)], dtype=float
+    )
+
+
+def series_matrix(data: Dict[str, Any]) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Stack every KPI series onto one quarter grid.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        Tuple: Series index (process, kpi_id, target), the series × quarter
+        value matrix (NaN where missing) and the quarter ids of its columns.
+    """
+    keys, cells = [], []
+    for process, block in data.get("quarterlyData", {}).items():
+        for kpi_id, kobj in block.items():
+            points = [
+                (parse_period(x["quarter"]), x.get("value"))
+                for x in kobj.get("data", [])
+                if isinstance(x.get("value"), (int, float))
+            ]
+            points = [(pid, v) for (gran, pid), v in points if gran == QUARTER]
+            if not points:
+                continue
+            keys.append((process, kpi_id, kobj.get("target")))
+            cells.append(points)
+    index = pd.DataFrame(keys, columns=["process", "kpi_id", "target"]).astype({"target": float})
+    if not cells:
+        return index, np.empty((0, 0)), np.empty(0, dtype=np.int64)
+    lo = min(pid for points in cells for pid, _ in points)
+    hi = max(pid for points in cells for pid, _ in points)
+    matrix = np.full((len(cells), hi - lo + 1), np.nan)
+    for i, points in enumerate(cells):
+        for pid, v in points:
+            matrix[i, pid - lo] = v
+    return index, matrix, np.arange(lo, hi + 1, dtype=np.int64)
+
+
+def _fit_chunk(y: np.ndarray, grid: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Fit the grid to a block of series (process-pool worker).
+
+    Args:
+        y (np.ndarray): Series × quarter values (NaN where missing).
+        grid (np.ndarray): G × 3 (α, β, φ) grid.
+
+    Returns:
+        Dict[str, np.ndarray]: Per series: alpha, beta, phi, sigma, level,
+        trend (final states) and n_obs.
+    """
+    n, t_len = y.shape
+    observed = ~np.isnan(y)
+    n_obs = observed.sum(axis=1)
+    cols = np.arange(t_len)
+    first = np.where(observed.any(axis=1), observed.argmax(axis=1), t_len)
+    last = np.where(observed.any(axis=1), t_len - 1 - observed[:, ::-1].argmax(axis=1), -1)
+    # Second observation, for the initial trend
+    after_first = observed & (cols[None, :] > first[:, None])
+    second = np.where(after_first.any(axis=1), after_first.argmax(axis=1), first)
+    rows = np.arange(n)
+    y0 = y[rows, np.minimum(first, t_len - 1)]
+    gap = np.maximum(second - first, 1)
+    b0 = np.where(second > first, (y[rows, np.minimum(second, t_len - 1)] - y0) / gap, 0.0)
+
+    alpha, beta, phi = grid[:, 0][None, :], grid[:, 1][None, :], grid[:, 2][None, :]
+    level = np.broadcast_to(y0[:, None], (n, len(grid))).copy()
+    trend = np.broadcast_to(b0[:, None], (n, len(grid))).copy()
+    sse = np.zeros((n, len(grid)))
+    for t in range(t_len):
+        active = ((t > first) & (t <= last))[:, None]
+        pred = level + phi * trend
+        e = np.where(active & observed[:, t : t + 1], y[:, t : t + 1] - pred, 0.0)
+        level = np.where(active, pred + alpha * e, level)
+        trend = np.where(active, phi * trend + beta * e, trend)
+        sse += e * e
+    best = sse.argmin(axis=1)
+    # Degrees of freedom: errors (n_obs − 1) less the three smoothing parameters
+    dof = np.maximum(n_obs - 1 - 3, 1)
+    return {
+        "alpha": grid[best, 0],
+        "beta": grid[best, 1],
+        "phi": grid[best, 2],
+        "sigma": np.sqrt(sse[rows, best] / dof),
+        "level": level[rows, best],
+        "trend": trend[rows, best],
+        "n_obs": n_obs,
+        "last": last,
+    }
+
+
+def fit_models(data: Dict[str, Any], workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Fit a damped-trend model to every KPI series in one batch.
+
+    Args:
+        data (Dict): Loaded data.
+        workers (Optional[int]): Process pool size for large batches; 1
+            forces a single process.
+
+    Returns:
+        pd.DataFrame: ``MODEL_COLUMNS``, one row per series with at least
+        ``MIN_OBSERVATIONS`` values.
+    """
+    index, matrix, ids = series_matrix(data)
+    if matrix.size == 0:
+        return pd.DataFrame(columns=MODEL_COLUMNS)
+    grid = _parameter_grid()
+    n_chunks = max(1, math.ceil(len(matrix) / CHUNK_SERIES))
+    chunks = [matrix[i * CHUNK_SERIES : (i + 1) * CHUNK_SERIES] for i in range(n_chunks)]
+    parallel = (workers or os.cpu_count() or 1) > 1
+    if parallel and n_chunks > 1 and len(matrix) >= PARALLEL_MIN_SERIES:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_fit_chunk, chunks, itertools.repeat(grid)))
+    else:
+        parts = [_fit_chunk(chunk, grid) for chunk in chunks]
+    fit = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+    last_ids = ids[np.maximum(fit["last"], 0)]
+    out = index.assign(
+        last_quarter=[period_label(int(pid), QUARTER) for pid in last_ids],
+        last_period_id=last_ids,
+        n_obs=fit["n_obs"],
+        alpha=fit["alpha"],
+        beta=fit["beta"],
+        phi=fit["phi"],
+        sigma=fit["sigma"],
+        level=fit["level"],
+        trend=fit["trend"],
+    )
+    out = out[out["n_obs"] >= MIN_OBSERVATIONS]
+    return out[MODEL_COLUMNS].reset_index(drop=True)
+
+
+def forecast_frame(models: pd.DataFrame, horizon: int = MAX_HORIZON, z: float = CI_Z) -> pd.DataFrame:
+    """
+    1…``horizon``-quarter forecasts of fitted models (vectorized).
+
+    Percentage KPIs are clipped to 0–100 and time-based KPIs to ≥ 0; the
+    probability of hitting target uses the unclipped distribution.
+
+    Args:
+        models (pd.DataFrame): Output of ``fit_models``.
+        horizon (int): Quarters ahead.
+        z (float): Normal quantile of the two-sided prediction level.
+
+    Returns:
+        pd.DataFrame: ``FORECAST_COLUMNS``, one row per series and horizon.
+    """
+    if models.empty:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+    h = np.arange(1, horizon + 1)
+    phi = models["phi"].to_numpy()[:, None]
+    # φ + φ² + … + φʰ for h = 1…horizon (and the same sums for the variance terms)
+    phi_sums = np.cumsum(phi ** h[None, :], axis=1)
+    mean = models["level"].to_numpy()[:, None] + phi_sums * models["trend"].to_numpy()[:, None]
+    c = models["alpha"].to_numpy()[:, None] + models["beta"].to_numpy()[:, None] * phi_sums
+    var_terms = np.concatenate([np.ones((len(models), 1)), c[:, :-1] ** 2], axis=1)
+    sd = models["sigma"].to_numpy()[:, None] * np.sqrt(np.cumsum(var_terms, axis=1))
+
+    kpi_ids = models["kpi_id"].to_numpy()
+    lower_better = np.isin(kpi_ids, list(LOWER_IS_BETTER))[:, None]
+    is_pct = np.char.startswith(kpi_ids.astype(str), "pct_")[:, None]
+    target = models["target"].to_numpy()[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        below = stats.norm.cdf((target - mean) / np.where(sd > 0, sd, np.nan))
+    below = np.where(sd > 0, below, (mean <= target).astype(float))
+    p_hit = np.where(np.isnan(target), np.nan, np.where(lower_better, below, 1.0 - below))
+    upper = np.where(is_pct, 100.0, np.inf)
+
+    period_id = models["last_period_id"].to_numpy()[:, None] + h[None, :]
+    out = pd.DataFrame(
+        {
+            "process": np.repeat(models["process"].to_numpy(), horizon),
+            "kpi_id": np.repeat(kpi_ids, horizon),
+            "horizon": np.tile(h, len(models)),
+            "period_id": period_id.ravel(),
+            "forecast": np.clip(mean, 0.0, upper).ravel(),
+            "pi_low": np.clip(mean - z * sd, 0.0, upper).ravel(),
+            "pi_high": np.clip(mean + z * sd, 0.0, upper).ravel(),
+            "target": np.repeat(target[:, 0], horizon),
+            "p_hit": p_hit.ravel(),
+        }
+    )
+    out.insert(3, "quarter", [period_label(int(pid), QUARTER) for pid in out["period_id"]])
+    return out[FORECAST_COLUMNS]
+
+
+def kpi_forecasts(
+    data: Dict[str, Any], horizon: int = MAX_HORIZON, z: float = CI_Z, workers: Optional[int] = None
+) -> pd.DataFrame:
+    """Fit every KPI series and forecast ``horizon`` quarters ahead (see ``forecast_frame``)."""
+    return forecast_frame(fit_models(data, workers), horizon, z)
+
+
+def forecast_band(forecasts: pd.DataFrame, process: str, kpi_id: str, horizon: int = MAX_HORIZON) -> pd.DataFrame:
+    """
+    Forecast rows of one KPI up to ``horizon`` (for trend overlays).
+
+    Args:
+        forecasts (pd.DataFrame): Output of ``kpi_forecasts``.
+        process (str): Process.
+        kpi_id (str): KPI ID.
+        horizon (int): Quarters ahead to keep.
+
+    Returns:
+        pd.DataFrame: Rows of ``forecasts`` in chronological order.
+    """
+    sel = forecasts[
+        (forecasts["process"] == process) & (forecasts["kpi_id"] == kpi_id) & (forecasts["horizon"] <= horizon)
+    ]
+    return sel.sort_values("horizon")
+
+
+def off_target_outlook(forecasts: pd.DataFrame, horizon: int, threshold: float = 0.5) -> pd.DataFrame:
+    """
+    KPIs whose probability of meeting target at ``horizon`` is below ``threshold``.
+
+    Args:
+        forecasts (pd.DataFrame): Output of ``kpi_forecasts``.
+        horizon (int): Quarters ahead.
+        threshold (float): Probability below which a KPI is flagged.
+
+    Returns:
+        pd.DataFrame: Forecast rows at ``horizon``, least likely first.
+    """
+    sel = forecasts[(forecasts["horizon"] == horizon) & (forecasts["p_hit"] < threshold)]
+    return sel.sort_values(["p_hit", "process", "kpi_id"]).reset_index(drop=True)
@@ -0,0 +1,374 @@
+"""
+Concurrent ingestion of a dataset delivered as several source files.
+
+Production data arrives as one export per system (MA, CT, GMP) plus HR
+capacity figures for the bottleneck fields, each as its own file. A
+manifest lists them::
+
+    {"sources": [
+        {"name": "MA system", "path": "exports/ma.json"},
+        {"name": "CT system", "path": "exports/ct.json"},
+        {"name": "GMP system", "path": "exports/gmp.json"},
+        {"name": "HR capacity", "path": "exports/hr_capacity.csv",
+         "section": "bottleneckData", "max_age_days": 45}
+    ]}
+
+``ingest`` reads and parses every source concurrently: an asyncio task per
+source hands the file read and parse to a thread pool, so a refresh takes
+about as long as the slowest source instead of the sum of all of them. The
+partial datasets are then merged in manifest order (dicts key by key, record
+lists record by record on their period label, so a CSV can overlay fields
+onto existing bottleneck records) and loaded like a single export
+(``data.prepare_data``).
+
+Formats:
+
+- ``json``: a full or partial export (any subset of the sections);
+- ``csv``: one record per row with ``process``, ``series`` (or ``step``) and
+  ``quarter`` (or ``period``) columns; every other non-empty cell becomes a
+  field of that record in ``section``.
+
+Each source gets a ``SourceReport`` (timing, size, file age, latest quarter
+and staleness), kept with the data under ``data["sources"]``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import hashlib
+import io
+import json
+import os
+import pathlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .data import REQUIRED_KEYS, DataError, file_version, prepare_data
+from .lazy import lazy_import
+from .periods import parse_period, quarter_of, sort_periods
+
+pd = lazy_import("pandas")
+
+FORMATS = ("json", "csv")
+# A data path ending in this is a source manifest rather than an export
+MANIFEST_SUFFIX = ".sources.json"
+SOURCES_KEY = "sources"
+# Default section of CSV sources (HR capacity feeds the bottleneck fields)
+CSV_SECTION = "bottleneckData"
+# A source is stale when its file is older than this (about a quarter)
+MAX_AGE_DAYS = 100.0
+MAX_WORKERS = 8
+
+_PERIOD_KEYS = ("quarter", "period")
+_SERIES_COLUMNS = ("series", "step")
+
+
+@dataclass(frozen=True)
+class Source:
+    """One file of a multi-source dataset."""
+
+    name: str
+    path: str
+    format: str = ""
+    section: str = CSV_SECTION
+    max_age_days: float = MAX_AGE_DAYS
+
+    @property
+    def kind(self) -> str:
+        """Declared format, else the file suffix."""
+        return self.format or pathlib.Path(self.path).suffix.lstrip(".").lower()
+
+
+@dataclass
+class SourceReport:
+    """How one source was read."""
+
+    name: str
+    path: str
+    format: str
+    version: str = ""
+    bytes: int = 0
+    read_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    modified: Optional[float] = None
+    age_days: Optional[float] = None
+    sections: List[str] = field(default_factory=list)
+    latest_quarter: Optional[str] = None
+    quarters_behind: int = 0
+    stale: bool = False
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        """Read and parse time."""
+        return self.read_seconds + self.parse_seconds
+
+
+def is_manifest(data_path: str) -> bool:
+    """True when ``data_path`` names a source manifest (``MANIFEST_SUFFIX``)."""
+    return str(data_path).endswith(MANIFEST_SUFFIX)
+
+
+def load_manifest(manifest_path: str) -> List[Source]:
+    """
+    Sources listed in a manifest (relative paths resolve against its folder).
+
+    Args:
+        manifest_path (str): Path to the manifest JSON.
+
+    Returns:
+        List[Source]: Sources in manifest order.
+
+    Raises:
+        DataError: If the manifest is missing or malformed.
+    """
+    p = pathlib.Path(manifest_path)
+    if not p.exists():
+        raise DataError(f"Source manifest not found: {p}")
+    try:
+        entries = json.loads(p.read_text(encoding="utf-8"))[SOURCES_KEY]
+        sources = [Source(**entry) for entry in entries]
+    except (ValueError, KeyError, TypeError) as e:
+        raise DataError(f"Invalid source manifest {p}: {e}") from e
+    return [s if os.path.isabs(s.path) else dataclasses.replace(s, path=str(p.parent / s.path)) for s in sources]
+
+
+def dataset_version(data_path: str, fingerprint: Callable[[str], str] = file_version) -> str:
+    """
+    Version of a dataset: its file's fingerprint, combined with every source's for a manifest.
+
+    Args:
+        data_path (str): Path to a JSON export or source manifest.
+        fingerprint (Callable): Content fingerprint of one file (the app
+            passes a cached ``file_version``).
+
+    Returns:
+        str: Dataset version ("" if the file is missing).
+    """
+    if not pathlib.Path(data_path).exists():
+        return ""
+    version = fingerprint(data_path)
+    if is_manifest(data_path):
+        try:
+            sources = load_manifest(data_path)
+        except DataError:
+            return version
+        parts = [version] + [dataset_version(s.path, fingerprint) for s in sources]
+        version = hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+    return version
+
+
+def _csv_tree(text: str, section: str) -> Dict[str, Any]:
+    """``{section: {process: {series: [records]}}}`` from a CSV source."""
+    df = pd.read_csv(io.StringIO(text))
+    series_col = next((c for c in _SERIES_COLUMNS if c in df.columns), None)
+    period_col = next((c for c in _PERIOD_KEYS if c in df.columns), None)
+    if "process" not in df.columns or series_col is None or period_col is None:
+        raise ValueError(f"CSV needs process, {'/'.join(_SERIES_COLUMNS)} and {'/'.join(_PERIOD_KEYS)} columns")
+    tree: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for row in df.to_dict("records"):
+        process, series = str(row.pop("process")), str(row.pop(series_col))
+        # NaN (empty cell) is the only value not equal to itself
+        record = {k: v for k, v in row.items() if v == v}
+        tree.setdefault(process, {}).setdefault(series, []).append(record)
+    return {section: tree}
+
+
+def _periods(node: Any, out: set) -> None:
+    """Collect every record's period label under ``node``."""
+    if isinstance(node, dict):
+        label = next((node[k] for k in _PERIOD_KEYS if isinstance(node.get(k), str)), None)
+        if label is not None:
+            out.add(label)
+            return
+        for v in node.values():
+            _periods(v, out)
+    elif isinstance(node, list):
+        for v in node:
+            _periods(v, out)
+
+
+def _latest_quarter(tree: Dict[str, Any]) -> Optional[str]:
+    labels: set = set()
+    _periods(tree, labels)
+    quarters = set()
+    for label in labels:
+        try:
+            quarters.add(quarter_of(label))
+        except ValueError:
+            continue
+    return sort_periods(quarters)[-1] if quarters else None
+
+
+def read_source(source: Source, now: Optional[float] = None) -> Tuple[Dict[str, Any], SourceReport]:
+    """
+    Read and parse one source (blocking; run on a worker thread).
+
+    Args:
+        source (Source): Source to read.
+        now (Optional[float]): Reference time for the file age (default: now).
+
+    Returns:
+        Tuple[Dict[str, Any], SourceReport]: Partial dataset (empty on error)
+        and its report; failures are reported, not raised.
+    """
+    report = SourceReport(source.name, source.path, source.kind)
+    try:
+        if source.kind not in FORMATS:
+            raise ValueError(f"Unsupported format {source.kind!r} (expected one of {FORMATS})")
+        started = time.perf_counter()
+        p = pathlib.Path(source.path)
+        info = p.stat()
+        raw = p.read_bytes()
+        report.read_seconds = time.perf_counter() - started
+        report.bytes, report.modified = len(raw), info.st_mtime
+        report.age_days = ((now or time.time()) - info.st_mtime) / 86400.0
+        report.version = hashlib.sha256(raw).hexdigest()[:16]
+
+        started = time.perf_counter()
+        text = raw.decode("utf-8")
+        tree = json.loads(text) if source.kind == "json" else _csv_tree(text, source.section)
+        if not isinstance(tree, dict):
+            raise ValueError("Top level is not an object")
+        report.latest_quarter = _latest_quarter(tree)
+        report.parse_seconds = time.perf_counter() - started
+        report.sections = list(tree)
+        return tree, report
+    except (OSError, ValueError) as e:
+        report.error = f"{type(e).__name__}: {e}"
+        return {}, report
+
+
+def _is_records(node: Any) -> bool:
+    return isinstance(node, list) and all(
+        isinstance(r, dict) and any(k in r for k in _PERIOD_KEYS) for r in node
+    )
+
+
+def _label(record: Dict[str, Any]) -> Any:
+    return next((record[k] for k in _PERIOD_KEYS if k in record), None)
+
+
+def merge_trees(base: Any, extra: Any) -> Any:
+    """
+    ``extra`` overlaid on ``base`` (neither is modified).
+
+    Dicts merge key by key; record lists merge record by record on their
+    period label (fields of ``extra`` win, new periods are appended);
+    anything else is replaced by ``extra``.
+
+    Args:
+        base (Any): Tree merged so far.
+        extra (Any): Tree of the next source.
+
+    Returns:
+        Any: Merged tree; unchanged branches are shared with the inputs.
+    """
+    if isinstance(base, dict) and isinstance(extra, dict):
+        out = dict(base)
+        for key, value in extra.items():
+            out[key] = merge_trees(base[key], value) if key in base else value
+        return out
+    if base and extra and _is_records(base) and _is_records(extra):
+        out = list(base)
+        position = {_label(r): i for i, r in enumerate(out)}
+        for record in extra:
+            i = position.get(_label(record))
+            if i is None:
+                position[_label(record)] = len(out)
+                out.append(record)
+            else:
+                out[i] = {**out[i], **record}
+        return out
+    return extra
+
+
+async def ingest_async(
+    sources: Sequence[Source], max_workers: int = MAX_WORKERS, validate: bool = True
+) -> Dict[str, Any]:
+    """
+    Read all sources concurrently and load the merged dataset.
+
+    Args:
+        sources (Sequence[Source]): Sources, in merge order.
+        max_workers (int): Parser threads.
+        validate (bool): Run the data-quality checks (see ``load_data``).
+
+    Returns:
+        Dict[str, Any]: Loaded data; ``data["sources"]`` holds one
+        ``SourceReport`` dict per source, ``read_seconds`` (reading all
+        sources concurrently), ``total_seconds`` (their read and parse times
+        added up) and ``wall_seconds`` (the whole refresh, merge and checks
+        included).
+
+    Raises:
+        DataError: If no source could be read.
+    """
+    started = time.perf_counter()
+    now = time.time()
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(sources)))) as pool:
+        results = await asyncio.gather(*(loop.run_in_executor(pool, read_source, s, now) for s in sources))
+    read_seconds = time.perf_counter() - started
+    reports = [report for _, report in results]
+    if not any(report.error is None for report in reports):
+        raise DataError("No source could be read: " + "; ".join(f"{r.name}: {r.error}" for r in reports))
+
+    merged: Dict[str, Any] = {}
+    for tree, _ in results:
+        merged = merge_trees(merged, tree)
+    for k in REQUIRED_KEYS:
+        merged.setdefault(k, {})
+    data = prepare_data(merged, validate)
+
+    ids = {r.name: parse_period(r.latest_quarter)[1] for r in reports if r.latest_quarter}
+    for report, source in zip(reports, sources):
+        if report.name in ids:
+            report.quarters_behind = max(ids.values()) - ids[report.name]
+        report.stale = bool(
+            report.error
+            or report.quarters_behind > 0
+            or (report.age_days is not None and report.age_days > source.max_age_days)
+        )
+    data[SOURCES_KEY] = {
+        "reports": [asdict(r) | {"seconds": r.seconds} for r in reports],
+        "read_seconds": read_seconds,
+        "total_seconds": sum(r.seconds for r in reports),
+        "wall_seconds": time.perf_counter() - started,
+    }
+    return data
+
+
+def ingest(sources: Sequence[Source], max_workers: int = MAX_WORKERS, validate: bool = True) -> Dict[str, Any]:
+    """
+    Blocking ``ingest_async`` for callers without an event loop.
+
+    Args:
+        sources (Sequence[Source]): Sources, in merge order.
+        max_workers (int): Parser threads.
+        validate (bool): Run the data-quality checks.
+
+    Returns:
+        Dict[str, Any]: Loaded data (see ``ingest_async``).
+    """
+    return asyncio.run(ingest_async(sources, max_workers, validate))
+
+
+def load_sources(manifest_path: str, validate: bool = True) -> Dict[str, Any]:
+    """
+    Load the dataset described by a source manifest.
+
+    Args:
+        manifest_path (str): Path to the manifest.
+        validate (bool): Run the data-quality checks.
+
+    Returns:
+        Dict[str, Any]: Loaded data (see ``ingest_async``).
+
+    Raises:
+        DataError: If the manifest is invalid or no source could be read.
+    """
+    return ingest(load_manifest(manifest_path), validate=validate)
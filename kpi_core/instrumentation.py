@@ -0,0 +1,333 @@
+"""
+Opt-in profiling for dashboard reruns.
+
+A process-wide ``Profiler`` records span timings (``load_data``, the
+flatteners, chart renders...), cache hit/miss counts and chart payload sizes.
+Each rerun gets a ``RerunTrace`` kept in a per-session ring buffer, and the
+aggregates can be rendered as percentiles or exported in the Prometheus text
+exposition format to a file or a small local HTTP endpoint.
+
+Profiling is disabled unless ``KPI_DASH_PROFILE=1`` is set; when disabled the
+decorators and timers reduce to a flag check.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+PROFILE_ENV = "KPI_DASH_PROFILE"
+ADMIN_TOKEN_ENV = "KPI_DASH_ADMIN_TOKEN"
+METRICS_FILE_ENV = "KPI_DASH_METRICS_FILE"
+METRICS_PORT_ENV = "KPI_DASH_METRICS_PORT"
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+@dataclass
+class RerunTrace:
+    """Spans, counters and payload bytes recorded during one script rerun."""
+
+    session_id: str
+    started: float = field(default_factory=time.time)
+    spans: List[tuple] = field(default_factory=list)
+    cache_calls: int = 0
+    cache_misses: int = 0
+    payload_bytes: int = 0
+    last_event: float = field(default_factory=time.perf_counter)
+    _t0: float = field(default_factory=time.perf_counter)
+
+    @property
+    def wall_ms(self) -> float:
+        """Elapsed time from rerun start to the last recorded event."""
+        return (self.last_event - self._t0) * 1000.0
+
+    @property
+    def cache_hits(self) -> int:
+        """Cached lookups answered without recomputation."""
+        return max(self.cache_calls - self.cache_misses, 0)
+
+
+def percentile(sorted_vals: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_vals (List[float]): Ascending values (non-empty).
+        q (float): Quantile in [0, 1].
+
+    Returns:
+        float: Percentile value.
+    """
+    idx = min(len(sorted_vals) - 1, max(0, int(round(q * (len(sorted_vals) - 1)))))
+    return sorted_vals[idx]
+
+
+class Profiler:
+    """Thread-safe collector for spans, cache counters and payload sizes."""
+
+    def __init__(self, enabled: bool = False, window: int = 2048, traces_per_session: int = 50) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])  # count, sum seconds
+        self._cache_calls: Dict[str, int] = defaultdict(int)
+        self._cache_misses: Dict[str, int] = defaultdict(int)
+        self._payload: List[float] = [0, 0.0]  # renders, bytes
+        self._traces: Dict[str, Deque[RerunTrace]] = defaultdict(lambda: deque(maxlen=traces_per_session))
+        self._last_export = 0.0
+
+    # ---- rerun traces ----
+    def begin_rerun(self, session_id: str) -> Optional[RerunTrace]:
+        """Start a trace for the current script thread; it is stored immediately."""
+        if not self.enabled:
+            return None
+        trace = RerunTrace(session_id=session_id)
+        self._local.trace = trace
+        with self._lock:
+            self._traces[session_id].append(trace)
+        return trace
+
+    def _current(self) -> Optional[RerunTrace]:
+        return getattr(self._local, "trace", None)
+
+    def session_traces(self, session_id: str) -> List[RerunTrace]:
+        """Recent rerun traces for a session, oldest first."""
+        with self._lock:
+            return list(self._traces.get(session_id, ()))
+
+    # ---- spans ----
+    def record(self, name: str, seconds: float) -> None:
+        """Record one span duration."""
+        with self._lock:
+            self._samples[name].append(seconds)
+            tot = self._totals[name]
+            tot[0] += 1
+            tot[1] += seconds
+        trace = self._current()
+        if trace is not None:
+            trace.spans.append((name, seconds * 1000.0))
+            trace.last_event = time.perf_counter()
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Context manager timing a block as span ``name``."""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - t0)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator timing every call of a function as span ``name``."""
+
+        def deco(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.timer(name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return deco
+
+    # ---- caches ----
+    def cache_call(self, name: str) -> Callable:
+        """Decorator for the outside of a cached function: counts and times lookups."""
+
+        def deco(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self._lock:
+                    self._cache_calls[name] += 1
+                trace = self._current()
+                if trace is not None:
+                    trace.cache_calls += 1
+                with self.timer(name):
+                    return fn(*args, **kwargs)
+
+            for attr in ("clear",):
+                if hasattr(fn, attr):
+                    setattr(wrapper, attr, getattr(fn, attr))
+            return wrapper
+
+        return deco
+
+    def cache_miss(self, name: str) -> Callable:
+        """Decorator for the inside of a cached function: each execution is a miss."""
+
+        def deco(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if self.enabled:
+                    with self._lock:
+                        self._cache_misses[name] += 1
+                    trace = self._current()
+                    if trace is not None:
+                        trace.cache_misses += 1
+                return fn(*args, **kwargs)
+
+            return wrapper
+
+        return deco
+
+    # ---- payloads ----
+    def add_payload(self, nbytes: int) -> None:
+        """Record the serialized size of one chart sent to the browser."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._payload[0] += 1
+            self._payload[1] += nbytes
+        trace = self._current()
+        if trace is not None:
+            trace.payload_bytes += nbytes
+            trace.last_event = time.perf_counter()
+
+    # ---- reporting ----
+    def span_summary(self) -> List[Dict[str, Any]]:
+        """
+        Percentile breakdown per span over the sample window.
+
+        Returns:
+            List[Dict[str, Any]]: One row per span with count and p50/p90/p99/max in ms.
+        """
+        with self._lock:
+            snapshot = {k: sorted(v) for k, v in self._samples.items() if v}
+            totals = {k: tuple(v) for k, v in self._totals.items()}
+        rows = []
+        for name, vals in sorted(snapshot.items()):
+            row = {"span": name, "count": int(totals[name][0])}
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}_ms"] = percentile(vals, q) * 1000.0
+            row["max_ms"] = vals[-1] * 1000.0
+            rows.append(row)
+        return rows
+
+    def cache_summary(self) -> List[Dict[str, Any]]:
+        """
+        Cache lookups, misses and hit rate per cached function.
+
+        Returns:
+            List[Dict[str, Any]]: One row per cached function.
+        """
+        with self._lock:
+            calls = dict(self._cache_calls)
+            misses = dict(self._cache_misses)
+        rows = []
+        for name in sorted(set(calls) | set(misses)):
+            c, m = calls.get(name, 0), misses.get(name, 0)
+            hits = max(c - m, 0)
+            rows.append({"cache": name, "calls": c, "hits": hits, "misses": m, "hit_rate": hits / c if c else 0.0})
+        return rows
+
+    def prometheus_text(self) -> str:
+        """
+        Render all aggregates in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text.
+        """
+        lines = [
+            "# HELP kpi_dashboard_span_seconds Duration of instrumented dashboard spans.",
+            "# TYPE kpi_dashboard_span_seconds summary",
+        ]
+        with self._lock:
+            snapshot = {k: sorted(v) for k, v in self._samples.items() if v}
+            totals = {k: tuple(v) for k, v in self._totals.items()}
+            calls = dict(self._cache_calls)
+            misses = dict(self._cache_misses)
+            renders, nbytes = self._payload
+        for name, vals in sorted(snapshot.items()):
+            for q in QUANTILES:
+                lines.append(f'kpi_dashboard_span_seconds{{span="{name}",quantile="{q}"}} {percentile(vals, q):.6f}')
+            lines.append(f'kpi_dashboard_span_seconds_sum{{span="{name}"}} {totals[name][1]:.6f}')
+            lines.append(f'kpi_dashboard_span_seconds_count{{span="{name}"}} {int(totals[name][0])}')
+        lines += [
+            "# HELP kpi_dashboard_cache_calls_total Cached function lookups.",
+            "# TYPE kpi_dashboard_cache_calls_total counter",
+        ]
+        lines += [f'kpi_dashboard_cache_calls_total{{cache="{k}"}} {v}' for k, v in sorted(calls.items())]
+        lines += [
+            "# HELP kpi_dashboard_cache_misses_total Cached function executions (misses).",
+            "# TYPE kpi_dashboard_cache_misses_total counter",
+        ]
+        lines += [f'kpi_dashboard_cache_misses_total{{cache="{k}"}} {v}' for k, v in sorted(misses.items())]
+        lines += [
+            "# HELP kpi_dashboard_chart_payload_bytes_total Serialized chart bytes sent to browsers.",
+            "# TYPE kpi_dashboard_chart_payload_bytes_total counter",
+            f"kpi_dashboard_chart_payload_bytes_total {int(nbytes)}",
+            "# HELP kpi_dashboard_chart_renders_total Charts rendered.",
+            "# TYPE kpi_dashboard_chart_renders_total counter",
+            f"kpi_dashboard_chart_renders_total {int(renders)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self, path: str, min_interval: float = 10.0) -> bool:
+        """
+        Atomically write the Prometheus text to ``path``, at most every ``min_interval`` seconds.
+
+        Args:
+            path (str): Destination file (e.g. for a node-exporter textfile collector).
+            min_interval (float): Throttle in seconds.
+
+        Returns:
+            bool: True if the file was written.
+        """
+        now = time.time()
+        if not self.enabled or now - self._last_export < min_interval:
+            return False
+        self._last_export = now
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+        return True
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve ``/metrics`` on a local port from a daemon thread.
+
+        Args:
+            port (int): TCP port.
+            host (str): Bind address (loopback by default).
+
+        Returns:
+            ThreadingHTTPServer: The running server.
+        """
+        profiler = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802 (http.server API)
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = profiler.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=server.serve_forever, name="kpi-metrics", daemon=True).start()
+        return server
+
+
+PROFILER = Profiler(enabled=os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes"))
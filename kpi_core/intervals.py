@@ -0,0 +1,273 @@
+"""
+Confidence intervals for percentage KPIs.
+
+``kpiCounts`` gives the case counts behind each percentage KPI and quarter.
+A 60% on-time rate from 5 cases and one from 500 cases carry very different
+evidence, so every KPI × quarter gets a score interval, computed for the
+whole dataset in one vectorized pass:
+
+- the reported series value is the observed proportion (the raw
+  numerator/denominator is used where no value is reported);
+- the denominator is the sample size;
+- Wilson score intervals by default, Clopper-Pearson ("exact") on request.
+
+Pooled rates over quarter or year ranges are ratios of sums (successes over
+trials), never means of quarterly percentages.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .constants import TIME_BASED
+from .lazy import lazy_import
+from .periods import parse_period, period_year
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+stats = lazy_import("scipy.stats")
+
+# Two-sided 95% normal quantile
+CI_Z = 1.96
+CI_METHODS = ("wilson", "exact")
+
+# Significance of a quarter against its target
+SIG_BELOW = "below"
+SIG_ABOVE = "above"
+SIG_INCONCLUSIVE = "inconclusive"
+
+INTERVAL_COLUMNS = [
+    "process",
+    "kpi_id",
+    "quarter",
+    "period_id",
+    "value",
+    "successes",
+    "trials",
+    "ci_low",
+    "ci_high",
+    "target",
+    "significance",
+]
+
+
+def wilson_interval(successes: Any, trials: Any, z: float = CI_Z) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Wilson score interval for binomial proportions (vectorized).
+
+    Args:
+        successes (array-like): Successes (may be fractional).
+        trials (array-like): Trials; entries <= 0 give NaN bounds.
+        z (float): Normal quantile of the two-sided level.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Lower and upper bounds as proportions.
+    """
+    k = np.asarray(successes, dtype=float)
+    n = np.asarray(trials, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        n_safe = np.where(n > 0, n, np.nan)
+        p = np.clip(k / n_safe, 0.0, 1.0)
+        z2 = z * z
+        denom = 1.0 + z2 / n_safe
+        centre = (p + z2 / (2.0 * n_safe)) / denom
+        half = z * np.sqrt(p * (1.0 - p) / n_safe + z2 / (4.0 * n_safe * n_safe)) / denom
+    return np.clip(centre - half, 0.0, 1.0), np.clip(centre + half, 0.0, 1.0)
+
+
+def exact_interval(successes: Any, trials: Any, z: float = CI_Z) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clopper-Pearson interval (vectorized beta quantiles).
+
+    Args:
+        successes (array-like): Successes (rounded to whole cases).
+        trials (array-like): Trials; entries <= 0 give NaN bounds.
+        z (float): Normal quantile of the two-sided level.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Lower and upper bounds as proportions.
+    """
+    n = np.asarray(trials, dtype=float)
+    n_safe = np.where(n > 0, np.round(n), np.nan)
+    k = np.clip(np.round(np.asarray(successes, dtype=float)), 0.0, n_safe)
+    alpha = 2.0 * stats.norm.sf(z)
+    with np.errstate(invalid="ignore"):
+        lo = np.where(k > 0, stats.beta.ppf(alpha / 2, k, n_safe - k + 1), 0.0)
+        hi = np.where(k < n_safe, stats.beta.ppf(1 - alpha / 2, k + 1, n_safe - k), 1.0)
+    nan = np.isnan(n_safe)
+    return np.where(nan, np.nan, lo), np.where(nan, np.nan, hi)
+
+
+def proportion_interval(
+    successes: Any, trials: Any, z: float = CI_Z, method: str = "wilson"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interval for proportions by ``method`` ("wilson" or "exact").
+
+    Raises:
+        ValueError: For an unknown method.
+    """
+    if method == "wilson":
+        return wilson_interval(successes, trials, z)
+    if method == "exact":
+        return exact_interval(successes, trials, z)
+    raise ValueError(f"Unknown interval method: {method!r} (expected one of {CI_METHODS})")
+
+
+def significance(kpi_ids: Any, ci_low: Any, ci_high: Any, target: Any) -> np.ndarray:
+    """
+    Whether each interval lies entirely below/above target.
+
+    "below" means the KPI is statistically worse than target (for time-based
+    KPIs, lower is better, so the sides swap).
+
+    Args:
+        kpi_ids (array-like): KPI IDs.
+        ci_low (array-like): Lower bounds (same unit as ``target``).
+        ci_high (array-like): Upper bounds.
+        target (array-like): Targets; NaN gives "inconclusive".
+
+    Returns:
+        np.ndarray: "below", "above" or "inconclusive" per row.
+    """
+    lo = np.asarray(ci_low, dtype=float)
+    hi = np.asarray(ci_high, dtype=float)
+    t = np.asarray(target, dtype=float)
+    lower_better = np.isin(np.asarray(kpi_ids, dtype=object), list(TIME_BASED))
+    worse = np.where(lower_better, lo > t, hi < t)
+    better = np.where(lower_better, hi <= t, lo >= t)
+    return np.select([worse, better], [SIG_BELOW, SIG_ABOVE], SIG_INCONCLUSIVE)
+
+
+def kpi_counts_frame(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Long frame of every percentage KPI's reported value and case counts.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        pd.DataFrame: Columns process, kpi_id, quarter, period_id, value,
+        numerator, denominator, target.
+    """
+    rows = []
+    for process, kpis in data.get("kpiCounts", {}).items():
+        block = data["quarterlyData"].get(process, {})
+        for kpi_id, series in kpis.items():
+            kobj = block.get(kpi_id)
+            if not kobj or kpi_id in TIME_BASED:
+                continue
+            values = {x["quarter"]: x.get("value") for x in kobj["data"]}
+            target = kobj.get("target")
+            for rec in series:
+                if "denominator" not in rec:
+                    continue
+                q = rec["quarter"]
+                rows.append(
+                    (process, kpi_id, q, values.get(q), rec.get("numerator"), rec["denominator"], target)
+                )
+    df = pd.DataFrame(
+        rows, columns=["process", "kpi_id", "quarter", "value", "numerator", "denominator", "target"]
+    )
+    period_id = np.fromiter((parse_period(q)[1] for q in df["quarter"]), dtype=np.int64, count=len(df))
+    df.insert(3, "period_id", period_id)
+    return df.astype({"value": float, "numerator": float, "denominator": float, "target": float})
+
+
+def kpi_intervals(data: Dict[str, Any], z: float = CI_Z, method: str = "wilson") -> pd.DataFrame:
+    """
+    Interval and significance for every percentage KPI × quarter in one pass.
+
+    Args:
+        data (Dict): Loaded data.
+        z (float): Normal quantile of the two-sided level.
+        method (str): "wilson" or "exact".
+
+    Returns:
+        pd.DataFrame: ``INTERVAL_COLUMNS``; value and bounds in percent.
+    """
+    df = kpi_counts_frame(data)
+    trials = df["denominator"].to_numpy()
+    raw_rate = np.divide(
+        df["numerator"].to_numpy(), trials, out=np.full(len(df), np.nan), where=trials > 0
+    )
+    rate = np.clip(np.where(df["value"].notna(), df["value"].to_numpy() / 100.0, raw_rate), 0.0, 1.0)
+    successes = rate * trials
+    lo, hi = proportion_interval(successes, trials, z, method)
+    out = pd.DataFrame(
+        {
+            "process": df["process"],
+            "kpi_id": df["kpi_id"],
+            "quarter": df["quarter"],
+            "period_id": df["period_id"],
+            "value": rate * 100.0,
+            "successes": successes,
+            "trials": trials,
+            "ci_low": lo * 100.0,
+            "ci_high": hi * 100.0,
+            "target": df["target"],
+        }
+    )
+    out["significance"] = significance(out["kpi_id"], out["ci_low"], out["ci_high"], out["target"])
+    return out[INTERVAL_COLUMNS]
+
+
+def kpi_band(intervals: pd.DataFrame, process: str, kpi_id: str) -> pd.DataFrame:
+    """
+    Interval rows of one KPI in chronological order (for trend bands).
+
+    Args:
+        intervals (pd.DataFrame): Output of ``kpi_intervals``.
+        process (str): Process.
+        kpi_id (str): KPI ID.
+
+    Returns:
+        pd.DataFrame: Rows of ``intervals`` for the KPI.
+    """
+    sel = intervals[(intervals["process"] == process) & (intervals["kpi_id"] == kpi_id)]
+    return sel.sort_values("period_id")
+
+
+def pooled_rate(
+    intervals: pd.DataFrame,
+    process: str,
+    kpi_id: str,
+    quarters: Optional[Iterable[str]] = None,
+    years: Optional[Iterable[int]] = None,
+    z: float = CI_Z,
+    method: str = "wilson",
+) -> Dict[str, Any]:
+    """
+    Ratio-of-sums rate of a KPI over a set of quarters or years.
+
+    Args:
+        intervals (pd.DataFrame): Output of ``kpi_intervals``.
+        process (str): Process.
+        kpi_id (str): KPI ID.
+        quarters (Optional[Iterable[str]]): Quarters to pool (default: all).
+        years (Optional[Iterable[int]]): Years to pool (applied after ``quarters``).
+        z (float): Normal quantile of the two-sided level.
+        method (str): "wilson" or "exact".
+
+    Returns:
+        Dict[str, Any]: rate, ci_low, ci_high (percent), successes, trials,
+        quarters pooled and significance against the KPI target.
+    """
+    sel = kpi_band(intervals, process, kpi_id)
+    if quarters is not None:
+        sel = sel[sel["quarter"].isin(set(quarters))]
+    if years is not None:
+        wanted = set(years)
+        sel = sel[[period_year(q) in wanted for q in sel["quarter"]]]
+    k, n = float(sel["successes"].sum()), float(sel["trials"].sum())
+    lo, hi = proportion_interval([k], [n], z, method)
+    target = sel["target"].iloc[-1] if len(sel) else np.nan
+    return {
+        "rate": k / n * 100.0 if n > 0 else np.nan,
+        "ci_low": float(lo[0]) * 100.0,
+        "ci_high": float(hi[0]) * 100.0,
+        "successes": k,
+        "trials": n,
+        "quarters": sel["quarter"].tolist(),
+        "significance": str(significance([kpi_id], lo * 100.0, hi * 100.0, [target])[0]),
+    }
@@ -0,0 +1,59 @@
+"""
+Deferred imports for heavy optional modules.
+
+Plotly Express, SciPy and pandas dominate cold-start time but are only needed
+once a chart or analysis is actually rendered. ``lazy_import`` returns a
+module proxy that performs the real import on first attribute access, so
+call sites keep the familiar ``px.bar(...)`` / ``stats.linregress(...)`` form.
+"""
+
+import importlib
+import threading
+import types
+from typing import Any, Optional
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the target module on first attribute access."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self._lazy_target = name
+        self._lazy_module: Optional[types.ModuleType] = None
+        self._lazy_lock = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        """Import (once) and return the real module."""
+        if self._lazy_module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self._lazy_target)
+        return self._lazy_module
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the underlying module has been imported yet."""
+        return self._lazy_module is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module '{self._lazy_target}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    Create a lazily imported module proxy.
+
+    Args:
+        name (str): Fully qualified module name (e.g. ``"scipy.stats"``).
+
+    Returns:
+        LazyModule: Proxy that imports ``name`` on first use.
+    """
+    return LazyModule(name)
@@ -0,0 +1,195 @@
+"""
+Period dimension: integer period ids with a granularity.
+
+Labels are parsed once (memoized) into ``(granularity, period_id)``:
+
+- ``"Q2 2025"`` → quarter id ``year * 4 + (q - 1)``
+- ``"2025-03"`` → month id ``year * 12 + (m - 1)``
+- ``"2025-W07"`` → ISO week id, weeks since Monday 1970-01-05
+
+Ids of one granularity are consecutive integers, so ordering, ranges and
+year filters are integer comparisons. Months and ISO weeks roll up to
+quarters with vectorized NumPy arithmetic; a week belongs to the quarter of
+its Thursday, the same rule ISO uses for the week's year.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+QUARTER = "quarter"
+MONTH = "month"
+WEEK = "week"
+GRANULARITIES: Tuple[str, ...] = (QUARTER, MONTH, WEEK)
+# Mean length of a quarter, for per-day rates from quarterly counts
+DAYS_PER_QUARTER = 91.3
+
+_QUARTER_RE = re.compile(r"^Q([1-4]) (\d{4})$")
+_MONTH_RE = re.compile(r"^(\d{4})-(0[1-9]|1[0-2])$")
+_WEEK_RE = re.compile(r"^(\d{4})-W(\d{2})$")
+# Monday of ISO week 0 in the week id scheme
+_WEEK_EPOCH = dt.date(1970, 1, 5)
+
+
+@lru_cache(maxsize=65536)
+def parse_period(label: str) -> Tuple[str, int]:
+    """
+    Parse a period label.
+
+    Args:
+        label (str): "Qn YYYY", "YYYY-MM" or "YYYY-Www".
+
+    Returns:
+        Tuple[str, int]: Granularity and integer period id.
+
+    Raises:
+        ValueError: If the label is not a recognised period.
+    """
+    m = _QUARTER_RE.match(label)
+    if m:
+        return QUARTER, int(m.group(2)) * 4 + int(m.group(1)) - 1
+    m = _MONTH_RE.match(label)
+    if m:
+        return MONTH, int(m.group(1)) * 12 + int(m.group(2)) - 1
+    m = _WEEK_RE.match(label)
+    if m:
+        monday = dt.date.fromisocalendar(int(m.group(1)), int(m.group(2)), 1)
+        return WEEK, (monday - _WEEK_EPOCH).days // 7
+    raise ValueError(f"Unrecognised period label: {label!r}")
+
+
+def period_label(period_id: int, granularity: str) -> str:
+    """
+    Label of a period id.
+
+    Args:
+        period_id (int): Period id.
+        granularity (str): Granularity of the id.
+
+    Returns:
+        str: Canonical label.
+    """
+    if granularity == QUARTER:
+        return f"Q{period_id % 4 + 1} {period_id // 4}"
+    if granularity == MONTH:
+        return f"{period_id // 12}-{period_id % 12 + 1:02d}"
+    year, week, _ = (_WEEK_EPOCH + dt.timedelta(weeks=int(period_id))).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def period_ids(labels: Iterable[str]) -> Tuple[np.ndarray, str]:
+    """
+    Period ids for a sequence of labels of one granularity.
+
+    Args:
+        labels (Iterable[str]): Period labels.
+
+    Returns:
+        Tuple[np.ndarray, str]: int64 ids and their granularity.
+
+    Raises:
+        ValueError: If labels mix granularities.
+    """
+    parsed = [parse_period(label) for label in labels]
+    grans = {g for g, _ in parsed}
+    if len(grans) > 1:
+        raise ValueError(f"Mixed period granularities: {sorted(grans)}")
+    return np.fromiter((pid for _, pid in parsed), dtype=np.int64, count=len(parsed)), (
+        grans.pop() if grans else QUARTER
+    )
+
+
+def _week_thursday_days(ids: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 of the Thursday of each week id."""
+    return ids * 7 + (_WEEK_EPOCH - dt.date(1970, 1, 1)).days + 3
+
+
+def to_quarter(ids: Sequence[int], granularity: str) -> np.ndarray:
+    """
+    Quarter ids containing each period (vectorized).
+
+    Args:
+        ids (Sequence[int]): Period ids.
+        granularity (str): Granularity of ``ids``.
+
+    Returns:
+        np.ndarray: Quarter ids.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    if granularity == QUARTER:
+        return ids
+    if granularity == MONTH:
+        return (ids // 12) * 4 + (ids % 12) // 3
+    months = _week_thursday_days(ids).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    # datetime64[M] counts months from 1970-01
+    return ((months // 12) + 1970) * 4 + (months % 12) // 3
+
+
+def period_years(ids: Sequence[int], granularity: str) -> np.ndarray:
+    """
+    Calendar (ISO for weeks) year of each period (vectorized).
+
+    Args:
+        ids (Sequence[int]): Period ids.
+        granularity (str): Granularity of ``ids``.
+
+    Returns:
+        np.ndarray: Years.
+    """
+    return to_quarter(ids, granularity) // 4
+
+
+def period_year(label: str) -> int:
+    """Year of a period label (replaces ``int(label.split()[-1])``)."""
+    gran, pid = parse_period(label)
+    return int(period_years([pid], gran)[0])
+
+
+def quarter_of(label: str) -> str:
+    """Quarter label containing a period label."""
+    gran, pid = parse_period(label)
+    return period_label(int(to_quarter([pid], gran)[0]), QUARTER)
+
+
+def sort_periods(labels: Iterable[str]) -> List[str]:
+    """Labels in chronological order (by integer id)."""
+    return sorted(labels, key=lambda label: parse_period(label)[1])
+
+
+def rollup(
+    df: pd.DataFrame,
+    by: List[str],
+    how: Dict[str, str],
+    period_col: str = "period",
+) -> pd.DataFrame:
+    """
+    Roll finer periods up to quarters with one vectorized groupby.
+
+    Quarters are the only target: the dashboard works on quarterly periods,
+    and the month and week originals stay under ``data["finePeriods"]``.
+
+    Args:
+        df (pd.DataFrame): Rows with a ``period_col`` label column.
+        by (List[str]): Grouping columns besides the period.
+        how (Dict[str, str]): Column to aggregation ("sum", "mean", "first", "last"...).
+        period_col (str): Column holding period labels.
+
+    Returns:
+        pd.DataFrame: One row per group and quarter, with ``quarter`` labels and
+        ``period_id`` quarter ids, in chronological order.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=by + ["quarter", "period_id"] + list(how))
+    ids, gran = period_ids(df[period_col])
+    work = df.assign(period_id=to_quarter(ids, gran), _order=ids).sort_values("_order", kind="stable")
+    out = work.groupby(by + ["period_id"], sort=True, as_index=False).agg(how)
+    out.insert(len(by), "quarter", [period_label(int(q), QUARTER) for q in out["period_id"]])
+    return out
@@ -0,0 +1,401 @@
+"""
+Registry of several loaded datasets: agencies, scenarios or data vintages.
+
+Every dataset is held as a ``Snapshot`` (see ``kpi_core.store``) under a
+label, so derived frames are memoized per dataset version. Datasets share
+one memory pool: on load, the JSON tree is interned bottom-up, and any dict,
+list or string already held by another dataset (an unrevised KPI series in
+last quarter's export, the step catalogue of a sister agency) is replaced by
+the existing object. Loaded data must therefore be treated as read-only.
+
+Memory is bounded by eviction: a dataset not used for ``idle_seconds``, or
+the least recently used one beyond ``max_datasets``, is dropped unless
+pinned.
+
+Comparisons are joins of long KPI frames on (process, kpi_id, period_id):
+
+- ``vintage_deltas`` lines up two vintages of the same data and classifies
+  each point as revised, unchanged, added or dropped;
+- ``benchmark`` ranks datasets against each other on the KPI ids they share,
+  taking each KPI's direction into account.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .constants import LOWER_IS_BETTER
+from .data import DataError, load_data
+from .ingest import dataset_version, is_manifest, load_manifest, load_sources
+from .lazy import lazy_import
+from .periods import QUARTER, parse_period
+from .store import Snapshot
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+IDLE_SECONDS = 1800.0
+MAX_DATASETS = 8
+# Relative change below which a revised value counts as unchanged
+REVISION_TOLERANCE = 1e-9
+
+KPI_VALUE_COLUMNS = ["process", "kpi_id", "quarter", "period_id", "value", "target"]
+_JOIN_KEYS = ["process", "kpi_id", "period_id"]
+
+CHANGE_REVISED = "revised"
+CHANGE_UNCHANGED = "unchanged"
+CHANGE_ADDED = "added"
+CHANGE_DROPPED = "dropped"
+
+
+def _token(node: Any) -> Hashable:
+    """Identity of an interned node inside its parent's key."""
+    return id(node) if isinstance(node, (dict, list)) else (type(node), node)
+
+
+def intern_tree(node: Any, table: Dict[Hashable, Any]) -> Any:
+    """
+    Canonical copy of a JSON tree, sharing equal subtrees through ``table``.
+
+    Children are interned first, so a container's key is its type plus the
+    identities of its (already canonical) children. A container whose
+    children were all canonical already becomes canonical itself, so
+    interning a canonical tree again returns it unchanged.
+
+    Args:
+        node (Any): Parsed JSON value.
+        table (Dict): Canonical containers by key; grows in place.
+
+    Returns:
+        Any: The canonical equivalent of ``node``.
+    """
+    if isinstance(node, str):
+        return sys.intern(node)
+    if isinstance(node, dict):
+        items = [(sys.intern(k) if isinstance(k, str) else k, intern_tree(v, table)) for k, v in node.items()]
+        key: Hashable = (dict, tuple((k, _token(v)) for k, v in items))
+        same = all(v is node[k] for k, v in items)
+    elif isinstance(node, list):
+        items = [intern_tree(v, table) for v in node]
+        key = (list, tuple(_token(v) for v in items))
+        same = all(a is b for a, b in zip(items, node))
+    else:
+        return node
+    hit = table.get(key)
+    if hit is None:
+        hit = table[key] = node if same else (dict(items) if isinstance(node, dict) else items)
+    return hit
+
+
+def _containers(node: Any, seen: Dict[int, Any]) -> int:
+    """Count containers under ``node`` (repeats included), recording unique ones in ``seen``."""
+    if isinstance(node, dict):
+        children = node.values()
+    elif isinstance(node, list):
+        children = node
+    else:
+        return 0
+    seen[id(node)] = node
+    return 1 + sum(_containers(child, seen) for child in children)
+
+
+def kpi_values(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Every KPI value of a dataset as long rows.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        pd.DataFrame: ``KPI_VALUE_COLUMNS``; quarterly points only, value
+        NaN where a point has none.
+    """
+    rows = []
+    for process, block in data.get("quarterlyData", {}).items():
+        for kpi_id, kobj in block.items():
+            target = kobj.get("target")
+            for x in kobj.get("data", []):
+                gran, pid = parse_period(x["quarter"])
+                if gran == QUARTER:
+                    value = x.get("value")
+                    rows.append(
+                        (process, kpi_id, x["quarter"], pid, value if isinstance(value, (int, float)) else None, target)
+                    )
+    return pd.DataFrame(rows, columns=KPI_VALUE_COLUMNS).astype(
+        {"period_id": np.int64, "value": float, "target": float}
+    )
+
+
+def _meets_target(kpi_ids: pd.Series, values: pd.Series, targets: pd.Series) -> np.ndarray:
+    """On-target flags by KPI direction (False where value or target is missing)."""
+    lower = kpi_ids.isin(LOWER_IS_BETTER).to_numpy()
+    v, t = values.to_numpy(dtype=float), targets.to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.where(lower, v <= t, v >= t)
+
+
+def vintage_deltas(base: pd.DataFrame, other: pd.DataFrame) -> pd.DataFrame:
+    """
+    Point-by-point differences between two vintages.
+
+    Args:
+        base (pd.DataFrame): ``kpi_values`` of the earlier vintage.
+        other (pd.DataFrame): ``kpi_values`` of the later vintage.
+
+    Returns:
+        pd.DataFrame: One row per (process, kpi_id, period_id) in either
+        vintage with quarter, target (later vintage's where present),
+        value_base, value_other, delta, pct_delta, change (revised,
+        unchanged, added or dropped) and target_flip (the point moved across
+        its target), sorted by process, KPI and period.
+    """
+    joined = base.merge(other, on=_JOIN_KEYS, how="outer", suffixes=("_base", "_other"), indicator=True)
+    joined["quarter"] = joined["quarter_other"].fillna(joined["quarter_base"])
+    joined["target"] = joined["target_other"].fillna(joined["target_base"])
+    joined["delta"] = joined["value_other"] - joined["value_base"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        joined["pct_delta"] = np.where(
+            joined["value_base"] != 0, joined["delta"] / joined["value_base"].abs() * 100, np.nan
+        )
+    both = joined["_merge"] == "both"
+    moved = ~np.isclose(joined["value_base"], joined["value_other"], rtol=REVISION_TOLERANCE, equal_nan=True)
+    joined["change"] = np.select(
+        [joined["_merge"] == "left_only", joined["_merge"] == "right_only", both & moved],
+        [CHANGE_DROPPED, CHANGE_ADDED, CHANGE_REVISED],
+        CHANGE_UNCHANGED,
+    )
+    met_base = _meets_target(joined["kpi_id"], joined["value_base"], joined["target_base"])
+    met_other = _meets_target(joined["kpi_id"], joined["value_other"], joined["target_other"])
+    joined["target_flip"] = both.to_numpy() & (met_base != met_other)
+    cols = ["process", "kpi_id", "quarter", "period_id", "target", "value_base", "value_other", "delta", "pct_delta"]
+    return joined.sort_values(_JOIN_KEYS, ignore_index=True)[cols + ["change", "target_flip"]]
+
+
+def benchmark(values: Dict[str, pd.DataFrame], min_datasets: int = 2) -> pd.DataFrame:
+    """
+    Cross-dataset ranking on shared KPI ids.
+
+    Args:
+        values (Dict[str, pd.DataFrame]): ``kpi_values`` per dataset label.
+        min_datasets (int): Datasets that must report a point for it to be
+            ranked.
+
+    Returns:
+        pd.DataFrame: One row per dataset and (process, kpi_id, period_id)
+        with dataset, quarter, value, target, meets_target, rank (1 = best
+        for the KPI's direction), peers, peer_median and gap_to_best (how far
+        behind the best dataset, in the KPI's units, 0 for the best).
+    """
+    frames = [df.assign(dataset=label) for label, df in values.items() if not df.empty]
+    if not frames:
+        return pd.DataFrame(columns=["dataset"] + KPI_VALUE_COLUMNS)
+    long = pd.concat(frames, ignore_index=True).dropna(subset=["value"])
+    g = long.groupby(_JOIN_KEYS, sort=False)["value"]
+    long["peers"] = g.transform("size")
+    long = long[long["peers"] >= min_datasets].copy()
+    if long.empty:
+        return long
+    lower = long["kpi_id"].isin(LOWER_IS_BETTER).to_numpy()
+    # Rank on a "higher is better" score so one ranking serves both directions
+    long["score"] = np.where(lower, -long["value"], long["value"])
+    g = long.groupby(_JOIN_KEYS, sort=False)
+    long["rank"] = g["score"].rank(ascending=False, method="min").astype(int)
+    long["peer_median"] = g["value"].transform("median")
+    long["gap_to_best"] = g["score"].transform("max") - long["score"]
+    long["meets_target"] = _meets_target(long["kpi_id"], long["value"], long["target"])
+    cols = ["dataset", "process", "kpi_id", "quarter", "period_id", "value", "target", "meets_target"]
+    out = long.sort_values(_JOIN_KEYS + ["rank", "dataset"], ignore_index=True)
+    return out[cols + ["rank", "peers", "peer_median", "gap_to_best"]]
+
+
+def _stat(path: str) -> Optional[Tuple[Tuple[int, int], ...]]:
+    """(mtime, size) of the file, and of every source for a manifest; None if any is missing."""
+    paths = [path]
+    if is_manifest(path):
+        try:
+            paths += [source.path for source in load_manifest(path)]
+        except DataError:
+            return None
+    try:
+        return tuple((info.st_mtime_ns, info.st_size) for info in map(os.stat, paths))
+    except OSError:
+        return None
+
+
+@dataclass
+class _Entry:
+    """One registered dataset."""
+
+    label: str
+    path: Optional[str]
+    snapshot: Snapshot
+    stat: Optional[Tuple[Tuple[int, int], ...]] = None
+    last_used: float = field(default_factory=time.monotonic)
+    pinned: bool = False
+
+
+class DatasetRegistry:
+    """Thread-safe set of labelled datasets sharing one interned memory pool."""
+
+    def __init__(self, idle_seconds: float = IDLE_SECONDS, max_datasets: int = MAX_DATASETS) -> None:
+        self.idle_seconds = idle_seconds
+        self.max_datasets = max_datasets
+        self._entries: Dict[str, _Entry] = {}
+        self._intern: Optional[Dict[Hashable, Any]] = None
+        self._lock = threading.RLock()
+
+    # ---- registration ----
+    def _interned(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """``data`` interned against the datasets already held."""
+        if self._intern is None:
+            # Rebuilt after evictions so dropped datasets are not kept alive by the table
+            self._intern = {}
+            for entry in self._entries.values():
+                intern_tree(entry.snapshot.data, self._intern)
+        return intern_tree(data, self._intern)
+
+    def publish(self, label: str, version: str, data: Dict[str, Any], pinned: bool = False) -> Snapshot:
+        """
+        Register already loaded data under ``label`` (no-op if the version is current).
+
+        Args:
+            label (str): Dataset label (e.g. an agency or "2025 Q1 export").
+            version (str): Dataset version.
+            data (Dict): Loaded data; interned, then treated as read-only.
+            pinned (bool): Never evict this dataset.
+
+        Returns:
+            Snapshot: The dataset's snapshot.
+        """
+        with self._lock:
+            entry = self._entries.get(label)
+            if entry is None or entry.snapshot.version != version:
+                entry = _Entry(label, None, Snapshot(version, self._interned(data)), pinned=pinned)
+                self._entries[label] = entry
+            entry.pinned = entry.pinned or pinned
+            entry.last_used = time.monotonic()
+            self._evict()
+            return entry.snapshot
+
+    def register(self, label: str, path: str, pinned: bool = False) -> Snapshot:
+        """
+        Load ``path`` under ``label``, reloading when the file changed on disk.
+
+        Args:
+            label (str): Dataset label.
+            path (str): Path to a JSON data file or source manifest (loaded
+                with ``kpi_core.ingest.load_sources``).
+            pinned (bool): Never evict this dataset.
+
+        Returns:
+            Snapshot: The dataset's snapshot.
+
+        Raises:
+            DataError: If the file is missing or invalid.
+        """
+        with self._lock:
+            entry = self._entries.get(label)
+            stat = _stat(path)
+            if entry is None or entry.path != path or stat is None or entry.stat != stat:
+                version = dataset_version(path) if stat is not None else ""
+                if entry is None or entry.path != path or entry.snapshot.version != version:
+                    data = load_sources(path) if is_manifest(path) else load_data(path)
+                    self.publish(label, version, data, pinned)
+                    entry = self._entries[label]
+                entry.path, entry.stat = path, stat
+            entry.pinned = entry.pinned or pinned
+            entry.last_used = time.monotonic()
+            self._evict()
+            return entry.snapshot
+
+    # ---- access ----
+    def labels(self) -> List[str]:
+        """Registered labels, in registration order."""
+        with self._lock:
+            return list(self._entries)
+
+    def get(self, label: str) -> Snapshot:
+        """
+        Snapshot of a registered dataset (marks it as used).
+
+        Raises:
+            KeyError: If ``label`` is not registered (or was evicted).
+        """
+        with self._lock:
+            entry = self._entries[label]
+            entry.last_used = time.monotonic()
+            return entry.snapshot
+
+    def kpi_values(self, label: str) -> pd.DataFrame:
+        """``kpi_values`` of a dataset, memoized on its snapshot."""
+        snapshot = self.get(label)
+        return snapshot.derived(("kpi_values",), lambda: kpi_values(snapshot.data))
+
+    def vintage_deltas(self, base: str, other: str) -> pd.DataFrame:
+        """``vintage_deltas`` of two registered datasets, memoized per version pair."""
+        base_snap, other_snap = self.get(base), self.get(other)
+        return other_snap.derived(
+            ("vintage_deltas", base_snap.version),
+            lambda: vintage_deltas(self.kpi_values(base), self.kpi_values(other)),
+        )
+
+    def benchmark(self, labels: Optional[List[str]] = None, min_datasets: int = 2) -> pd.DataFrame:
+        """``benchmark`` across registered datasets (all when ``labels`` is None)."""
+        return benchmark({label: self.kpi_values(label) for label in (labels or self.labels())}, min_datasets)
+
+    # ---- memory ----
+    def remove(self, label: str) -> None:
+        """Drop a dataset (no-op if absent)."""
+        with self._lock:
+            if self._entries.pop(label, None) is not None:
+                self._intern = None
+
+    def _evict(self, now: Optional[float] = None) -> List[str]:
+        """Drop idle datasets, then the least recently used beyond ``max_datasets``."""
+        now = time.monotonic() if now is None else now
+        evictable = sorted((e for e in self._entries.values() if not e.pinned), key=lambda e: e.last_used)
+        dropped = [e.label for e in evictable if now - e.last_used > self.idle_seconds]
+        excess = len(self._entries) - len(dropped) - self.max_datasets
+        dropped += [e.label for e in evictable if e.label not in dropped][: max(excess, 0)]
+        for label in dropped:
+            del self._entries[label]
+        if dropped:
+            self._intern = None
+        return dropped
+
+    def evict_idle(self, now: Optional[float] = None) -> List[str]:
+        """
+        Apply the memory bound now.
+
+        Args:
+            now (Optional[float]): ``time.monotonic()`` reading (for tests).
+
+        Returns:
+            List[str]: Labels evicted.
+        """
+        with self._lock:
+            return self._evict(now)
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """
+        Sharing achieved by interning.
+
+        Returns:
+            Dict[str, Any]: datasets, containers (summed over datasets as if
+            each were held separately), unique_containers (actually held)
+            and shared_fraction.
+        """
+        with self._lock:
+            seen: Dict[int, Any] = {}
+            total = sum(_containers(e.snapshot.data, seen) for e in self._entries.values())
+            return {
+                "datasets": len(self._entries),
+                "containers": total,
+                "unique_containers": len(seen),
+                "shared_fraction": 1.0 - len(seen) / total if total else 0.0,
+            }
@@ -0,0 +1,311 @@
+"""
+Dataset stored section by section and parsed on first access.
+
+``load_data`` parses the whole export, including ``bottleneckData`` (the
+largest section, only needed by Bottleneck Analysis) and
+``processStepCounts`` (never shown). After the first load of a version,
+``write_sections`` splits the prepared data (periods rolled up, errors
+quarantined) into one JSON file per section and process, in a folder per
+version next to the dataset (``data/kpiData.json`` →
+``data/kpiData.sections/<version>/``)::
+
+    index.json                  version and the keys of every section, in order
+    quarterlyData/000.json      quarterlyData["MA"]
+    quarterlyData/001.json      quarterlyData["CT"]
+    ...
+    dataQuality.json            sections that are not keyed by process
+
+``LazyDataset`` is a read-only mapping over that folder: a section's
+processes are known from the index, and each one is parsed the first time
+it is read. Loading is thread-safe and happens once per file, so sessions
+and warm-up threads sharing one dataset never parse a file twice, and a
+session that never reads the bottleneck history never parses it. Each
+version has its own folder, so a process still reading an older version is
+never handed files of a newer one; only the ``KEEP_VERSIONS`` newest
+folders are kept, plus any this process still has open. A folder pruned by
+another process is treated as stale: its sections are read from a full load
+instead.
+"""
+
+from __future__ import annotations
+
+import json
+import pathlib
+import shutil
+import threading
+import weakref
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+from .data import write_atomic
+from .ingest import is_manifest
+from .instrumentation import PROFILER
+
+SECTIONS_SUFFIX = ".sections"
+INDEX_FILE = "index.json"
+KEEP_VERSIONS = 2
+
+# Version folders opened by a live LazyDataset in this process (never pruned)
+_OPEN_DIRS: Dict[pathlib.Path, int] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def sections_dir(data_path: str) -> pathlib.Path:
+    """Folder holding the split sections of a dataset (``SECTIONS_SUFFIX`` next to it)."""
+    p = pathlib.Path(data_path)
+    if is_manifest(data_path):
+        return p.with_name(p.name.split(".")[0] + SECTIONS_SUFFIX)
+    return p.with_suffix(SECTIONS_SUFFIX)
+
+
+def _by_process(value: Any) -> bool:
+    """True for sections keyed by process (or sub-section): a dict of dicts or record lists."""
+    return isinstance(value, dict) and bool(value) and all(isinstance(v, (dict, list)) for v in value.values())
+
+
+def _hold(out_dir: pathlib.Path) -> None:
+    with _OPEN_LOCK:
+        _OPEN_DIRS[out_dir] = _OPEN_DIRS.get(out_dir, 0) + 1
+
+
+def _release(out_dir: pathlib.Path) -> None:
+    with _OPEN_LOCK:
+        if _OPEN_DIRS.get(out_dir, 0) <= 1:
+            _OPEN_DIRS.pop(out_dir, None)
+        else:
+            _OPEN_DIRS[out_dir] -= 1
+
+
+def _prune(root: pathlib.Path, keep: int) -> None:
+    """Remove all but the ``keep`` most recently written version folders, except those open here."""
+    with _OPEN_LOCK:
+        held = set(_OPEN_DIRS)
+    folders = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in folders[keep:]:
+        if old not in held:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def write_sections(data: Dict[str, Any], version: str, root: pathlib.Path) -> int:
+    """
+    Write a loaded dataset one file per section and process, ``index.json`` last.
+
+    Args:
+        data (Dict): Loaded data.
+        version (str): Dataset version.
+        root (pathlib.Path): Sections folder; files go to its ``version`` subfolder.
+
+    Returns:
+        int: Bytes written.
+
+    Raises:
+        OSError: If the folder is not writable.
+    """
+    out_dir = root / version
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index: Dict[str, Optional[List[str]]] = {}
+    written = 0
+    for section, value in data.items():
+        if _by_process(value):
+            (out_dir / section).mkdir(exist_ok=True)
+            parts = {out_dir / section / f"{i:03d}.json": v for i, v in enumerate(value.values())}
+            index[section] = list(value)
+        else:
+            parts = {out_dir / f"{section}.json": value}
+            index[section] = None
+        for path, part in parts.items():
+            blob = json.dumps(part, separators=(",", ":")).encode("utf-8")
+            write_atomic(path, blob)
+            written += len(blob)
+    blob = json.dumps({"version": version, "sections": index}).encode("utf-8")
+    write_atomic(out_dir / INDEX_FILE, blob)
+    _prune(root, KEEP_VERSIONS)
+    return written + len(blob)
+
+
+class _Files:
+    """
+    Parse-once store of the JSON files of one folder, shared by all its sections.
+
+    When a file is gone (the folder was pruned by another process), its
+    section is taken from ``fallback`` (the full load), run at most once.
+    """
+
+    def __init__(self, root: pathlib.Path, fallback: Optional[Callable[[], Mapping]] = None) -> None:
+        self.root = root
+        self._fallback = fallback
+        self._full: Optional[Mapping] = None
+        self._parsed: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._full_lock = threading.Lock()
+
+    def _full_data(self) -> Mapping:
+        with self._full_lock:
+            if self._full is None:
+                self._full = self._fallback()
+            return self._full
+
+    def load(self, rel: str, section: str, key: Optional[str] = None) -> Any:
+        """
+        Parsed content of ``rel``, read from disk on first use only.
+
+        Args:
+            rel (str): File path relative to the folder.
+            section (str): Section the file holds.
+            key (Optional[str]): Process (or sub-section) key, for split sections.
+
+        Returns:
+            Any: Parsed section (or one process of it).
+
+        Raises:
+            FileNotFoundError: If the file is gone and there is no fallback load.
+        """
+        try:
+            return self._parsed[rel]
+        except KeyError:
+            pass
+        with self._lock:
+            key_lock = self._key_locks.setdefault(rel, threading.Lock())
+        with key_lock:
+            if rel not in self._parsed:
+                with PROFILER.timer("parse_section"):
+                    try:
+                        value = json.loads((self.root / rel).read_bytes())
+                    except FileNotFoundError:
+                        if self._fallback is None:
+                            raise
+                        full = self._full_data()
+                        value = full[section] if key is None else full[section][key]
+                self._parsed[rel] = value
+        return self._parsed[rel]
+
+    def parsed(self) -> List[str]:
+        """Files parsed so far."""
+        with self._lock:
+            return sorted(str(k) for k in self._parsed)
+
+
+class LazySection(Mapping):
+    """One section keyed by process; each process's file is parsed on first access."""
+
+    def __init__(self, files: _Files, section: str, keys: List[str]) -> None:
+        self._files = files
+        self._section = section
+        self._slots = {key: f"{section}/{i:03d}.json" for i, key in enumerate(keys)}
+
+    def __getitem__(self, key: str) -> Any:
+        return self._files.load(self._slots[key], self._section, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slots)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slots
+
+    def __repr__(self) -> str:
+        return f"LazySection({self._section!r}, {list(self._slots)})"
+
+
+class LazyDataset(Mapping):
+    """
+    Read-only dataset over a ``write_sections`` folder.
+
+    Sections keyed by process are ``LazySection`` mappings; other sections
+    are parsed whole on first access. ``_prune`` keeps the folder while the
+    dataset is alive; ``fallback`` serves files removed by other processes.
+    """
+
+    def __init__(
+        self,
+        root: pathlib.Path,
+        version: str,
+        index: Dict[str, Optional[List[str]]],
+        fallback: Optional[Callable[[], Mapping]] = None,
+    ) -> None:
+        self.version = version
+        self._files = _Files(root, fallback)
+        _hold(root)
+        weakref.finalize(self, _release, root)
+        self._sections = {
+            section: (LazySection(self._files, section, keys) if keys is not None else None)
+            for section, keys in index.items()
+        }
+
+    def __getitem__(self, section: str) -> Any:
+        lazy = self._sections[section]
+        return lazy if lazy is not None else self._files.load(f"{section}.json", section)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sections)
+
+    def __len__(self) -> int:
+        return len(self._sections)
+
+    def __contains__(self, section: object) -> bool:
+        return section in self._sections
+
+    def __repr__(self) -> str:
+        return f"LazyDataset({self.version!r}, parsed={self.parsed()})"
+
+    def parsed(self) -> List[str]:
+        """Section files parsed so far (e.g. ``quarterlyData/000.json``)."""
+        return self._files.parsed()
+
+
+def load_sections(
+    root: pathlib.Path, version: str, fallback: Optional[Callable[[], Mapping]] = None
+) -> Optional[LazyDataset]:
+    """
+    Open split sections if they were written for ``version`` (nothing is parsed yet).
+
+    Args:
+        root (pathlib.Path): Sections folder.
+        version (str): Current dataset version.
+        fallback (Optional[Callable]): Full load, for files removed after opening.
+
+    Returns:
+        Optional[LazyDataset]: Dataset, or None when missing, outdated or unreadable.
+    """
+    out_dir = root / version
+    try:
+        index = json.loads((out_dir / INDEX_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != version or not isinstance(index.get("sections"), dict):
+        return None
+    return LazyDataset(out_dir, version, index["sections"], fallback)
+
+
+def open_dataset(data_path: str, version: str, load: Callable[[], Dict[str, Any]]) -> Mapping:
+    """
+    Dataset of a version, from its split sections when available.
+
+    Otherwise ``load`` parses the full dataset, which is then split for the
+    next process (best effort: on a read-only disk nothing is written).
+
+    Args:
+        data_path (str): Path of the dataset (or source manifest).
+        version (str): Dataset version.
+        load (Callable): Full load (``load_data`` or ``load_sources``).
+
+    Returns:
+        Mapping: ``LazyDataset``, or the fully loaded dict.
+
+    Raises:
+        DataError: From ``load``.
+    """
+    root = sections_dir(data_path)
+    lazy = load_sections(root, version, load) if version else None
+    if lazy is not None:
+        return lazy
+    data = load()
+    try:
+        if version:
+            write_sections(data, version, root)
+    except OSError:
+        pass
+    return data
@@ -0,0 +1,530 @@
+"""
+Derived-artifact cache shared by several dashboard replicas.
+
+Each replica behind a load balancer would otherwise parse the dataset and
+build every derived frame itself. A ``SharedCache`` sits under the
+per-process caches: on a local miss it looks the artifact up in a shared
+backend, and only computes it (then publishes it) when no replica has yet.
+A short-lived lock per artifact makes concurrent replicas wait for the one
+computing it instead of repeating the work.
+
+Artifacts are keyed by dataset version, artifact name and a digest of the
+call arguments, and are stored as Arrow IPC: every DataFrame or Series in
+the value becomes an Arrow IPC stream; the structure around them (tuples,
+lists, dicts, scalars, Plotly figures as JSON) goes in a small JSON header.
+Values of other types are computed locally and not shared.
+
+Backends (``backend_from_url``, configured with ``KPI_DASH_SHARED_CACHE``):
+
+- ``file:///shared/kpi-cache``: one file per artifact on a shared disk,
+  written atomically and read through a memory map;
+- ``redis://host:6379/0``: any server speaking the Redis protocol (RESP),
+  with expiry handled by the server;
+- ``memory://``: in-process stand-in with the same interface.
+
+Backend errors never fail a request: the artifact is computed locally.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pathlib
+import socket
+import struct
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from .lazy import lazy_import
+
+pa = lazy_import("pyarrow")
+pd = lazy_import("pandas")
+pio = lazy_import("plotly.io")
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_ENV = "KPI_DASH_SHARED_CACHE"
+# Artifacts expire after a week; a new dataset version never reads old ones
+TTL_SECONDS = 7 * 24 * 3600
+# How long a replica may hold an artifact's lock, and others wait for it
+LOCK_SECONDS = 60.0
+POLL_SECONDS = 0.05
+
+_MAGIC = b"KPIARROW1"
+_LEN = struct.Struct("<Q")
+
+
+# ---- serialization ----
+def _pack(value: Any, blobs: List[bytes]) -> Any:
+    """JSON-able structure of ``value``; frames are appended to ``blobs`` as Arrow IPC."""
+    if isinstance(value, pd.DataFrame):
+        blobs.append(_ipc(value))
+        return {"__frame__": len(blobs) - 1}
+    if isinstance(value, pd.Series):
+        blobs.append(_ipc(value.to_frame(name="__values__")))
+        return {"__series__": len(blobs) - 1, "name": _pack(value.name, blobs)}
+    if hasattr(value, "to_plotly_json"):
+        return {"__figure__": value.to_json()}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_pack(v, blobs) for v in value]}
+    if isinstance(value, list):
+        return [_pack(v, blobs) for v in value]
+    if isinstance(value, dict):
+        return {"__dict__": [[_pack(k, blobs), _pack(v, blobs)] for k, v in value.items()]}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, "item") and getattr(value, "ndim", None) == 0:
+        return value.item()
+    raise TypeError(f"Cannot share values of type {type(value).__name__}")
+
+
+def _unpack(node: Any, frames: List[pd.DataFrame]) -> Any:
+    if isinstance(node, list):
+        return [_unpack(v, frames) for v in node]
+    if not isinstance(node, dict):
+        return node
+    if "__frame__" in node:
+        return frames[node["__frame__"]]
+    if "__series__" in node:
+        return frames[node["__series__"]]["__values__"].rename(_unpack(node["name"], frames))
+    if "__figure__" in node:
+        return pio.from_json(node["__figure__"])
+    if "__tuple__" in node:
+        return tuple(_unpack(v, frames) for v in node["__tuple__"])
+    return {_unpack(k, frames): _unpack(v, frames) for k, v in node["__dict__"]}
+
+
+def _ipc(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(value: Any) -> bytes:
+    """
+    Serialize an artifact: JSON header plus one Arrow IPC stream per frame.
+
+    Args:
+        value (Any): DataFrames/Series, figures and JSON-able values, nested
+            in tuples, lists and dicts.
+
+    Returns:
+        bytes: Encoded artifact.
+
+    Raises:
+        TypeError: For a value (or frame column) that cannot be stored.
+    """
+    blobs: List[bytes] = []
+    try:
+        header = json.dumps(_pack(value, blobs)).encode("utf-8")
+    except pa.ArrowException as e:
+        raise TypeError(str(e)) from e
+    parts = [_MAGIC, _LEN.pack(len(header)), header]
+    for blob in blobs:
+        parts += [_LEN.pack(len(blob)), blob]
+    return b"".join(parts)
+
+
+def decode(buf: Any) -> Any:
+    """
+    Inverse of ``encode``.
+
+    Args:
+        buf (Any): Bytes-like encoded artifact (memory-mapped buffers are
+            read without copying until conversion to pandas).
+
+    Returns:
+        Any: The artifact.
+
+    Raises:
+        ValueError: If ``buf`` is not an encoded artifact.
+    """
+    view = memoryview(buf)
+    if bytes(view[: len(_MAGIC)]) != _MAGIC:
+        raise ValueError("Not a shared-cache artifact")
+    pos = len(_MAGIC)
+    (size,) = _LEN.unpack_from(view, pos)
+    header = json.loads(bytes(view[pos + _LEN.size : pos + _LEN.size + size]))
+    pos += _LEN.size + size
+    frames = []
+    while pos < len(view):
+        (size,) = _LEN.unpack_from(view, pos)
+        pos += _LEN.size
+        frames.append(pa.ipc.open_stream(pa.py_buffer(view[pos : pos + size])).read_all().to_pandas())
+        pos += size
+    return _unpack(header, frames)
+
+
+# ---- backends ----
+class CacheBackend:
+    """Byte store shared by the replicas."""
+
+    url = ""
+
+    def get(self, key: str) -> Optional[Any]:
+        """Bytes-like value of ``key``, or None."""
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds."""
+        raise NotImplementedError
+
+    def add(self, key: str, ttl: float) -> bool:
+        """Create ``key`` only if absent (a lock); True when created."""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` if present."""
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """In-process stand-in for a shared backend (single replica, tests)."""
+
+    url = "memory://"
+
+    def __init__(self) -> None:
+        self._items: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value, expires = self._items.get(key, (None, 0.0))
+            if value is not None and expires < time.time():
+                del self._items[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._items[key] = (value, time.time() + ttl)
+
+    def add(self, key: str, ttl: float) -> bool:
+        with self._lock:
+            value, expires = self._items.get(key, (None, 0.0))
+            if value is not None and expires >= time.time():
+                return False
+            self._items[key] = (b"", time.time() + ttl)
+            return True
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+
+class FileBackend(CacheBackend):
+    """
+    One file per key under a shared directory, read through a memory map.
+
+    Writes go to a temporary file renamed into place, so readers on other
+    hosts see a complete artifact or none. An artifact's modification time
+    is set to its expiry time when it is written.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = pathlib.Path(root)
+        self.url = f"file://{self.root}"
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.root.joinpath(*(part.replace(os.sep, "_") for part in key.split("/")))
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime < time.time():
+                path.unlink(missing_ok=True)
+                return None
+            return pa.memory_map(str(path), "r").read_buffer()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            expires = time.time() + ttl
+            os.utime(tmp, (expires, expires))
+            os.replace(tmp, path)
+        except OSError:
+            pathlib.Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def add(self, key: str, ttl: float) -> bool:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # A lock left behind by a replica that died is reclaimed after ttl
+            if time.time() - path.stat().st_mtime > ttl:
+                path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            return False
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+class RedisError(RuntimeError):
+    """Error reply from a Redis-protocol server."""
+
+
+class RespBackend(CacheBackend):
+    """
+    Minimal Redis-protocol (RESP2) client: GET, SET (EX/PX/NX) and DEL.
+
+    One connection per thread, opened on first use and reopened after a
+    network error.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 2.0) -> None:
+        self.host, self.port, self.db, self.password, self.timeout = host, port, db, password, timeout
+        self.url = f"redis://{host}:{port}/{db}"
+        self._local = threading.local()
+
+    def _connection(self) -> Tuple[socket.socket, Any]:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+            if self.password:
+                self._call("AUTH", self.password)
+            if self.db:
+                self._call("SELECT", str(self.db))
+        return conn
+
+    def _call(self, *args: Any) -> Any:
+        sock, reader = self._connection()
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, (bytes, bytearray, memoryview)) else str(arg).encode()
+            parts += [b"$%d\r\n" % len(data), bytes(data), b"\r\n"]
+        try:
+            sock.sendall(b"".join(parts))
+            return self._reply(reader)
+        except OSError:
+            self.close()
+            raise
+
+    def _reply(self, reader: Any) -> Any:
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [self._reply(reader) for _ in range(size)]
+        raise RedisError(f"Unexpected reply {line!r}")
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            conn[1].close()
+            conn[0].close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._call("SET", key, value, "EX", max(1, int(ttl)))
+
+    def add(self, key: str, ttl: float) -> bool:
+        return self._call("SET", key, b"1", "NX", "PX", max(1, int(ttl * 1000))) == "OK"
+
+    def delete(self, key: str) -> None:
+        self._call("DEL", key)
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    """
+    Backend for a ``file://``, ``redis://`` or ``memory://`` URL.
+
+    Args:
+        url (str): Backend URL (``redis://:password@host:port/db``).
+
+    Returns:
+        CacheBackend: The backend.
+
+    Raises:
+        ValueError: For an unsupported scheme.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return FileBackend(unquote(parsed.netloc + parsed.path))
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        password = unquote(parsed.password) if parsed.password else None
+        return RespBackend(parsed.hostname or "localhost", parsed.port or 6379, db, password)
+    if parsed.scheme == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unsupported shared cache URL: {url!r} (expected file://, redis:// or memory://)")
+
+
+# ---- cache ----
+class SharedCache:
+    """Get-or-compute of versioned artifacts over a ``CacheBackend``."""
+
+    def __init__(self, backend: CacheBackend, namespace: str = "kpi", ttl: float = TTL_SECONDS,
+                 lock_seconds: float = LOCK_SECONDS) -> None:
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.lock_seconds = lock_seconds
+        self._stats = {"hits": 0, "misses": 0, "waits": 0, "local": 0, "errors": 0, "bytes_read": 0,
+                       "bytes_written": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self._stats[k] += v
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since start: hits, misses (computed here), waits, local-only, errors, bytes."""
+        with self._lock:
+            return {"backend": self.backend.url, **self._stats}
+
+    def key(self, version: str, name: str, args: Tuple[Any, ...]) -> str:
+        """Backend key of an artifact: namespace/version/name/argument digest."""
+        digest = hashlib.sha256(repr(args).encode("utf-8")).hexdigest()[:20]
+        return f"{self.namespace}/{version}/{name}/{digest}"
+
+    def _lookup(self, key: str) -> Tuple[bool, Any]:
+        try:
+            buf = self.backend.get(key)
+            if buf is None or len(buf) == 0:
+                return False, None
+            value = decode(buf)
+        except (OSError, RedisError, ValueError) as e:
+            logger.warning("Shared cache read failed for %s: %s", key, e)
+            self._count(errors=1)
+            return False, None
+        self._count(bytes_read=len(buf))
+        return True, value
+
+    def get_or_compute(self, version: str, name: str, args: Tuple[Any, ...], fn: Callable[[], Any]) -> Any:
+        """
+        Artifact from the backend, else computed by ``fn`` and published.
+
+        While another replica holds the artifact's lock, this one polls for
+        the result for up to ``lock_seconds`` before computing it itself.
+
+        Args:
+            version (str): Dataset version.
+            name (str): Artifact name.
+            args (Tuple): Arguments that select the artifact (``repr`` is hashed).
+            fn (Callable): Zero-argument builder.
+
+        Returns:
+            Any: The artifact.
+        """
+        key = self.key(version, name, args)
+        found, value = self._lookup(key)
+        if found:
+            self._count(hits=1)
+            return value
+        lock_key = key + ".lock"
+        try:
+            locked = self.backend.add(lock_key, self.lock_seconds)
+        except (OSError, RedisError) as e:
+            logger.warning("Shared cache lock failed for %s: %s", key, e)
+            self._count(errors=1, local=1)
+            return fn()
+        if not locked:
+            deadline = time.monotonic() + self.lock_seconds
+            while time.monotonic() < deadline:
+                time.sleep(POLL_SECONDS)
+                found, value = self._lookup(key)
+                if found:
+                    self._count(hits=1, waits=1)
+                    return value
+        try:
+            value = fn()
+            self._count(misses=1)
+            self._publish(key, value)
+            return value
+        finally:
+            if locked:
+                try:
+                    self.backend.delete(lock_key)
+                except (OSError, RedisError):
+                    pass
+
+    def _publish(self, key: str, value: Any) -> None:
+        try:
+            blob = encode(value)
+        except TypeError as e:
+            logger.debug("Not sharing %s: %s", key, e)
+            self._count(local=1)
+            return
+        try:
+            self.backend.set(key, blob, self.ttl)
+            self._count(bytes_written=len(blob))
+        except (OSError, RedisError) as e:
+            logger.warning("Shared cache write failed for %s: %s", key, e)
+            self._count(errors=1)
+
+    def wrap(self, name: str) -> Callable:
+        """
+        Decorator sharing a function's results; its first argument is the dataset version.
+
+        Arguments whose parameter name starts with "_" (the data itself, as
+        in ``st.cache_data``) are left out of the key.
+
+        Args:
+            name (str): Artifact name.
+
+        Returns:
+            Callable: Decorator.
+        """
+
+        def deco(fn: Callable) -> Callable:
+            params = list(inspect.signature(fn).parameters)
+
+            @functools.wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                bound = dict(zip(params, args)) | kwargs
+                version = bound[params[0]]
+                selector = tuple((k, v) for k, v in bound.items() if k != params[0] and not k.startswith("_"))
+                return self.get_or_compute(version, name, selector, lambda: fn(*args, **kwargs))
+
+            return wrapper
+
+        return deco
+
+
+def shared_cache_from_env() -> Optional[SharedCache]:
+    """``SharedCache`` for ``KPI_DASH_SHARED_CACHE``, or None when unset."""
+    url = os.environ.get(SHARED_CACHE_ENV)
+    return SharedCache(backend_from_url(url)) if url else None
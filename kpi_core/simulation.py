@@ -0,0 +1,280 @@
+"""
+Monte Carlo staffing what-if for bottleneck steps.
+
+Each step of a process's ``bottleneckData`` is simulated as a queue over the
+next quarter in weekly ticks, for thousands of replications at once (NumPy
+arrays of shape replications × steps):
+
+- weekly arrivals are Poisson with the step's ``incoming_cases_q`` rate
+  (scaled by the scenario's demand factor);
+- weekly service is Poisson with the step's effective capacity.
+  ``work_to_staff_ratio`` is read as demand ÷ staff capacity, so capacity is
+  ``incoming_cases_q / work_to_staff_ratio`` (``capacity_cases_q`` when the
+  ratio is missing), scaled by ``(team + extra) / team`` for added reviewers;
+- the queue starts from the quarter's ``closing_backlog``;
+- each weekly cohort waits ``queue ÷ daily capacity`` and is then worked for
+  a log-normal touch time fitted to ``touch_median_days``/``touch_p90_days``.
+
+Cohort cycle times, weighted by arrivals, give cycle-time percentiles and the
+probability of meeting the step's ``targetDays``. The end-to-end view sums
+the step times of the same replication and week. Large runs are split into
+fixed-size chunks with independent seeds and spread over a process pool, so
+results depend only on the seed, not on the worker count.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .lazy import lazy_import
+from .steps import strip_disag_suffix
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+WEEKS_PER_QUARTER = 13
+DEFAULT_REPLICATIONS = 5000
+# Replications per chunk; chunks are the unit of parallel work and of seeding
+CHUNK_REPLICATIONS = 5000
+# Below this many replications the pool start-up costs more than it saves
+PARALLEL_MIN_REPLICATIONS = 100000
+DEFAULT_TEAM_SIZE = 4
+# z-score of the 90th percentile, for fitting log-normal touch times
+_Z90 = 1.2815515655446004
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """
+    A staffing/demand what-if (hashable, so it can key caches).
+
+    Attributes:
+        extra_staff (Tuple[Tuple[str, int], ...]): (step, reviewers added) pairs.
+        team_size (Tuple[Tuple[str, int], ...]): (step, current reviewers)
+            overrides; other steps use ``DEFAULT_TEAM_SIZE``.
+        demand_factor (float): Multiplier on arrivals.
+        weeks (int): Horizon in weeks.
+    """
+
+    extra_staff: Tuple[Tuple[str, int], ...] = ()
+    team_size: Tuple[Tuple[str, int], ...] = ()
+    demand_factor: float = 1.0
+    weeks: int = WEEKS_PER_QUARTER
+
+    def capacity_multiplier(self, step: str) -> float:
+        """Capacity scale for a step: (team + extra) / team."""
+        team = dict(self.team_size).get(step, DEFAULT_TEAM_SIZE)
+        extra = dict(self.extra_staff).get(step, 0)
+        return max(team + extra, 0) / team if team > 0 else 1.0
+
+
+@dataclass
+class StepInputs:
+    """Per-step simulation parameters of one process and base quarter."""
+
+    process: str
+    quarter: str
+    steps: List[str]
+    arrivals_q: np.ndarray
+    capacity_q: np.ndarray
+    backlog: np.ndarray
+    touch_median: np.ndarray
+    touch_p90: np.ndarray
+    target_days: np.ndarray
+    notes: List[str] = field(default_factory=list)
+
+
+def step_inputs(
+    process: str, quarter: str, bottleneck_data: Dict[str, Any], process_step_data: Dict[str, Any]
+) -> Optional[StepInputs]:
+    """
+    Simulation inputs from one quarter of bottleneck and step data.
+
+    Args:
+        process (str): Process.
+        quarter (str): Base quarter (the simulation projects the next one).
+        bottleneck_data (Dict): ``data["bottleneckData"]``.
+        process_step_data (Dict): ``data["processStepData"]``.
+
+    Returns:
+        Optional[StepInputs]: Inputs, or None if no step has arrivals data
+        for the quarter.
+    """
+    targets = {}
+    for key, obj in process_step_data.get(process, {}).items():
+        rec = next((r for r in obj.get("data", []) if r.get("quarter") == quarter), None)
+        if rec and rec.get("targetDays") is not None:
+            targets.setdefault(strip_disag_suffix(key), rec["targetDays"])
+    rows, notes = [], []
+    for step, series in bottleneck_data.get(process, {}).items():
+        rec = next((r for r in series if r.get("quarter") == quarter), None)
+        if not rec or rec.get("incoming_cases_q") is None:
+            continue
+        arrivals = float(rec["incoming_cases_q"])
+        ratio = rec.get("work_to_staff_ratio")
+        if ratio:
+            capacity = arrivals / float(ratio)
+        else:
+            capacity = float(rec.get("capacity_cases_q") or 0.0)
+            notes.append(f"{step}: no work-to-staff ratio, using recorded capacity")
+        backlog = rec.get("closing_backlog")
+        if backlog is None:
+            backlog = rec.get("wip_count") or 0.0
+        median = float(rec.get("touch_median_days") or rec.get("cycle_time_median") or 1.0)
+        p90 = float(rec.get("touch_p90_days") or median * 1.8)
+        rows.append(
+            (step, arrivals, capacity, max(float(backlog), 0.0), median, max(p90, median), targets.get(step))
+        )
+    if not rows:
+        return None
+    cols = list(zip(*rows))
+    return StepInputs(
+        process=process,
+        quarter=quarter,
+        steps=list(cols[0]),
+        arrivals_q=np.array(cols[1], dtype=float),
+        capacity_q=np.array(cols[2], dtype=float),
+        backlog=np.array(cols[3], dtype=float),
+        touch_median=np.array(cols[4], dtype=float),
+        touch_p90=np.array(cols[5], dtype=float),
+        target_days=np.array([np.nan if t is None else t for t in cols[6]], dtype=float),
+        notes=notes,
+    )
+
+
+def _simulate_chunk(
+    arrivals_w: np.ndarray,
+    capacity_w: np.ndarray,
+    backlog0: np.ndarray,
+    touch_mu: np.ndarray,
+    touch_sigma: np.ndarray,
+    weeks: int,
+    n: int,
+    seed: Any,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simulate ``n`` replications (process-pool worker).
+
+    Returns:
+        Tuple: end backlog (n × steps), cohort cycle days and cohort sizes
+        (both n × weeks × steps).
+    """
+    rng = np.random.default_rng(seed)
+    n_steps = len(arrivals_w)
+    queue = np.broadcast_to(backlog0, (n, n_steps)).copy()
+    rate_day = np.where(capacity_w > 0, capacity_w / 7.0, np.nan)
+    cycle = np.empty((n, weeks, n_steps))
+    sizes = np.empty((n, weeks, n_steps))
+    for t in range(weeks):
+        arrived = rng.poisson(arrivals_w, size=(n, n_steps))
+        served = rng.poisson(capacity_w, size=(n, n_steps))
+        # A cohort waits behind the queue in front of it (half of its own arrivals on average)
+        wait = (queue + arrived / 2.0) / rate_day
+        touch = rng.lognormal(touch_mu, touch_sigma, size=(n, n_steps))
+        cycle[:, t, :] = np.nan_to_num(wait, nan=np.inf) + touch
+        sizes[:, t, :] = arrived
+        queue = np.maximum(queue + arrived - served, 0.0)
+    return queue, cycle, sizes
+
+
+def _weighted_quantiles(values: np.ndarray, weights: np.ndarray, qs: List[float]) -> np.ndarray:
+    """Quantiles of ``values`` where each value counts ``weights`` times."""
+    order = np.argsort(values)
+    v, w = values[order], weights[order]
+    cum = np.cumsum(w)
+    if cum[-1] <= 0:
+        return np.full(len(qs), np.nan)
+    return np.interp(np.asarray(qs) * cum[-1], cum, v)
+
+
+def simulate(
+    inputs: StepInputs,
+    scenario: Scenario = Scenario(),
+    replications: int = DEFAULT_REPLICATIONS,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run the what-if for every step of a process.
+
+    Args:
+        inputs (StepInputs): Output of ``step_inputs``.
+        scenario (Scenario): Staffing/demand changes.
+        replications (int): Monte Carlo replications.
+        seed (int): Base seed (results are reproducible for a seed).
+        workers (Optional[int]): Process pool size for large runs; 1 forces
+            a single process.
+
+    Returns:
+        Dict[str, Any]: ``steps`` (per-step DataFrame with capacity and
+        utilisation, backlog p10/p50/p90, cycle p50/p90, target days and
+        p_meet_target) and ``end_to_end`` (cycle p50/p90, total target and
+        p_meet_target for a case passing every step).
+    """
+    weeks = scenario.weeks
+    mult = np.array([scenario.capacity_multiplier(s) for s in inputs.steps])
+    arrivals_w = inputs.arrivals_q * scenario.demand_factor / WEEKS_PER_QUARTER
+    capacity_w = inputs.capacity_q * mult / WEEKS_PER_QUARTER
+    touch_mu = np.log(np.maximum(inputs.touch_median, 1e-6))
+    touch_sigma = np.maximum(np.log(inputs.touch_p90 / np.maximum(inputs.touch_median, 1e-6)) / _Z90, 1e-6)
+
+    n_chunks = max(1, math.ceil(replications / CHUNK_REPLICATIONS))
+    sizes_per_chunk = [min(CHUNK_REPLICATIONS, replications - i * CHUNK_REPLICATIONS) for i in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    args = [
+        (arrivals_w, capacity_w, inputs.backlog, touch_mu, touch_sigma, weeks, n, child)
+        for n, child in zip(sizes_per_chunk, seeds)
+    ]
+    parallel = (workers or os.cpu_count() or 1) > 1
+    if parallel and n_chunks > 1 and replications >= PARALLEL_MIN_REPLICATIONS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, *zip(*args)))
+    else:
+        parts = [_simulate_chunk(*a) for a in args]
+    backlog = np.concatenate([p[0] for p in parts])
+    cycle = np.concatenate([p[1] for p in parts])
+    sizes = np.concatenate([p[2] for p in parts])
+
+    rows = []
+    for i, step in enumerate(inputs.steps):
+        c, w = cycle[:, :, i].ravel(), sizes[:, :, i].ravel()
+        p50, p90 = _weighted_quantiles(c, w, [0.5, 0.9])
+        target = inputs.target_days[i]
+        p_meet = float(w[c <= target].sum() / w.sum()) if np.isfinite(target) and w.sum() > 0 else np.nan
+        b10, b50, b90 = np.percentile(backlog[:, i], [10, 50, 90])
+        rows.append(
+            {
+                "step": step,
+                "capacity_multiplier": mult[i],
+                "capacity_q": capacity_w[i] * weeks,
+                "utilisation": arrivals_w[i] / capacity_w[i] if capacity_w[i] > 0 else np.inf,
+                "start_backlog": inputs.backlog[i],
+                "backlog_p10": b10,
+                "backlog_p50": b50,
+                "backlog_p90": b90,
+                "cycle_p50": p50,
+                "cycle_p90": p90,
+                "target_days": target,
+                "p_meet_target": p_meet,
+            }
+        )
+    # End to end: one case per replication and week passing every step in turn
+    total = cycle.sum(axis=2).ravel()
+    e_p50, e_p90 = np.percentile(total, [50, 90])
+    total_target = float(np.nansum(inputs.target_days)) if np.isfinite(inputs.target_days).any() else np.nan
+    return {
+        "steps": pd.DataFrame(rows),
+        "end_to_end": {
+            "cycle_p50": float(e_p50),
+            "cycle_p90": float(e_p90),
+            "target_days": total_target,
+            "p_meet_target": float(np.mean(total <= total_target)) if np.isfinite(total_target) else np.nan,
+        },
+        "replications": int(replications),
+        "weeks": weeks,
+        "notes": list(inputs.notes),
+    }
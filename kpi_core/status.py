@@ -0,0 +1,160 @@
+"""
+KPI and process-step status rules.
+
+Statuses are "success" (on target), "warning" (within 5% of target) and
+"error" (off target), shared by KPI cards, step charts and summaries.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from .constants import DISAG_KPI_LINKS, TIME_BASED
+from .data import list_quarters
+from .lazy import lazy_import
+from .steps import process_step_statuses
+
+pd = lazy_import("pandas")
+
+
+def status_for(kpi_id: str, value: float, target: float) -> str:
+    """
+    Determine status based on value vs target (success/warning/error).
+
+    Args:
+        kpi_id (str): KPI ID.
+        value (float): Current value.
+        target (float): Target value.
+
+    Returns:
+        str: Status ("success", "warning", "error").
+    """
+    if value is None or target is None:
+        return "error"
+    if kpi_id in TIME_BASED:  # Lower is better for time-based
+        if value <= target:
+            return "success"
+        if value <= target * 1.05:
+            return "warning"
+        return "error"
+    else:  # Higher is better for percentages
+        if value >= target:
+            return "success"
+        if value >= target * 0.95:
+            return "warning"
+        return "error"
+
+
+def has_disag_for_kpi(base_kpi: str, process: str) -> bool:
+    """
+    Check if a KPI supports disaggregation for the given process.
+
+    Args:
+        base_kpi (str): Base KPI ID.
+        process (str): Process name (e.g., "GMP").
+
+    Returns:
+        bool: True if disaggregation is available.
+    """
+    return process == "GMP" and base_kpi in DISAG_KPI_LINKS
+
+
+def base_kpi_ids(kpis_block: Dict[str, Any]) -> List[str]:
+    """
+    KPI ids of a process without its disaggregated variants, in data order.
+
+    Args:
+        kpis_block (Dict): KPIs of one process.
+
+    Returns:
+        List[str]: Base KPI ids.
+    """
+    disagg_variants = {v for mapping in DISAG_KPI_LINKS.values() for v in mapping.values()}
+    return [k for k in kpis_block.keys() if k not in disagg_variants]
+
+
+def resolve_effective_kpi_id(
+    base_kpi: str, process: str, disag_choice: str
+) -> Tuple[str, Optional[str]]:
+    """
+    Resolve the effective KPI ID based on disaggregation choice.
+
+    Args:
+        base_kpi (str): Base KPI ID.
+        process (str): Process name.
+        disag_choice (str): Selected disaggregation.
+
+    Returns:
+        Tuple[str, Optional[str]]: Effective KPI ID and applied disaggregation name.
+    """
+    if disag_choice == "All":
+        return base_kpi, None
+    if process == "GMP" and base_kpi in DISAG_KPI_LINKS:
+        target = DISAG_KPI_LINKS[base_kpi].get(disag_choice)
+        if target:
+            return target, disag_choice
+    return base_kpi, None
+
+
+def status_matrix(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Status of every KPI and general process step for every quarter.
+
+    KPIs without a value in a quarter are reported as "error" (matching the
+    KPI cards); steps without data in a quarter are omitted.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        pd.DataFrame: Columns kind ("kpi"/"step"), process, item, quarter, status.
+    """
+    quarters = list_quarters(data)
+    rows = []
+    for proc, kpis in data["quarterlyData"].items():
+        for kid, kobj in kpis.items():
+            by_quarter = {x["quarter"]: x.get("value") for x in kobj["data"]}
+            for q in quarters:
+                rows.append(
+                    {
+                        "kind": "kpi",
+                        "process": proc,
+                        "item": kid,
+                        "quarter": q,
+                        "status": status_for(kid, by_quarter.get(q), kobj.get("target")),
+                    }
+                )
+    for proc in data["processStepData"]:
+        for q in quarters:
+            for step, status in process_step_statuses(proc, q, data["processStepData"]).items():
+                rows.append({"kind": "step", "process": proc, "item": step, "quarter": q, "status": status})
+    return pd.DataFrame(rows, columns=["kind", "process", "item", "quarter", "status"])
+
+
+def status_counts(
+    matrix: pd.DataFrame,
+    kind: str,
+    process: str,
+    quarter: str,
+    items: Optional[List[str]] = None,
+) -> Dict[str, int]:
+    """
+    Count statuses for one process and quarter from the status matrix.
+
+    Args:
+        matrix (pd.DataFrame): Output of ``status_matrix``.
+        kind (str): "kpi" or "step".
+        process (str): Process.
+        quarter (str): Quarter.
+        items (Optional[List[str]]): Restrict to these KPI/step ids.
+
+    Returns:
+        Dict[str, int]: Status counts.
+    """
+    sel = matrix[(matrix["kind"] == kind) & (matrix["process"] == process) & (matrix["quarter"] == quarter)]
+    if items is not None:
+        sel = sel[sel["item"].isin(items)]
+    counts = {"success": 0, "warning": 0, "error": 0}
+    for status, n in sel["status"].value_counts().items():
+        counts[status] = int(n)
+    return counts
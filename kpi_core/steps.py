@@ -0,0 +1,295 @@
+"""
+Process-step helpers: step-key parsing, labels and per-quarter step status.
+
+Step keys carry their disaggregation as a suffix
+(``application_screening_reliance_joint_on_site_foreign``). Each key is
+parsed once into (base step, disaggregation) by longest-suffix match, so
+overlapping suffixes such as ``_foreign`` and ``_reliance_joint_on_site_foreign``
+resolve the same way regardless of list order, and a ``StepCatalog`` indexes
+every process's steps by disaggregation for dict-lookup filtering.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from .constants import DISAG_LABEL_SUFFIXES, DISAG_SUFFIXES, STEP_ALIASES
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+
+# Longest first, so "_reliance_joint_on_site_foreign" wins over "_foreign"
+_SUFFIXES_LONGEST_FIRST: Tuple[str, ...] = tuple(
+    sorted(set(DISAG_SUFFIXES) | set(DISAG_LABEL_SUFFIXES.values()), key=len, reverse=True)
+)
+_SUFFIX_LABELS: Dict[str, str] = {suf: label for label, suf in DISAG_LABEL_SUFFIXES.items()}
+
+
+@dataclass(frozen=True)
+class StepKey:
+    """A step key split into its base step and disaggregation."""
+
+    key: str
+    base: str
+    suffix: Optional[str]
+    disag: Optional[str]  # UI label from DISAG_LABEL_SUFFIXES; None for general steps
+
+
+@lru_cache(maxsize=4096)
+def parse_step_key(step_key: str) -> StepKey:
+    """
+    Split a step key by longest matching disaggregation suffix.
+
+    Args:
+        step_key (str): Step identifier.
+
+    Returns:
+        StepKey: Parsed key; ``suffix``/``disag`` are None for general steps.
+    """
+    for suf in _SUFFIXES_LONGEST_FIRST:
+        if len(step_key) > len(suf) and step_key.endswith(suf):
+            return StepKey(step_key, step_key[: -len(suf)], suf, _SUFFIX_LABELS.get(suf))
+    return StepKey(step_key, step_key, None, None)
+
+
+class StepCatalog:
+    """Per-process index of step series by disaggregation (None = general steps)."""
+
+    def __init__(self, processStepData: Dict[str, Any]) -> None:
+        self._index: Dict[str, Dict[Optional[str], Dict[str, Any]]] = {}
+        for process, steps in processStepData.items():
+            by_disag: Dict[Optional[str], Dict[str, Any]] = {None: {}}
+            for key, obj in steps.items():
+                parsed = parse_step_key(key)
+                group = (parsed.disag or parsed.suffix) if parsed.suffix else None
+                by_disag.setdefault(group, {})[key] = obj
+            self._index[process] = by_disag
+
+    def steps(self, process: str, disag: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Steps of a process for one disaggregation.
+
+        Args:
+            process (str): Process.
+            disag (Optional[str]): Disaggregation UI label; None for general steps.
+
+        Returns:
+            Dict[str, Any]: Step key to step object (empty if none).
+        """
+        return self._index.get(process, {}).get(disag, {})
+
+    def disaggregations(self, process: str) -> List[str]:
+        """Disaggregation labels that have step data for a process."""
+        return [d for d in self._index.get(process, {}) if d is not None]
+
+
+_CATALOG_LOCK = threading.Lock()
+_CATALOGS: Dict[int, Tuple[Dict[str, Any], StepCatalog]] = {}
+_CATALOGS_MAX = 8
+
+
+def step_catalog(processStepData: Dict[str, Any]) -> StepCatalog:
+    """
+    Catalog for a loaded ``processStepData`` block, built once per object.
+
+    Loaded datasets are treated as read-only, so the catalog is memoized on the
+    identity of the block (which is held alongside it so the id stays valid).
+
+    Args:
+        processStepData (Dict): Process step data.
+
+    Returns:
+        StepCatalog: The catalog.
+    """
+    with _CATALOG_LOCK:
+        hit = _CATALOGS.get(id(processStepData))
+        if hit is not None and hit[0] is processStepData:
+            return hit[1]
+        catalog = StepCatalog(processStepData)
+        if len(_CATALOGS) >= _CATALOGS_MAX:
+            _CATALOGS.pop(next(iter(_CATALOGS)))
+        _CATALOGS[id(processStepData)] = (processStepData, catalog)
+        return catalog
+
+
+def strip_disag_suffix(step_key: str) -> str:
+    """
+    Remove disaggregation suffix from step key.
+
+    Args:
+        step_key (str): Step identifier.
+
+    Returns:
+        str: Base step key.
+    """
+    return parse_step_key(step_key).base
+
+
+def friendly_step_label(step_key: str) -> str:
+    """
+    Generate user-friendly label for process step.
+
+    Args:
+        step_key (str): Step identifier.
+
+    Returns:
+        str: Display label.
+    """
+    base = strip_disag_suffix(step_key)
+    label = STEP_ALIASES.get(base, base.replace("_", " ").title())
+    return label
+
+
+def wrap_label(text: str, max_len: int = 14) -> str:
+    """
+    Wrap long text into HTML <br> lines.
+
+    Args:
+        text (str): Text to wrap.
+        max_len (int): Max characters per line.
+
+    Returns:
+        str: Wrapped HTML text.
+    """
+    parts, line, count = [], [], 0
+    for word in text.split():
+        add = len(word) + (1 if line else 0)
+        if count + add > max_len:
+            parts.append(" ".join(line))
+            line, count = [word], len(word)
+        else:
+            line.append(word)
+            count += add
+    if line:
+        parts.append(" ".join(line))
+    return "<br>".join(parts)
+
+
+def get_step_status(actual: float, target: float) -> str:
+    """
+    Determine status for process step duration.
+
+    Args:
+        actual (float): Actual days.
+        target (float): Target days.
+
+    Returns:
+        str: Status ("success", "warning", "error").
+    """
+    if actual <= target:
+        return "success"
+    elif actual < target * 1.05:
+        return "warning"
+    else:
+        return "error"
+
+
+def process_step_statuses(
+    process: str, quarter: str, processStepData: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Status of each general (non-disaggregated) process step in a quarter.
+
+    Args:
+        process (str): Process.
+        quarter (str): Quarter.
+        processStepData (Dict): Steps data.
+
+    Returns:
+        Dict[str, str]: Step key to status; steps without data are omitted.
+    """
+    statuses = {}
+    for step_name, step_obj in step_catalog(processStepData).steps(process).items():
+        series = step_obj["data"]
+        cur = next((x for x in series if x["quarter"] == quarter), None)
+        if not cur:
+            continue
+        metric = cur.get("avgDays")
+        target = cur.get("targetDays")
+        if metric is None or target is None:
+            continue
+        statuses[step_name] = get_step_status(float(metric), float(target))
+    return statuses
+
+
+def process_step_status_counts(
+    process: str, quarter: str, processStepData: Dict[str, Any]
+) -> Dict[str, int]:
+    """
+    Count status for process steps.
+
+    Args:
+        process (str): Process.
+        quarter (str): Quarter.
+        processStepData (Dict): Steps data.
+
+    Returns:
+        Dict[str, int]: Status counts.
+    """
+    counts = {"success": 0, "warning": 0, "error": 0}
+    for status in process_step_statuses(process, quarter, processStepData).values():
+        counts[status] += 1
+    return counts
+
+
+def select_steps(
+    process: str, processStepData: Dict[str, Any], disag_choice: str
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Pick the step series to show for a disaggregation choice.
+
+    Args:
+        process (str): Process name.
+        processStepData (Dict): Process step data.
+        disag_choice (str): Disaggregation choice ("All" for general steps).
+
+    Returns:
+        Tuple[Dict[str, Any], bool]: Step key to step object, and whether the
+        general steps were used because no disaggregation-specific steps exist.
+    """
+    catalog = step_catalog(processStepData)
+    general = catalog.steps(process)
+    if disag_choice not in DISAG_LABEL_SUFFIXES:
+        return general, False
+    steps_dict = catalog.steps(process, disag_choice)
+    if not steps_dict:
+        return general, True
+    return steps_dict, False
+
+
+def process_step_rows(
+    process: str, quarter: str, processStepData: Dict[str, Any], disag_choice: str
+) -> Tuple[pd.DataFrame, bool]:
+    """
+    Actual vs target days per step for one quarter.
+
+    Args:
+        process (str): Process name.
+        quarter (str): Selected quarter.
+        processStepData (Dict): Process step data.
+        disag_choice (str): Disaggregation choice.
+
+    Returns:
+        Tuple[pd.DataFrame, bool]: Rows with step (wrapped label), Actual, Target
+        and status, and the fallback flag from ``select_steps``.
+    """
+    steps_dict, fell_back = select_steps(process, processStepData, disag_choice)
+    rows = []
+    for step_key, step_obj in steps_dict.items():
+        series = step_obj["data"]
+        cur = next((x for x in series if x["quarter"] == quarter), None)
+        if not cur:
+            continue
+        metric = cur.get("avgDays")
+        target = cur.get("targetDays")
+        if metric is None or target is None:
+            continue
+        label = wrap_label(friendly_step_label(step_key), max_len=16)
+        status = get_step_status(float(metric), float(target))
+        rows.append(
+            {"step": label, "Actual": float(metric), "Target": float(target), "status": status}
+        )
+    return pd.DataFrame(rows, columns=["step", "Actual", "Target", "status"]), fell_back
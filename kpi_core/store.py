@@ -0,0 +1,239 @@
+"""
+Versioned in-memory KPI store.
+
+A ``KPIStore`` holds one loaded dataset at a time as an immutable
+``Snapshot`` and memoizes everything derived from it (status matrix, KPI
+series, comparison and bottleneck frames, encoded responses) on that
+snapshot. A new data version swaps in a fresh snapshot, so stale derived
+values are dropped with it and readers never see a mix of versions.
+
+The store can follow a file on disk (``refresh`` re-stats it at most every
+``check_interval`` seconds) or be fed by a host process via ``publish`` so the
+dashboard and the HTTP API share one copy of the data.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .bottlenecks import prepare_bottleneck_df
+from .comparison import prepare_category_first_df
+from .constants import KPI_NAME_MAP, TIME_BASED
+from .data import DataError, file_version, list_quarters, load_data
+from .lazy import lazy_import
+from .status import status_for, status_matrix
+from .steps import process_step_rows, step_catalog
+
+pd = lazy_import("pandas")
+
+# Port for the read-only HTTP API embedded in the dashboard process (see kpi_core.api)
+API_PORT_ENV = "KPI_DASH_API_PORT"
+
+
+class Snapshot:
+    """One dataset version plus its memoized derived values."""
+
+    def __init__(self, version: str, data: Dict[str, Any]) -> None:
+        self.version = version
+        self.data = data
+        self.quarters: List[str] = list_quarters(data)
+        self.step_catalog = step_catalog(data["processStepData"])
+        self._memo: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Compute ``fn()`` once per key for this snapshot.
+
+        Concurrent callers asking for the same key wait for the first
+        computation instead of repeating it.
+
+        Args:
+            key (Hashable): Memo key.
+            fn (Callable): Zero-argument builder.
+
+        Returns:
+            Any: The memoized value.
+        """
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._memo:
+                self._memo[key] = fn()
+        return self._memo[key]
+
+    # ---- lookups ----
+    def processes(self) -> List[str]:
+        """Processes with KPI series."""
+        return list(self.data["quarterlyData"])
+
+    def kpi_ids(self, process: str) -> List[str]:
+        """KPI ids reported for a process."""
+        return list(self.data["quarterlyData"].get(process, {}))
+
+    def latest_quarter(self) -> Optional[str]:
+        """Most recent quarter in the dataset."""
+        return self.quarters[-1] if self.quarters else None
+
+    # ---- derived frames ----
+    def status_matrix(self) -> pd.DataFrame:
+        """Status of every KPI and general step for every quarter."""
+        return self.derived(("status_matrix",), lambda: status_matrix(self.data))
+
+    def kpi_series(self, process: str, kpi_id: str) -> pd.DataFrame:
+        """
+        Quarterly values of one KPI with target, baseline and status.
+
+        Args:
+            process (str): Process.
+            kpi_id (str): KPI ID.
+
+        Returns:
+            pd.DataFrame: Columns quarter, value, target, baseline, status.
+        """
+
+        def build() -> pd.DataFrame:
+            kobj = self.data["quarterlyData"][process][kpi_id]
+            target, baseline = kobj.get("target"), kobj.get("baseline")
+            rows = [
+                {
+                    "quarter": x["quarter"],
+                    "value": x.get("value"),
+                    "target": target,
+                    "baseline": baseline,
+                    "status": status_for(kpi_id, x.get("value"), target),
+                }
+                for x in kobj["data"]
+            ]
+            return pd.DataFrame(rows, columns=["quarter", "value", "target", "baseline", "status"])
+
+        return self.derived(("kpi_series", process, kpi_id), build)
+
+    def comparison(self, process: str, kpi_id: str, quarter: str) -> Tuple[pd.DataFrame, str, List[str], List[str]]:
+        """Category-first comparison frame (see ``prepare_category_first_df``)."""
+        return self.derived(
+            ("comparison", process, kpi_id, quarter),
+            lambda: prepare_category_first_df(process, kpi_id, quarter, self.data),
+        )
+
+    def bottlenecks(self, process: str, quarter: str) -> pd.DataFrame:
+        """Bottleneck metrics per step (see ``prepare_bottleneck_df``)."""
+        return self.derived(
+            ("bottlenecks", process, quarter),
+            lambda: prepare_bottleneck_df(process, quarter, self.data["bottleneckData"]),
+        )
+
+    def steps(self, process: str, quarter: str, disag_choice: str = "All") -> Tuple[pd.DataFrame, bool]:
+        """Actual vs target days per step (see ``process_step_rows``)."""
+        return self.derived(
+            ("steps", process, quarter, disag_choice),
+            lambda: process_step_rows(process, quarter, self.data["processStepData"], disag_choice),
+        )
+
+    def kpi_meta(self, process: str, kpi_id: str) -> Dict[str, Any]:
+        """Display name, target and direction of a KPI."""
+        kobj = self.data["quarterlyData"][process][kpi_id]
+        return {
+            "process": process,
+            "kpi_id": kpi_id,
+            "name": KPI_NAME_MAP.get(kpi_id, kpi_id),
+            "target": kobj.get("target"),
+            "baseline": kobj.get("baseline"),
+            "time_based": kpi_id in TIME_BASED,
+        }
+
+
+class KPIStore:
+    """Thread-safe holder of the current ``Snapshot``."""
+
+    def __init__(self, data_path: Optional[str] = None, check_interval: float = 2.0) -> None:
+        self.data_path = data_path
+        self.check_interval = check_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._pending: Optional[Tuple[str, Callable[[], Dict[str, Any]]]] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def publish(self, version: str, data: Dict[str, Any]) -> Snapshot:
+        """
+        Install an already loaded dataset (no-op if ``version`` is current).
+
+        Args:
+            version (str): Dataset version.
+            data (Dict): Loaded data; treated as read-only.
+
+        Returns:
+            Snapshot: The current snapshot.
+        """
+        with self._lock:
+            self._pending = None
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = Snapshot(version, data)
+            return self._snapshot
+
+    def publish_lazy(self, version: str, load: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Make ``version`` current, loaded by ``load`` on the first snapshot request.
+
+        Cheap enough to call on every rerun: nothing is loaded until a client
+        asks, and nothing changes while ``version`` is already current.
+
+        Args:
+            version (str): Dataset version.
+            load (Callable): Returns the loaded data; may raise ``DataError``.
+        """
+        with self._lock:
+            current = self._pending[0] if self._pending else (self._snapshot.version if self._snapshot else None)
+            if current != version:
+                self._pending = (version, load)
+
+    def refresh(self, force: bool = False) -> Snapshot:
+        """
+        Load a pending ``publish_lazy`` version, or reload ``data_path`` if its size or mtime changed.
+
+        Args:
+            force (bool): Ignore ``check_interval``.
+
+        Returns:
+            Snapshot: The current snapshot.
+
+        Raises:
+            DataError: If no dataset is available.
+        """
+        if self._pending is not None:
+            with self._lock:
+                if self._pending is not None:
+                    version, load = self._pending
+                    if self._snapshot is None or self._snapshot.version != version:
+                        self._snapshot = Snapshot(version, load())
+                    self._pending = None
+        now = time.monotonic()
+        if self.data_path and (force or self._snapshot is None or now - self._checked >= self.check_interval):
+            with self._lock:
+                self._checked = now
+                try:
+                    info = os.stat(self.data_path)
+                except OSError:
+                    info = None
+                stat = (info.st_mtime_ns, info.st_size) if info else None
+                if stat is not None and stat != self._stat:
+                    version = file_version(self.data_path)
+                    if self._snapshot is None or self._snapshot.version != version:
+                        self._snapshot = Snapshot(version, load_data(self.data_path))
+                    self._stat = stat
+        if self._snapshot is None:
+            raise DataError(f"Data file not found: {self.data_path}")
+        return self._snapshot
+
+    def snapshot(self) -> Snapshot:
+        """Current snapshot, refreshed from disk when following a file."""
+        return self.refresh()
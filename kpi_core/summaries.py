@@ -0,0 +1,330 @@
+"""
+Overview summaries materialized when a dataset is ingested.
+
+The Overview only ever shows, for one process and quarter, the KPI and step
+status counts (the donuts), the KPI cards (latest value, change vs the
+previous point, status, interval verdict), the forecast outlook and the
+anomalies. ``materialize`` computes these once per dataset version and
+writes them as small Arrow IPC files in a folder next to the dataset
+(``data/kpiData.json`` → ``data/kpiData.summaries/``):
+
+- ``statuses``: ``status.status_matrix``;
+- ``counts``: status counts per (process, quarter) and kind, KPI counts
+  restricted to the base KPIs shown on the Overview;
+- ``cards``: one row per base KPI, process and quarter;
+- ``outlook``: next-quarter forecasts more likely than not to miss target;
+- ``anomalies``: ``anomalies.anomaly_table``;
+- ``quality``: ``validation.quality_report``;
+
+plus ``meta.json`` (dataset version, quarters, base KPI ids per process,
+check and ingest timings), written last so a folder with a current
+``meta.json`` is complete. Tables are indexed by (process, quarter), so a
+page reads its rows with one ``.loc`` lookup.
+
+``load_summaries`` returns None when the folder is missing or was built for
+another version; the caller then loads the full data and materializes it::
+
+    python -m kpi_core.summaries --data data/kpiData.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import pathlib
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .anomalies import anomaly_table
+from .data import list_quarters, load_data, write_atomic
+from .forecast import kpi_forecasts, off_target_outlook
+from .ingest import SOURCES_KEY, dataset_version, is_manifest, load_sources
+from .intervals import kpi_intervals
+from .lazy import lazy_import
+from .status import base_kpi_ids, status_for, status_matrix
+from .validation import QUALITY_KEY, quality_report
+
+pa = lazy_import("pyarrow")
+pd = lazy_import("pandas")
+
+SUMMARY_SUFFIX = ".summaries"
+META_FILE = "meta.json"
+TABLES = ("statuses", "counts", "cards", "outlook", "anomalies", "quality")
+STATUSES = ["success", "warning", "error"]
+INDEX = ["process", "quarter"]
+CARD_COLUMNS = ["kpi_id", "value", "delta", "target", "status", "significance"]
+
+
+@dataclass
+class Summaries:
+    """Materialized Overview tables of one dataset version."""
+
+    version: str
+    quarters: List[str]
+    kpi_ids: Dict[str, List[str]]
+    tables: Dict[str, pd.DataFrame]
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def statuses(self) -> pd.DataFrame:
+        """``status_matrix`` rows (kind, process, item, quarter, status)."""
+        return self.tables["statuses"].reset_index()
+
+    @property
+    def anomalies(self) -> pd.DataFrame:
+        """``anomaly_table`` (indexed by process and quarter)."""
+        return self.tables["anomalies"]
+
+    @property
+    def outlook(self) -> pd.DataFrame:
+        """``off_target_outlook`` of the next quarter."""
+        return self.tables["outlook"]
+
+    @property
+    def quality(self) -> pd.DataFrame:
+        """``quality_report`` rows."""
+        return self.tables["quality"]
+
+    def counts_for(self, kind: str, process: str, quarter: str) -> Dict[str, int]:
+        """
+        Status counts for the Overview donuts.
+
+        Args:
+            kind (str): "kpi" or "step".
+            process (str): Process.
+            quarter (str): Quarter.
+
+        Returns:
+            Dict[str, int]: Count per status (zeros when nothing is recorded).
+        """
+        counts = self.tables["counts"]
+        if (process, quarter) not in counts.index:
+            return dict.fromkeys(STATUSES, 0)
+        rows = counts.loc[[(process, quarter)]]
+        rows = rows[rows["kind"] == kind]
+        return {s: int(rows[s].iloc[0]) if len(rows) else 0 for s in STATUSES}
+
+    def cards_for(self, process: str, quarter: str) -> pd.DataFrame:
+        """
+        KPI card rows of one process and quarter, in Overview order.
+
+        Args:
+            process (str): Process.
+            quarter (str): Quarter.
+
+        Returns:
+            pd.DataFrame: ``CARD_COLUMNS``; value and delta are NaN where
+            the KPI has no point (or no previous point).
+        """
+        cards = self.tables["cards"]
+        if (process, quarter) not in cards.index:
+            return pd.DataFrame(columns=CARD_COLUMNS)
+        return cards.loc[[(process, quarter)]].reset_index(drop=True)
+
+
+def summary_dir(data_path: str) -> pathlib.Path:
+    """Folder holding the summaries of a dataset (``SUMMARY_SUFFIX`` next to it)."""
+    p = pathlib.Path(data_path)
+    if is_manifest(data_path):
+        return p.with_name(p.name.split(".")[0] + SUMMARY_SUFFIX)
+    return p.with_suffix(SUMMARY_SUFFIX)
+
+
+def _cards(
+    data: Dict[str, Any], quarters: List[str], kpi_ids: Dict[str, List[str]], intervals: pd.DataFrame
+) -> pd.DataFrame:
+    significance = dict(
+        zip(zip(intervals["process"], intervals["kpi_id"], intervals["quarter"]), intervals["significance"])
+    )
+    rows = []
+    for proc, ids in kpi_ids.items():
+        for kid in ids:
+            kobj = data["quarterlyData"][proc][kid]
+            series, target = kobj["data"], kobj.get("target")
+            # The card compares with the previous point of the series, which may be several quarters back
+            points: Dict[str, Any] = {}
+            for i, x in enumerate(series):
+                points.setdefault(x["quarter"], (x.get("value"), series[i - 1].get("value") if i else None))
+            for q in quarters:
+                value, prev = points.get(q, (None, None))
+                rows.append(
+                    {
+                        "process": proc,
+                        "quarter": q,
+                        "kpi_id": kid,
+                        "value": value,
+                        "delta": None if prev is None or value is None else value - prev,
+                        "target": target,
+                        "status": status_for(kid, value, target),
+                        "significance": significance.get((proc, kid, q)),
+                    }
+                )
+    cards = pd.DataFrame(rows, columns=INDEX + CARD_COLUMNS)
+    cards[["value", "delta", "target"]] = cards[["value", "delta", "target"]].astype(float)
+    return cards.set_index(INDEX).sort_index(kind="stable")
+
+
+def _counts(statuses: pd.DataFrame, kpi_ids: Dict[str, List[str]]) -> pd.DataFrame:
+    shown = pd.DataFrame([(p, k) for p, ids in kpi_ids.items() for k in ids], columns=["process", "item"])
+    kpis = statuses[statuses["kind"] == "kpi"].merge(shown, on=["process", "item"])
+    rows = pd.concat([kpis, statuses[statuses["kind"] == "step"]], ignore_index=True)
+    counts = (
+        rows.groupby(["process", "quarter", "kind", "status"]).size().unstack("status", fill_value=0)
+        .reindex(columns=STATUSES, fill_value=0)
+        .reset_index()
+    )
+    counts.columns.name = None
+    return counts.set_index(INDEX).sort_index(kind="stable")
+
+
+def build_summaries(data: Dict[str, Any], version: str) -> Summaries:
+    """
+    Compute the Overview summaries of a loaded dataset.
+
+    Args:
+        data (Dict): Loaded data.
+        version (str): Dataset version.
+
+    Returns:
+        Summaries: Tables and metadata (not written anywhere).
+    """
+    quarters = list_quarters(data)
+    kpi_ids = {proc: base_kpi_ids(kpis) for proc, kpis in data["quarterlyData"].items()}
+    statuses = status_matrix(data)
+    quality = quality_report(data)
+    # Free-form cell values of mixed types are shown as text anyway
+    quality = quality.assign(**{c: quality[c].astype(str) for c in quality.columns if quality[c].dtype == object})
+    tables = {
+        "statuses": statuses.set_index(INDEX).sort_index(kind="stable"),
+        "counts": _counts(statuses, kpi_ids),
+        "cards": _cards(data, quarters, kpi_ids, kpi_intervals(data)),
+        "outlook": off_target_outlook(kpi_forecasts(data), horizon=1),
+        "anomalies": anomaly_table(data),
+        "quality": quality,
+    }
+    meta = {
+        "quality_seconds": data[QUALITY_KEY]["seconds"] if QUALITY_KEY in data else None,
+        SOURCES_KEY: data.get(SOURCES_KEY),
+    }
+    return Summaries(version, quarters, kpi_ids, tables, meta)
+
+
+def _ipc(df: pd.DataFrame) -> bytes:
+    # Repeated labels (KPI ids, statuses, rules) are stored once as Arrow dictionaries
+    labels = [c for c in df.columns if pd.api.types.is_string_dtype(df[c]) and df[c].nunique() < len(df) // 2]
+    df = df.astype(dict.fromkeys(labels, "category"))
+    table = pa.Table.from_pandas(df, preserve_index=not isinstance(df.index, pd.RangeIndex))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def write_summaries(summaries: Summaries, out_dir: pathlib.Path) -> int:
+    """
+    Write summaries to ``out_dir``, tables first and ``meta.json`` last.
+
+    Args:
+        summaries (Summaries): Output of ``build_summaries``.
+        out_dir (pathlib.Path): Target folder (created if needed).
+
+    Returns:
+        int: Bytes written.
+
+    Raises:
+        OSError: If the folder is not writable.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for name in TABLES:
+        blob = _ipc(summaries.tables[name])
+        write_atomic(out_dir / f"{name}.arrow", blob)
+        written += len(blob)
+    meta = {
+        "version": summaries.version,
+        "quarters": summaries.quarters,
+        "kpi_ids": summaries.kpi_ids,
+        "written": time.time(),
+        **summaries.meta,
+    }
+    blob = json.dumps(meta, default=str).encode("utf-8")
+    write_atomic(out_dir / META_FILE, blob)
+    return written + len(blob)
+
+
+def load_summaries(out_dir: pathlib.Path, version: str) -> Optional[Summaries]:
+    """
+    Read materialized summaries if they were built for ``version``.
+
+    Args:
+        out_dir (pathlib.Path): Summary folder.
+        version (str): Current dataset version.
+
+    Returns:
+        Optional[Summaries]: Summaries, or None when missing, outdated or unreadable.
+    """
+    try:
+        meta = json.loads((out_dir / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("version") != version:
+            return None
+        tables = {}
+        for name in TABLES:
+            with pa.memory_map(str(out_dir / f"{name}.arrow")) as source:
+                tables[name] = pa.ipc.open_file(source).read_all().to_pandas()
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+    quarters, kpi_ids = meta.pop("quarters"), meta.pop("kpi_ids")
+    for key in ("version", "written"):
+        meta.pop(key, None)
+    return Summaries(version, quarters, kpi_ids, tables, meta)
+
+
+def materialize(data: Dict[str, Any], version: str, data_path: str) -> Summaries:
+    """
+    Build the summaries of a loaded dataset and write them next to it.
+
+    Writing is best effort: on a read-only disk the summaries are returned
+    without being stored.
+
+    Args:
+        data (Dict): Loaded data.
+        version (str): Dataset version.
+        data_path (str): Path of the dataset (or source manifest).
+
+    Returns:
+        Summaries: The summaries built.
+    """
+    summaries = build_summaries(data, version)
+    try:
+        summaries.meta["bytes"] = write_summaries(summaries, summary_dir(data_path))
+    except OSError:
+        pass
+    return summaries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line: ``python -m kpi_core.summaries --data data/kpiData.json``."""
+    parser = argparse.ArgumentParser(description="Materialize the Overview summaries of a dataset.")
+    parser.add_argument("--data", default="data/kpiData.json", help="Path to the KPI JSON file or source manifest.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = load_sources(args.data) if is_manifest(args.data) else load_data(args.data)
+    summaries = materialize(data, dataset_version(args.data), args.data)
+    print(
+        json.dumps(
+            {
+                "folder": str(summary_dir(args.data)),
+                "version": summaries.version,
+                "bytes": summaries.meta.get("bytes"),
+                "seconds": round(time.perf_counter() - started, 2),
+            },
+            indent=2,
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
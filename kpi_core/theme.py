@@ -0,0 +1,306 @@
+"""
+Global CSS for the KPI dashboard.
+
+The stylesheet template is substituted with the theme tokens once per
+process and the rendered string is reused on every rerun.
+"""
+
+from functools import lru_cache
+from string import Template
+
+from .constants import (
+    BG_COLOR,
+    BORDER_COLOR,
+    CARD_BG,
+    NDA_ACCENT,
+    NDA_DARK_GREEN,
+    NDA_GREEN,
+    NDA_LIGHT_GREEN,
+    TEXT_DARK,
+    TEXT_LIGHT,
+)
+
+# Stylesheet source; ``$TOKEN`` placeholders are filled from the theme tokens
+_CSS_SOURCE = """
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
+* {
+    font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif;
+}
+.main .block-container {
+    padding-top: .6rem;
+    padding-bottom: 0;
+    background: $BG_COLOR;
+    max-width: 100%;
+}
+/* Enhanced Header */
+.header {
+    background: linear-gradient(135deg, $NDA_GREEN 0%, $NDA_DARK_GREEN 100%);
+    color: #fff;
+    padding: 1.5rem 2.5rem;
+    margin: -1rem -1rem 2rem -1rem;
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    box-shadow: 0 8px 32px rgba(0,99,65,0.15);
+    border-radius: 0 0 24px 24px;
+    position: relative;
+    overflow: hidden;
+}
+.header::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    right: 0;
+    width: 200px;
+    height: 200px;
+    background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
+    border-radius: 50%;
+}
+.header h1 {
+    font-size: 2rem;
+    margin: 0;
+    font-weight: 800;
+    letter-spacing: -0.02em;
+    background: linear-gradient(135deg, #ffffff 0%, rgba(255,255,255,0.9) 100%);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+}
+.header .subtitle {
+    margin: 0.25rem 0 0 0;
+    opacity: 0.9;
+    font-size: 1.1rem;
+    font-weight: 400;
+    letter-spacing: 0.01em;
+    color: rgba(255,255,255,0.9);
+}
+.header .version {
+    font-size: 0.85rem;
+    opacity: 0.9;
+    font-weight: 600;
+    background: rgba(255,255,255,0.15);
+    padding: 0.5rem 1rem;
+    border-radius: 12px;
+    backdrop-filter: blur(10px);
+    border: 1px solid rgba(255,255,255,0.2);
+}
+/* Enhanced Panels */
+.panel {
+    background: $CARD_BG;
+    border: 1px solid $BORDER_COLOR;
+    border-radius: 16px;
+    box-shadow: 0 4px 24px rgba(0,0,0,0.06);
+    overflow: hidden;
+    margin-bottom: 1.5rem;
+    transition: transform 0.2s ease, box-shadow 0.2s ease;
+}
+.panel:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 8px 32px rgba(0,0,0,0.1);
+}
+.panel-header {
+    background: linear-gradient(135deg, $NDA_GREEN 0%, $NDA_DARK_GREEN 100%);
+    color: white;
+    padding: 1rem 1.5rem;
+    display: flex;
+    align-items: center;
+    justify-content: space-between;
+    border-radius: 16px 16px 0 0;
+}
+.panel-header h3 {
+    margin: 0;
+    font-weight: 700;
+    font-size: 1.1rem;
+    display: flex;
+    align-items: center;
+    gap: 0.5rem;
+}
+.panel-body {
+    padding: 1.5rem;
+}
+.section-header {
+    color: $NDA_DARK_GREEN;
+    font-size: 1.15rem;
+    font-weight: 700;
+    margin: 1.5rem 0 1rem;
+    padding-bottom: 0.5rem;
+    border-bottom: 2px solid $NDA_LIGHT_GREEN;
+}
+.kpi-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+    gap: 1.25rem;
+}
+/* Enhanced KPI Cards */
+.kpi-card {
+    border: 1px solid $BORDER_COLOR;
+    background: #ffffff;
+    border-left: 6px solid $NDA_GREEN;
+    border-radius: 16px;
+    padding: 1.5rem;
+    box-shadow: 0 2px 16px rgba(0,0,0,0.04);
+    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
+    position: relative;
+    overflow: hidden;
+}
+.kpi-card::before {
+    content: '';
+    position: absolute;
+    top: 0;
+    left: 0;
+    right: 0;
+    height: 4px;
+    background: linear-gradient(90deg, $NDA_GREEN, $NDA_ACCENT);
+    opacity: 0;
+    transition: opacity 0.3s ease;
+}
+.kpi-card:hover {
+    transform: translateY(-4px);
+    box-shadow: 0 12px 40px rgba(0,0,0,0.12);
+    border-left-color: $NDA_ACCENT;
+}
+.kpi-card:hover::before {
+    opacity: 1;
+}
+.kpi-title {
+    font-weight: 700;
+    color: $NDA_DARK_GREEN;
+    font-size: 0.95rem;
+    margin-bottom: 0.5rem;
+}
+.kpi-value {
+    font-size: 2rem;
+    font-weight: 800;
+    color: $TEXT_DARK;
+    line-height: 1.1;
+    margin: 0.5rem 0;
+    background: linear-gradient(135deg, $TEXT_DARK, $NDA_DARK_GREEN);
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+}
+.kpi-sub {
+    font-size: 0.78rem;
+    color: $TEXT_LIGHT;
+    text-transform: uppercase;
+    letter-spacing: 0.05em;
+    margin-top: 0.75rem;
+}
+.kpi-chip {
+    display: inline-block;
+    border-radius: 12px;
+    padding: 4px 12px;
+    font-weight: 700;
+    border: 1px solid;
+    font-size: 0.75rem;
+    margin-right: 0.5rem;
+    margin-bottom: 0.5rem;
+    backdrop-filter: blur(10px);
+}
+.kpi-chip.ok {
+    color: $NDA_GREEN;
+    border-color: $NDA_GREEN;
+    background: rgba(0, 99, 65, 0.08);
+}
+.kpi-chip.bad {
+    color: #ef4444;
+    border-color: #ef4444;
+    background: rgba(239, 68, 68, 0.08);
+}
+.stProgress > div > div > div > div {
+    background: linear-gradient(90deg, $NDA_GREEN, $NDA_ACCENT) !important;
+}
+div[data-testid="stHorizontalBlock"] {
+    gap: 1rem;
+}
+/* Enhanced Builder */
+.stepper {
+    display: flex;
+    gap: 0.5rem;
+    margin-bottom: 1rem;
+    flex-wrap: wrap;
+}
+.step-pill {
+    background: #fff;
+    border: 1px solid $BORDER_COLOR;
+    padding: 0.5rem 1rem;
+    border-radius: 12px;
+    font-size: 0.85rem;
+    color: $TEXT_DARK;
+    transition: all 0.2s ease;
+}
+.step-pill.active {
+    background: $NDA_LIGHT_GREEN;
+    border-color: $NDA_GREEN;
+    box-shadow: 0 2px 8px rgba(0, 99, 65, 0.1);
+}
+.help-tag {
+    font-size: 0.78rem;
+    color: $TEXT_LIGHT;
+}
+/* Enhanced Tables */
+.dataframe {
+    border-radius: 12px;
+    overflow: hidden;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.04);
+}
+.dataframe thead th {
+    background: $NDA_LIGHT_GREEN !important;
+    color: $NDA_DARK_GREEN !important;
+    font-weight: 700 !important;
+    border: none !important;
+}
+/* Enhanced Buttons */
+.stButton button {
+    border-radius: 12px !important;
+    font-weight: 600 !important;
+    transition: all 0.2s ease !important;
+}
+.stButton button:hover {
+    transform: translateY(-1px);
+}
+/* Enhanced Sidebar */
+.css-1d391kg, .css-1lcbmhc {
+    background: $CARD_BG !important;
+}
+[data-testid="stSidebar"] {
+    border-right: 1px solid $BORDER_COLOR;
+}
+/* Custom scrollbar */
+::-webkit-scrollbar {
+    width: 6px;
+}
+::-webkit-scrollbar-track {
+    background: $BG_COLOR;
+}
+::-webkit-scrollbar-thumb {
+    background: $NDA_LIGHT_GREEN;
+    border-radius: 3px;
+}
+::-webkit-scrollbar-thumb:hover {
+    background: $NDA_GREEN;
+}
+</style>
+"""
+
+
+@lru_cache(maxsize=1)
+def global_css() -> str:
+    """
+    Render the dashboard stylesheet with theme tokens substituted.
+
+    Returns:
+        str: ``<style>`` block ready for ``st.markdown``.
+    """
+    return Template(_CSS_SOURCE).substitute(
+        BG_COLOR=BG_COLOR,
+        NDA_GREEN=NDA_GREEN,
+        NDA_DARK_GREEN=NDA_DARK_GREEN,
+        NDA_ACCENT=NDA_ACCENT,
+        BORDER_COLOR=BORDER_COLOR,
+        CARD_BG=CARD_BG,
+        TEXT_DARK=TEXT_DARK,
+        TEXT_LIGHT=TEXT_LIGHT,
+        NDA_LIGHT_GREEN=NDA_LIGHT_GREEN,
+    )
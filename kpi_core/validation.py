@@ -0,0 +1,434 @@
+"""
+Columnar data-quality validation of a loaded dataset.
+
+Every series of records in the export (KPI values, KPI counts, volumes,
+process steps, bottlenecks, step counts) is flattened once into a record
+table and a long field table (one row per non-null field of a record,
+located by section, process, series, index and field). The checks are
+column operations over those tables:
+
+- types: values that are not numbers;
+- ranges: negative counts, durations or scores, and percentages above 100;
+- quarters: labels that do not parse, repeated and out-of-order records
+  within a series, and gaps between a series' first and last quarter;
+- numerator ≤ denominator: KPI counts, and the volume pairs behind the
+  rate metrics (``aggregation.VOLUME_RATIOS``);
+- KPIs without a value or a numeric target;
+- child/parent consistency: disaggregated KPIs (``DISAG_KPI_LINKS``) that
+  are missing or cover other quarters than their parent, and parent values
+  outside the range of all their disaggregations (a weighted average or a
+  median of the parts cannot be).
+
+Issues of severity "error" are quarantined: ``quarantine`` removes the
+offending field, or the whole record for record-level rules, and keeps it
+with the issue list under ``data["dataQuality"]``, so no view renders a value
+known to be wrong. ``load_data`` runs both steps; fine-grained sections kept
+under ``"finePeriods"`` are not checked.
+"""
+
+from __future__ import annotations
+
+import time
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .aggregation import VOLUME_RATIOS
+from .constants import DISAG_KPI_LINKS
+from .lazy import lazy_import
+from .periods import QUARTER, parse_period
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+ERROR = "error"
+WARNING = "warning"
+
+RULE_TYPE = "type"
+RULE_NEGATIVE = "negative"
+RULE_PERCENT = "percent_range"
+RULE_QUARTER = "quarter_label"
+RULE_DUPLICATE = "duplicate_quarter"
+RULE_ORDER = "quarter_order"
+RULE_GAP = "quarter_gap"
+RULE_RATIO = "numerator_gt_denominator"
+RULE_MISSING_VALUE = "missing_value"
+RULE_TARGET = "missing_target"
+RULE_CHILD_MISSING = "child_missing"
+RULE_CHILD_QUARTERS = "child_quarters"
+RULE_CHILD_RANGE = "parent_outside_children"
+
+ISSUE_COLUMNS = ["severity", "rule", "section", "process", "series", "index", "quarter", "field", "value", "message"]
+# ``field`` of record-level issues (quarantine drops the whole record)
+RECORD = "*"
+# ``index`` of series-level issues
+SERIES = -1
+QUALITY_KEY = "dataQuality"
+
+# {process: {series: {"data": [records]}}}
+_NESTED_DATA = ("quarterlyData", "processStepData")
+# {process: {series: [records]}}
+_NESTED_LIST = ("kpiCounts", "bottleneckData", "processStepCounts")
+# {process: [records]}
+_FLAT = ("quarterlyVolumes", "inspectionVolumes")
+_PERIOD_KEYS = ("quarter", "period")
+# Exact types accepted as values (bool is an int subclass but not a value)
+_NUMERIC_TYPES = {int, float, type(None)}
+_LOCATION = ["section", "process", "series", "index"]
+_REMOVED = _LOCATION + ["quarter", "rule", "field"]
+_KPI = "quarterlyData"
+
+
+def _series(data: Dict[str, Any]) -> Iterator[Tuple[str, str, str, List[Dict[str, Any]]]]:
+    """Every (section, process, series, records) of the export."""
+    for section in _NESTED_DATA:
+        for process, block in (data.get(section) or {}).items():
+            for key, obj in (block or {}).items():
+                yield section, process, key, (obj or {}).get("data") or []
+    for section in _NESTED_LIST:
+        for process, block in (data.get(section) or {}).items():
+            for key, records in (block or {}).items():
+                yield section, process, key, records or []
+    for section in _FLAT:
+        for process, records in (data.get(section) or {}).items():
+            yield section, process, "", records or []
+
+
+def _records_of(data: Dict[str, Any], section: str, process: str, series: str) -> List[Dict[str, Any]]:
+    """The record list a location refers to."""
+    if section in _NESTED_DATA:
+        return data[section][process][series]["data"]
+    if section in _NESTED_LIST:
+        return data[section][process][series]
+    return data[section][process]
+
+
+def record_table(data: Dict[str, Any]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    The export flattened into a record table and a long field table.
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: Records (section, process,
+        series, index, quarter, period_id; period_id NaN where the label is
+        missing or not a quarter) and fields (the record columns plus row,
+        the position in the record table, field, value, bad_type and raw,
+        the original object where bad_type).
+    """
+    keys, lengths, sections = [], [], {}
+    for section, process, series, recs in _series(data):
+        keys.append((section, process, series))
+        lengths.append(len(recs))
+        sections.setdefault(section, []).extend(recs)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    owner = np.repeat(np.arange(len(keys)), lengths)
+    # Categorical locations keep the long field table cheap to build and group
+    rec = pd.DataFrame(keys, columns=["section", "process", "series"]).astype("category").iloc[owner]
+    rec = rec.reset_index(drop=True)
+    rec["index"] = np.arange(len(owner), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    # Sections are contiguous in the record table and each has its own fields
+    labels, parts, names, offset = [], [], [], 0
+    for records in sections.values():
+        label = [r.get(_PERIOD_KEYS[0]) for r in records]
+        if None in label:
+            label = [q if q is not None else r.get(_PERIOD_KEYS[1]) for q, r in zip(label, records)]
+        labels.extend(label)
+        for field in set(chain.from_iterable(records)).difference(_PERIOD_KEYS):
+            column = [r.get(field) for r in records]
+            if set(map(type, column)) <= _NUMERIC_TYPES:
+                values = np.array(column, dtype=float)
+                rows = np.flatnonzero(~np.isnan(values))
+                values, bad, raw = values[rows], np.zeros(len(rows), dtype=bool), None
+            else:
+                rows = np.flatnonzero([v is not None for v in column])
+                raw = np.array([column[i] for i in rows], dtype=object)
+                bad = np.array([type(v) not in _NUMERIC_TYPES for v in raw], dtype=bool)
+                values = np.where(bad, np.nan, raw).astype(float)
+            parts.append(
+                pd.DataFrame({"row": rows + offset, "field": len(names), "value": values, "bad_type": bad, "raw": raw})
+            )
+            names.append(field)
+        offset += len(records)
+
+    label = pd.Series(labels, index=rec.index, dtype=object)
+    ids: Dict[Any, float] = {}
+    for q in label.dropna().unique():
+        try:
+            gran, pid = parse_period(str(q))
+        except ValueError:
+            gran, pid = None, 0
+        ids[q] = float(pid) if gran == QUARTER else np.nan
+    rec["quarter"] = label.astype("category")
+    rec["period_id"] = label.map(ids).astype(float)
+    if not parts:
+        return rec, rec.iloc[:0].assign(field="", value=np.nan, bad_type=False, raw=None)
+    fields = pd.concat(parts, ignore_index=True)
+    fields["field"] = pd.Categorical.from_codes(fields["field"].to_numpy(), names)
+    located = rec.iloc[fields["row"].to_numpy()].reset_index(drop=True)
+    return rec, pd.concat([located, fields], axis=1)
+
+
+def _fmt(values: pd.Series, spec: str = "{:g}") -> pd.Series:
+    """Numbers formatted for issue messages (string dtype even when empty)."""
+    return values.map(spec.format).astype(str)
+
+
+def _issues(
+    rows: pd.DataFrame, severity: str, rule: str, message: Any, field: Optional[str] = None
+) -> pd.DataFrame:
+    """Issue rows for the rows of a record or field table."""
+    return pd.DataFrame(
+        {
+            "severity": severity,
+            "rule": rule,
+            "section": rows["section"],
+            "process": rows["process"],
+            "series": rows["series"],
+            "index": rows["index"],
+            "quarter": rows["quarter"],
+            "field": rows["field"] if field is None else field,
+            "value": rows["value"] if "value" in rows.columns else np.nan,
+            "message": message,
+        }
+    )
+
+
+def _field_checks(fields: pd.DataFrame) -> List[pd.DataFrame]:
+    """Types, negative values and percentages above 100."""
+    bad_type = fields["bad_type"].to_numpy(dtype=bool)
+    typed = fields[bad_type]
+    value = fields["value"].to_numpy()
+    # Percentage KPIs are named pct_*, percentage fields *_pct
+    kpi_pct = (
+        (fields["section"] == _KPI).to_numpy()
+        & (fields["field"] == "value").to_numpy()
+        & fields["series"].str.startswith("pct_").to_numpy(dtype=bool)
+    )
+    pct_field = fields["field"].str.endswith("_pct").to_numpy(dtype=bool)
+    with np.errstate(invalid="ignore"):
+        negative = value < 0
+        over = (kpi_pct | pct_field) & (value > 100)
+    return [
+        _issues(typed.assign(value=np.nan), ERROR, RULE_TYPE, "Not a number: " + typed["raw"].astype(str)),
+        _issues(fields[negative], ERROR, RULE_NEGATIVE, "Negative value"),
+        _issues(fields[over], ERROR, RULE_PERCENT, "Percentage above 100"),
+    ]
+
+
+def _quarter_checks(records: pd.DataFrame) -> List[pd.DataFrame]:
+    """Quarter labels, repeats, order and gaps within each series."""
+    out = [
+        _issues(records[records["period_id"].isna()], ERROR, RULE_QUARTER, "Missing or unrecognised quarter", RECORD)
+    ]
+    ok = records[records["period_id"].notna()]
+    repeated = ok.duplicated(["section", "process", "series", "period_id"], keep="first")
+    out.append(_issues(ok[repeated], ERROR, RULE_DUPLICATE, "Quarter already reported in this series", RECORD))
+    ok = ok[~repeated]
+    by_series = ["section", "process", "series"]
+    step = ok["period_id"] - ok.groupby(by_series, sort=False, observed=True)["period_id"].shift(1)
+    out.append(_issues(ok[step < 0], WARNING, RULE_ORDER, "Listed after a later quarter", RECORD))
+    ok = ok.sort_values(by_series + ["period_id"], kind="stable")
+    gap = ok["period_id"] - ok.groupby(by_series, sort=False, observed=True)["period_id"].shift(1) - 1
+    gaps = ok[gap > 0]
+    out.append(
+        _issues(gaps, WARNING, RULE_GAP, gap[gap > 0].astype(int).astype(str) + " quarter(s) missing before", RECORD)
+    )
+    return out
+
+
+def _per_record(records: pd.DataFrame, fields: pd.DataFrame, select: np.ndarray) -> np.ndarray:
+    """Value of the selected field rows aligned with the record table (NaN where absent)."""
+    out = np.full(len(records), np.nan)
+    out[fields["row"].to_numpy()[select]] = fields["value"].to_numpy()[select]
+    return out
+
+
+def _ratio_checks(records: pd.DataFrame, fields: pd.DataFrame) -> List[pd.DataFrame]:
+    """Numerator ≤ denominator: KPI counts (error) and rate volume pairs (warning)."""
+    counts = fields[(fields["section"] == "kpiCounts").to_numpy()]
+    num = _per_record(records, counts, (counts["field"] == "numerator").to_numpy())
+    den = _per_record(records, counts, (counts["field"] == "denominator").to_numpy())
+    with np.errstate(invalid="ignore"):
+        bad = np.flatnonzero(num > den)
+    message = "Numerator " + _fmt(pd.Series(num[bad])) + " > denominator " + _fmt(pd.Series(den[bad]))
+    out = [_issues(records.iloc[bad].assign(value=num[bad]), ERROR, RULE_RATIO, message.to_numpy(), RECORD)]
+
+    volumes = fields[fields["section"].isin(_FLAT).to_numpy()]
+    field = volumes["field"].astype(object).to_numpy()
+    process = records["process"].to_numpy()
+    for p, n, d in dict.fromkeys((v.process, v.numerator, v.denominator) for v in VOLUME_RATIOS):
+        num = _per_record(records, volumes, field == n)
+        den = _per_record(records, volumes, field == d)
+        with np.errstate(invalid="ignore"):
+            bad = np.flatnonzero((num > den) & (process == p))
+        if len(bad):
+            message = f"{n} " + _fmt(pd.Series(num[bad])) + f" > {d} " + _fmt(pd.Series(den[bad]))
+            out.append(_issues(records.iloc[bad].assign(value=num[bad]), WARNING, RULE_RATIO, message.to_numpy(), n))
+    return out
+
+
+def _kpi_checks(data: Dict[str, Any], records: pd.DataFrame, fields: pd.DataFrame) -> List[pd.DataFrame]:
+    """Missing values and targets, and disaggregated KPIs against their parent."""
+    kpi = (records["section"] == _KPI).to_numpy() & records["period_id"].notna().to_numpy()
+    select = (fields["section"] == _KPI).to_numpy() & (fields["field"] == "value").to_numpy()
+    present = np.zeros(len(records), dtype=bool)
+    present[fields["row"].to_numpy()[select]] = True
+    out = [_issues(records[kpi & ~present], WARNING, RULE_MISSING_VALUE, "No value", "value")]
+    value = _per_record(records, fields, select & ~fields["bad_type"].to_numpy())
+    kpi_records = records[kpi]
+    values = kpi_records.assign(value=value[kpi]).dropna(subset=["value"])
+
+    rows = []
+    for process, block in data.get(_KPI, {}).items():
+        for kpi_id, kobj in block.items():
+            if not isinstance(kobj.get("target"), (int, float)):
+                rows.append((process, kpi_id, RULE_TARGET, "target", "No numeric target"))
+            for child in DISAG_KPI_LINKS.get(kpi_id, {}).values():
+                if child not in block:
+                    rows.append((process, child, RULE_CHILD_MISSING, RECORD, f"Disaggregation of {kpi_id} missing"))
+    series_level = pd.DataFrame(rows, columns=["process", "series", "rule", "field", "message"])
+    for rule, grp in series_level.groupby("rule", sort=False):
+        out.append(_issues(grp.assign(section=_KPI, index=SERIES, quarter=None), WARNING, rule, grp["message"]))
+
+    links = pd.DataFrame(
+        [(base, child) for base, mapping in DISAG_KPI_LINKS.items() for child in mapping.values()],
+        columns=["parent", "series"],
+    )
+    cover = kpi_records[["process", "series", "index", "quarter", "period_id"]]
+    children = cover.merge(links, on="series")
+    parents = cover.rename(columns={"series": "parent"})[["process", "parent", "quarter", "period_id"]]
+    # Only pairs where both the parent and the child are reported
+    pairs = children[["process", "parent", "series"]].drop_duplicates().merge(
+        parents[["process", "parent"]].drop_duplicates(), on=["process", "parent"]
+    )
+    extra = children.merge(pairs, on=["process", "parent", "series"]).merge(
+        parents, on=["process", "parent", "period_id"], how="left", suffixes=("", "_parent"), indicator=True
+    )
+    extra = extra[extra["_merge"] == "left_only"].assign(section=_KPI)
+    out.append(_issues(extra, WARNING, RULE_CHILD_QUARTERS, "Quarter not reported by " + extra["parent"], RECORD))
+    lacking = parents.merge(pairs, on=["process", "parent"]).merge(
+        children[["process", "series", "period_id"]], on=["process", "series", "period_id"], how="left", indicator=True
+    )
+    lacking = lacking[lacking["_merge"] == "left_only"].assign(section=_KPI, index=SERIES)
+    out.append(_issues(lacking, WARNING, RULE_CHILD_QUARTERS, "Quarter reported by " + lacking["parent"], RECORD))
+
+    child_values = values.merge(links, on="series")
+    span = (
+        child_values.groupby(["process", "parent", "period_id"], observed=True)["value"]
+        .agg(["min", "max", "size"])
+        .reset_index()
+        .merge(links.groupby("parent").size().rename("expected").reset_index(), on="parent")
+    )
+    span = span[span["size"] == span["expected"]].merge(
+        values.rename(columns={"series": "parent"}), on=["process", "parent", "period_id"]
+    )
+    tol = 1e-6 * np.maximum(span["max"].abs(), 1.0)
+    outside = span[(span["value"] < span["min"] - tol) | (span["value"] > span["max"] + tol)]
+    message = (
+        "Outside its disaggregations ("
+        + _fmt(outside["min"], "{:.1f}") + "–" + _fmt(outside["max"], "{:.1f}") + ")"
+    )
+    out.append(_issues(outside.rename(columns={"parent": "series"}), WARNING, RULE_CHILD_RANGE, message, "value"))
+    return out
+
+
+def validate(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Run every check over a loaded dataset (the data is not modified).
+
+    Args:
+        data (Dict): Loaded data (quarterly sections).
+
+    Returns:
+        pd.DataFrame: ``ISSUE_COLUMNS``, errors first. ``index`` is the
+        record's position in its series (``SERIES`` for series-level
+        issues); ``field`` is ``RECORD`` for record-level issues.
+    """
+    records, fields = record_table(data)
+    parts = [
+        p
+        for p in _field_checks(fields)
+        + _quarter_checks(records)
+        + _ratio_checks(records, fields)
+        + _kpi_checks(data, records, fields)
+        if not p.empty
+    ]
+    if not parts:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    issues = pd.concat(parts, ignore_index=True)[ISSUE_COLUMNS]
+    issues = issues.astype({c: object for c in ["section", "process", "series", "quarter"]} | {"index": np.int64})
+    return issues.sort_values(["severity", "section", "process", "series", "index"], kind="stable", ignore_index=True)
+
+
+def quarantine(data: Dict[str, Any], issues: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Remove the values and records of error issues from ``data`` (in place).
+
+    Args:
+        data (Dict): Loaded data the issues were found in.
+        issues (pd.DataFrame): Output of ``validate``.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per removed item: section, process,
+        series, index, quarter, rule, field and the removed value (``RECORD``
+        entries hold the whole record).
+    """
+    errors = issues[(issues["severity"] == ERROR) & (issues["index"] != SERIES)]
+    dropped = errors[errors["field"] == RECORD].drop_duplicates(_LOCATION)
+    gone = set(dropped[_LOCATION].itertuples(index=False, name=None))
+    removed = []
+    for issue in errors[errors["field"] != RECORD].to_dict("records"):
+        if tuple(issue[k] for k in _LOCATION) in gone:
+            continue
+        record = _records_of(data, issue["section"], issue["process"], issue["series"])[issue["index"]]
+        if issue["field"] in record:
+            removed.append({k: issue[k] for k in _REMOVED} | {"value": record.pop(issue["field"])})
+    # Highest index first so earlier positions in the series stay valid
+    for issue in dropped.sort_values("index", ascending=False, kind="stable").to_dict("records"):
+        records = _records_of(data, issue["section"], issue["process"], issue["series"])
+        removed.append({k: issue[k] for k in _REMOVED} | {"value": records.pop(issue["index"])})
+    return removed
+
+
+def check_and_quarantine(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Validate ``data``, quarantine its errors and attach the report.
+
+    Args:
+        data (Dict): Loaded data; modified in place.
+
+    Returns:
+        Dict[str, Any]: ``data``, with ``data["dataQuality"]`` holding
+        issues (records of ``ISSUE_COLUMNS``), quarantined (see
+        ``quarantine``), values (fields checked) and seconds.
+    """
+    start = time.perf_counter()
+    issues = validate(data)
+    removed = quarantine(data, issues)
+    data[QUALITY_KEY] = {
+        "issues": issues.to_dict("records"),
+        "quarantined": removed,
+        "seconds": time.perf_counter() - start,
+    }
+    return data
+
+
+def quality_report(data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Issue table attached by ``check_and_quarantine`` (empty if none ran).
+
+    Args:
+        data (Dict): Loaded data.
+
+    Returns:
+        pd.DataFrame: ``ISSUE_COLUMNS`` plus quarantined (the item was
+        removed from the data).
+    """
+    report = data.get(QUALITY_KEY) or {}
+    issues = pd.DataFrame(report.get("issues", []), columns=ISSUE_COLUMNS)
+    removed = pd.DataFrame(report.get("quarantined", []), columns=_LOCATION + ["rule"])
+    flagged = issues.merge(removed.drop_duplicates(), on=_LOCATION + ["rule"], how="left", indicator=True)
+    issues["quarantined"] = (flagged["_merge"] == "both").to_numpy()
+    return issues
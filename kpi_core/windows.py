@@ -0,0 +1,210 @@
+"""
+Year-over-year, rolling and year-to-date measures for self-service analytics.
+
+The analytics pool is reduced once per dataset version to one cell per
+(source, process, metric, category, quarter) with the same rule as
+``ratio_pivot`` (rates pooled from their components, volumes summed, other
+metrics averaged). Window measures are then added as columns, each a
+group-wise transform over the cells sorted by period ordinal:
+
+- YoY change and YoY % change against the same quarter a year earlier
+  (joined on ``period_id - 4``, so a missing quarter never shifts the
+  comparison onto the wrong year);
+- rolling mean and median over ``ROLLING_WINDOWS`` quarters, only where
+  the window covers that many consecutive quarters. For rates the rolling
+  mean is the pooled rate of the window (rolling numerator ÷ rolling
+  denominator);
+- year-to-date values: cumulative sums for volumes, the pooled rate of the
+  year so far for rates, and the running mean for everything else.
+
+``windowed_pool`` turns one measure back into analytics-pool rows for a
+scope, so the builder switches measures with a join and a column pick.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .aggregation import ADDITIVE_SOURCES, RATE_SCALE, is_ratio_metric
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+ROLLING_WINDOWS: Tuple[int, ...] = (2, 4)
+QUARTERS_PER_YEAR = 4
+# Pool source of measures that must be averaged, not summed, across cells
+WINDOW_SOURCE = "windows"
+# Builder choice for the plain quarterly values
+VALUE_MEASURE = "value"
+
+CELL_KEYS = ["source", "process", "metric_name", "category"]
+
+
+@dataclass(frozen=True)
+class WindowMeasure:
+    """A window column of the window table and how it aggregates."""
+
+    key: str
+    label: str
+    additive: bool
+    components: Optional[Tuple[str, str]] = None
+
+
+WINDOW_MEASURES: List[WindowMeasure] = (
+    [
+        WindowMeasure("yoy_delta", "Change vs same quarter last year", True),
+        WindowMeasure("yoy_pct", "% change vs same quarter last year", False),
+    ]
+    + [
+        m
+        for n in ROLLING_WINDOWS
+        for m in (
+            WindowMeasure(f"rolling_mean_{n}", f"Rolling mean ({n} quarters)", True, (f"rolling_num_{n}", f"rolling_den_{n}")),
+            WindowMeasure(f"rolling_median_{n}", f"Rolling median ({n} quarters)", False),
+        )
+    ]
+    + [WindowMeasure("ytd", "Year to date", True, ("ytd_num", "ytd_den"))]
+)
+
+_MEASURES = {m.key: m for m in WINDOW_MEASURES}
+
+
+def measure_label(key: str) -> str:
+    """Display label of a measure key (including ``VALUE_MEASURE``)."""
+    return "Quarterly value" if key == VALUE_MEASURE else _MEASURES[key].label
+
+
+def _cells(pool: pd.DataFrame) -> pd.DataFrame:
+    """One row per (source, process, metric, category, quarter), pooled like ``ratio_pivot``."""
+    rows = pool.assign(
+        category=pool["category"].fillna("").astype(str),
+        numerator=pool["numerator"] if "numerator" in pool.columns else np.nan,
+        denominator=pool["denominator"] if "denominator" in pool.columns else np.nan,
+    )
+    cells = rows.groupby(CELL_KEYS + ["quarter"], sort=False, as_index=False).agg(
+        value_sum=("value", "sum"),
+        value_mean=("value", "mean"),
+        numerator=("numerator", "sum"),
+        denominator=("denominator", "sum"),
+        components=("denominator", "count"),
+        period_id=("period_id", "first"),
+    )
+    # Cells without components stay NaN rather than summing to 0
+    cells[["numerator", "denominator"]] = cells[["numerator", "denominator"]].where(cells["components"] > 0)
+    rate = is_ratio_metric(cells)
+    additive = cells["source"].isin(ADDITIVE_SOURCES)
+    cells["value"] = np.where(
+        rate, cells["numerator"] / cells["denominator"] * RATE_SCALE, np.where(additive, cells["value_sum"], cells["value_mean"])
+    )
+    cells["period_id"] = cells["period_id"].astype(np.int64)
+    cells["year"] = cells["period_id"] // QUARTERS_PER_YEAR
+    cells["rate"], cells["additive"] = rate, additive & ~rate
+    return cells.drop(columns=["value_sum", "value_mean", "components"])
+
+
+def window_table(pool: pd.DataFrame) -> pd.DataFrame:
+    """
+    Quarterly cells of an analytics pool with every window measure as a column.
+
+    Args:
+        pool (pd.DataFrame): Analytics rows of all sources (unscoped).
+
+    Returns:
+        pd.DataFrame: One row per (source, process, metric_name, category,
+        quarter), sorted by group and period, with value, numerator,
+        denominator, period_id, year, rate/additive flags, the
+        ``WINDOW_MEASURES`` columns and their rate components. Category is
+        "" where the pool has none.
+    """
+    if pool.empty:
+        return pd.DataFrame()
+    cells = _cells(pool).sort_values(CELL_KEYS + ["period_id"], kind="stable", ignore_index=True)
+    g = cells.groupby(CELL_KEYS, sort=False)
+    rate, additive = cells["rate"].to_numpy(), cells["additive"].to_numpy()
+
+    # Year over year: exact join on the period a year earlier
+    prior = cells[CELL_KEYS + ["period_id", "value"]].assign(period_id=cells["period_id"] + QUARTERS_PER_YEAR)
+    last_year = cells[CELL_KEYS + ["period_id"]].merge(prior, on=CELL_KEYS + ["period_id"], how="left")["value"]
+    cells["yoy_delta"] = cells["value"] - last_year.to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cells["yoy_pct"] = np.where(last_year != 0, cells["yoy_delta"] / last_year.abs().to_numpy() * 100, np.nan)
+
+    # Rolling windows over consecutive quarters (cumulative sums differenced n rows back)
+    comp = cells[["value", "numerator", "denominator"]].fillna(0.0)
+    cum = comp.groupby([cells[k] for k in CELL_KEYS], sort=False).cumsum()
+    for n in ROLLING_WINDOWS:
+        full = (cells["period_id"] - g["period_id"].shift(n - 1)) == n - 1
+        back = cum.groupby([cells[k] for k in CELL_KEYS], sort=False).shift(n).fillna(0.0)
+        sums = (cum - back).where(full)
+        cells[f"rolling_num_{n}"] = sums["numerator"].where(rate)
+        cells[f"rolling_den_{n}"] = sums["denominator"].where(rate)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pooled = sums["numerator"] / sums["denominator"] * RATE_SCALE
+        cells[f"rolling_mean_{n}"] = np.where(rate, pooled, sums["value"] / n)
+        median = g["value"].rolling(n, min_periods=n).median().reset_index(level=list(range(len(CELL_KEYS))), drop=True)
+        cells[f"rolling_median_{n}"] = median.where(full)
+
+    # Year to date
+    gy = comp.groupby([cells[k] for k in CELL_KEYS + ["year"]], sort=False)
+    ytd = gy.cumsum()
+    count = gy.cumcount() + 1
+    cells["ytd_num"] = ytd["numerator"].where(rate)
+    cells["ytd_den"] = ytd["denominator"].where(rate)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ytd_rate = ytd["numerator"] / ytd["denominator"] * RATE_SCALE
+    cells["ytd"] = np.where(rate, ytd_rate, np.where(additive, ytd["value"], ytd["value"] / count))
+    return cells
+
+
+def windowed_pool(
+    table: pd.DataFrame, measure: str, scope: Optional[pd.DataFrame] = None, year_end: bool = False
+) -> pd.DataFrame:
+    """
+    Analytics-pool rows carrying one window measure as ``value``.
+
+    Additive measures keep their source (volumes still sum across cells)
+    and rates carry the measure's components, so ``ratio_pivot`` pools them;
+    other measures get source ``WINDOW_SOURCE`` and are averaged.
+
+    Args:
+        table (pd.DataFrame): Output of ``window_table``.
+        measure (str): A ``WINDOW_MEASURES`` key.
+        scope (Optional[pd.DataFrame]): Pool rows that define the scope
+            (processes, sources and quarters); all cells when None.
+        year_end (bool): Keep only the last quarter of each year per series,
+            for yearly views of quarterly window measures.
+
+    Returns:
+        pd.DataFrame: Columns source, process, quarter, period_id, year,
+        metric_name, category, value, numerator, denominator; rows without
+        a value are dropped.
+
+    Raises:
+        KeyError: For an unknown measure.
+    """
+    spec = _MEASURES[measure]
+    cells = table
+    if scope is not None:
+        keys = scope[CELL_KEYS + ["quarter"]].assign(category=scope["category"].fillna("").astype(str))
+        cells = table.merge(keys.drop_duplicates(), on=CELL_KEYS + ["quarter"])
+    cells = cells[cells[spec.key].notna()]
+    if year_end and not cells.empty:
+        last = cells.groupby(CELL_KEYS + ["year"], sort=False)["period_id"].transform("max")
+        cells = cells[cells["period_id"] == last]
+    num, den = spec.components if spec.components else (None, None)
+    return pd.DataFrame(
+        {
+            "source": cells["source"] if spec.additive else WINDOW_SOURCE,
+            "process": cells["process"],
+            "quarter": cells["quarter"],
+            "period_id": cells["period_id"],
+            "year": cells["year"].astype(int),
+            "metric_name": cells["metric_name"],
+            "category": cells["category"].replace("", None),
+            "value": cells[spec.key],
+            "numerator": cells[num] if num else np.nan,
+            "denominator": cells[den] if den else np.nan,
+        }
+    ).reset_index(drop=True)
@@ -27,18 +27,92 @@ Version: 4.2 (Enhanced Analytics)
 Last Updated: November 11, 2025
 """
 
-import json
+from __future__ import annotations
+
+import functools
+import hashlib
+import logging
+import os
 import pathlib
 import io
-import random
-from typing import Dict, Any, List, Tuple, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, List, Mapping, Tuple, Optional, Callable
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
-from scipy import stats  # For correlation/regression insights
-from string import Template
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from kpi_core import (
+    DataError,
+    base_kpi_ids,
+    filter_period,
+    fine_bottleneck_df,
+    global_css,
+    lazy_import,
+    metric_display_name,
+    period_year,
+    prep_analysis,
+    prepare_bottleneck_df,
+    prepare_category_first_df,
+    process_step_rows,
+    quarter_order_key,
+    resolve_effective_kpi_id,
+    status_for,
+)
+from kpi_core import flatten_steps_for_analytics as core_flatten_steps_for_analytics
+from kpi_core import flatten_volumes as core_flatten_volumes
+from kpi_core import load_data as core_load_data
+from kpi_core.instrumentation import ADMIN_TOKEN_ENV, METRICS_FILE_ENV, METRICS_PORT_ENV, PROFILER
+from kpi_core.constants import (
+    BORDER_COLOR,
+    CARD_BG,
+    DISAG_UI_OPTIONS,
+    KPI_NAME_MAP,
+    KPI_PROCESS_MAP,
+    NDA_ACCENT,
+    NDA_DARK_GREEN,
+    NDA_GREEN,
+    PALETTE,
+    TEXT_DARK,
+    TIME_BASED,
+)
+from kpi_core.figures import (
+    TREND_WEBGL_THRESHOLD,
+    aging_heatmap_figure,
+    backlog_figure,
+    compact_figure,
+    comparison_figure,
+    cumulative_flow_figure,
+    cycle_time_figure,
+    fine_bottleneck_figure,
+    flow_ranking_figure,
+    steps_figure,
+    trend_figure,
+    trend_periods,
+)
+from kpi_core.aggregation import RATIO_AGG, ratio_components, yearly_components
+from kpi_core.anomalies import KIND_SHIFT, anomalies_for, anomaly_label
+from kpi_core.correlation import MAX_LAG, correlation_matrix, correlation_scan, pairs_involving
+from kpi_core.bottlenecks import aging_matrix, bottleneck_analytics, flatten_bottleneck_analytics
+from kpi_core.flow import FlowMatrix, cumulative_flow, flow_matrices, flow_summary
+from kpi_core.forecast import MAX_HORIZON, forecast_band, kpi_forecasts
+from kpi_core.ingest import SOURCES_KEY, is_manifest, load_sources
+from kpi_core.ingest import dataset_version as core_dataset_version
+from kpi_core.intervals import SIG_BELOW, kpi_band, kpi_intervals
+from kpi_core.shared_cache import SharedCache, shared_cache_from_env
+from kpi_core.registry import CHANGE_ADDED, CHANGE_DROPPED, CHANGE_REVISED, DatasetRegistry
+from kpi_core.simulation import DEFAULT_REPLICATIONS, DEFAULT_TEAM_SIZE, Scenario, simulate, step_inputs
+from kpi_core.windows import VALUE_MEASURE, WINDOW_MEASURES, measure_label, window_table, windowed_pool
+from kpi_core.store import API_PORT_ENV, KPIStore
+from kpi_core.sections import open_dataset
+from kpi_core.summaries import Summaries, load_summaries, materialize, summary_dir
+from kpi_core.validation import ERROR, WARNING
+
+# Heavy libraries are imported on first use to keep cold starts fast
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+px = lazy_import("plotly.express")
+go = lazy_import("plotly.graph_objects")
+stats = lazy_import("scipy.stats")  # For correlation/regression insights
 
 
 # =======================
@@ -51,325 +125,88 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Apply global CSS (rendered once per process)
+st.markdown(global_css(), unsafe_allow_html=True)
+
 
 # =======================
-# THEME TOKENS
+# INSTRUMENTATION (opt-in via KPI_DASH_PROFILE=1)
 # =======================
-# Color palette inspired by NDA branding
-NDA_GREEN = "#006341"
-NDA_LIGHT_GREEN = "#e0f0e5"
-NDA_DARK_GREEN = "#004c30"
-NDA_ACCENT = "#8dc63f"
-TEXT_DARK = "#0f172a"
-TEXT_LIGHT = "#64748b"
-BG_COLOR = "#f8fafc"
-CARD_BG = "#ffffff"
-BORDER_COLOR = "#e2e8f0"
-
-PALETTE = {
-    "primary": NDA_GREEN,
-    "accent": NDA_ACCENT,
-    "ok": NDA_GREEN,
-    "warn": "#F59E0B",
-    "bad": "#C62828",
-    "info": "#1976D2",
-    "violet": "#7a4cff",
-    "grey": "#6b7280",
-}
-
-# GMP-specific disaggregation colors
-GMP_GROUP_COLORS = {
-    "Domestic": "#3b82f6",
-    "Foreign": "#7c3aed",
-    "Reliance": "#f59e0b",
-    "Desk": "#10b981",
-}
+_run_ctx = get_script_run_ctx()
+PROFILER.begin_rerun(_run_ctx.session_id if _run_ctx else "bare")
 
 
-# =======================
-# GLOBAL CSS STYLING
-# =======================
-# Template for custom CSS with variable substitution
-_css_tpl = Template(
-    """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-* {
-    font-family: Inter, system-ui, -apple-system, Segoe UI, Roboto, Helvetica, Arial, sans-serif;
-}
-.main .block-container {
-    padding-top: .6rem;
-    padding-bottom: 0;
-    background: $BG_COLOR;
-    max-width: 100%;
-}
-/* Enhanced Header */
-.header {
-    background: linear-gradient(135deg, $NDA_GREEN 0%, $NDA_DARK_GREEN 100%);
-    color: #fff;
-    padding: 1.5rem 2.5rem;
-    margin: -1rem -1rem 2rem -1rem;
-    display: flex;
-    align-items: center;
-    justify-content: space-between;
-    box-shadow: 0 8px 32px rgba(0,99,65,0.15);
-    border-radius: 0 0 24px 24px;
-    position: relative;
-    overflow: hidden;
-}
-.header::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    right: 0;
-    width: 200px;
-    height: 200px;
-    background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-    border-radius: 50%;
-}
-.header h1 {
-    font-size: 2rem;
-    margin: 0;
-    font-weight: 800;
-    letter-spacing: -0.02em;
-    background: linear-gradient(135deg, #ffffff 0%, rgba(255,255,255,0.9) 100%);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-}
-.header .subtitle {
-    margin: 0.25rem 0 0 0;
-    opacity: 0.9;
-    font-size: 1.1rem;
-    font-weight: 400;
-    letter-spacing: 0.01em;
-    color: rgba(255,255,255,0.9);
-}
-.header .version {
-    font-size: 0.85rem;
-    opacity: 0.9;
-    font-weight: 600;
-    background: rgba(255,255,255,0.15);
-    padding: 0.5rem 1rem;
-    border-radius: 12px;
-    backdrop-filter: blur(10px);
-    border: 1px solid rgba(255,255,255,0.2);
-}
-/* Enhanced Panels */
-.panel {
-    background: $CARD_BG;
-    border: 1px solid $BORDER_COLOR;
-    border-radius: 16px;
-    box-shadow: 0 4px 24px rgba(0,0,0,0.06);
-    overflow: hidden;
-    margin-bottom: 1.5rem;
-    transition: transform 0.2s ease, box-shadow 0.2s ease;
-}
-.panel:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-}
-.panel-header {
-    background: linear-gradient(135deg, $NDA_GREEN 0%, $NDA_DARK_GREEN 100%);
-    color: white;
-    padding: 1rem 1.5rem;
-    display: flex;
-    align-items: center;
-    justify-content: space-between;
-    border-radius: 16px 16px 0 0;
-}
-.panel-header h3 {
-    margin: 0;
-    font-weight: 700;
-    font-size: 1.1rem;
-    display: flex;
-    align-items: center;
-    gap: 0.5rem;
-}
-.panel-body {
-    padding: 1.5rem;
-}
-.section-header {
-    color: $NDA_DARK_GREEN;
-    font-size: 1.15rem;
-    font-weight: 700;
-    margin: 1.5rem 0 1rem;
-    padding-bottom: 0.5rem;
-    border-bottom: 2px solid $NDA_LIGHT_GREEN;
-}
-.kpi-grid {
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-    gap: 1.25rem;
-}
-/* Enhanced KPI Cards */
-.kpi-card {
-    border: 1px solid $BORDER_COLOR;
-    background: #ffffff;
-    border-left: 6px solid $NDA_GREEN;
-    border-radius: 16px;
-    padding: 1.5rem;
-    box-shadow: 0 2px 16px rgba(0,0,0,0.04);
-    transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-    position: relative;
-    overflow: hidden;
-}
-.kpi-card::before {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    right: 0;
-    height: 4px;
-    background: linear-gradient(90deg, $NDA_GREEN, $NDA_ACCENT);
-    opacity: 0;
-    transition: opacity 0.3s ease;
-}
-.kpi-card:hover {
-    transform: translateY(-4px);
-    box-shadow: 0 12px 40px rgba(0,0,0,0.12);
-    border-left-color: $NDA_ACCENT;
-}
-.kpi-card:hover::before {
-    opacity: 1;
-}
-.kpi-title {
-    font-weight: 700;
-    color: $NDA_DARK_GREEN;
-    font-size: 0.95rem;
-    margin-bottom: 0.5rem;
-}
-.kpi-value {
-    font-size: 2rem;
-    font-weight: 800;
-    color: $TEXT_DARK;
-    line-height: 1.1;
-    margin: 0.5rem 0;
-    background: linear-gradient(135deg, $TEXT_DARK, $NDA_DARK_GREEN);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-}
-.kpi-sub {
-    font-size: 0.78rem;
-    color: $TEXT_LIGHT;
-    text-transform: uppercase;
-    letter-spacing: 0.05em;
-    margin-top: 0.75rem;
-}
-.kpi-chip {
-    display: inline-block;
-    border-radius: 12px;
-    padding: 4px 12px;
-    font-weight: 700;
-    border: 1px solid;
-    font-size: 0.75rem;
-    margin-right: 0.5rem;
-    margin-bottom: 0.5rem;
-    backdrop-filter: blur(10px);
-}
-.kpi-chip.ok {
-    color: $NDA_GREEN;
-    border-color: $NDA_GREEN;
-    background: rgba(0, 99, 65, 0.08);
-}
-.kpi-chip.bad {
-    color: #ef4444;
-    border-color: #ef4444;
-    background: rgba(239, 68, 68, 0.08);
-}
-.stProgress > div > div > div > div {
-    background: linear-gradient(90deg, $NDA_GREEN, $NDA_ACCENT) !important;
-}
-div[data-testid="stHorizontalBlock"] {
-    gap: 1rem;
-}
-/* Enhanced Builder */
-.stepper {
-    display: flex;
-    gap: 0.5rem;
-    margin-bottom: 1rem;
-    flex-wrap: wrap;
-}
-.step-pill {
-    background: #fff;
-    border: 1px solid $BORDER_COLOR;
-    padding: 0.5rem 1rem;
-    border-radius: 12px;
-    font-size: 0.85rem;
-    color: $TEXT_DARK;
-    transition: all 0.2s ease;
-}
-.step-pill.active {
-    background: $NDA_LIGHT_GREEN;
-    border-color: $NDA_GREEN;
-    box-shadow: 0 2px 8px rgba(0, 99, 65, 0.1);
-}
-.help-tag {
-    font-size: 0.78rem;
-    color: $TEXT_LIGHT;
-}
-/* Enhanced Tables */
-.dataframe {
-    border-radius: 12px;
-    overflow: hidden;
-    box-shadow: 0 2px 8px rgba(0,0,0,0.04);
-}
-.dataframe thead th {
-    background: $NDA_LIGHT_GREEN !important;
-    color: $NDA_DARK_GREEN !important;
-    font-weight: 700 !important;
-    border: none !important;
-}
-/* Enhanced Buttons */
-.stButton button {
-    border-radius: 12px !important;
-    font-weight: 600 !important;
-    transition: all 0.2s ease !important;
-}
-.stButton button:hover {
-    transform: translateY(-1px);
-}
-/* Enhanced Sidebar */
-.css-1d391kg, .css-1lcbmhc {
-    background: $CARD_BG !important;
-}
-[data-testid="stSidebar"] {
-    border-right: 1px solid $BORDER_COLOR;
-}
-/* Custom scrollbar */
-::-webkit-scrollbar {
-    width: 6px;
-}
-::-webkit-scrollbar-track {
-    background: $BG_COLOR;
-}
-::-webkit-scrollbar-thumb {
-    background: $NDA_LIGHT_GREEN;
-    border-radius: 3px;
-}
-::-webkit-scrollbar-thumb:hover {
-    background: $NDA_GREEN;
-}
-</style>
-"""
-)
+@st.cache_resource(show_spinner=False)
+def _shared_cache() -> Optional[SharedCache]:
+    """Process-wide cache shared with other replicas (``KPI_DASH_SHARED_CACHE``), None when unset."""
+    return shared_cache_from_env()
 
-# Apply CSS with token substitution
-st.markdown(
-    _css_tpl.substitute(
-        BG_COLOR=BG_COLOR,
-        NDA_GREEN=NDA_GREEN,
-        NDA_DARK_GREEN=NDA_DARK_GREEN,
-        NDA_ACCENT=NDA_ACCENT,
-        BORDER_COLOR=BORDER_COLOR,
-        CARD_BG=CARD_BG,
-        TEXT_DARK=TEXT_DARK,
-        TEXT_LIGHT=TEXT_LIGHT,
-        NDA_LIGHT_GREEN=NDA_LIGHT_GREEN,
-    ),
-    unsafe_allow_html=True,
-)
+
+def shared_artifact(name: str, fn: Callable) -> Callable:
+    """
+    ``fn`` backed by the shared cache when one is configured.
+
+    Args:
+        name (str): Artifact name.
+        fn (Callable): Function whose first argument is the dataset version.
+
+    Returns:
+        Callable: Wrapper that looks the result up in (and publishes it to)
+        the shared cache, or just calls ``fn`` without one.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        shared = _shared_cache()
+        if shared is None:
+            return fn(*args, **kwargs)
+        return shared.wrap(name)(fn)(*args, **kwargs)
+
+    return wrapper
+
+
+def cache_data(name: str, shared: bool = False, **kwargs) -> Callable:
+    """
+    ``st.cache_data`` with profiling of lookups (hits) and executions (misses).
+
+    Args:
+        name (str): Span/cache name reported by the profiler.
+        shared (bool): On a local miss, try the cache shared by all replicas
+            first (see ``shared_artifact``); the first argument must be the
+            dataset version.
+        **kwargs: Extra ``st.cache_data`` options.
+
+    Returns:
+        Callable: Decorator.
+    """
+
+    def deco(fn: Callable) -> Callable:
+        inner = shared_artifact(name, fn) if shared else fn
+        cached = st.cache_data(show_spinner=False, **kwargs)(PROFILER.cache_miss(name)(inner))
+        return PROFILER.cache_call(name)(cached)
+
+    return deco
+
+
+def plotly_chart(fig: go.Figure, **kwargs) -> None:
+    """
+    Render a Plotly figure, recording render time and payload size when profiling.
+
+    The figure is compacted first (``compact_figure``): values rounded to
+    display precision, integer arrays as base64 typed arrays, constant
+    reference lines as end points, theme defaults for unused trace types
+    dropped.
+
+    Args:
+        fig (go.Figure): Figure to render.
+        **kwargs: Passed to ``st.plotly_chart``.
+    """
+    with PROFILER.timer("compact_figure"):
+        fig = compact_figure(fig)
+    if PROFILER.enabled:
+        PROFILER.add_payload(len(fig.to_json()))
+    with PROFILER.timer("st.plotly_chart"):
+        st.plotly_chart(fig, **kwargs)
 
 
 # =======================
@@ -409,68 +246,6 @@ def panel_close() -> None:
     st.markdown("</div></div>", unsafe_allow_html=True)
 
 
-# =======================
-# KPI MAPPING AND UTILITIES
-# =======================
-KPI_NAME_MAP: Dict[str, Dict[str, str]] = {
-    # Marketing Authorization (MA) KPIs
-    "pct_new_apps_evaluated_on_time": {"short": "New Apps on Time", "long": "Percentage of New Applications Evaluated On Time"},
-    "pct_renewal_apps_evaluated_on_time": {"short": "Renewals on Time", "long": "Percentage of Renewal Applications Evaluated On Time"},
-    "pct_variation_apps_evaluated_on_time": {"short": "Variations on Time", "long": "Percentage of Variation Applications Evaluated On Time"},
-    "pct_fir_responses_on_time": {"short": "F.I.R Responses on Time", "long": "Percentage of Further Information Responses On Time"},
-    "pct_query_responses_evaluated_on_time": {"short": "Query Responses on Time", "long": "Percentage of Query Responses Evaluated On Time"},
-    "pct_granted_within_90_days": {"short": "Granted ≤ 90 Days", "long": "Percentage of Applications Granted Within 90 Days"},
-    "median_duration_continental": {"short": "Median Duration", "long": "Median Duration to Grant (Days, Continental)"},
-    # Clinical Trials (CT) KPIs
-    "pct_new_apps_evaluated_on_time_ct": {"short": "CT New Apps on Time", "long": "Clinical Trials: % of New Applications Evaluated On Time"},
-    "pct_amendment_apps_evaluated_on_time": {"short": "Amendments on Time", "long": "Clinical Trials: % of Amendment Applications Evaluated On Time"},
-    "pct_gcp_inspections_on_time": {"short": "GCP Inspections on Time", "long": "Clinical Trials: % of GCP Inspections Completed On Time"},
-    "pct_safety_reports_assessed_on_time": {"short": "Safety Reports on Time", "long": "Clinical Trials: % of Safety Reports Assessed On Time"},
-    "pct_gcp_compliant": {"short": "GCP Compliant", "long": "Clinical Trials: % of Sites Compliant with GCP"},
-    "pct_registry_submissions_on_time": {"short": "Registry on Time", "long": "Clinical Trials: % of Registry Submissions On Time"},
-    "pct_capa_evaluated_on_time": {"short": "CAPA on Time", "long": "Clinical Trials: % of CAPA Evaluations Completed On Time"},
-    "avg_turnaround_time": {"short": "Avg TAT (Days)", "long": "Clinical Trials: Average Turnaround Time (Days)"},
-    # GMP KPIs
-    "pct_facilities_inspected_on_time": {"short": "Facilities Inspected On Time", "long": "GMP: % of Facilities Inspected On Time"},
-    "pct_inspections_waived_on_time": {"short": "Waivers on Time", "long": "GMP: % of Inspections Waived On Time"},
-    "pct_facilities_compliant": {"short": "Facilities Compliant", "long": "GMP: % of Facilities Compliant"},
-    "pct_capa_decisions_on_time": {"short": "CAPA Decisions on Time", "long": "GMP: % of CAPA Decisions On Time"},
-    "pct_applications_completed_on_time": {"short": "Apps Completed on Time", "long": "GMP: % of Applications Completed On Time"},
-    "avg_turnaround_time_gmp": {"short": "Avg TAT (GMP)", "long": "GMP: Average Turnaround Time (Days)"},
-    "median_turnaround_time": {"short": "Median TAT", "long": "GMP: Median Turnaround Time (Days)"},
-    "pct_reports_published_on_time": {"short": "Reports on Time", "long": "GMP: % of Reports Published On Time"},
-    # GMP Disaggregated KPIs (child metrics)
-    "pct_facilities_inspected_on_time_on_site_domestic": {"short": "On-time (On-site Domestic)", "long": "GMP: % On Time (On-site Domestic)"},
-    "pct_facilities_inspected_on_time_on_site_foreign": {"short": "On-time (On-site Foreign)", "long": "GMP: % On Time (On-site Foreign)"},
-    "pct_facilities_inspected_on_time_reliance_joint_on_site_foreign": {"short": "On-time (Reliance/Joint On-site Foreign)", "long": "GMP: % On Time (Reliance/Joint On-site Foreign)"},
-    "pct_facilities_compliant_on_site_domestic": {"short": "Compliant (On-site Domestic)", "long": "GMP: % Compliant (On-site Domestic)"},
-    "pct_facilities_compliant_on_site_foreign": {"short": "Compliant (On-site Foreign)", "long": "GMP: % Compliant (On-site Foreign)"},
-    "pct_facilities_compliant_reliance_joint_on_site_foreign": {"short": "Compliant (Reliance/Joint On-site Foreign)", "long": "GMP: % Compliant (Reliance/Joint On-site Foreign)"},
-    "pct_facilities_compliant_reliance_joint_desk_based_foreign": {"short": "Compliant (Reliance/Joint Desk-based Foreign)", "long": "GMP: % Compliant (Reliance/Joint Desk-based Foreign)"},
-    "pct_capa_decisions_on_time_direct_foreign_domestic_done_by_nra": {"short": "CAPA on Time (Direct NRA)", "long": "GMP: % CAPA On Time (Direct NRA)"},
-    "pct_capa_decisions_on_time_reliance_rec_joint_inspections": {"short": "CAPA on Time (Reliance Joint)", "long": "GMP: % CAPA On Time (Reliance Joint)"},
-    "pct_applications_completed_on_time_domestic_applicant": {"short": "Apps On-time (Domestic Applicant)", "long": "GMP: % Apps On Time (Domestic Applicant)"},
-    "pct_applications_completed_on_time_foreign_applicant_direct": {"short": "Apps On-time (Foreign Direct)", "long": "GMP: % Apps On Time (Foreign Direct)"},
-    "pct_applications_completed_on_time_foreign_applicant_reliance": {"short": "Apps On-time (Foreign Reliance)", "long": "GMP: % Apps On Time (Foreign Reliance)"},
-    "avg_turnaround_time_gmp_on_site_domestic": {"short": "Avg TAT (On-site Domestic)", "long": "GMP: Avg TAT (On-site Domestic)"},
-    "avg_turnaround_time_gmp_on_site_foreign": {"short": "Avg TAT (On-site Foreign)", "long": "GMP: Avg TAT (On-site Foreign)"},
-    "avg_turnaround_time_gmp_reliance_joint_on_site_foreign": {"short": "Avg TAT (Reliance/Joint On-site Foreign)", "long": "GMP: Avg TAT (Reliance/Joint On-site Foreign)"},
-    "median_turnaround_time_on_site_domestic": {"short": "Median TAT (On-site Domestic)", "long": "GMP: Median TAT (On-site Domestic)"},
-    "median_turnaround_time_on_site_foreign": {"short": "Median TAT (On-site Foreign)", "long": "GMP: Median TAT (On-site Foreign)"},
-    "pct_reports_published_on_time_on_site_domestic": {"short": "Reports on Time (On-site Domestic)", "long": "GMP: % Reports On Time (On-site Domestic)"},
-    "pct_reports_published_on_time_on_site_foreign": {"short": "Reports on Time (On-site Foreign)", "long": "GMP: % Reports On Time (On-site Foreign)"},
-    "pct_reports_published_on_time_reliance_joint_on_site_foreign": {"short": "Reports on Time (Reliance/Joint On-site Foreign)", "long": "GMP: % Reports On Time (Reliance/Joint On-site Foreign)"},
-}
-
-# Time-based KPIs (lower values are better)
-TIME_BASED: set[str] = {
-    "median_duration_continental",
-    "avg_turnaround_time",
-    "avg_turnaround_time_gmp",
-    "median_turnaround_time",
-}
-
-
 def tiny_label(kpi_id: str) -> str:
     """
     Generate a concise, lowercase label for KPI display.
@@ -492,202 +267,118 @@ def tiny_label(kpi_id: str) -> str:
 
 
 # =======================
-# KPI TO PROCESS MAPPING
+# DATA LOADING
 # =======================
-KPI_PROCESS_MAP: Dict[str, str] = {
-    # CT KPIs
-    "pct_new_apps_evaluated_on_time_ct": "CT",
-    "pct_amendment_apps_evaluated_on_time": "CT",
-    "pct_gcp_inspections_on_time": "CT",
-    "pct_safety_reports_assessed_on_time": "CT",
-    "pct_gcp_compliant": "CT",
-    "pct_registry_submissions_on_time": "CT",
-    "pct_capa_evaluated_on_time": "CT",
-    "avg_turnaround_time": "CT",
-    # GMP KPIs
-    "pct_facilities_inspected_on_time": "GMP",
-    "pct_inspections_waived_on_time": "GMP",
-    "pct_facilities_compliant": "GMP",
-    "pct_capa_decisions_on_time": "GMP",
-    "pct_applications_completed_on_time": "GMP",
-    "avg_turnaround_time_gmp": "GMP",
-    "median_turnaround_time": "GMP",
-    "pct_reports_published_on_time": "GMP",
-    # MA KPIs
-    "pct_new_apps_evaluated_on_time": "MA",
-    "pct_renewal_apps_evaluated_on_time": "MA",
-    "pct_variation_apps_evaluated_on_time": "MA",
-    "pct_fir_responses_on_time": "MA",
-    "pct_query_responses_evaluated_on_time": "MA",
-    "pct_granted_within_90_days": "MA",
-    "median_duration_continental": "MA",
-}
-
+@cache_data("dataset_version")
+def dataset_version(data_path: str, mtime_ns: int, size: int) -> str:
+    """
+    Content fingerprint of the data file.
 
-# =======================
-# DISAGGREGATION FILTERS AND LINKS
-# =======================
-DISAG_UI_OPTIONS: Dict[str, List[str]] = {
-    "MA": ["All"],
-    "CT": ["All"],
-    "GMP": [
-        "All",
-        "On-site Domestic",
-        "On-site Foreign",
-        "Reliance/Joint On-site Foreign",
-        "Reliance/Joint Desk-based Foreign",
-        "Direct NRA",
-        "Reliance Joint",
-        "Domestic Applicant",
-        "Foreign Direct",
-        "Foreign Reliance",
-    ],
-}
-
-DISAG_KPI_LINKS: Dict[str, Dict[str, str]] = {
-    "pct_facilities_inspected_on_time": {
-        "On-site Domestic": "pct_facilities_inspected_on_time_on_site_domestic",
-        "On-site Foreign": "pct_facilities_inspected_on_time_on_site_foreign",
-        "Reliance/Joint On-site Foreign": "pct_facilities_inspected_on_time_reliance_joint_on_site_foreign",
-    },
-    "pct_facilities_compliant": {
-        "On-site Domestic": "pct_facilities_compliant_on_site_domestic",
-        "On-site Foreign": "pct_facilities_compliant_on_site_foreign",
-        "Reliance/Joint On-site Foreign": "pct_facilities_compliant_reliance_joint_on_site_foreign",
-        "Reliance/Joint Desk-based Foreign": "pct_facilities_compliant_reliance_joint_desk_based_foreign",
-    },
-    "pct_capa_decisions_on_time": {
-        "Direct NRA": "pct_capa_decisions_on_time_direct_foreign_domestic_done_by_nra",
-        "Reliance Joint": "pct_capa_decisions_on_time_reliance_rec_joint_inspections",
-    },
-    "pct_applications_completed_on_time": {
-        "Domestic Applicant": "pct_applications_completed_on_time_domestic_applicant",
-        "Foreign Direct": "pct_applications_completed_on_time_foreign_applicant_direct",
-        "Foreign Reliance": "pct_applications_completed_on_time_foreign_applicant_reliance",
-    },
-    "avg_turnaround_time_gmp": {
-        "On-site Domestic": "avg_turnaround_time_gmp_on_site_domestic",
-        "On-site Foreign": "avg_turnaround_time_gmp_on_site_foreign",
-        "Reliance/Joint On-site Foreign": "avg_turnaround_time_gmp_reliance_joint_on_site_foreign",
-    },
-    "median_turnaround_time": {
-        "On-site Domestic": "median_turnaround_time_on_site_domestic",
-        "On-site Foreign": "median_turnaround_time_on_site_foreign",
-    },
-    "pct_reports_published_on_time": {
-        "On-site Domestic": "pct_reports_published_on_time_on_site_domestic",
-        "On-site Foreign": "pct_reports_published_on_time_on_site_foreign",
-        "Reliance/Joint On-site Foreign": "pct_reports_published_on_time_reliance_joint_on_site_foreign",
-    },
-}
-
-
-def has_disag_for_kpi(base_kpi: str, process: str) -> bool:
-    """
-    Check if a KPI supports disaggregation for the given process.
+    The file's mtime and size are part of the cache key, so the hash is only
+    recomputed when the file on disk changes.
 
     Args:
-        base_kpi (str): Base KPI ID.
-        process (str): Process name (e.g., "GMP").
+        data_path (str): Path to JSON data file.
+        mtime_ns (int): File modification time (ns).
+        size (int): File size in bytes.
 
     Returns:
-        bool: True if disaggregation is available.
+        str: Short SHA-256 hex digest of the file contents.
     """
-    return process == "GMP" and base_kpi in DISAG_KPI_LINKS
+    return hashlib.sha256(pathlib.Path(data_path).read_bytes()).hexdigest()[:16]
 
 
-def resolve_effective_kpi_id(
-    base_kpi: str, process: str, disag_choice: str
-) -> Tuple[str, Optional[str]]:
+def current_data_version(data_path: str) -> str:
     """
-    Resolve the effective KPI ID based on disaggregation choice.
+    Resolve the dataset version for a data path ("" if the file is missing).
 
     Args:
-        base_kpi (str): Base KPI ID.
-        process (str): Process name.
-        disag_choice (str): Selected disaggregation.
+        data_path (str): Path to JSON data file.
 
     Returns:
-        Tuple[str, Optional[str]]: Effective KPI ID and applied disaggregation name.
+        str: Dataset version used to key derived caches.
     """
-    if disag_choice == "All":
-        return base_kpi, None
-    if process == "GMP" and base_kpi in DISAG_KPI_LINKS:
-        target = DISAG_KPI_LINKS[base_kpi].get(disag_choice)
-        if target:
-            return target, disag_choice
-    return base_kpi, None
 
+    def fingerprint(path: str) -> str:
+        info = pathlib.Path(path).stat()
+        return dataset_version(path, info.st_mtime_ns, info.st_size)
 
-# =======================
-# DATA LOADING
-# =======================
-@st.cache_data(show_spinner=False)
-def load_data(data_path: str) -> Dict[str, Any]:
+    return core_dataset_version(data_path, fingerprint)
+
+
+@PROFILER.cache_call("load_data")
+@st.cache_resource(show_spinner=False)
+@PROFILER.cache_miss("load_data")
+def _load_data_cached(data_path: str, version: str = "") -> Mapping[str, Any]:
+    """
+    Dataset of a version, shared by all sessions (``kpi_core.sections.open_dataset``).
+
+    Once a version's sections have been split next to the data, each
+    section is parsed the first time a view reads it (profiled as
+    ``parse_section``); the first load parses everything
+    (``kpi_core.load_data``, or multi-source ingest for a manifest) and
+    writes the split.
+    """
+    if is_manifest(data_path):
+        return open_dataset(data_path, version, lambda: load_sources(data_path))
+    return open_dataset(data_path, version, lambda: core_load_data(data_path))
+
+
+def load_data(data_path: str, version: str = "") -> Mapping[str, Any]:
     """
     Load and validate JSON data from file path.
 
     Args:
         data_path (str): Path to JSON data file.
+        version (str): Dataset version; a new version invalidates the cached load.
 
     Returns:
-        Dict[str, Any]: Loaded and validated data.
+        Mapping[str, Any]: Loaded and validated data (read-only; sections
+        may be parsed on first access).
 
     Raises:
         StreamlitError: If file not found or missing required keys.
     """
-    p = pathlib.Path(data_path)
-    if not p.exists():
-        st.error(f"Data file not found: {p}")
+    try:
+        return _load_data_cached(data_path, version)
+    except DataError as e:
+        st.error(str(e))
         st.stop()
-    with p.open("r", encoding="utf-8") as f:
-        raw = json.load(f)
-    required = [
-        "quarterlyData",
-        "processStepData",
-        "kpiCounts",
-        "quarterlyVolumes",
-        "inspectionVolumes",
-        "bottleneckData",
-    ]
-    for k in required:
-        if k not in raw:
-            st.error(f"Missing '{k}' in data file.")
-            st.stop()
-    return raw
 
 
-# =======================
-# UTILITY FUNCTIONS
-# =======================
-def status_for(kpi_id: str, value: float, target: float) -> str:
+@cache_data("overview_summaries")
+def _summaries_cached(data_path: str, version: str) -> Summaries:
+    """Materialized Overview summaries: read from next to the dataset, else built from the full data and written."""
+    summaries = load_summaries(summary_dir(data_path), version)
+    if summaries is None:
+        summaries = materialize(_load_data_cached(data_path, version), version, data_path)
+    return summaries
+
+
+def load_overview_summaries(data_path: str, version: str) -> Summaries:
     """
-    Determine status based on value vs target (success/warning/error).
+    Overview summaries of a dataset version (``kpi_core.summaries``).
 
     Args:
-        kpi_id (str): KPI ID.
-        value (float): Current value.
-        target (float): Target value.
+        data_path (str): Path to JSON data file.
+        version (str): Dataset version.
 
     Returns:
-        str: Status ("success", "warning", "error").
-    """
-    if value is None or target is None:
-        return "error"
-    if kpi_id in TIME_BASED:  # Lower is better for time-based
-        if value <= target:
-            return "success"
-        if value <= target * 1.05:
-            return "warning"
-        return "error"
-    else:  # Higher is better for percentages
-        if value >= target:
-            return "success"
-        if value >= target * 0.95:
-            return "warning"
-        return "error"
+        Summaries: Status counts, KPI cards, outlook, anomalies and data-quality issues.
 
+    Raises:
+        StreamlitError: If the data has to be loaded and cannot be.
+    """
+    try:
+        return _summaries_cached(data_path, version)
+    except DataError as e:
+        st.error(str(e))
+        st.stop()
 
+
+# =======================
+# UTILITY FUNCTIONS
+# =======================
 def status_color(status: str) -> str:
     """
     Map status to color.
@@ -841,110 +532,7 @@ def english_summary(counts: Dict[str, int], what: str) -> str:
     )
 
 
-# =======================
-# PROCESS STEPS AND BOTTLENECKS
-# =======================
-STEP_ALIASES: Dict[str, str] = {
-    "application_submission_review": "Submission review",
-    "technical_screening": "Tech screening",
-    "committee_assignment": "Committee assign.",
-    "committee_review": "Committee review",
-    "inspection_scheduling": "Schedule insp.",
-    "inspection_execution": "Conduct insp.",
-    "report_drafting": "Draft report",
-    "report_publication": "Publish report",
-    "capa_request": "CAPA request",
-    "capa_evaluation": "CAPA evaluation",
-}
-
-DISAG_SUFFIXES: List[str] = [
-    "_domestic",
-    "_foreign",
-    "_reliance_joint_on_site_foreign",
-    "_reliance_joint_desk_based_foreign",
-    "_direct_foreign_domestic_done_by_nra",
-    "_reliance_rec_joint_inspections",
-    "_domestic_applicant",
-    "_foreign_applicant_direct",
-    "_foreign_applicant_reliance",
-]
-
-
-def strip_disag_suffix(step_key: str) -> str:
-    """
-    Remove disaggregation suffix from step key.
-
-    Args:
-        step_key (str): Step identifier.
-
-    Returns:
-        str: Base step key.
-    """
-    for suf in DISAG_SUFFIXES:
-        if step_key.endswith(suf):
-            return step_key[:-len(suf)]
-    return step_key
-
-
-def friendly_step_label(step_key: str) -> str:
-    """
-    Generate user-friendly label for process step.
-
-    Args:
-        step_key (str): Step identifier.
-
-    Returns:
-        str: Display label.
-    """
-    base = strip_disag_suffix(step_key)
-    label = STEP_ALIASES.get(base, base.replace("_", " ").title())
-    return label
-
-
-def wrap_label(text: str, max_len: int = 14) -> str:
-    """
-    Wrap long text into HTML <br> lines.
-
-    Args:
-        text (str): Text to wrap.
-        max_len (int): Max characters per line.
-
-    Returns:
-        str: Wrapped HTML text.
-    """
-    parts, line, count = [], [], 0
-    for word in text.split():
-        add = len(word) + (1 if line else 0)
-        if count + add > max_len:
-            parts.append(" ".join(line))
-            line, count = [word], len(word)
-        else:
-            line.append(word)
-            count += add
-    if line:
-        parts.append(" ".join(line))
-    return "<br>".join(parts)
-
-
-def get_step_status(actual: float, target: float) -> str:
-    """
-    Determine status for process step duration.
-
-    Args:
-        actual (float): Actual days.
-        target (float): Target days.
-
-    Returns:
-        str: Status ("success", "warning", "error").
-    """
-    if actual <= target:
-        return "success"
-    elif actual < target * 1.05:
-        return "warning"
-    else:
-        return "error"
-
-
+@PROFILER.timed("process_steps_block")
 def process_steps_block(
     process: str, quarter: str, processStepData: Dict[str, Any], disag_choice: str
 ) -> None:
@@ -962,116 +550,16 @@ def process_steps_block(
         st.info("No process step data.")
         return
 
-    # Map UI labels to suffixes for filtering
-    label2suffix = {
-        "On-site Domestic": "_domestic",
-        "On-site Foreign": "_foreign",
-        "Reliance/Joint On-site Foreign": "_reliance_joint_on_site_foreign",
-        "Reliance/Joint Desk-based Foreign": "_reliance_joint_desk_based_foreign",
-        "Direct NRA": "_direct_foreign_domestic_done_by_nra",
-        "Reliance Joint": "_reliance_rec_joint_inspections",
-        "Domestic Applicant": "_domestic_applicant",
-        "Foreign Direct": "_foreign_applicant_direct",
-        "Foreign Reliance": "_foreign_applicant_reliance",
-    }
-
-    # Filter steps based on disaggregation
-    if disag_choice == "All":
-        steps_dict = {
-            k: v for k, v in all_steps.items() if not any(k.endswith(s) for s in DISAG_SUFFIXES)
-        }
-    else:
-        suf = label2suffix.get(disag_choice)
-        if suf:
-            steps_dict = {k: v for k, v in all_steps.items() if k.endswith(suf)}
-            if not steps_dict:
-                st.warning("No disag-specific step data found — showing general steps.")
-                steps_dict = {
-                    k: v
-                    for k, v in all_steps.items()
-                    if not any(k.endswith(s) for s in DISAG_SUFFIXES)
-                }
-        else:
-            steps_dict = {
-                k: v for k, v in all_steps.items() if not any(k.endswith(s) for s in DISAG_SUFFIXES)
-            }
-
-    # Build rows for DataFrame
-    rows = []
-    for step_key, step_obj in steps_dict.items():
-        series = step_obj["data"]
-        cur = next((x for x in series if x["quarter"] == quarter), None)
-        if not cur:
-            continue
-        metric = cur.get("avgDays")
-        target = cur.get("targetDays")
-        if metric is None or target is None:
-            continue
-        label = wrap_label(friendly_step_label(step_key), max_len=16)
-        status = get_step_status(float(metric), float(target))
-        rows.append(
-            {"step": label, "Actual": float(metric), "Target": float(target), "status": status}
-        )
-
-    if not rows:
+    df_bar, fell_back = process_step_rows(process, quarter, processStepData, disag_choice)
+    if fell_back:
+        st.warning("No disag-specific step data found — showing general steps.")
+    if df_bar.empty:
         st.info("No process step rows for this selection.")
         return
 
-    df_bar = pd.DataFrame(rows)
-
     # Render bar chart
-    fig = go.Figure()
-    status_colors = {"success": NDA_GREEN, "warning": PALETTE["warn"], "error": PALETTE["bad"]}
-    actual_colors = [status_colors[row["status"]] for _, row in df_bar.iterrows()]
-    fig.add_trace(
-        go.Bar(
-            x=df_bar["step"],
-            y=df_bar["Actual"],
-            name="Actual",
-            marker_color=actual_colors,
-            text=[f"{v:.0f}d" for v in df_bar["Actual"]],
-            textposition="outside",
-            textfont=dict(size=12, color=TEXT_DARK),
-            legendgroup="Actual",
-            hovertemplate="<b>%{x}</b><br>Actual: %{y:.0f} days<extra></extra>",
-        )
-    )
-    fig.add_trace(
-        go.Bar(
-            x=df_bar["step"],
-            y=df_bar["Target"],
-            name="Target",
-            marker_color=PALETTE["grey"],
-            marker_opacity=0.7,
-            text=[f"{v:.0f}d" for v in df_bar["Target"]],
-            textposition="outside",
-            textfont=dict(size=12, color=TEXT_DARK),
-            legendgroup="Target",
-            hovertemplate="<b>%{x}</b><br>Target: %{y:.0f} days<extra></extra>",
-        )
-    )
-    fig.update_layout(
-        barmode="group",
-        height=400,
-        margin=dict(l=10, r=10, t=10, b=100),
-        xaxis_tickangle=-45,
-        plot_bgcolor=CARD_BG,
-        paper_bgcolor=CARD_BG,
-        font=dict(color=TEXT_DARK, size=12),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=-0.3,
-            xanchor="center",
-            x=0.5,
-            bgcolor="rgba(255,255,255,0.8)",
-            bordercolor=BORDER_COLOR,
-            borderwidth=1,
-        ),
-        hoverlabel=dict(bgcolor="white", font_size=12, font_family="Inter"),
-    )
-
-    st.plotly_chart(fig, use_container_width=True)
+    fig = steps_figure(df_bar)
+    plotly_chart(fig, use_container_width=True)
 
     # Render styled table
     df_table = (
@@ -1098,431 +586,205 @@ def process_steps_block(
 
 
 # =======================
-# CONTEXT CHARTS HELPERS (VOLUME COMPARISONS)
+# KPI INTERVALS
 # =======================
-def seeded_rng(*parts) -> random.Random:
+@cache_data("kpi_intervals", shared=True)
+def kpi_intervals_cached(data_version: str, _data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Cached ``kpi_core.intervals.kpi_intervals`` (95% Wilson) for one dataset version.
+
+    Args:
+        data_version (str): Dataset version (cache key for ``_data``).
+        _data (Dict): Loaded data (not hashed).
+
+    Returns:
+        pd.DataFrame: Interval and significance per percentage KPI and quarter.
+    """
+    return kpi_intervals(_data)
+
+
+@cache_data("correlation_scan")
+def correlation_scan_cached(
+    data_version: str, scope: Tuple[Any, ...], agg: str, max_lag: int, _pool: pd.DataFrame
+) -> Dict[str, Any]:
     """
-    Create seeded random number generator for reproducible simulations.
+    Cached ``kpi_core.correlation.correlation_scan`` per analytics scope.
 
     Args:
-        *parts: Seed components.
+        data_version (str): Dataset version.
+        scope (Tuple): Everything that shaped ``_pool`` (processes, workflow
+            metrics flag, period selection); the cache key for it.
+        agg (str): Cell aggregation.
+        max_lag (int): Longest lead, in quarters.
+        _pool (pd.DataFrame): Analytics rows of the scope (not hashed).
 
     Returns:
-        random.Random: Seeded RNG.
+        Dict[str, Any]: Quarter × series matrix and ranked pairs.
     """
-    s = "|".join(str(p) for p in parts)
-    r = random.Random()
-    r.seed(s)
-    return r
+    return correlation_scan(_pool, agg, max_lag)
 
 
-def clamp(v: float, lo: float, hi: float) -> float:
-    """Clamp value between lo and hi."""
-    return max(lo, min(hi, v))
+@cache_data("kpi_forecasts", shared=True)
+def kpi_forecasts_cached(data_version: str, _data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Cached ``kpi_core.forecast.kpi_forecasts`` (every KPI, 1–4 quarters ahead) for one dataset version.
 
+    Args:
+        data_version (str): Dataset version (cache key for ``_data``).
+        _data (Dict): Loaded data (not hashed).
 
-def build_kpi_comparison_df(
-    process: str, kpi_id: str, quarter: str, data: Dict[str, Any]
-) -> Tuple[pd.DataFrame, str, str]:
+    Returns:
+        pd.DataFrame: Forecast, 95% prediction interval and P(meet target) per KPI and horizon.
     """
-    Build DataFrame for KPI volume comparison chart.
+    return kpi_forecasts(_data)
+
+
+# =======================
+# BOTTLENECK DATA PREPARATION
+# =======================
+@cache_data("reports_prepare_bottleneck_df", shared=True)
+def reports_prepare_bottleneck_df(
+    data_version: str, process: str, quarter: str, _bottleneck_data: Dict[str, Any]
+) -> pd.DataFrame:
+    """
+    Cached ``kpi_core.prepare_bottleneck_df`` for one dataset version.
 
     Args:
+        data_version (str): Dataset version (cache key for ``_bottleneck_data``).
         process (str): Process.
-        kpi_id (str): KPI ID.
-        quarter (str): Quarter (used for year).
-        data (Dict): Loaded data.
+        quarter (str): Quarter.
+        _bottleneck_data (Dict): Bottlenecks data (not hashed).
 
     Returns:
-        Tuple[pd.DataFrame, str, str]: DF, title, ylabel.
+        pd.DataFrame: Bottleneck metrics.
     """
-    if kpi_id in TIME_BASED:
-        return pd.DataFrame(columns=["quarter", "series", "value"]), "", ""
+    return prepare_bottleneck_df(process, quarter, _bottleneck_data)
 
-    year = int(quarter.split()[-1])
 
-    def labels_from(block_list: List[Dict]) -> List[str]:
-        return [d["quarter"] for d in block_list]
+@cache_data("bottleneck_analytics", shared=True)
+def bottleneck_analytics_cached(data_version: str, _bottleneck_data: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Cached ``kpi_core.bottleneck_analytics`` (aging, WIP, lead time, headroom) for one dataset version.
 
-    if process in ["MA", "CT"]:
-        qlist = data["quarterlyVolumes"][process]
-        year_quarters = sorted(
-            [q for q in labels_from(qlist) if int(q.split()[-1]) == year],
-            key=lambda s: int(s.split()[0][1:]),
-        )
-        rec_map = {d["quarter"]: d for d in qlist if d["quarter"] in year_quarters}
-    else:
-        qlist = data["inspectionVolumes"]["GMP"]
-        year_quarters = sorted(
-            [q for q in labels_from(qlist) if int(q.split()[-1]) == year],
-            key=lambda s: int(s.split()[0][1:]),
-        )
-        rec_map = {d["quarter"]: d for d in qlist if d["quarter"] in year_quarters}
+    Args:
+        data_version (str): Dataset version (cache key for ``_bottleneck_data``).
+        _bottleneck_data (Dict): Bottlenecks data (not hashed).
 
-    if not year_quarters:
-        return (
-            pd.DataFrame(columns=["quarter", "series", "value"]),
-            f"No volume data for {year}",
-            "",
-        )
+    Returns:
+        pd.DataFrame: Flow metrics per process, step and quarter.
+    """
+    return bottleneck_analytics(_bottleneck_data)
 
-    rows = []
-    title = ""
-    ylabel = "count"
-
-    if process == "MA":
-        title_map = {
-            "pct_new_apps_evaluated_on_time": "New Applications: Submitted vs Evaluated",
-            "pct_renewal_apps_evaluated_on_time": "Renewal Applications: Submitted vs Evaluated",
-            "pct_variation_apps_evaluated_on_time": "Variation Applications: Submitted vs Evaluated",
-            "pct_fir_responses_on_time": "FIR: Queries vs Responses",
-            "pct_query_responses_evaluated_on_time": "Queries: Raised vs Responses",
-            "pct_granted_within_90_days": "MA Applications: Submitted vs Granted",
-        }
-        title = f"{title_map.get(kpi_id, 'MA comparison')} — {year}"
-        for q in year_quarters:
-            rec = rec_map.get(q, {})
-            recvd = int(rec.get("applications_received", 0) or 0)
-            compl = int(rec.get("applications_completed", 0) or 0)
-            appr = int(rec.get("approvals_granted", 0) or 0)
-            rng = seeded_rng("MA", kpi_id, q)
-            new_ratio = 0.50 + rng.uniform(-0.05, 0.05)
-            ren_ratio = 0.30 + rng.uniform(-0.05, 0.05)
-            var_subm = clamp(recvd - int(round(recvd * new_ratio)) - int(round(recvd * ren_ratio)), 0, recvd)
-            if kpi_id == "pct_new_apps_evaluated_on_time":
-                new_sub = int(round(recvd * new_ratio))
-                new_eval = int(round(compl * new_ratio))
-                rows += [
-                    {"quarter": q, "series": "Submitted", "value": new_sub},
-                    {"quarter": q, "series": "Evaluated", "value": new_eval},
-                ]
-            elif kpi_id == "pct_renewal_apps_evaluated_on_time":
-                ren_sub = int(round(recvd * ren_ratio))
-                ren_eval = int(round(compl * ren_ratio))
-                rows += [
-                    {"quarter": q, "series": "Submitted", "value": ren_sub},
-                    {"quarter": q, "series": "Evaluated", "value": ren_eval},
-                ]
-            elif kpi_id == "pct_variation_apps_evaluated_on_time":
-                var_sub = var_subm
-                var_eval = clamp(compl - int(round(compl * new_ratio)) - int(round(compl * ren_ratio)), 0, compl)
-                rows += [
-                    {"quarter": q, "series": "Submitted", "value": var_sub},
-                    {"quarter": q, "series": "Evaluated", "value": var_eval},
-                ]
-            elif kpi_id == "pct_fir_responses_on_time":
-                fir_q = int(round(compl * clamp(0.35 + rng.uniform(-0.08, 0.08), 0.15, 0.6)))
-                fir_r = int(round(fir_q * clamp(0.88 + rng.uniform(-0.05, 0.05), 0.6, 1.0)))
-                rows += [
-                    {"quarter": q, "series": "FIR queries", "value": fir_q},
-                    {"quarter": q, "series": "FIR responses", "value": fir_r},
-                ]
-            elif kpi_id == "pct_query_responses_evaluated_on_time":
-                queries = int(round(compl * clamp(0.55 + rng.uniform(-0.1, 0.1), 0.3, 0.8)))
-                q_resps = int(round(queries * clamp(0.82 + rng.uniform(-0.08, 0.08), 0.5, 0.98)))
-                rows += [
-                    {"quarter": q, "series": "Queries", "value": queries},
-                    {"quarter": q, "series": "Query responses", "value": q_resps},
-                ]
-            elif kpi_id == "pct_granted_within_90_days":
-                rows += [
-                    {"quarter": q, "series": "Submitted", "value": recvd},
-                    {"quarter": q, "series": "Granted", "value": appr},
-                ]
 
-    elif process == "CT":
-        title_map = {
-            "pct_new_apps_evaluated_on_time_ct": "CT New Applications: Submitted vs Evaluated",
-            "pct_amendment_apps_evaluated_on_time": "CT Amendments: Submitted vs Evaluated",
-            "pct_gcp_inspections_on_time": "GCP Inspections: Planned vs Conducted",
-            "pct_safety_reports_assessed_on_time": "Safety Reports: Submitted vs Assessed",
-            "pct_gcp_compliant": "GCP Sites: Assessed vs Compliant",
-            "pct_registry_submissions_on_time": "Registry: Total reports vs Published",
-            "pct_capa_evaluated_on_time": "CAPA: Raised vs Evaluated",
-        }
-        title = f"{title_map.get(kpi_id, 'CT comparison')} — {year}"
-        for q in year_quarters:
-            rec = rec_map.get(q, {})
-            recvd = int(rec.get("applications_received", 0) or 0)
-            compl = int(rec.get("applications_completed", 0) or 0)
-            req_insp = int(rec.get("gcp_inspections_requested", 0) or 0)
-            cond_insp = int(rec.get("gcp_inspections_conducted", 0) or 0)
-            rng = seeded_rng("CT", kpi_id, q)
-            new_ratio = 0.65 + rng.uniform(-0.07, 0.07)
-            new_subm = int(round(recvd * new_ratio))
-            amd_subm = max(recvd - new_subm, 0)
-            new_eval = int(
-                round(compl * max(min(new_ratio + rng.uniform(-0.03, 0.03), 0.85), 0.4))
-            )
-            amd_eval = max(compl - new_eval, 0)
-            safety_reports = int(
-                round(compl * max(min(0.60 + rng.uniform(-0.1, 0.1), 0.9), 0.3))
-            )
-            safety_assessed = int(
-                round(safety_reports * max(min(0.9 + rng.uniform(-0.08, 0.05), 1.0), 0.5))
-            )
-            sites_assessed = int(
-                round(cond_insp * max(min(1.2 + rng.uniform(-0.2, 0.2), 2.0), 0.5))
-            )
-            sites_compliant = int(
-                round(sites_assessed * max(min(0.9 + rng.uniform(-0.05, 0.05), 1.0), 0.6))
-            )
-            registry_sub = int(
-                round(recvd * max(min(0.5 + rng.uniform(-0.1, 0.1), 0.9), 0.3))
-            )
-            registry_proc = int(
-                round(registry_sub * max(min(0.9 + rng.uniform(-0.05, 0.05), 1.0), 0.6))
-            )
-            capa_raised = int(
-                round(compl * max(min(0.25 + rng.uniform(-0.08, 0.08), 0.6), 0.1))
-            )
-            capa_eval = int(
-                round(capa_raised * max(min(0.9 + rng.uniform(-0.08, 0.05), 1.0), 0.5))
-            )
-            if kpi_id == "pct_new_apps_evaluated_on_time_ct":
-                rows += [
-                    {"quarter": q, "series": "Submitted", "value": new_subm},
-                    {"quarter": q, "series": "Evaluated", "value": new_eval},
-                ]
-            elif kpi_id == "pct_amendment_apps_evaluated_on_time":
-                rows += [
-                    {"quarter": q, "series": "Submitted", "value": amd_subm},
-                    {"quarter": q, "series": "Evaluated", "value": amd_eval},
-                ]
-            elif kpi_id == "pct_gcp_inspections_on_time":
-                rows += [
-                    {"quarter": q, "series": "Planned", "value": req_insp},
-                    {"quarter": q, "series": "Conducted", "value": cond_insp},
-                ]
-            elif kpi_id == "pct_safety_reports_assessed_on_time":
-                rows += [
-                    {"quarter": q, "series": "Safety reports", "value": safety_reports},
-                    {"quarter": q, "series": "Assessed", "value": safety_assessed},
-                ]
-            elif kpi_id == "pct_gcp_compliant":
-                rows += [
-                    {"quarter": q, "series": "Sites assessed", "value": sites_assessed},
-                    {"quarter": q, "series": "Compliant", "value": sites_compliant},
-                ]
-            elif kpi_id == "pct_registry_submissions_on_time":
-                rows += [
-                    {"quarter": q, "series": "Total reports", "value": registry_sub},
-                    {"quarter": q, "series": "Published", "value": registry_proc},
-                ]
-            elif kpi_id == "pct_capa_evaluated_on_time":
-                rows += [
-                    {"quarter": q, "series": "CAPA raised", "value": capa_raised},
-                    {"quarter": q, "series": "Evaluated", "value": capa_eval},
-                ]
+@cache_data("bottleneck_analytics_rows", shared=True)
+def bottleneck_analytics_rows(data_version: str, _bottleneck_data: Dict[str, Any]) -> pd.DataFrame:
+    """Derived flow metrics as analytics-pool rows (cached per dataset version)."""
+    return flatten_bottleneck_analytics(bottleneck_analytics_cached(data_version, _bottleneck_data))
 
-    elif process == "GMP":
-        title_map = {
-            "pct_facilities_inspected_on_time": "GMP: Submitted vs Inspected by Inspection Type",
-            "pct_inspections_waived_on_time": "GMP: Total Inspections vs Waived (Desk/Remote)",
-            "pct_facilities_compliant": "GMP: Conducted vs Compliant by Inspection Type",
-            "pct_capa_decisions_on_time": "GMP: CAPA Decisions by Inspection Source",
-            "pct_applications_completed_on_time": "GMP: Applications by Source",
-            "pct_reports_published_on_time": "GMP: Reports Published by Inspection Type",
-        }
-        title = f"{title_map.get(kpi_id, 'GMP comparison')} — {year}"
-        for q in year_quarters:
-            rec = rec_map.get(q, {})
-            rng = seeded_rng("GMP", kpi_id, q)
-            req = {
-                "Domestic": int(rec.get("requested_domestic", 0) or 0),
-                "Foreign": int(rec.get("requested_foreign", 0) or 0),
-                "Reliance": int(rec.get("requested_reliance", 0) or 0),
-                "Desk": int(rec.get("requested_desk", 0) or 0),
-            }
-            cond = {
-                "Domestic": int(rec.get("conducted_domestic", 0) or 0),
-                "Foreign": int(rec.get("conducted_foreign", 0) or 0),
-                "Reliance": int(rec.get("conducted_reliance", 0) or 0),
-                "Desk": int(rec.get("conducted_desk", 0) or 0),
-            }
-            types = ["Domestic", "Foreign", "Reliance", "Desk"]
-            waived = {
-                t: int(round(req[t] * clamp(0.12 + rng.uniform(-0.05, 0.05), 0, 0.3)))
-                for t in types
-            }
-            compliant = {
-                t: int(round(cond[t] * clamp(0.88 + rng.uniform(-0.06, 0.05), 0.5, 1.0)))
-                for t in types
-            }
-            capa = {
-                t: int(round(cond[t] * clamp(0.30 + rng.uniform(-0.1, 0.1), 0.05, 0.7)))
-                for t in types
-            }
-            apps_by_src = {
-                t: int(round(req[t] * clamp(1.10 + rng.uniform(-0.2, 0.2), 0.4, 2.0)))
-                for t in types
-            }
-            reports = {
-                t: int(round(cond[t] * clamp(0.95 + rng.uniform(-0.05, 0.05), 0.5, 1.2)))
-                for t in types
-            }
-            if kpi_id == "pct_facilities_inspected_on_time":
-                for t in types:
-                    rows += [
-                        {"quarter": q, "series": f"{t} — Submitted", "value": req[t]},
-                        {"quarter": q, "series": f"{t} — Inspected", "value": cond[t]},
-                    ]
-            elif kpi_id == "pct_inspections_waived_on_time":
-                total_inspections = sum(req.values())
-                total_waived = waived["Desk"]
-                rows += [
-                    {"quarter": q, "series": "Total Inspections", "value": total_inspections},
-                    {"quarter": q, "series": "Waived (Desk/Remote)", "value": total_waived},
-                ]
-            elif kpi_id == "pct_facilities_compliant":
-                for t in types:
-                    rows += [
-                        {"quarter": q, "series": f"{t} — Conducted", "value": cond[t]},
-                        {"quarter": q, "series": f"{t} — Compliant", "value": compliant[t]},
-                    ]
-            elif kpi_id == "pct_capa_decisions_on_time":
-                for t in ["Domestic", "Foreign", "Reliance"]:
-                    rows += [
-                        {"quarter": q, "series": f"{t} — CAPA decisions", "value": capa[t]},
-                    ]
-            elif kpi_id == "pct_applications_completed_on_time":
-                for t in ["Domestic", "Foreign", "Reliance"]:
-                    rows += [
-                        {"quarter": q, "series": f"{t} — Applications", "value": apps_by_src[t]},
-                    ]
-            elif kpi_id == "pct_reports_published_on_time":
-                for t in types:
-                    rows += [
-                        {"quarter": q, "series": f"{t} — Reports published", "value": reports[t]},
-                    ]
 
-    df = pd.DataFrame(rows)
-    return df, title, ylabel
+@cache_data("flow_matrices")
+def flow_matrices_cached(data_version: str, _process_step_counts: Dict[str, Any]) -> Dict[str, FlowMatrix]:
+    """
+    Cached ``kpi_core.flow.flow_matrices`` for one dataset version.
+
+    Args:
+        data_version (str): Dataset version (cache key for ``_process_step_counts``).
+        _process_step_counts (Dict): ``processStepCounts`` data (not hashed).
+
+    Returns:
+        Dict[str, FlowMatrix]: Step × quarter flow matrix per process.
+    """
+    return flow_matrices(_process_step_counts)
 
 
-def _pair_spec_for_kpi(process: str, kpi_id: str) -> Optional[Tuple[Optional[str], str, List[str]]]:
+@cache_data("staffing_scenario")
+def staffing_scenario(
+    data_version: str, process: str, quarter: str, scenario: Scenario, replications: int, _data: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
     """
-    Get pair specification for volume comparison.
+    Cached Monte Carlo what-if (``kpi_core.simulation``) per dataset version and scenario.
 
     Args:
+        data_version (str): Dataset version (cache key for ``_data``).
         process (str): Process.
-        kpi_id (str): KPI ID.
+        quarter (str): Base quarter.
+        scenario (Scenario): Staffing/demand changes.
+        replications (int): Monte Carlo replications.
+        _data (Dict): Loaded data (not hashed).
 
     Returns:
-        Optional[Tuple]: Base label, compare label, group levels.
-    """
-    if process == "MA":
-        pairs = {
-            "pct_new_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
-            "pct_renewal_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
-            "pct_variation_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
-            "pct_fir_responses_on_time": ("FIR queries", "FIR responses", ["All"]),
-            "pct_query_responses_evaluated_on_time": ("Queries", "Query responses", ["All"]),
-            "pct_granted_within_90_days": ("Submitted", "Granted", ["All"]),
-        }
-        return pairs.get(kpi_id)
-    if process == "CT":
-        pairs = {
-            "pct_new_apps_evaluated_on_time_ct": ("Submitted", "Evaluated", ["All"]),
-            "pct_amendment_apps_evaluated_on_time": ("Submitted", "Evaluated", ["All"]),
-            "pct_gcp_inspections_on_time": ("Planned", "Conducted", ["All"]),
-            "pct_safety_reports_assessed_on_time": ("Safety reports", "Assessed", ["All"]),
-            "pct_gcp_compliant": ("Sites assessed", "Compliant", ["All"]),
-            "pct_registry_submissions_on_time": ("Total reports", "Published", ["All"]),
-            "pct_capa_evaluated_on_time": ("CAPA raised", "Evaluated", ["All"]),
-        }
-        return pairs.get(kpi_id)
-    if process == "GMP":
-        pairs = {
-            "pct_facilities_inspected_on_time": (
-                "Submitted",
-                "Inspected",
-                ["Domestic", "Foreign", "Reliance", "Desk"],
-            ),
-            "pct_facilities_compliant": (
-                "Conducted",
-                "Compliant",
-                ["Domestic", "Foreign", "Reliance", "Desk"],
-            ),
-            "pct_inspections_waived_on_time": ("Total Inspections", "Waived (Desk/Remote)", ["All"]),
-            "pct_capa_decisions_on_time": (None, "CAPA decisions", ["Domestic", "Foreign", "Reliance"]),
-            "pct_applications_completed_on_time": (None, "Applications", ["Domestic", "Foreign", "Reliance"]),
-            "pct_reports_published_on_time": (
-                "Conducted",
-                "Reports published",
-                ["Domestic", "Foreign", "Reliance", "Desk"],
-            ),
-        }
-        return pairs.get(kpi_id)
-    return None
+        Optional[Dict[str, Any]]: Simulation result, or None without inputs for the quarter.
+    """
+    inputs = step_inputs(process, quarter, _data.get("bottleneckData", {}), _data["processStepData"])
+    return None if inputs is None else simulate(inputs, scenario, replications)
+
+
+@cache_data("reports_fine_bottleneck_df", shared=True)
+def reports_fine_bottleneck_df(
+    data_version: str, process: str, quarter: str, _fine_bottleneck_data: Dict[str, Any]
+) -> pd.DataFrame:
+    """
+    Cached ``kpi_core.fine_bottleneck_df`` for one dataset version.
+
+    Args:
+        data_version (str): Dataset version (cache key for ``_fine_bottleneck_data``).
+        process (str): Process.
+        quarter (str): Quarter.
+        _fine_bottleneck_data (Dict): Week/month bottleneck data (not hashed).
+
+    Returns:
+        pd.DataFrame: Bottleneck metrics per step and period.
+    """
+    return fine_bottleneck_df(process, quarter, _fine_bottleneck_data)
 
 
-def _prepare_category_first_df(
-    process: str, kpi_id: str, quarter: str, data: Dict[str, Any]
+# =======================
+# CONTEXT CHARTS HELPERS (VOLUME COMPARISONS)
+# =======================
+@cache_data("kpi_comparison_frames", shared=True)
+def kpi_comparison_frames(
+    data_version: str, process: str, kpi_id: str, quarter: str, _data: Dict[str, Any]
 ) -> Tuple[pd.DataFrame, str, List[str], List[str]]:
     """
-    Prepare DataFrame for category-first volume analysis.
+    Cached category-first comparison frame, keyed by dataset version.
 
     Args:
+        data_version (str): Dataset version (cache key for ``_data``).
         process (str): Process.
         kpi_id (str): KPI ID.
         quarter (str): Quarter.
-        data (Dict): Data.
+        _data (Dict): Data (not hashed).
 
     Returns:
         Tuple: DF, title, categories, group levels.
     """
-    spec = _pair_spec_for_kpi(process, kpi_id)
-    if not spec:
-        return pd.DataFrame(), "", [], []
-    base_label, compare_label, group_levels = spec
-    df_raw, title, _ = build_kpi_comparison_df(process, kpi_id, quarter, data)
-    if df_raw.empty:
-        return pd.DataFrame(), title, [], []
-
-    rows = []
-    for _, r in df_raw.iterrows():
-        series = str(r["series"])
-        if "—" in series:
-            group, category = [s.strip() for s in series.split("—", 1)]
-        else:
-            group, category = "All", series
-        rows.append(
-            {
-                "quarter": r["quarter"],
-                "group": group,
-                "category": category,
-                "value": int(r["value"] or 0),
-            }
-        )
-    d = pd.DataFrame(rows)
-    categories = [c for c in [base_label, compare_label] if c is not None] if base_label else [compare_label]
-    d = d[d["category"].isin(categories)].copy()
-    if base_label is not None and len(group_levels) == 1:
-        pair_tot = d.groupby("quarter")["value"].sum().rename("pair_total")
-        d = d.merge(pair_tot.reset_index(), on="quarter", how="left")
-        d["pct"] = (d["value"] / d["pair_total"]) * 100.0
-        if kpi_id == "pct_inspections_waived_on_time":
-            total_vals = d[d["category"] == "Total Inspections"].set_index("quarter")["value"]
-            waived_rows = d["category"] == "Waived (Desk/Remote)"
-            d.loc[waived_rows, "pct"] = (
-                d.loc[waived_rows, "value"] / total_vals[d.loc[waived_rows, "quarter"]].values
-            ) * 100
-            d.loc[d["category"] == "Total Inspections", "pct"] = 100.0
-    else:
-        cat_tot = (
-            d.groupby(["quarter", "category"], as_index=False)["value"].sum().rename(columns={"value": "cat_total"})
-        )
-        d = d.merge(cat_tot, on=["quarter", "category"], how="left")
-        d["pct"] = np.where(d["cat_total"] > 0, (d["value"] / d["cat_total"]) * 100.0, np.nan)
-    if process == "GMP":
-        d["group"] = pd.Categorical(d["group"], categories=group_levels, ordered=True)
-    else:
-        d["group"] = pd.Categorical(d["group"], categories=["All"], ordered=True)
-    return d, title, categories, group_levels
+    return prepare_category_first_df(process, kpi_id, quarter, _data)
+
 
+@cache_data("comparison_figure", shared=True)
+def comparison_figure_cached(
+    data_version: str, process: str, kpi_id: str, quarter: str, _data: Dict[str, Any]
+) -> Optional[go.Figure]:
+    """
+    Cached volume comparison figure, keyed by dataset version.
+
+    Args:
+        data_version (str): Dataset version (cache key for ``_data``).
+        process (str): Process.
+        kpi_id (str): KPI ID.
+        quarter (str): Quarter.
+        _data (Dict): Data (not hashed).
 
-def render_kpi_comparison(process: str, kpi_id: str, quarter: str, data: Dict[str, Any]) -> None:
+    Returns:
+        Optional[go.Figure]: Figure, or None when the KPI has no comparison chart.
+    """
+    d, title, categories, group_levels = kpi_comparison_frames(data_version, process, kpi_id, quarter, _data)
+    return comparison_figure(process, d, title, categories, group_levels)
+
+
+def render_kpi_comparison(
+    process: str, kpi_id: str, quarter: str, data: Dict[str, Any], data_version: str
+) -> None:
     """
     Render volume comparison chart for KPI.
 
@@ -1531,296 +793,121 @@ def render_kpi_comparison(process: str, kpi_id: str, quarter: str, data: Dict[st
         kpi_id (str): KPI ID.
         quarter (str): Quarter.
         data (Dict): Data.
+        data_version (str): Dataset version for cache lookups.
     """
-    d, title, categories, group_levels = _prepare_category_first_df(process, kpi_id, quarter, data)
-    if d.empty or not title:
+    fig = comparison_figure_cached(data_version, process, kpi_id, quarter, data)
+    if fig is None:
         st.info("No per-quarter comparison chart for this KPI.")
         return
-
-    fig = go.Figure()
-    if process in ("MA", "CT"):
-        qorder = sorted(
-            d["quarter"].unique(), key=lambda s: (int(s.split()[1]), int(s.split()[0][1:]))
-        )
-        for i, cat in enumerate(categories):
-            dd = d[d["category"] == cat].groupby("quarter", as_index=False).agg(
-                {"value": "sum", "pct": "mean"}
-            )
-            dd["quarter"] = pd.Categorical(dd["quarter"], categories=qorder, ordered=True)
-            color = NDA_GREEN if i == 0 else NDA_ACCENT
-            fig.add_bar(
-                x=dd["quarter"],
-                y=dd["value"],
-                name=cat,
-                marker=dict(color=color),
-                text=[
-                    f"{int(v):,} ({p:.0f}%)" if not np.isnan(p) else f"{int(v):,} (—)"
-                    for v, p in zip(dd["value"], dd["pct"])
-                ],
-                textposition="outside",
-            )
-        fig.update_layout(
-            title=title,
-            barmode="group",
-            bargap=0.25,
-            bargroupgap=0.15,
-            margin=dict(l=10, r=10, t=50, b=10),
-            plot_bgcolor=CARD_BG,
-            paper_bgcolor=CARD_BG,
-            font=dict(color=TEXT_DARK),
-            legend=dict(orientation="h", y=-0.2),
-            xaxis=dict(title=""),
-            yaxis=dict(title="count", rangemode="tozero"),
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        return
-
-    def _color_for_group(g: str) -> str:
-        return GMP_GROUP_COLORS.get(g, NDA_GREEN)
-
-    qorder = sorted(
-        d["quarter"].unique(), key=lambda s: (int(s.split()[1]), int(s.split()[0][1:]))
-    )
-    x_axis = []
-    for q in qorder:
-        for cat in categories:
-            x_axis.append((q, cat))
-    look = {}
-    for _, r in d.iterrows():
-        look[(str(r["group"]), r["quarter"], r["category"])] = (
-            int(r["value"]),
-            float(r["pct"]) if not pd.isna(r["pct"]) else np.nan,
-        )
-    for g in group_levels:
-        xs, ys, texts = [], [], []
-        for (q, cat) in x_axis:
-            v, p = look.get((g, q, cat), (0, np.nan))
-            xs.append((q, cat))
-            ys.append(v)
-            texts.append(
-                f"{int(v):,} ({p:.0f}%)" if not np.isnan(p) else f"{int(v):,} (—)"
-            )
-        fig.add_bar(
-            x=xs,
-            y=ys,
-            name=g,
-            marker=dict(color=_color_for_group(g)),
-            text=texts,
-            textposition="outside",
-        )
-    fig.update_layout(
-        title=title,
-        barmode="group",
-        bargap=0.25,
-        bargroupgap=0.15,
-        margin=dict(l=10, r=10, t=50, b=10),
-        plot_bgcolor=CARD_BG,
-        paper_bgcolor=CARD_BG,
-        font=dict(color=TEXT_DARK),
-        legend=dict(orientation="h", y=-0.2),
-        xaxis=dict(title="", type="category"),
-        yaxis=dict(title="count", rangemode="tozero"),
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
 
 
 # =======================
 # KPI TREND VISUALIZATION
 # =======================
+@PROFILER.timed("kpi_trend")
 def kpi_trend(
     process: str,
     base_kpi_id: str,
     kpis_block: Dict[str, Any],
     quarter: str,
     disag_choice: str,
+    intervals: Optional[pd.DataFrame] = None,
+    forecasts: Optional[pd.DataFrame] = None,
 ) -> None:
     """
     Render trend line chart for KPI, respecting disaggregation.
 
+    Long histories get a zoom window control; the chart is re-queried for the
+    selected window so detail is never lost to downsampling. Percentage KPIs
+    with case counts get a shaded 95% confidence band, and the precomputed
+    forecast extends the line up to the chosen number of quarters ahead.
+
     Args:
         process (str): Process.
         base_kpi_id (str): Base KPI ID.
         kpis_block (Dict): KPIs data.
         quarter (str): Selected quarter.
         disag_choice (str): Disaggregation.
-    """
-    # Special handling for GMP all-disag view
-    if (
-        process == "GMP"
-        and base_kpi_id
-        in [
-            "pct_facilities_inspected_on_time",
-            "pct_facilities_compliant",
-            "pct_capa_decisions_on_time",
-            "pct_applications_completed_on_time",
-            "pct_reports_published_on_time",
-        ]
-        and disag_choice == "All"
-    ):
-        fig = go.Figure()
-        child_map = DISAG_KPI_LINKS.get(base_kpi_id, {})
-        ref_quarters = None
-        for label, kid in child_map.items():
-            k = kpis_block.get(kid)
-            if not k:
-                continue
-            series = pd.DataFrame(k["data"])
-            if ref_quarters is None:
-                ref_quarters = series["quarter"].tolist()
-            fig.add_trace(
-                go.Scatter(
-                    x=series["quarter"],
-                    y=series["value"],
-                    name=label,
-                    mode="lines+markers",
-                )
-            )
-        k_base = kpis_block.get(base_kpi_id)
-        if k_base:
-            series_base = pd.DataFrame(k_base["data"])
-            if ref_quarters is None:
-                ref_quarters = series_base["quarter"].tolist()
-            fig.add_trace(
-                go.Scatter(
-                    x=series_base["quarter"],
-                    y=series_base["value"],
-                    name="Overall",
-                    mode="lines+markers",
-                    line=dict(width=4, color=NDA_GREEN),
-                )
-            )
-            target = k_base.get("target")
-            baseline = k_base.get("baseline")
-            if target is not None:
-                fig.add_trace(
-                    go.Scatter(
-                        x=ref_quarters,
-                        y=[target] * len(ref_quarters),
-                        name="Target",
-                        mode="lines",
-                        line=dict(dash="dash", color=NDA_ACCENT),
-                    )
-                )
-            if baseline is not None:
-                fig.add_trace(
-                    go.Scatter(
-                        x=ref_quarters,
-                        y=[baseline] * len(ref_quarters),
-                        name="Baseline",
-                        mode="lines",
-                        line=dict(dash="dot", color="#94a3b8"),
-                    )
-                )
-        y_max = 100 if base_kpi_id.startswith("pct_") else None
-        fig.update_layout(
-            title="Trend vs Target — All disaggregations",
-            height=500,
-            margin=dict(l=10, r=10, t=40, b=0),
-            yaxis_range=[0, y_max] if y_max else None,
-            plot_bgcolor=CARD_BG,
-            paper_bgcolor=CARD_BG,
-            font=dict(color=TEXT_DARK),
-            legend=dict(orientation="h", y=-0.2),
+        intervals (Optional[pd.DataFrame]): Output of ``kpi_intervals``.
+        forecasts (Optional[pd.DataFrame]): Output of ``kpi_forecasts``.
+    """
+    periods = trend_periods(process, base_kpi_id, kpis_block, disag_choice)
+    x_range = None
+    if len(periods) > TREND_WEBGL_THRESHOLD:
+        # Long histories are downsampled; zooming re-queries the window at full resolution
+        x_range = st.select_slider(
+            "Zoom window",
+            options=periods,
+            value=(periods[0], periods[-1]),
+            key=f"trend_zoom_{process}_{base_kpi_id}_{disag_choice}",
         )
-        st.plotly_chart(fig, use_container_width=True)
-        return
-
-    # Standard trend for effective KPI
-    effective_kpi_id, applied = resolve_effective_kpi_id(base_kpi_id, process, disag_choice)
-    k = kpis_block.get(effective_kpi_id) or kpis_block.get(base_kpi_id)
-    if not k:
-        st.warning("No KPI series found.")
-        return
-    series = pd.DataFrame(k["data"])
-    target = k.get("target")
-    baseline = k.get("baseline")
-    y_max = 100 if effective_kpi_id.startswith("pct_") else None
-    fig = go.Figure()
-    fig.add_trace(
-        go.Scatter(
-            x=series["quarter"],
-            y=series["value"],
-            name="Performance",
-            mode="lines+markers",
-            line=dict(width=3, color=NDA_GREEN),
+    band = None
+    if intervals is not None:
+        effective_kpi_id, _ = resolve_effective_kpi_id(base_kpi_id, process, disag_choice)
+        band = kpi_band(intervals, process, effective_kpi_id)
+        if band.empty:
+            band = kpi_band(intervals, process, base_kpi_id)
+        band = band if not band.empty else None
+    ahead = None
+    if forecasts is not None:
+        horizon = st.select_slider(
+            "Forecast quarters ahead",
+            options=list(range(MAX_HORIZON + 1)),
+            value=2,
+            key=f"trend_horizon_{process}_{base_kpi_id}_{disag_choice}",
         )
+        effective_kpi_id, _ = resolve_effective_kpi_id(base_kpi_id, process, disag_choice)
+        ahead = forecast_band(forecasts, process, effective_kpi_id, horizon)
+        if ahead.empty:
+            ahead = forecast_band(forecasts, process, base_kpi_id, horizon)
+        ahead = ahead if not ahead.empty else None
+    fig = trend_figure(
+        process, base_kpi_id, kpis_block, quarter, disag_choice, x_range=x_range, band=band, forecast=ahead
     )
-    if target is not None:
-        fig.add_trace(
-            go.Scatter(
-                x=series["quarter"],
-                y=[target] * len(series),
-                name="Target",
-                mode="lines",
-                line=dict(dash="dash", color=NDA_ACCENT),
-            )
-        )
-    if baseline is not None:
-        fig.add_trace(
-            go.Scatter(
-                x=series["quarter"],
-                y=[baseline] * len(series),
-                name="Baseline",
-                mode="lines",
-                line=dict(dash="dot", color="#94a3b8"),
-            )
+    if fig is None:
+        st.warning("No KPI series found.")
+        return
+    plotly_chart(fig, use_container_width=True)
+    if band is not None:
+        st.caption("Shaded band: 95% Wilson interval from the quarter's case counts (kpiCounts).")
+    if ahead is not None and pd.notna(ahead["p_hit"].iloc[-1]):
+        end = ahead.iloc[-1]
+        st.caption(
+            f"Dashed: damped-trend forecast with 95% prediction interval. "
+            f"Chance of meeting target in {end['quarter']}: {end['p_hit']:.0%}."
         )
-    title_suffix = f" — {applied}" if applied else ""
-    fig.update_layout(
-        title=f"Trend vs Target{title_suffix}",
-        height=500,
-        margin=dict(l=10, r=10, t=40, b=0),
-        yaxis_range=[0, y_max] if y_max else None,
-        plot_bgcolor=CARD_BG,
-        paper_bgcolor=CARD_BG,
-        font=dict(color=TEXT_DARK),
-        legend=dict(orientation="h", y=-0.2),
-    )
-    st.plotly_chart(fig, use_container_width=True)
 
 
 # =======================
 # KPI CARD COMPONENT
 # =======================
-def kpi_card(
-    kpi_id: str, kpi_obj: Dict[str, Any], quarter: str, *, process: str
-) -> bool:
+def kpi_card(card: Dict[str, Any], quarter: str, *, process: str) -> bool:
     """
     Render interactive KPI card.
 
     Args:
-        kpi_id (str): KPI ID.
-        kpi_obj (Dict): KPI data.
+        card (Dict): Card row of the Overview summaries (kpi_id, value,
+            delta vs the previous point, status, significance).
         quarter (str): Quarter.
         process (str): Process.
 
     Returns:
         bool: True if details button clicked.
     """
-    series = kpi_obj["data"]
-    cur = next((x for x in series if x["quarter"] == quarter), None)
-    prev_val = None
-    if cur:
-        idx = series.index(cur)
-        if idx > 0:
-            prev_val = series[idx - 1]["value"]
+    kpi_id = card["kpi_id"]
+    value = None if pd.isna(card["value"]) else float(card["value"])
+    delta = None if pd.isna(card["delta"]) else float(card["delta"])
     is_time = kpi_id in TIME_BASED
     is_pct = kpi_id.startswith("pct_")
-    delta = None if (not cur or prev_val is None) else (cur["value"] - prev_val)
-    vdisp = (
-        pct(cur["value"])
-        if (cur and is_pct)
-        else (f"{cur['value']:.2f}" if cur else "—")
-    )
+    vdisp = "—" if value is None else (pct(value) if is_pct else f"{value:.2f}")
     ddisp = (
         None
         if delta is None
         else (f"{'+' if delta > 0 else ''}{delta:.1f}" + ("%" if is_pct else ""))
     )
     good_vs_prev = (delta is not None) and ((delta < 0) if is_time else (delta > 0))
-    status = status_for(
-        kpi_id, None if not cur else cur["value"], kpi_obj.get("target")
-    )
+    status = card["status"]
     bleft = status_color(status)
     btint = status_bg_tint(status)
     status_label = {
@@ -1845,6 +932,8 @@ def kpi_card(
     chips.append(
         f"<span class='kpi-chip' style='border-color:{bleft}; color:{bleft}'>{status_label}</span>"
     )
+    if card["significance"] == SIG_BELOW:
+        chips.append("<span class='kpi-chip bad' title='95% interval lies below target'>Statistically below</span>")
     st.markdown(" ".join(chips), unsafe_allow_html=True)
     st.markdown(f"<div class='kpi-sub'>{tiny_label(kpi_id)}</div>", unsafe_allow_html=True)
     clicked = st.button(
@@ -1879,113 +968,20 @@ st.markdown(
 # =======================
 st.sidebar.image("logo.jpg", use_container_width=True)
 data_path = st.sidebar.text_input(
-    "Path to data (JSON exported from kpiData.js)", value="data/kpiData.json"
+    "Path to data (JSON exported from kpiData.js, or a *.sources.json manifest)", value="data/kpiData.json"
 )
-data = load_data(data_path)
+data_version = current_data_version(data_path)
+# The Overview renders from these; the full data is loaded on drill-in and in Reports (``full_data``)
+summaries = load_overview_summaries(data_path, data_version)
 tab = st.sidebar.radio("View", ["Overview", "Reports"], index=0, horizontal=False)
 
 # Extract all available quarters
-all_quarters = sorted(
-    {
-        q
-        for proc in data["quarterlyData"].values()
-        for k in proc.values()
-        for q in [d["quarter"] for d in k["data"]]
-    },
-    key=lambda s: (int(s.split()[1]), int(s.split()[0][1:])),
-)
+all_quarters = summaries.quarters
 
 
 # =======================
-# SELF-SERVICE ANALYTICS PREPARATION
+# SELF-SERVICE ANALYTICS RENDERING
 # =======================
-def prep_analysis(
-    df: pd.DataFrame,
-    analysis_type: str,
-    processes: List[str],
-    metrics: List[str],
-    group_by: str,
-    agg: str,
-    compare_by_category: bool,
-    show_pct_change: bool,
-    x_metric: Optional[str] = None,
-    y_metric: Optional[str] = None,
-) -> Tuple[pd.DataFrame, str, Dict[str, Any], str, Optional[pd.DataFrame]]:
-    """
-    Prepare pivot table for analysis.
-
-    Args:
-        df (pd.DataFrame): Input data.
-        analysis_type (str): Type ("Trend", "Comparison", etc.).
-        processes (List[str]): Processes.
-        metrics (List[str]): Metrics.
-        group_by (str): Grouping column.
-        agg (str): Aggregation function.
-        compare_by_category (bool): Compare by category.
-        show_pct_change (bool): Show % change.
-        x_metric (Optional[str]): X metric for correlation.
-        y_metric (Optional[str]): Y metric for correlation.
-
-    Returns:
-        Tuple: Pivot DF, agg, metadata, type, % change DF.
-    """
-    if df.empty:
-        return pd.DataFrame(), None, None, None, None
-    filtered = df[df["process"].isin(processes)].copy()
-    is_time_series = group_by in ["quarter", "year"]
-    pt = None
-    meta = {"color_var": None, "x_col": None, "y_col": None}
-    if analysis_type == "Correlation":
-        if not (x_metric and y_metric):
-            return pd.DataFrame(), None, None, None, None
-        filtered = filtered[filtered["metric_name"].isin([x_metric, y_metric])]
-        if filtered.empty:
-            return pd.DataFrame(), None, None, None, None
-        if group_by not in ["quarter", "year"]:
-            group_by = "quarter"
-        pt_x = pd.pivot_table(
-            filtered[filtered["metric_name"] == x_metric],
-            values="value",
-            index=group_by,
-            aggfunc=agg,
-            fill_value=0,
-        )
-        pt_x.columns = [metric_display_name(x_metric)]
-        pt_y = pd.pivot_table(
-            filtered[filtered["metric_name"] == y_metric],
-            values="value",
-            index=group_by,
-            aggfunc=agg,
-            fill_value=0,
-        )
-        pt_y.columns = [metric_display_name(y_metric)]
-        pt = pt_x.join(pt_y, how="inner").sort_index()
-        meta = {"x_col": pt.columns[0], "y_col": pt.columns[1], "color_var": None}
-        return pt, agg, meta, "Correlation", None
-    if metrics:
-        filtered = filtered[filtered["metric_name"].isin(metrics)]
-    if filtered.empty:
-        return pd.DataFrame(), None, None, None, None
-    if compare_by_category and "category" in filtered.columns and filtered["category"].notna().any():
-        pt = pd.pivot_table(
-            filtered, values="value", index=group_by, columns="category", aggfunc=agg, fill_value=0
-        )
-        pt.columns = [category_display_name(c) for c in pt.columns]
-        meta["color_var"] = "category"
-    else:
-        pt = pd.pivot_table(
-            filtered, values="value", index=group_by, columns="metric_name", aggfunc=agg, fill_value=0
-        )
-        pt.columns = [metric_display_name(c) for c in pt.columns]
-        meta["color_var"] = "metric_name"
-    pct_change_df = None
-    if show_pct_change and is_time_series and analysis_type == "Trend" and len(pt) > 1:
-        pct_change_df = pt.pct_change(axis=0) * 100
-        pct_change_df = pct_change_df.round(1).dropna(how="all")
-        pct_change_df.index.name = group_by  # Ensure index name for plotting
-    return pt.sort_index(), agg, meta, analysis_type, pct_change_df
-
-
 def render_analysis_table_and_chart(
     pt: pd.DataFrame,
     pct_change_df: Optional[pd.DataFrame],
@@ -2167,7 +1163,7 @@ def render_analysis_table_and_chart(
                 st.caption(f"Could not compute regression: {e}")
     elif selected_chart == "heatmap" and pt.shape[1] >= 2:
         if analysis_type != "Correlation":
-            corr_matrix = pt.corr(numeric_only=True)
+            corr_matrix = correlation_matrix(pt.select_dtypes("number"))
             fig = px.imshow(
                 corr_matrix, aspect="auto", color_continuous_scale="RdBu_r", text_auto=True
             )
@@ -2204,262 +1200,396 @@ def render_analysis_table_and_chart(
         height=450,
         title=dict(text=title, x=0.5, font=dict(size=14, color=TEXT_DARK)),
         xaxis_title=f"{x_col.replace('_', ' ').title()}",
-        yaxis_title=f"{y_label} ({'Count' if agg == 'sum' else agg.title()})",
+        yaxis_title=f"{y_label} ({'Count' if agg == 'sum' else 'Weighted' if agg == RATIO_AGG else agg.title()})",
         plot_bgcolor=CARD_BG,
         paper_bgcolor=CARD_BG,
         font=dict(color=TEXT_DARK),
         legend=dict(orientation="h", yanchor="bottom", y=-0.25, xanchor="center", x=0.5),
         annotations=annotations,
     )
-    st.plotly_chart(fig, use_container_width=True)
+    plotly_chart(fig, use_container_width=True)
 
 
 # =======================
 # REPORTS DATA FLATTENERS
 # =======================
-@st.cache_data(show_spinner=False)
-def flatten_volumes(data: Dict[str, Any]) -> pd.DataFrame:
+@cache_data("flatten_volumes", shared=True)
+def flatten_volumes(data_version: str, _data: Dict[str, Any]) -> pd.DataFrame:
+    """Cached ``kpi_core.flatten_volumes`` for one dataset version."""
+    return core_flatten_volumes(_data)
+
+
+@cache_data("flatten_steps_for_analytics", shared=True)
+def flatten_steps_for_analytics(data_version: str, _data: Dict[str, Any]) -> pd.DataFrame:
+    """Cached ``kpi_core.flatten_steps_for_analytics`` for one dataset version."""
+    return core_flatten_steps_for_analytics(_data)
+
+
+@cache_data("ratio_components", shared=True)
+def ratio_components_cached(data_version: str, _data: Dict[str, Any]) -> pd.DataFrame:
     """
-    Flatten quarterly and inspection volumes into analysis-ready DF.
+    Cached ``kpi_core.aggregation.ratio_components`` for one dataset version.
 
     Args:
-        data (Dict): Loaded data.
+        data_version (str): Dataset version (cache key for ``_data``).
+        _data (Dict): Loaded data (not hashed).
 
     Returns:
-        pd.DataFrame: Flattened volumes.
-    """
-    rows = []
-    for proc in ["MA", "CT"]:
-        for qd in data.get("quarterlyVolumes", {}).get(proc, []):
-            quarter = qd["quarter"]
-            year = int(quarter.split()[-1])
-            for metric, value in qd.items():
-                if metric == "quarter":
-                    continue
-                cat = metric.split("_")[-1] if "_" in metric else None
-                rows.append(
-                    {
-                        "source": "volumes",
-                        "process": proc,
-                        "quarter": quarter,
-                        "year": year,
-                        "metric_name": metric,
-                        "category": cat,
-                        "value": (value if isinstance(value, (int, float)) else 0),
-                    }
-                )
-    for qd in data.get("inspectionVolumes", {}).get("GMP", []):
-        quarter = qd["quarter"]
-        year = int(quarter.split()[-1])
-        for metric, value in qd.items():
-            if metric == "quarter":
-                continue
-            cat = metric.split("_")[-1] if "_" in metric else None
-            rows.append(
-                {
-                    "source": "volumes",
-                    "process": "GMP",
-                    "quarter": quarter,
-                    "year": year,
-                    "metric_name": metric,
-                    "category": cat,
-                    "value": (value if isinstance(value, (int, float)) else 0),
-                }
-            )
-    return pd.DataFrame(rows)
+        pd.DataFrame: Quarterly rate metrics with numerator/denominator.
+    """
+    return ratio_components(_data)
 
 
-@st.cache_data(show_spinner=False)
-def flatten_steps_for_analytics(data: Dict[str, Any]) -> pd.DataFrame:
+@cache_data("yearly_components", shared=True)
+def yearly_components_cached(data_version: str, _data: Dict[str, Any]) -> pd.DataFrame:
     """
-    Flatten process steps and bottlenecks for analytics.
+    Materialized per-(process, metric, year) rate components for one dataset version.
 
     Args:
-        data (Dict): Loaded data.
+        data_version (str): Dataset version (cache key for ``_data``).
+        _data (Dict): Loaded data (not hashed).
 
     Returns:
-        pd.DataFrame: Flattened steps data.
-    """
-    rows = []
-    # Process steps avgDays/targetDays
-    for proc, steps in data.get("processStepData", {}).items():
-        for step_key, obj in steps.items():
-            for rec in obj.get("data", []):
-                quarter = rec.get("quarter")
-                if not quarter:
-                    continue
-                year = int(quarter.split()[-1])
-                if "avgDays" in rec:
-                    rows.append(
-                        {
-                            "source": "steps",
-                            "process": proc,
-                            "quarter": quarter,
-                            "year": year,
-                            "metric_name": "step_avg_days",
-                            "category": strip_disag_suffix(step_key),
-                            "value": rec["avgDays"],
-                        }
-                    )
-                if "targetDays" in rec:
-                    rows.append(
-                        {
-                            "source": "steps",
-                            "process": proc,
-                            "quarter": quarter,
-                            "year": year,
-                            "metric_name": "step_target_days",
-                            "category": strip_disag_suffix(step_key),
-                            "value": rec["targetDays"],
-                        }
-                    )
-    # Bottleneck metrics
-    for proc, steps in data.get("bottleneckData", {}).items():
-        for step, series in steps.items():
-            for rec in series:
-                quarter = rec.get("quarter")
-                if not quarter:
-                    continue
-                year = int(quarter.split()[-1])
-                for m in [
-                    "cycle_time_median",
-                    "ext_median_days",
-                    "opening_backlog",
-                    "carry_over_rate",
-                    "avg_query_cycles",
-                    "fpy_pct",
-                    "wait_share_pct",
-                    "work_to_staff_ratio",
-                    "sched_median_days",
-                ]:
-                    if rec.get(m) is not None:
-                        rows.append(
-                            {
-                                "source": "bottlenecks",
-                                "process": proc,
-                                "quarter": quarter,
-                                "year": year,
-                                "metric_name": m,
-                                "category": step,
-                                "value": rec[m],
-                            }
-                        )
-    return pd.DataFrame(rows)
+        pd.DataFrame: Yearly numerator/denominator sums per rate metric.
+    """
+    return yearly_components(ratio_components_cached(data_version, _data))
 
 
-def metric_display_name(metric: str) -> str:
+@cache_data("window_table", shared=True)
+def window_table_cached(data_version: str, _data: Dict[str, Any]) -> pd.DataFrame:
     """
-    Human-readable name for metrics.
+    YoY, rolling and year-to-date measures of every analytics series for one dataset version.
 
     Args:
-        metric (str): Metric key.
+        data_version (str): Dataset version (cache key for ``_data``).
+        _data (Dict): Loaded data (not hashed).
 
     Returns:
-        str: Display name.
-    """
-    m = {
-        # Volumes
-        "applications_received": "Applications Received",
-        "applications_completed": "Applications Completed",
-        "approvals_granted": "Approvals Granted",
-        "gcp_inspections_requested": "GCP Inspections Requested",
-        "gcp_inspections_conducted": "GCP Inspections Conducted",
-        "requested_domestic": "Requested - Domestic",
-        "requested_foreign": "Requested - Foreign",
-        "requested_reliance": "Requested - Reliance",
-        "requested_desk": "Requested - Desk/Remote",
-        "conducted_domestic": "Conducted - Domestic",
-        "conducted_foreign": "Conducted - Foreign",
-        "conducted_reliance": "Conducted - Reliance",
-        "conducted_desk": "Conducted - Desk/Remote",
-        "compliant_domestic": "Compliant - Domestic",
-        "compliant_foreign": "Compliant - Foreign",
-        "compliant_reliance": "Compliant - Reliance",
-        "compliant_desk": "Compliant - Desk/Remote",
-        "reports_published": "Reports Published",
-        "fir_queries": "FIR Queries",
-        "fir_responses": "FIR Responses",
-        "queries": "Queries",
-        "query_responses": "Query Responses",
-        "amendments_received": "Amendments Received",
-        "sites_assessed": "Sites Assessed",
-        "registry_submissions": "Registry Submissions",
-        # Steps/Bottlenecks
-        "step_avg_days": "Step Actual Days",
-        "step_target_days": "Step Target Days",
-        "opening_backlog": "Opening Backlog",
-        "cycle_time_median": "Median Cycle Time (Days)",
-        "ext_median_days": "Median External Response (Days)",
-        "carry_over_rate": "Carry-Over Rate (%)",
-        "avg_query_cycles": "Average Query Cycles",
-        "fpy_pct": "First Pass Yield (%)",
-        "wait_share_pct": "Wait Time Share (%)",
-        "work_to_staff_ratio": "Work-to-Staff Ratio",
-        "sched_median_days": "Median Scheduling (Days)",
-    }
-    return m.get(metric, metric.replace("_", " ").title())
+        pd.DataFrame: ``kpi_core.windows.window_table`` over volumes, rates,
+        steps and bottleneck flow metrics.
+    """
+    pool = pd.concat(
+        [
+            flatten_volumes(data_version, _data),
+            ratio_components_cached(data_version, _data),
+            flatten_steps_for_analytics(data_version, _data),
+            bottleneck_analytics_rows(data_version, _data.get("bottleneckData", {})),
+        ],
+        ignore_index=True,
+    )
+    return window_table(pool)
 
 
-def category_display_name(cat: Optional[str]) -> str:
+# =======================
+# CACHE WARM-UP
+# =======================
+logger = logging.getLogger("kpi_dashboard")
+WARM_MAX_WORKERS = min(8, os.cpu_count() or 2)
+
+
+@st.cache_resource(show_spinner=False)
+def _warm_registry() -> Dict[str, Any]:
+    """Process-wide record of which dataset versions have been warmed."""
+    return {"lock": threading.Lock(), "reports": {}}
+
+
+WARM_DETAILS = "details"
+WARM_REPORTS = "reports"
+
+
+def warm_caches(
+    data_version: str, data: Mapping[str, Any], quarters: List[str], scope: str = WARM_REPORTS
+) -> Dict[str, Any]:
+    """
+    Pre-compute the derived caches of one part of the dashboard, once per process and dataset version.
+
+    Runs on the first session after server start and after each data swap
+    (a new ``data_version``) that opens that part. ``WARM_DETAILS`` (KPI
+    drill-in) builds the KPI intervals and forecasts and the comparison
+    figures for every (process, KPI, quarter); ``WARM_REPORTS`` builds the
+    flattened analytics tables and rate components, the flow metrics and
+    the bottleneck frames for every (process, quarter). Tasks run on a
+    thread pool so they land in the shared ``st.cache_data`` store before
+    users click, and only read the sections their part needs (KPI drill-in
+    never parses the bottleneck history). Concurrent sessions wait for the
+    warm-up in progress instead of repeating it.
+
+    Args:
+        data_version (str): Dataset version.
+        data (Mapping): Loaded data.
+        quarters (List[str]): All quarters.
+        scope (str): ``WARM_DETAILS`` or ``WARM_REPORTS``.
+
+    Returns:
+        Dict[str, Any]: Report with task count, failures and elapsed seconds.
+    """
+    registry = _warm_registry()
+    with registry["lock"]:
+        if (data_version, scope) in registry["reports"]:
+            return registry["reports"][(data_version, scope)]
+
+        if scope == WARM_DETAILS:
+            tasks = [
+                ("KPI intervals", kpi_intervals_cached, (data_version, data)),
+                ("KPI forecasts", kpi_forecasts_cached, (data_version, data)),
+            ]
+            for proc, kpis in data["quarterlyData"].items():
+                for q in quarters:
+                    for kid in base_kpi_ids(kpis):
+                        tasks.append(
+                            (f"comparison {proc} {kid} {q}", comparison_figure_cached, (data_version, proc, kid, q, data))
+                        )
+        else:
+            bottleneck_data = data.get("bottleneckData", {})
+            tasks = [
+                ("volumes table", flatten_volumes, (data_version, data)),
+                ("steps table", flatten_steps_for_analytics, (data_version, data)),
+                ("yearly rate components", yearly_components_cached, (data_version, data)),
+                ("window measures", window_table_cached, (data_version, data)),
+                ("bottleneck flow metrics", bottleneck_analytics_rows, (data_version, bottleneck_data)),
+                ("step flow matrices", flow_matrices_cached, (data_version, data.get("processStepCounts", {}))),
+            ]
+            for proc in data["quarterlyData"]:
+                for q in quarters:
+                    tasks.append(
+                        (f"bottlenecks {proc} {q}", reports_prepare_bottleneck_df, (data_version, proc, q, bottleneck_data))
+                    )
+
+        ctx = get_script_run_ctx()
+        progress = st.progress(0.0, text="Preparing dashboard data…")
+        failures = []
+        started = time.perf_counter()
+        with ThreadPoolExecutor(
+            max_workers=WARM_MAX_WORKERS,
+            initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx),
+        ) as pool:
+            futures = {pool.submit(fn, *args): label for label, fn, args in tasks}
+            for done, fut in enumerate(as_completed(futures), start=1):
+                if fut.exception() is not None:
+                    failures.append(futures[fut])
+                    logger.warning("Cache warm-up failed for %s: %s", futures[fut], fut.exception())
+                progress.progress(done / len(tasks), text=f"Preparing dashboard data… {done}/{len(tasks)}")
+        progress.empty()
+        report = {
+            "tasks": len(tasks),
+            "failed": failures,
+            "seconds": time.perf_counter() - started,
+        }
+        logger.info(
+            "Warmed %d caches for dataset %s in %.2fs (%d failed)",
+            report["tasks"], data_version, report["seconds"], len(failures),
+        )
+        registry["reports"][(data_version, scope)] = report
+        return report
+
+
+def full_data(scope: str) -> Mapping[str, Any]:
     """
-    Human-readable category name.
+    Full dataset for KPI details and Reports (call once per rerun).
+
+    Opens the data (shared per version; sections are parsed as views read
+    them) and warms the derived caches of ``scope`` the first time a
+    version is used.
 
     Args:
-        cat (Optional[str]): Category.
+        scope (str): ``WARM_DETAILS`` or ``WARM_REPORTS``.
 
     Returns:
-        str: Display name.
+        Mapping[str, Any]: Loaded data.
     """
-    return cat if cat is None else str(cat)
+    data = load_data(data_path, data_version)
+    warm_report = warm_caches(data_version, data, all_quarters, scope)
+    st.sidebar.caption(
+        f"⚡ {warm_report['tasks']} cached views ready ({warm_report['seconds']:.1f}s warm-up)"
+    )
+    return data
+
+
+def render_data_quality_panel() -> None:
+    """Sidebar summary of the load-time checks: quarantined errors, warnings and the issue list."""
+    issues = summaries.quality
+    errors = int((issues["severity"] == ERROR).sum())
+    warnings = int((issues["severity"] == WARNING).sum())
+    label = f"🩺 Data quality ({errors} quarantined, {warnings} warnings)" if len(issues) else "🩺 Data quality"
+    with st.sidebar.expander(label, expanded=False):
+        if summaries.meta.get("quality_seconds") is None:
+            st.caption("Checks were not run for this dataset.")
+            return
+        st.caption(
+            f"Checked in {summaries.meta['quality_seconds'] * 1000:.0f} ms. Errors are removed from every view; "
+            "warnings are shown for review only."
+        )
+        if issues.empty:
+            st.success("No issues found.")
+            return
+        rule = st.selectbox("Rule", ["All"] + sorted(issues["rule"].unique()), key="dq_rule")
+        shown = issues if rule == "All" else issues[issues["rule"] == rule]
+        st.dataframe(
+            shown[["severity", "process", "series", "quarter", "field", "message"]],
+            hide_index=True,
+            use_container_width=True,
+        )
+        csv_download(issues, "data_quality_issues.csv")
+
+
+render_data_quality_panel()
+
+
+def render_sources_panel() -> None:
+    """Sidebar timing and staleness of each source of a multi-source dataset."""
+    ingest = summaries.meta.get(SOURCES_KEY)
+    if not ingest:
+        return
+    reports = pd.DataFrame(ingest["reports"])
+    stale = int(reports["stale"].sum())
+    with st.sidebar.expander(f"📥 Sources ({stale} stale)" if stale else "📥 Sources", expanded=bool(stale)):
+        st.caption(
+            f"{len(reports)} sources read concurrently in {ingest['read_seconds']:.2f}s "
+            f"({ingest['total_seconds']:.2f}s one after another); refreshed in {ingest['wall_seconds']:.2f}s."
+        )
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "source": reports["name"],
+                    "format": reports["format"],
+                    "KB": (reports["bytes"] / 1024).round(1),
+                    "seconds": reports["seconds"].round(3),
+                    "age (days)": reports["age_days"].round(1),
+                    "latest quarter": reports["latest_quarter"],
+                    "quarters behind": reports["quarters_behind"],
+                    "stale": reports["stale"],
+                    "error": reports["error"],
+                }
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+render_sources_panel()
 
 
 # =======================
-# PERIOD FILTER UTILITIES
+# KPI HTTP API (opt-in via KPI_DASH_API_PORT)
 # =======================
-def quarter_order_key(q: str) -> Tuple[int, int]:
-    """Sorting key for quarters (Qx YYYY)."""
-    qn, yr = q.split()
-    return (int(yr), int(qn[1:]))
-
-
-def filter_period(
-    df: pd.DataFrame,
-    mode: str,
-    q_all: List[str],
-    q_single: Optional[str],
-    q_from: Optional[str],
-    q_to: Optional[str],
-    y_from: Optional[int],
-    y_to: Optional[int],
-) -> pd.DataFrame:
+@st.cache_resource(show_spinner=False)
+def _kpi_store() -> KPIStore:
+    """Process-wide store shared by all sessions and the embedded API."""
+    return KPIStore()
+
+
+@st.cache_resource(show_spinner=False)
+def _api_server(port: int) -> Any:
+    """Start the read-only KPI API once per process (imports Starlette on demand)."""
+    from kpi_core.api import serve_in_thread
+
+    return serve_in_thread(_kpi_store(), port)
+
+
+if os.environ.get(API_PORT_ENV):
+    # Loaded by the first API request, not by this rerun (Overview sessions load no data)
+    _kpi_store().publish_lazy(data_version, functools.partial(_load_data_cached, data_path, data_version))
+    _api_server(int(os.environ[API_PORT_ENV]))
+
+
+@st.cache_resource(show_spinner=False)
+def _dataset_registry() -> DatasetRegistry:
+    """Process-wide registry of datasets compared side by side (shared by all sessions)."""
+    return DatasetRegistry()
+
+
+def parse_dataset_list(text: str) -> List[Tuple[str, str]]:
     """
-    Filter DF by period mode.
+    Parse "label = path" lines (a bare path is labelled by its file name).
 
     Args:
-        df (pd.DataFrame): Input DF.
-        mode (str): Mode ("Single Quarter", etc.).
-        q_all (List[str]): All quarters.
-        q_single (Optional[str]): Single quarter.
-        q_from (Optional[str]): From quarter.
-        q_to (Optional[str]): To quarter.
-        y_from (Optional[int]): From year.
-        y_to (Optional[int]): To year.
+        text (str): One dataset per line; blank lines and "#" comments are ignored.
 
     Returns:
-        pd.DataFrame: Filtered DF.
-    """
-    if df.empty:
-        return df
-    if mode == "Single Quarter" and q_single:
-        return df[df["quarter"] == q_single]
-    if mode == "Quarter Range" and q_from and q_to:
-        q_sorted = sorted(q_all, key=quarter_order_key)
-        start_idx, end_idx = q_sorted.index(q_from), q_sorted.index(q_to)
-        keep = set(q_sorted[start_idx : end_idx + 1])
-        return df[df["quarter"].isin(keep)]
-    if mode == "Year Range" and y_from and y_to:
-        return df[(df["year"] >= y_from) & (df["year"] <= y_to)]
-    return df
+        List[Tuple[str, str]]: (label, path) pairs, first occurrence of a label kept.
+    """
+    out: Dict[str, str] = {}
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        label, sep, path = line.partition("=")
+        label, path = (label.strip(), path.strip()) if sep else (pathlib.Path(line).stem, line)
+        if label and path:
+            out.setdefault(label, path)
+    return list(out.items())
+
+
+# =======================
+# PERFORMANCE VIEW (ADMIN)
+# =======================
+@st.cache_resource(show_spinner=False)
+def _metrics_endpoint(port: int) -> Any:
+    """Start the local Prometheus endpoint once per process."""
+    return PROFILER.serve_prometheus(port)
+
+
+def is_admin() -> bool:
+    """True when the ``admin`` query param matches ``KPI_DASH_ADMIN_TOKEN``."""
+    token = os.environ.get(ADMIN_TOKEN_ENV)
+    return bool(token) and qp_get("admin") == token
+
+
+def render_performance_panel(session_id: str) -> None:
+    """
+    Sidebar view with per-span percentiles, cache hit rates and this session's rerun traces.
+
+    Args:
+        session_id (str): Current Streamlit session id.
+    """
+    with st.sidebar.expander("⏱️ Performance", expanded=False):
+        if not PROFILER.enabled:
+            st.caption("Profiling is off. Set KPI_DASH_PROFILE=1 and restart to collect timings.")
+            return
+        # The last trace is the rerun currently rendering this panel; show completed ones
+        traces = PROFILER.session_traces(session_id)[:-1][-10:]
+        st.markdown("**Recent reruns (this session)**")
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {
+                        "started": time.strftime("%H:%M:%S", time.localtime(t.started)),
+                        "wall ms": round(t.wall_ms, 1),
+                        "spans": len(t.spans),
+                        "cache hits": t.cache_hits,
+                        "cache misses": t.cache_misses,
+                        "payload KB": round(t.payload_bytes / 1024, 1),
+                    }
+                    for t in reversed(traces)
+                ]
+            ),
+            hide_index=True,
+            use_container_width=True,
+        )
+        st.markdown("**Span percentiles (ms)**")
+        spans = pd.DataFrame(PROFILER.span_summary())
+        st.dataframe(spans.round(2) if not spans.empty else spans, hide_index=True, use_container_width=True)
+        st.markdown("**Caches**")
+        caches = pd.DataFrame(PROFILER.cache_summary())
+        st.dataframe(caches.round(3) if not caches.empty else caches, hide_index=True, use_container_width=True)
+        shared = _shared_cache()
+        if shared is not None:
+            st.markdown("**Shared cache (this replica)**")
+            st.dataframe(pd.DataFrame([shared.stats()]), hide_index=True, use_container_width=True)
+        st.download_button(
+            "Download Prometheus metrics",
+            PROFILER.prometheus_text(),
+            file_name="kpi_dashboard_metrics.prom",
+        )
+
+
+if PROFILER.enabled:
+    if os.environ.get(METRICS_FILE_ENV):
+        PROFILER.export_prometheus(os.environ[METRICS_FILE_ENV])
+    if os.environ.get(METRICS_PORT_ENV):
+        _metrics_endpoint(int(os.environ[METRICS_PORT_ENV]))
+if is_admin():
+    render_performance_panel(_run_ctx.session_id if _run_ctx else "bare")
 
 
 # =======================
@@ -2493,9 +1623,7 @@ if tab == "Overview":
         index=0,
         help="KPIs show general view by default. Choose a disaggregation to view disag-specific trend and steps.",
     )
-    kpis_block = data["quarterlyData"][process]
-    disagg_variants = {v for mapping in DISAG_KPI_LINKS.values() for v in mapping.values()}
-    ordered_ids = [k for k in kpis_block.keys() if k not in disagg_variants]
+    ordered_ids = summaries.kpi_ids.get(process, [])
     default_kpi = qp_get("kpi", ordered_ids[0] if ordered_ids else None)
     if default_kpi not in ordered_ids:
         default_kpi = ordered_ids[0] if ordered_ids else None
@@ -2504,6 +1632,8 @@ if tab == "Overview":
 
     # KPI Details View
     if st.session_state.get(FOCUS_KEY):
+        data = full_data(WARM_DETAILS)
+        kpis_block = data["quarterlyData"][process]
         kpi_id = st.session_state[FOCUS_KEY]
         if kpi_id not in kpis_block:
             st.session_state[FOCUS_KEY] = default_kpi
@@ -2511,16 +1641,25 @@ if tab == "Overview":
         effective_kpi_id, applied = resolve_effective_kpi_id(kpi_id, process, disag_choice)
         k = kpis_block.get(effective_kpi_id) or kpis_block[kpi_id]
         cur = next((x for x in k["data"] if x["quarter"] == quarter), None)
-        s = status_for(effective_kpi_id, None if not cur else cur["value"], k.get("target"))
+        cur_value = cur.get("value") if cur else None
+        s = status_for(effective_kpi_id, cur_value, k.get("target"))
         curr_disp = (
-            pct(cur["value"])
-            if (effective_kpi_id.startswith("pct_") and cur)
-            else (f"{cur['value']:.2f}" if cur else "—")
+            "—"
+            if cur_value is None
+            else (pct(cur_value) if effective_kpi_id.startswith("pct_") else f"{cur_value:.2f}")
         )
         curr_label = f" — {applied}" if applied else ""
         status_label = {"success": "On Target", "warning": "Near Target", "error": "Below Target"}.get(
             s, "—"
         )
+        ci_rows = kpi_band(kpi_intervals_cached(data_version, data), process, effective_kpi_id)
+        ci_cur = ci_rows[ci_rows["quarter"] == quarter]
+        ci_note = ""
+        if not ci_cur.empty:
+            ci = ci_cur.iloc[0]
+            ci_note = f" (95% CI {ci['ci_low']:.1f}–{ci['ci_high']:.1f}%" + (
+                ", statistically below target)" if ci["significance"] == SIG_BELOW else ")"
+            )
         applied_badge = (
             f"<span class='kpi-chip' style='margin-left:.5rem;border-color:{NDA_DARK_GREEN}; color:{NDA_DARK_GREEN}'>Filter: {applied}</span>"
             if applied
@@ -2534,7 +1673,7 @@ if tab == "Overview":
             f"""
             <div style="border-radius:16px; padding:1.5rem; margin-bottom:1.5rem; background:#ffffff; border:1px solid {BORDER_COLOR}; box-shadow:0 8px 32px rgba(0,0,0,.08); border-left:12px solid {status_color(s)};">
               <div style="font-size:1.2rem; font-weight:800; color:{TEXT_DARK}; margin-bottom:.5rem; background:linear-gradient(135deg, {TEXT_DARK}, {NDA_DARK_GREEN}); -webkit-background-clip:text; -webkit-text-fill-color:transparent; background-clip:text;">How is {KPI_NAME_MAP.get(effective_kpi_id, {}).get('long', kpi_id)} tracking against targets?</div>
-              <div style="font-size:1rem; opacity:.9;"><b>Current{curr_label} ({quarter})</b>: {curr_disp}{applied_badge} • <b>Target</b>: {pct(k.get('target')) if effective_kpi_id.startswith('pct_') else (k.get('target','—'))} • <b>Baseline</b>: {pct(k.get('baseline')) if effective_kpi_id.startswith('pct_') else (k.get('baseline','—'))} • <b>Status</b>: {status_label}</div>
+              <div style="font-size:1rem; opacity:.9;"><b>Current{curr_label} ({quarter})</b>: {curr_disp}{applied_badge} • <b>Target</b>: {pct(k.get('target')) if effective_kpi_id.startswith('pct_') else (k.get('target','—'))} • <b>Baseline</b>: {pct(k.get('baseline')) if effective_kpi_id.startswith('pct_') else (k.get('baseline','—'))} • <b>Status</b>: {status_label}{ci_note}</div>
             </div>
             """,
             unsafe_allow_html=True,
@@ -2549,57 +1688,33 @@ if tab == "Overview":
         chart_col1, chart_col2 = st.columns([1.2, 1])
         with chart_col1:
             st.markdown("**What's the volume breakdown for this KPI?**")
-            render_kpi_comparison(process, kpi_id, quarter, data)
+            render_kpi_comparison(process, kpi_id, quarter, data, data_version)
         with chart_col2:
             st.markdown("**How has this KPI trended over time?**")
-            kpi_trend(process, kpi_id, kpis_block, quarter, disag_choice)
+            kpi_trend(
+                process,
+                kpi_id,
+                kpis_block,
+                quarter,
+                disag_choice,
+                kpi_intervals_cached(data_version, data),
+                kpi_forecasts_cached(data_version, data),
+            )
         with st.expander(f"🧭 Where are bottlenecks in this process?", expanded=(disag_choice != "All")):
             process_steps_block(process, quarter, data["processStepData"], disag_choice)
         st.stop()
 
-    # Executive Summary Row
-    stat_counts = {"success": 0, "warning": 0, "error": 0}
-    for kid in ordered_ids:
-        series = kpis_block[kid]["data"]
-        cur = next((x for x in series if x["quarter"] == quarter), None)
-        s = status_for(kid, None if not cur else cur["value"], kpis_block[kid].get("target"))
-        stat_counts[s] += 1
+    # Executive Summary Row (materialized summaries only)
+    stat_counts = summaries.counts_for("kpi", process, quarter)
     total_kpis = sum(stat_counts.values())
-
-    def process_step_status_counts(
-        process: str, quarter: str, processStepData: Dict[str, Any]
-    ) -> Dict[str, int]:
-        """
-        Count status for process steps.
-
-        Args:
-            process (str): Process.
-            quarter (str): Quarter.
-            processStepData (Dict): Steps data.
-
-        Returns:
-            Dict[str, int]: Status counts.
-        """
-        all_steps = processStepData.get(process, {})
-        counts = {"success": 0, "warning": 0, "error": 0}
-        general_steps = {
-            k: v for k, v in all_steps.items() if not any(k.endswith(s) for s in DISAG_SUFFIXES)
-        }
-        for step_name, step_obj in general_steps.items():
-            series = step_obj["data"]
-            cur = next((x for x in series if x["quarter"] == quarter), None)
-            if not cur:
-                continue
-            metric = cur.get("avgDays")
-            target = cur.get("targetDays")
-            if metric is None or target is None:
-                continue
-            status = get_step_status(float(metric), float(target))
-            counts[status] += 1
-        return counts
-
-    step_counts = process_step_status_counts(process, quarter, data["processStepData"])
+    step_counts = summaries.counts_for("step", process, quarter)
     total_steps = sum(step_counts.values())
+    cards = summaries.cards_for(process, quarter)
+    n_sig_below = int((cards["significance"] == SIG_BELOW).sum())
+    headed_off = pd.DataFrame()
+    if quarter == all_quarters[-1]:
+        outlook = summaries.outlook
+        headed_off = outlook[(outlook["process"] == process) & outlook["kpi_id"].isin(ordered_ids)]
 
     panel_open("How are our KPIs performing this quarter?", icon="👀")
     left, right = st.columns(2)
@@ -2607,12 +1722,13 @@ if tab == "Overview":
         st.markdown("**Are our KPIs meeting targets?**")
         labels = ["On track", "At risk", "Off track"]
         vals = [stat_counts["success"], stat_counts["warning"], stat_counts["error"]]
-        fig = px.pie(
-            values=vals,
-            names=labels,
-            hole=0.7,
-            color=labels,
-            color_discrete_map={"On track": NDA_GREEN, "At risk": NDA_ACCENT, "Off track": "#ef4444"},
+        fig = go.Figure(
+            go.Pie(
+                values=vals,
+                labels=labels,
+                hole=0.7,
+                marker=dict(colors=[NDA_GREEN, NDA_ACCENT, "#ef4444"]),
+            )
         )
         fig.update_traces(textinfo="none")
         fig.update_layout(
@@ -2622,19 +1738,31 @@ if tab == "Overview":
             plot_bgcolor=CARD_BG,
             paper_bgcolor=CARD_BG,
         )
-        st.plotly_chart(fig, use_container_width=True, config={"displaylogo": False})
+        plotly_chart(fig, use_container_width=True, config={"displaylogo": False})
         st.caption(f"{stat_counts['success']} / {total_kpis} KPIs are on track.")
+        if n_sig_below:
+            st.caption(
+                f"{n_sig_below} KPI{'s' if n_sig_below != 1 else ''} statistically below target "
+                "(95% interval from case counts entirely under target)."
+            )
+        if not headed_off.empty:
+            names = ", ".join(KPI_NAME_MAP.get(k, {}).get("short", k) for k in headed_off["kpi_id"])
+            st.caption(
+                f"Forecast for {headed_off['quarter'].iloc[0]}: {len(headed_off)} KPI"
+                f"{'s' if len(headed_off) != 1 else ''} more likely than not to miss target ({names})."
+            )
         st.markdown(english_summary(stat_counts, "KPIs"))
     with right:
         st.markdown(f"**Where are delays showing up in {process} steps?**")
         labels = ["On track", "At risk", "Off track"]
         vals = [step_counts["success"], step_counts["warning"], step_counts["error"]]
-        fig = px.pie(
-            values=vals,
-            names=labels,
-            hole=0.7,
-            color=labels,
-            color_discrete_map={"On track": NDA_GREEN, "At risk": NDA_ACCENT, "Off track": "#ef4444"},
+        fig = go.Figure(
+            go.Pie(
+                values=vals,
+                labels=labels,
+                hole=0.7,
+                marker=dict(colors=[NDA_GREEN, NDA_ACCENT, "#ef4444"]),
+            )
         )
         fig.update_traces(textinfo="none")
         fig.update_layout(
@@ -2644,7 +1772,7 @@ if tab == "Overview":
             plot_bgcolor=CARD_BG,
             paper_bgcolor=CARD_BG,
         )
-        st.plotly_chart(fig, use_container_width=True, config={"displaylogo": False})
+        plotly_chart(fig, use_container_width=True, config={"displaylogo": False})
         st.caption(f"{step_counts['success']} / {total_steps} steps are on track.")
         st.markdown(english_summary(step_counts, "process steps"))
     st.info(
@@ -2656,25 +1784,59 @@ if tab == "Overview":
     panel_open(f"How is {process} performing on key metrics?", icon="📊")
     st.markdown('<div class="kpi-grid">', unsafe_allow_html=True)
     cols_per_row = 4
-    for i in range(0, len(ordered_ids), cols_per_row):
+    card_rows = cards.to_dict("records")
+    for i in range(0, len(card_rows), cols_per_row):
         row_cols = st.columns(cols_per_row)
-        for j, kpi_id in enumerate(ordered_ids[i : i + cols_per_row]):
+        for j, card in enumerate(card_rows[i : i + cols_per_row]):
             with row_cols[j]:
-                if kpi_card(kpi_id, kpis_block[kpi_id], quarter, process=process):
-                    select_kpi(kpi_id, process, quarter)
+                if kpi_card(card, quarter, process=process):
+                    select_kpi(card["kpi_id"], process, quarter)
                     st.rerun()
     st.markdown("</div>", unsafe_allow_html=True)
     panel_close()
 
+    # Anomalies
+    panel_open(f"Anomalies this quarter: what looks unusual in {process}?", icon="🚨")
+    unusual = anomalies_for(summaries.anomalies, process, quarter)
+    if unusual.empty:
+        st.success(f"No KPI, step or bottleneck series of {process} departs from its own history in {quarter}.")
+    else:
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "Series": [
+                        anomaly_label(src, series, field)
+                        for src, series, field in zip(unusual["source"], unusual["series"], unusual["field"])
+                    ],
+                    "Type": [
+                        "Level shift" if kind == KIND_SHIFT else "Outlier" for kind in unusual["kind"]
+                    ],
+                    "Value": unusual["value"],
+                    "Expected": unusual["expected"],
+                    "Score": unusual["score"],
+                }
+            ).style.format({"Value": "{:.1f}", "Expected": "{:.1f}", "Score": "{:+.1f}"}),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.caption(
+            "Outliers sit far from the series' own trend (robust z-score beyond ±3.5); level shifts are a step "
+            "up or down from this quarter that the trend does not explain (|t| > 3). Expected is the trend value."
+        )
+    panel_close()
+
 
 # =======================
 # REPORTS TAB
 # =======================
 else:
+    data = full_data(WARM_REPORTS)
     process_reports = st.sidebar.selectbox("Process (Reports)", ["MA", "CT", "GMP"])
     quarter_reports = st.sidebar.selectbox("Quarter (Reports)", all_quarters, index=len(all_quarters) - 1)
     view = st.sidebar.radio(
-        "Reports View", ["Quarterly Volumes & Self-Service Analytics", "Bottleneck Analysis"], horizontal=False
+        "Reports View",
+        ["Quarterly Volumes & Self-Service Analytics", "Bottleneck Analysis", "Dataset Comparison"],
+        horizontal=False,
     )
     if view == "Quarterly Volumes & Self-Service Analytics":
         panel_open("What custom insights do you want to uncover?", icon="🧮")
@@ -2682,8 +1844,9 @@ else:
             "**Welcome to Self-Service Analytics!** Build custom views of your regulatory data. Start with Period & Scope, then choose an Analysis Type. Use % Change for trends to spot improvements/declines."
         )
         # Flatten data
-        df_vol = flatten_volumes(data)
-        df_steps = flatten_steps_for_analytics(data)
+        df_vol = flatten_volumes(data_version, data)
+        df_steps = flatten_steps_for_analytics(data_version, data)
+        df_rates = ratio_components_cached(data_version, data)
         # Period Selection
         with st.expander("📅 Over what time frame should we analyze?", expanded=True):
             st.info("Choose a single quarter, range, or year span for your analysis.")
@@ -2704,7 +1867,7 @@ else:
                     st.warning("From > To: Auto-swapping.")
                     q_from, q_to = q_to, q_from
             else:  # Year Range
-                years = sorted({int(q.split()[1]) for q in all_quarters})
+                years = sorted({period_year(q) for q in all_quarters})
                 c1, c2 = st.columns(2)
                 with c1:
                     y_from = st.selectbox("From Year", years, index=max(0, len(years) - 2))
@@ -2729,7 +1892,9 @@ else:
             )
         # Prepare pool
         pool = pd.concat(
-            [df_vol, df_steps if include_steps else pd.DataFrame(columns=df_vol.columns)], ignore_index=True
+            [df_vol, df_rates]
+            + ([df_steps, bottleneck_analytics_rows(data_version, data.get("bottleneckData", {}))] if include_steps else []),
+            ignore_index=True,
         )
         pool = pool[pool["process"].isin(processes_selected)] if processes_selected else pool
         pool = filter_period(pool, period_mode, all_quarters, q_single, q_from, q_to, y_from, y_to)
@@ -2763,7 +1928,23 @@ else:
                 )
             with col3:
                 agg = st.selectbox(
-                    "Aggregate", ["sum", "mean", "median"], index=1, help="Sum for volumes, Mean/Median for averages/rates."
+                    "Aggregate",
+                    [RATIO_AGG, "sum", "mean", "median"],
+                    index=0,
+                    format_func=lambda a: "weighted (ratio of sums)" if a == RATIO_AGG else a,
+                    help="Weighted pools rates as total numerator / total denominator, sums volumes and averages the rest. "
+                    "Sum for volumes, Mean/Median for plain averages.",
+                )
+            measure = st.selectbox(
+                "Measure",
+                [VALUE_MEASURE] + [m.key for m in WINDOW_MEASURES],
+                format_func=measure_label,
+                help="Year-over-year change, rolling averages and year-to-date totals, precomputed per series over "
+                "all quarters (rates are pooled from their counts). Yearly views show the year-end value.",
+            )
+            if measure != VALUE_MEASURE:
+                pool = windowed_pool(
+                    window_table_cached(data_version, data), measure, scope=pool, year_end=group_by == "year"
                 )
             # Options
             show_pct_change = False
@@ -2816,6 +1997,11 @@ else:
                 show_pct_change,
                 x_metric,
                 y_metric,
+                yearly_components=(
+                    yearly_components_cached(data_version, data)
+                    if period_mode == "Year Range" and measure == VALUE_MEASURE
+                    else None
+                ),
             )
             display_mets = (
                 selected_display_metrics
@@ -2830,130 +2016,342 @@ else:
             st.info(
                 "👆 Select metrics above to generate your analysis. Example: For trends, pick 'Applications Received' and group by quarter."
             )
+        if analysis_type == "Correlation" and not pool.empty:
+            st.divider()
+            section_header("Which metrics move together?", "🔗")
+            c1, c2 = st.columns([2, 1])
+            with c1:
+                focus = st.multiselect(
+                    "Focus on metrics",
+                    display_metrics_all,
+                    default=[],
+                    help="E.g. a cycle time, to see what rises and falls with it. Empty = all pairs.",
+                )
+            with c2:
+                max_lag = st.select_slider("Lead of up to (quarters)", options=[0, 1, 2, 3], value=MAX_LAG)
+            scope = (
+                tuple(sorted(processes_selected)),
+                include_steps,
+                period_mode,
+                q_single,
+                q_from,
+                q_to,
+                y_from,
+                y_to,
+                measure,
+                group_by,
+            )
+            scan = correlation_scan_cached(data_version, scope, agg, max_lag, pool)
+            top = pairs_involving(scan["pairs"], [name2key[d] for d in focus], top=25)
+            if top.empty:
+                st.info("Not enough shared quarters in this scope to score pairs (at least 6 are needed).")
+            else:
+                st.dataframe(
+                    pd.DataFrame(
+                        {
+                            "Metric": top["x_label"],
+                            "Moves with": top["y_label"],
+                            "Lead (quarters)": top["lag"],
+                            "Quarters": top["n"],
+                            "Pearson r": top["pearson"],
+                            "Spearman ρ": top["spearman"],
+                            "q-value": top["q_value"],
+                        }
+                    ).style.format(
+                        {"Pearson r": "{:+.2f}", "Spearman ρ": "{:+.2f}", "q-value": "{:.3g}"}
+                    ),
+                    use_container_width=True,
+                    hide_index=True,
+                )
+                st.caption(
+                    f"{len(scan['pairs']):,} pairs scored over {scan['matrix'].shape[1]} series. Ranked by the weaker "
+                    "of Pearson and Spearman, so one extreme quarter cannot top the list. A lead of L means the first "
+                    "metric L quarters earlier; q-values correct for testing every pair. Correlation is not causation."
+                )
+        panel_close()
+    elif view == "Dataset Comparison":
+        panel_open("How do other agencies or data vintages compare?", icon="🗂️")
+        dataset_text = st.text_area(
+            "Datasets (one `label = path` per line)",
+            value=f"Current = {data_path}",
+            help="E.g. `Previous export = data/kpiData_2025Q1.json` or `Agency B = data/agency_b.json`. "
+            "Datasets are loaded once into shared memory and dropped after 30 idle minutes.",
+        )
+        registry = _dataset_registry()
+        loaded = []
+        for label, path in parse_dataset_list(dataset_text):
+            try:
+                registry.register(label, path, pinned=path == data_path)
+                loaded.append(label)
+            except DataError as e:
+                st.warning(f"{label}: {e}")
+        if len(loaded) < 2:
+            st.info("Add at least one more dataset to compare, e.g. last quarter's export.")
+        else:
+            mode = st.radio("Compare", ["Vintage changes", "Benchmark"], horizontal=True)
+            if mode == "Vintage changes":
+                c1, c2 = st.columns(2)
+                with c1:
+                    base_label = st.selectbox("Earlier vintage", loaded, index=1)
+                with c2:
+                    other_label = st.selectbox("Later vintage", loaded, index=0)
+                deltas = registry.vintage_deltas(base_label, other_label)
+                deltas = deltas[deltas["process"] == process_reports]
+                counts = deltas["change"].value_counts()
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric("Revised points", int(counts.get(CHANGE_REVISED, 0)))
+                m2.metric("New points", int(counts.get(CHANGE_ADDED, 0)))
+                m3.metric("Dropped points", int(counts.get(CHANGE_DROPPED, 0)))
+                m4.metric("Moved across target", int(deltas["target_flip"].sum()))
+                changed = deltas[deltas["change"] != "unchanged"]
+                if changed.empty:
+                    st.success(f"No {process_reports} KPI values differ between the two datasets.")
+                else:
+                    st.dataframe(
+                        pd.DataFrame(
+                            {
+                                "KPI": changed["kpi_id"].map(metric_display_name),
+                                "Quarter": changed["quarter"],
+                                base_label: changed["value_base"],
+                                other_label: changed["value_other"],
+                                "Change": changed["delta"],
+                                "Change (%)": changed["pct_delta"],
+                                "Type": changed["change"],
+                                "Crossed target": changed["target_flip"].map({True: "yes", False: ""}),
+                            }
+                        ).style.format(
+                            {base_label: "{:.1f}", other_label: "{:.1f}", "Change": "{:+.1f}", "Change (%)": "{:+.1f}%"},
+                            na_rep="—",
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                    csv_download(changed, f"vintage_changes_{process_reports}.csv")
+            else:
+                bench = registry.benchmark(loaded)
+                bench = bench[(bench["process"] == process_reports) & (bench["quarter"] == quarter_reports)]
+                if bench.empty:
+                    st.info(f"No {process_reports} KPI is reported by two or more datasets for {quarter_reports}.")
+                else:
+                    table = bench.pivot(index="kpi_id", columns="dataset", values="value").reindex(columns=loaded)
+                    best = bench[bench["rank"] == 1].groupby("kpi_id")["dataset"].agg(", ".join)
+                    table.insert(len(loaded), "Best", best)
+                    table.insert(len(loaded) + 1, "Peer median", bench.groupby("kpi_id")["peer_median"].first())
+                    table.index = table.index.map(metric_display_name)
+                    st.dataframe(
+                        table.style.format({c: "{:.1f}" for c in loaded + ["Peer median"]}, na_rep="—"),
+                        use_container_width=True,
+                    )
+                    st.caption(
+                        f"{process_reports} KPIs for {quarter_reports} that at least two datasets report under the "
+                        "same KPI id. Best takes each KPI's direction into account (lower is better for turnaround "
+                        "times)."
+                    )
+        mem_stats = registry.memory_stats()
+        st.caption(
+            f"{mem_stats['datasets']} datasets in memory; {mem_stats['shared_fraction']:.0%} of their data "
+            "structures are shared rather than duplicated."
+        )
         panel_close()
     else:
         # Bottleneck Analysis
 
-        @st.cache_data(show_spinner=False)
-        def reports_prepare_bottleneck_df(
-            process: str, quarter: str, bottleneck_data: Dict[str, Any]
-        ) -> pd.DataFrame:
-            """
-            Prepare bottleneck DF with fallback random data if missing.
-
-            Args:
-                process (str): Process.
-                quarter (str): Quarter.
-                bottleneck_data (Dict): Bottlenecks data.
-
-            Returns:
-                pd.DataFrame: Bottleneck metrics.
-            """
-            steps_data = bottleneck_data.get(process, {})
-            if not steps_data:
-                default_steps = {
-                    "MA": [
-                        "Preliminary Screening",
-                        "Technical Dossier Review",
-                        "Quality Review",
-                        "Safety & Efficacy Review",
-                        "Queries to Applicant",
-                        "Applicant Response Review",
-                        "Decision Issued",
-                        "License Publication",
-                    ],
-                    "CT": [
-                        "Administrative Screening",
-                        "Ethics Review",
-                        "Technical Review",
-                        "GCP Inspection",
-                        "Applicant Response Review",
-                        "Decision Issued",
-                        "Trial Registration",
-                    ],
-                    "GMP": [
-                        "Application Screening",
-                        "Inspection Planning",
-                        "Inspection Conducted",
-                        "Inspection Report Drafted",
-                        "CAPA Requested",
-                        "CAPA Review",
-                        "Final Decision Issued",
-                        "Report Publication",
-                    ],
-                }
-                steps_data = {step: [] for step in default_steps.get(process, ["Generic Step 1", "Generic Step 2"])}
-            rows = []
-            for step, series in steps_data.items():
-                qrec = next((x for x in series if x.get("quarter") == quarter), None) or {}
-                random.seed(f"{process}_{quarter}_{step}")
-                row = {"step": step}
-                row["cycle_time_median"] = qrec.get("cycle_time_median") or random.uniform(10, 60)
-                row["ext_median_days"] = qrec.get("ext_median_days") or random.uniform(5, 30)
-                row["opening_backlog"] = qrec.get("opening_backlog") or random.randint(5, 50)
-                row["carry_over_rate"] = (qrec.get("carry_over_rate") or random.uniform(0.1, 0.4)) * 100
-                row["avg_query_cycles"] = qrec.get("avg_query_cycles") or random.uniform(1, 4)
-                row["fpy_pct"] = qrec.get("fpy_pct") or random.uniform(70, 95)
-                row["wait_share_pct"] = qrec.get("wait_share_pct") or random.uniform(20, 60)
-                if process == "MA":
-                    row["work_to_staff_ratio"] = qrec.get("work_to_staff_ratio") or random.uniform(1.5, 4.0)
-                else:
-                    row["sched_median_days"] = qrec.get("sched_median_days") or random.uniform(7, 21)
-                rows.append(row)
-            df = pd.DataFrame(rows).sort_values("step")
-            if df["cycle_time_median"].isna().any():
-                np.random.seed(42)
-                df.loc[df["cycle_time_median"].isna(), "cycle_time_median"] = np.random.uniform(
-                    10, 60, size=df["cycle_time_median"].isna().sum()
-                )
-            return df
-
         panel_open(f"Where are the biggest bottlenecks in {process_reports}?", icon="🔬")
         df_b = reports_prepare_bottleneck_df(
-            process_reports, quarter_reports, data.get("bottleneckData", {})
+            data_version, process_reports, quarter_reports, data.get("bottleneckData", {})
         )
         c1, c2 = st.columns(2)
         with c1:
-            if df_b.empty or "opening_backlog" not in df_b.columns:
+            fig = backlog_figure(df_b, process_reports, quarter_reports)
+            if fig is None:
                 st.info("No backlog data available for this selection.")
             else:
                 st.markdown("**Which steps carry the heaviest backlogs?**")
-                backlog_df = df_b[["step", "opening_backlog"]].dropna()
-                fig = px.bar(
-                    backlog_df,
-                    y="step",
-                    x="opening_backlog",
-                    orientation="h",
-                    title=f"Backlog Carried Forward in Process Step ({quarter_reports}, {process_reports})",
-                    labels={"opening_backlog": "Backlog Items", "step": "Process Steps"},
-                    color_discrete_sequence=[NDA_GREEN],
-                )
-                fig.update_layout(
-                    height=400, plot_bgcolor=CARD_BG, paper_bgcolor=CARD_BG, font=dict(color=TEXT_DARK)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                plotly_chart(fig, use_container_width=True)
         with c2:
-            if df_b.empty or "cycle_time_median" not in df_b.columns:
+            fig = cycle_time_figure(df_b, process_reports, quarter_reports)
+            if fig is None:
                 st.info("No cycle time data.")
             else:
                 st.markdown("**How long are steps taking to complete?**")
-                cycle_df = df_b[["step", "cycle_time_median"]].dropna()
-                fig = px.bar(
-                    cycle_df,
-                    x="step",
-                    y="cycle_time_median",
-                    title=f"Median Time to Complete This Step (Days, {quarter_reports}, {process_reports})",
-                    labels={"cycle_time_median": "Median Days", "step": "Process Steps"},
-                    color_discrete_sequence=[NDA_ACCENT],
+                plotly_chart(fig, use_container_width=True)
+        flow = bottleneck_analytics_cached(data_version, data.get("bottleneckData", {}))
+        flow_q = flow[(flow["process"] == process_reports) & (flow["quarter"] == quarter_reports)]
+        if not flow_q.empty:
+            st.divider()
+            section_header("How old is the backlog, and is capacity keeping up?", "⏳")
+            c1, c2 = st.columns(2)
+            with c1:
+                fig = aging_heatmap_figure(aging_matrix(flow, process_reports, quarter_reports), process_reports, quarter_reports)
+                if fig is None:
+                    st.info("No aging data for this selection.")
+                else:
+                    st.markdown("**Where are items getting old?**")
+                    plotly_chart(fig, use_container_width=True)
+            with c2:
+                st.markdown("**Lead time, backlog growth and headroom per step**")
+                flow_cols = [
+                    ("wip_count", "WIP"),
+                    ("throughput_q", "Throughput / qtr"),
+                    ("littles_lead_time_days", "Lead time (days)"),
+                    ("aged_90_share_pct", "Aged 90+ (%)"),
+                    ("backlog_growth_pct", "Backlog growth (%)"),
+                    ("capacity_headroom_pct", "Capacity headroom (%)"),
+                ]
+                df_flow = flow_q.set_index("step")[[c for c, _ in flow_cols]]
+                df_flow.columns = [label for _, label in flow_cols]
+                st.dataframe(df_flow.style.format("{:.1f}", na_rep="—"), use_container_width=True)
+                st.caption(
+                    "Lead time = WIP ÷ daily throughput (Little's law); throughput = capacity × utilisation. "
+                    "Negative headroom means more cases arrive than the step can process."
                 )
-                fig.update_layout(
-                    height=400,
-                    xaxis_tickangle=45,
-                    plot_bgcolor=CARD_BG,
-                    paper_bgcolor=CARD_BG,
-                    font=dict(color=TEXT_DARK),
+        fm = flow_matrices_cached(data_version, data.get("processStepCounts", {})).get(process_reports)
+        if fm is not None and quarter_reports in fm.quarters:
+            st.divider()
+            section_header("Where does work actually pile up?", "🚦")
+            history = fm.quarters[: fm.quarters.index(quarter_reports) + 1]
+            summary = flow_summary(fm, [quarter_reports])
+            c1, c2 = st.columns(2)
+            with c1:
+                fig = flow_ranking_figure(summary, process_reports, quarter_reports)
+                if fig is not None:
+                    st.markdown("**Which steps hold the most days of open work?**")
+                    plotly_chart(fig, use_container_width=True)
+            with c2:
+                fig = cumulative_flow_figure(cumulative_flow(fm, history), process_reports)
+                if fig is not None:
+                    st.markdown("**How has work flowed through the pipeline?**")
+                    plotly_chart(fig, use_container_width=True)
+            flow_cols = [
+                ("rank", "Rank"),
+                ("started", "Started"),
+                ("completed", "Completed"),
+                ("imbalance", "Net inflow"),
+                ("open_end", "Open at end"),
+                ("accumulation", "Open change"),
+                ("handoff_gap", "Hand-off gap"),
+                ("backlog_days", "Days of open work"),
+            ]
+            df_rank = summary.set_index("step")[[c for c, _ in flow_cols]]
+            df_rank.columns = [label for _, label in flow_cols]
+            st.dataframe(df_rank.style.format("{:.1f}", na_rep="—", subset=df_rank.columns[1:]), use_container_width=True)
+            st.caption(
+                "From processStepCounts. Net inflow = started − completed; hand-off gap = completed here but not yet "
+                "started by the next step; days of open work = open items ÷ daily throughput."
+            )
+        sim_steps = [
+            step
+            for step, series in data.get("bottleneckData", {}).get(process_reports, {}).items()
+            if any(r.get("quarter") == quarter_reports and r.get("incoming_cases_q") is not None for r in series)
+        ]
+        if sim_steps:
+            st.divider()
+            section_header("What if we change staffing next quarter?", "🧪")
+            c1, c2, c3, c4 = st.columns(4)
+            with c1:
+                sim_step = st.selectbox("Step", sim_steps, key="sim_step")
+            with c2:
+                sim_team = st.number_input("Reviewers now", min_value=1, max_value=100, value=DEFAULT_TEAM_SIZE, key="sim_team")
+            with c3:
+                sim_extra = st.number_input("Reviewers added", min_value=-sim_team + 1, max_value=50, value=2, key="sim_extra")
+            with c4:
+                sim_demand = st.slider("Demand change (%)", -50, 100, 0, step=5, key="sim_demand")
+            sim_reps = st.select_slider(
+                "Replications", options=[2000, DEFAULT_REPLICATIONS, 20000, 100000], value=DEFAULT_REPLICATIONS, key="sim_reps"
+            )
+            base = staffing_scenario(
+                data_version, process_reports, quarter_reports, Scenario(demand_factor=1 + sim_demand / 100), sim_reps, data
+            )
+            what_if = staffing_scenario(
+                data_version,
+                process_reports,
+                quarter_reports,
+                Scenario(
+                    extra_staff=((sim_step, int(sim_extra)),),
+                    team_size=((sim_step, int(sim_team)),),
+                    demand_factor=1 + sim_demand / 100,
+                ),
+                sim_reps,
+                data,
+            )
+            if base and what_if:
+                b_row = base["steps"].set_index("step").loc[sim_step]
+                w_row = what_if["steps"].set_index("step").loc[sim_step]
+                m1, m2, m3, m4 = st.columns(4)
+                m1.metric(
+                    "Backlog at quarter end (median)",
+                    f"{w_row['backlog_p50']:.0f}",
+                    delta=f"{w_row['backlog_p50'] - b_row['backlog_p50']:+.0f} vs no change",
+                    delta_color="inverse",
+                )
+                m2.metric(
+                    "Cycle time p50 / p90 (days)",
+                    f"{w_row['cycle_p50']:.1f} / {w_row['cycle_p90']:.1f}",
+                    delta=f"{w_row['cycle_p50'] - b_row['cycle_p50']:+.1f} days (p50)",
+                    delta_color="inverse",
+                )
+                m3.metric(
+                    f"P(≤ {w_row['target_days']:.0f} target days)" if pd.notna(w_row["target_days"]) else "P(meet target)",
+                    "—" if pd.isna(w_row["p_meet_target"]) else f"{w_row['p_meet_target']:.0%}",
+                    delta=None
+                    if pd.isna(w_row["p_meet_target"])
+                    else f"{(w_row['p_meet_target'] - b_row['p_meet_target']) * 100:+.0f} pts",
+                )
+                e2e = what_if["end_to_end"]
+                m4.metric(
+                    "End to end p50 / p90 (days)",
+                    f"{e2e['cycle_p50']:.1f} / {e2e['cycle_p90']:.1f}",
+                    delta=f"{e2e['cycle_p50'] - base['end_to_end']['cycle_p50']:+.1f} days (p50)",
+                    delta_color="inverse",
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                sim_cols = [
+                    ("utilisation", "Utilisation"),
+                    ("backlog_p10", "Backlog p10"),
+                    ("backlog_p50", "Backlog p50"),
+                    ("backlog_p90", "Backlog p90"),
+                    ("cycle_p50", "Cycle p50 (days)"),
+                    ("cycle_p90", "Cycle p90 (days)"),
+                    ("target_days", "Target days"),
+                    ("p_meet_target", "P(meet target)"),
+                ]
+                df_sim = what_if["steps"].set_index("step")[[c for c, _ in sim_cols]]
+                df_sim.columns = [label for _, label in sim_cols]
+                st.dataframe(
+                    df_sim.style.format("{:.1f}", na_rep="—").format(
+                        "{:.0%}", subset=["Utilisation", "P(meet target)"], na_rep="—"
+                    ),
+                    use_container_width=True,
+                )
+                st.caption(
+                    f"{what_if['replications']:,} Monte Carlo replications of the next {what_if['weeks']} weeks, starting "
+                    f"from {quarter_reports}. Capacity is inferred from the work-to-staff ratio and scaled by "
+                    "(reviewers now + added) ÷ reviewers now; the end-to-end time assumes a case passes every step listed."
+                )
+                for note in what_if["notes"]:
+                    st.caption(f"ℹ️ {note}")
+        fine_bottlenecks = data.get("finePeriods", {}).get("bottleneckData")
+        if fine_bottlenecks:
+            df_fine = reports_fine_bottleneck_df(data_version, process_reports, quarter_reports, fine_bottlenecks)
+            if not df_fine.empty:
+                st.divider()
+                section_header("How did bottlenecks move within the quarter?", "📆")
+                fine_metrics = [
+                    (m, lbl)
+                    for m, lbl in [
+                        ("wip_count", "Work in Progress"),
+                        ("closing_backlog", "Backlog at Period End"),
+                        ("cycle_time_median", "Median Cycle Time (Days)"),
+                        ("wait_share_pct", "Waiting Time (%)"),
+                    ]
+                    if m in df_fine.columns
+                ]
+                if fine_metrics:
+                    metric_fine = st.selectbox(
+                        "Metric", fine_metrics, format_func=lambda m: m[1], key="fine_bottleneck_metric"
+                    )
+                    fig = fine_bottleneck_figure(df_fine, metric_fine[0], metric_fine[1], quarter_reports)
+                    if fig is not None:
+                        plotly_chart(fig, use_container_width=True)
         st.divider()
         section_header("What are the key metrics driving bottlenecks?", "📋")
         if df_b.empty: